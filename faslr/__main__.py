@@ -3,7 +3,7 @@ import os
 import platform
 import sys
 
-from faslr.analysis import AnalysisTab
+from faslr.common.tabs import BackgroundTabUnloader
 
 from faslr.connection import (
     populate_project_tree
@@ -19,6 +19,8 @@ from faslr.core import (
     FCore
 )
 
+from faslr.database import DatabaseClient
+
 from faslr.menu import (
     MainMenuBar
 )
@@ -34,10 +36,18 @@ from faslr.style.main import (
     MAIN_WINDOW_TITLE
 )
 
+from faslr.startup import (
+    StartupSplash,
+    preload_modules
+)
+
+from faslr.utilities.lazy import lazy_import
+
 from PyQt6.QtCore import (
     QEvent,
     Qt,
-    QThreadPool
+    QThreadPool,
+    QTimer
 )
 
 from PyQt6.QtWidgets import (
@@ -53,21 +63,33 @@ from PyQt6.QtWidgets import (
 
 from shutil import copyfile
 
+from faslr.utilities.results_cache import RESULTS_CACHE
+
 from faslr.utilities.sample import load_sample
 
+# Loaded behind the splash screen, see MainWindow.initialize().
+analysis = lazy_import('faslr.analysis')
+
 
 class MainWindow(QMainWindow):
     def __init__(
             self,
             application: QApplication = None,
-            core: FCore = None
+            core: FCore = None,
+            deferred: bool = False
     ):
+        """
+        :param deferred: If True, the parts of the window that need the numerical libraries are left for
+        initialize(), which the caller runs once the window is shown.
+        """
         super().__init__()
         logging.info("Main window initialized.")
 
         self.application = application
         self.core = core
 
+        RESULTS_CACHE.max_size = self.core.results_cache_size * 1024 ** 2
+
         self.resize(
             MAIN_WINDOW_WIDTH,
             MAIN_WINDOW_HEIGHT
@@ -100,22 +122,9 @@ class MainWindow(QMainWindow):
         splitter = QSplitter(Qt.Orientation.Horizontal)
         splitter.addWidget(self.project_pane)
 
-        # triangle placeholder
-
-        self.auto_triangle = load_sample('us_industry_auto')
-        self.xyz_triangle = load_sample('uspp_incr_case')
-        self.auto_tab = AnalysisTab(
-            triangle=self.auto_triangle
-        )
-        self.xyz_tab = AnalysisTab(
-            triangle=self.xyz_triangle
-        )
-
         self.analysis_pane = QTabWidget()
         self.analysis_pane.setTabsClosable(True)
         self.analysis_pane.setMovable(True)
-        self.analysis_pane.addTab(self.auto_tab, "Auto")
-        self.analysis_pane.addTab(self.xyz_tab, "XYZ")
 
         # This styling is mostly done to add a border right beneath the tab
         # self.analysis_pane.setStyleSheet(
@@ -144,6 +153,12 @@ class MainWindow(QMainWindow):
         # noinspection PyUnresolvedReferences
         self.analysis_pane.tabCloseRequested.connect(self.remove_tab)
 
+        # Releases the models of analysis tabs left in the background.
+        self.tab_unloader = BackgroundTabUnloader(
+            tab_widget=self.analysis_pane,
+            timeout=self.core.tab_unload_timeout
+        )
+
         splitter.addWidget(self.analysis_pane)
         splitter.setStretchFactor(1, 1)
         splitter.setSizes([125, 150])
@@ -164,13 +179,57 @@ class MainWindow(QMainWindow):
 
         self.setCentralWidget(self.main_container)
 
+        if not deferred:
+            self.initialize()
+
+    def initialize(
+            self,
+            splash: StartupSplash = None
+    ) -> None:
+        """
+        Loads the numerical libraries, opens the sample triangles and connects to the startup database.
+
+        :param splash: Displays the progress of each step, and is closed once they are done.
+        """
+
+        on_status = None if splash is None else splash.set_status
+
+        preload_modules(on_status=on_status)
+
+        if on_status is not None:
+            on_status("Loading sample triangles...")
+
+        # triangle placeholder
+
+        self.auto_triangle = load_sample('us_industry_auto')
+        self.xyz_triangle = load_sample('uspp_incr_case')
+        self.auto_tab = analysis.DeferredAnalysisTab(
+            triangle=self.auto_triangle
+        )
+        self.xyz_tab = analysis.DeferredAnalysisTab(
+            triangle=self.xyz_triangle
+        )
+
+        self.analysis_pane.insertTab(0, self.auto_tab, "Auto")
+        self.analysis_pane.insertTab(1, self.xyz_tab, "XYZ")
+        self.analysis_pane.setCurrentIndex(0)
+
         # if a startup db is indicated, connect to it and populate the project tree with its contents
-        if core.startup_db != "None":
+        if self.core.startup_db not in [None, "None"]:
+
+            if on_status is not None:
+                on_status("Connecting to database...")
+
             populate_project_tree(
-                db_filename=core.startup_db,
+                db_filename=self.core.startup_db,
                 main_window=self
             )
 
+        if splash is not None:
+            splash.finish(self)
+
+        logging.info("Main window ready.")
+
     def remove_tab(
             self,
             index: int
@@ -178,8 +237,13 @@ class MainWindow(QMainWindow):
         """
         Deletes an open tab from the analysis pane.
         """
+        widget = self.analysis_pane.widget(index)
         self.analysis_pane.removeTab(index)
 
+        # removeTab() only detaches the widget, which would otherwise be kept alive along with its models.
+        if widget is not None:
+            widget.deleteLater()
+
     def closeEvent(
             self,
             event: QEvent
@@ -197,6 +261,11 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
 
+    # python -m faslr batch runs the headless batch projection instead of the application.
+    if sys.argv[1:2] == ['batch']:
+        from faslr.batch import main
+        sys.exit(main(sys.argv[2:]))
+
     # Get OS information from the user.
     os_name = platform.platform()
 
@@ -228,13 +297,29 @@ if __name__ == "__main__":
         )
 
     app = QApplication(sys.argv)
+
+    splash = StartupSplash()
+    splash.show()
+    app.processEvents()
+
     fcore = FCore()
 
+    # All database access in the application goes through the database worker thread.
+    fcore.db_client = DatabaseClient()
+    app.aboutToQuit.connect(fcore.db_client.stop)  # noqa
+
     window = MainWindow(
         application=app,
-        core=fcore
+        core=fcore,
+        deferred=True
     )
 
     window.show()
 
+    # Finish loading once the window has been painted.
+    QTimer.singleShot(
+        0,
+        lambda: window.initialize(splash=splash)
+    )
+
     app.exec()
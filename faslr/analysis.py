@@ -1,5 +1,14 @@
+from __future__ import annotations
+
+import gc
+import pandas as pd
+import time
+import tracemalloc
+
 from chainladder import Triangle
 
+from faslr.batch import write_view_selections
+
 from faslr.base_table import (
     FAbstractTableModel,
     FTableView
@@ -12,9 +21,30 @@ from faslr.constants import (
     VALUE_TYPES_COMBO_BOX_WIDTH
 )
 
+from faslr.database import (
+    DatabaseClient,
+    run_db_job
+)
+
+from faslr.diagnostics import MackDiagnostics
+
+from faslr.factor import FactorModel
+
+from faslr.mack import MackStandardErrors
+
+from faslr.methods.development import DevelopmentTab
+
+from faslr.profiler import profile_span
+
+from faslr.stochastic import BootstrapWidget
+
 from faslr.utilities.accessors import get_column
+from faslr.utilities.lazy import lazy_import
 
 from PyQt6.QtCore import (
+    QEvent,
+    QModelIndex,
+    QTimer,
     Qt
 )
 
@@ -27,6 +57,7 @@ from PyQt6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QDoubleSpinBox,
+    QPushButton,
     QStackedWidget,
     QTabWidget,
     QVBoxLayout,
@@ -38,6 +69,19 @@ from faslr.triangle_model import (
     TriangleView
 )
 
+from functools import partial
+
+from typing import (
+    Any,
+    TYPE_CHECKING
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from faslr.tail import TailPane
+
+# The tail pane sets matplotlib's Qt backend when it is imported, which needs a running QApplication.
+tail = lazy_import('faslr.tail')
+
 pass_alias = {
     True: "Fail",
     False: "Pass"
@@ -53,13 +97,24 @@ class AnalysisTab(QWidget):
     # should eventually contain the TriangleColumnTab
     def __init__(
             self, triangle: Triangle,
-            lob: str = None
+            lob: str = None,
+            exclusions: dict = None,
+            selections: dict = None,
+            tails: dict = None,
+            view_id: int = None,
+            db_path: str = None,
+            client: DatabaseClient = None
     ):
         super().__init__()
 
         self.triangle = triangle
         self.lob = lob
 
+        # The data view the triangle was read from, if any, to which the selections are saved, see save_selections().
+        self.view_id = view_id
+        self.db_path = db_path
+        self.client = client
+
         self.layout = QVBoxLayout()
 
         # The combo box is used to switch between values (losses/premiums) and link ratios.
@@ -69,6 +124,23 @@ class AnalysisTab(QWidget):
         self.column_tab = ColumnTab()
         self.column_tab.setTabPosition(QTabWidget.TabPosition.West)
 
+        # Opens the development factors of the selected column in a window, see open_development().
+        self.development_btn = QPushButton("Development")
+        self.development_btn.setFixedWidth(self.development_btn.sizeHint().width())
+        self.development_btn.clicked.connect(lambda: self.open_development()) # noqa
+
+        # Likewise for the tail analysis, see open_tail().
+        self.tail_btn = QPushButton("Tail")
+        self.tail_btn.setFixedWidth(self.tail_btn.sizeHint().width())
+        self.tail_btn.clicked.connect(lambda: self.open_tail()) # noqa
+
+        self.save_btn = QPushButton("Save")
+        self.save_btn.setFixedWidth(self.save_btn.sizeHint().width())
+        self.save_btn.clicked.connect(lambda: self.save_selections()) # noqa
+
+        # Outcome of the last save.
+        self.save_label = QLabel()
+
         self.column_list = list(self.triangle.columns)
 
         # These dictionaries allow us to keep track of and manipulate the views later.
@@ -77,9 +149,35 @@ class AnalysisTab(QWidget):
 
         self.analysis_containers = {}
 
+        self.triangle_columns = {}
+
+        # Test statistics shared by the diagnostic widgets of each column
+        self.diagnostics = {}
+
         self.diagnostic_containers = {}
         self.diagnostic_widgets = {}
 
+        # Stochastic views of each column, one page per column in its stacked widget
+        self.bootstrap_pages = {}
+        self.bootstrap_widgets = {}
+
+        # Mack standard errors of every column, computed together the first time any column's are displayed
+        self.mack = None
+        self.mack_views = {}
+
+        # Development windows of each column, and the slots connecting their factor models to the standard errors.
+        self.development_tabs = {}
+        self.factor_links = {}
+
+        # Tail windows of each column.
+        self.tail_tabs = {}
+
+        # Link ratios excluded in each column, as (origin, age) tuples, LDFs selected in each column, by age, and the
+        # arguments of the TailConstant selected for each column.
+        self.exclusions = dict(exclusions or {})
+        self.selections = dict(selections or {})
+        self.tails = dict(tails or {})
+
         # 1 set of groupboxes for each of the Mack tests
         self.mack_valuation_groupboxes = {}
         self.mack_development_groupboxes = {}
@@ -104,50 +202,25 @@ class AnalysisTab(QWidget):
                 lob=self.lob
             )
 
+            self.triangle_columns[i] = triangle_column
+
             self.triangle_views[i] = TriangleView()
             # We use QStackedWidget to switch between tabular and diagnostic views.
             self.analysis_containers[i] = QStackedWidget()
             self.analysis_containers[i].addWidget(self.triangle_views[i])
-            self.diagnostic_containers[i] = QVBoxLayout()
-            self.diagnostic_containers[i].setSpacing(30)
-
-            self.mack_valuation_groupboxes[i] = MackAllYearGroupBox(
-                title="Mack Valuation Correlation Test - All Years",
-                triangle=triangle_column,
-                test_type="valuation correlation"
-            )
-            self.diagnostic_containers[i].addWidget(self.mack_valuation_groupboxes[i])
-
-            self.mack_valuation_individual_groupboxes[i] = MackIndividualGroupBox(
-                title="Mack Valuation Correlation Test - Individual Years",
-                triangle=triangle_column
-            )
-
-            self.diagnostic_containers[i].addWidget(self.mack_valuation_individual_groupboxes[i])
-
-            self.mack_development_groupboxes[i] = MackAllYearGroupBox(
-                title="Mack Development Correlation Test",
-                triangle=triangle_column,
-                test_type="development correlation"
-            )
-
-            self.diagnostic_containers[i].addWidget(
-                self.mack_development_groupboxes[i],
-                stretch=0
-            )
-
-            self.diagnostic_containers[i].addWidget(
-                QWidget(),
-                stretch=2
-            )
-
-            self.mack_development_view = MackValuationView()
 
+            # The diagnostics are only built once the user first views them for this column, see build_diagnostics().
             self.diagnostic_widgets[i] = DiagnosticWidget()
-
-            self.diagnostic_widgets[i].setLayout(self.diagnostic_containers[i])
             self.analysis_containers[i].addWidget(self.diagnostic_widgets[i])
 
+            # Likewise for the bootstrap, see build_bootstrap().
+            self.bootstrap_pages[i] = QWidget()
+            self.bootstrap_pages[i].setLayout(QVBoxLayout())
+            self.analysis_containers[i].addWidget(self.bootstrap_pages[i])
+
+            self.mack_views[i] = MackResultsView()
+            self.analysis_containers[i].addWidget(self.mack_views[i])
+
             triangle_model = TriangleModel(triangle_column, 'value')
             self.triangle_views[i].setModel(triangle_model)
 
@@ -162,10 +235,20 @@ class AnalysisTab(QWidget):
 
             self.column_tab.addTab(self.analysis_containers[i], i)
 
-        self.layout.addWidget(
-            self.value_box,
-            alignment=Qt.AlignmentFlag.AlignRight
-        )
+        self.tool_layout = QHBoxLayout()
+        self.tool_layout.setContentsMargins(0, 0, 0, 0)
+        self.tool_layout.addStretch()
+
+        # Only triangles read from a data view have somewhere to save the selections.
+        if self.view_id is not None:
+            self.tool_layout.addWidget(self.save_label)
+            self.tool_layout.addWidget(self.save_btn)
+
+        self.tool_layout.addWidget(self.development_btn)
+        self.tool_layout.addWidget(self.tail_btn)
+        self.tool_layout.addWidget(self.value_box)
+
+        self.layout.addLayout(self.tool_layout)
         self.layout.addWidget(self.column_tab)
 
         self.setLayout(self.layout)
@@ -219,21 +302,365 @@ class AnalysisTab(QWidget):
         self.setPalette(palette)
 
         self.value_box.currentTextChanged.connect(self.update_value_type) # noqa
+        self.column_tab.currentChanged.connect(self.update_current_diagnostics) # noqa
 
-    def resizeEvent(self, event):
+    def build_diagnostics(
+            self,
+            column: str
+    ) -> None:
+        """
+        Builds the Mack diagnostics for a column. Running the tests is relatively expensive and most users never
+        look at the diagnostics, so this is deferred until the first time they are displayed for the column.
+        """
+
+        if column in self.diagnostic_containers:
+            return
+
+        triangle_column = self.triangle_columns[column]
+        diagnostics = MackDiagnostics(triangle=triangle_column)
+        self.diagnostics[column] = diagnostics
+
+        self.diagnostic_containers[column] = QVBoxLayout()
+        self.diagnostic_containers[column].setSpacing(30)
+
+        self.mack_valuation_groupboxes[column] = MackAllYearGroupBox(
+            title="Mack Valuation Correlation Test - All Years",
+            triangle=triangle_column,
+            test_type="valuation correlation",
+            diagnostics=diagnostics
+        )
+        self.diagnostic_containers[column].addWidget(self.mack_valuation_groupboxes[column])
 
-        for i in self.column_list:
+        self.mack_valuation_individual_groupboxes[column] = MackIndividualGroupBox(
+            title="Mack Valuation Correlation Test - Individual Years",
+            triangle=triangle_column,
+            diagnostics=diagnostics
+        )
+
+        self.diagnostic_containers[column].addWidget(self.mack_valuation_individual_groupboxes[column])
+
+        self.mack_development_groupboxes[column] = MackAllYearGroupBox(
+            title="Mack Development Correlation Test",
+            triangle=triangle_column,
+            test_type="development correlation",
+            diagnostics=diagnostics
+        )
+
+        self.diagnostic_containers[column].addWidget(
+            self.mack_development_groupboxes[column],
+            stretch=0
+        )
+
+        self.diagnostic_containers[column].addWidget(
+            QWidget(),
+            stretch=2
+        )
+
+        self.diagnostic_widgets[column].setLayout(self.diagnostic_containers[column])
 
-            groupbox = self.mack_valuation_individual_groupboxes[i]
-            max_width = groupbox.mv_max_individual_width
-            padding_widget = groupbox.vertical_padding_widget
+        self.resize_individual_groupbox(self.mack_valuation_individual_groupboxes[column])
 
-            if self.width() >= max_width + 109:
-                groupbox.individual_view.setFixedHeight(52)
-                padding_widget.setFixedHeight(30)
+    def build_bootstrap(
+            self,
+            column: str
+    ) -> None:
+        """
+        Builds the bootstrap widget for a column the first time the bootstrap is displayed for it. Nothing is simulated
+        until the user runs the bootstrap.
+        """
+
+        if column in self.bootstrap_widgets:
+            return
+
+        self.bootstrap_widgets[column] = BootstrapWidget(triangle=self.triangle_columns[column])
+        self.bootstrap_pages[column].layout().addWidget(self.bootstrap_widgets[column])
+
+    def build_mack(
+            self,
+            column: str
+    ) -> None:
+        """
+        Displays the Mack standard errors of a column. The standard errors of every column and segment of the
+        triangle are computed in one batch the first time any of them are displayed.
+        """
+
+        if self.mack_views[column].model() is not None:
+            return
+
+        self.mack_views[column].setModel(
+            MackResultsModel(
+                mack=self.mack_errors(),
+                index=self.segment_index(),
+                column=self.column_list.index(column)
+            )
+        )
+
+    def mack_errors(self) -> MackStandardErrors:
+        """
+        Returns the Mack standard errors, computing them with the excluded link ratios of each column if they have not
+        been yet.
+        """
+
+        if self.mack is None:
+            self.mack = MackStandardErrors(triangle=self.triangle)
+
+            for column, drop_list in self.exclusions.items():
+                self.mack.set_drop(
+                    drop=drop_list,
+                    index=self.segment_index(),
+                    column=self.column_list.index(column)
+                )
+
+        return self.mack
+
+    def segment_index(self) -> int:
+        """
+        The position of the line of business of the tab in the index of the triangle.
+        """
+
+        if self.lob is None:
+            return 0
+
+        return list(self.triangle.index['LOB']).index(self.lob)
+
+    def open_development(
+            self,
+            column: str = None
+    ) -> DevelopmentTab:
+        """
+        Opens the development factors of a column, by default the selected one, in a window. Link ratios excluded in
+        the window are carried over to the column's standard errors.
+        """
+
+        if column is None:
+            column = self.column_tab.tabText(self.column_tab.currentIndex())
+
+        development_tab = self.development_tabs.get(column)
+
+        if development_tab is None:
+
+            development_tab = DevelopmentTab(
+                triangle=self.triangle_columns[column],
+                column=column
+            )
+
+            development_tab.setWindowTitle("Method: Chain Ladder - %s" % column)
+
+            if self.exclusions.get(column):
+                development_tab.factor_model.set_drop(drop_list=self.exclusions[column])
+
+            if self.selections.get(column):
+                development_tab.factor_model.set_selected_ldfs(ldfs=self.selections[column])
+
+            self.link_factor_model(
+                column=column,
+                factor_model=development_tab.factor_model
+            )
+
+            self.development_tabs[column] = development_tab
+
+        development_tab.show()
+        development_tab.raise_()
+        development_tab.activateWindow()
+
+        return development_tab
+
+    def open_tail(
+            self,
+            column: str = None
+    ) -> TailPane:
+        """
+        Opens the tail analysis of a column, by default the selected one, in a window. The constant tail marked as
+        selected in the window is saved with the column's other selections.
+        """
+
+        if column is None:
+            column = self.column_tab.tabText(self.column_tab.currentIndex())
+
+        tail_tab = self.tail_tabs.get(column)
+
+        if tail_tab is None:
+
+            tail_tab = tail.TailPane(triangle=self.triangle_columns[column])
+
+            tail_tab.setWindowTitle("Tail Analysis - %s" % column)
+
+            if self.tails.get(column):
+                tail_tab.select_tail(params=self.tails[column])
+
+            self.tail_tabs[column] = tail_tab
+
+        tail_tab.show()
+        tail_tab.raise_()
+        tail_tab.activateWindow()
+
+        return tail_tab
+
+    def sync_selections(self) -> None:
+        """
+        Copies the LDFs and tails selected in the open development and tail windows to selections and tails.
+        """
+
+        for column, development_tab in self.development_tabs.items():
+            self.selections[column] = development_tab.factor_model.selected_ldfs()
+
+        for column, tail_tab in self.tail_tabs.items():
+
+            params = tail_tab.selected_tail()
+
+            if params is None:
+                self.tails.pop(column, None)
             else:
-                groupbox.individual_view.setFixedHeight(66)
-                padding_widget.setFixedHeight(16)
+                self.tails[column] = params
+
+    def save_selections(self) -> None:
+        """
+        Saves the selected LDFs, excluded link ratios and tails of every column with the data view, replacing those
+        saved before.
+        """
+
+        self.sync_selections()
+
+        def on_result(counts: dict) -> None:
+
+            self.save_label.setText(
+                "Saved %d LDFs, %d exclusions and %d tails." % (
+                    counts['factors'],
+                    counts['exclusions'],
+                    counts['tails']
+                )
+            )
+
+        run_db_job(
+            db_path=self.db_path,
+            job=partial(
+                write_view_selections,
+                view_id=self.view_id,
+                factors=self.selections,
+                exclusions=self.exclusions,
+                tails=self.tails
+            ),
+            client=self.client,
+            on_result=on_result,
+            on_error=lambda message: self.save_label.setText("Could not save the selections: %s" % message),
+            write=True
+        )
+
+    def link_factor_model(
+            self,
+            column: str,
+            factor_model: FactorModel
+    ) -> None:
+        """
+        Keeps the Mack standard errors of a column in line with the link ratios excluded in a FactorModel of the same
+        column. Only the development periods whose exclusions changed are recomputed. The connection holds on to
+        the tab until unlink_factor_models() is called.
+        """
+
+        slot = partial(self.update_exclusions, column)
+
+        factor_model.exclusions_changed.connect(slot) # noqa
+
+        self.factor_links[column] = (factor_model, slot)
+
+    def unlink_factor_models(self) -> None:
+
+        for factor_model, slot in self.factor_links.values():
+            factor_model.exclusions_changed.disconnect(slot) # noqa
+
+        self.factor_links.clear()
+
+    def update_exclusions(
+            self,
+            column: str,
+            drop_list: list
+    ) -> None:
+
+        self.exclusions[column] = list(drop_list)
+
+        # The standard errors pick up the exclusions when they are first computed.
+        if self.mack is None:
+            return
+
+        self.mack.set_drop(
+            drop=drop_list,
+            index=self.segment_index(),
+            column=self.column_list.index(column)
+        )
+
+        # Every column's results are refreshed, though only the segment of this column has changed.
+        for view in self.mack_views.values():
+            if view.model() is not None:
+                view.model().recalculate()
+
+    def release(self) -> None:
+        """
+        Disconnects and closes the development and tail windows, so that nothing calls back into the tab once it is
+        released. The LDFs and tails selected in the windows are kept in selections and tails.
+        """
+
+        self.unlink_factor_models()
+        self.sync_selections()
+
+        for window in list(self.development_tabs.values()) + list(self.tail_tabs.values()):
+            window.close()
+            window.deleteLater()
+
+        self.development_tabs.clear()
+        self.tail_tabs.clear()
+
+    def is_busy(self) -> bool:
+        """
+        Whether a bootstrap of any column is running, or a development or tail window is open, in which case the tab
+        must not be released.
+        """
+
+        windows = list(self.development_tabs.values()) + list(self.tail_tabs.values())
+
+        return any(widget.thread is not None for widget in self.bootstrap_widgets.values()) or \
+            any(window.isVisible() for window in windows)
+
+    def update_current_diagnostics(self) -> None:
+        """
+        Builds the diagnostics, bootstrap or standard errors of the selected column if they are being displayed.
+        """
+
+        builders = {
+            "Diagnostics": self.build_diagnostics,
+            "Bootstrap": self.build_bootstrap,
+            "Std. Errors": self.build_mack
+        }
+
+        value_type = self.value_box.currentText()
+
+        if value_type not in builders:
+            return
+
+        index = self.column_tab.currentIndex()
+
+        if index >= 0:
+            builders[value_type](self.column_tab.tabText(index))
+
+    def resizeEvent(self, event):
+
+        # Columns whose diagnostics have not been built yet have nothing to resize.
+        for groupbox in self.mack_valuation_individual_groupboxes.values():
+            self.resize_individual_groupbox(groupbox)
+
+    def resize_individual_groupbox(
+            self,
+            groupbox: MackIndividualGroupBox
+    ) -> None:
+
+        max_width = groupbox.mv_max_individual_width
+        padding_widget = groupbox.vertical_padding_widget
+
+        if self.width() >= max_width + 109:
+            groupbox.individual_view.setFixedHeight(52)
+            padding_widget.setFixedHeight(30)
+        else:
+            groupbox.individual_view.setFixedHeight(66)
+            padding_widget.setFixedHeight(16)
 
     def update_value_type(self):
 
@@ -245,6 +672,14 @@ class AnalysisTab(QWidget):
             value_type = 'value'
             triangle = self.triangle
 
+        elif self.value_box.currentText() == "Bootstrap":
+            value_type = "bootstrap"
+            triangle = self.triangle
+
+        elif self.value_box.currentText() == "Std. Errors":
+            value_type = "mack"
+            triangle = self.triangle
+
         else:
             value_type = "diagnostics"
             triangle = self.triangle
@@ -253,21 +688,193 @@ class AnalysisTab(QWidget):
             index = i
             tab_name = self.column_tab.tabText(index)
 
-            if value_type != "diagnostics":
+            if value_type == "diagnostics":
+                self.analysis_containers[tab_name].setCurrentIndex(1)
+            elif value_type == "bootstrap":
+                self.analysis_containers[tab_name].setCurrentIndex(2)
+            elif value_type == "mack":
+                self.analysis_containers[tab_name].setCurrentIndex(3)
+            else:
                 triangle_column = triangle[self.column_list[index]]
 
                 triangle_model = TriangleModel(triangle_column, value_type)
                 self.triangle_views[tab_name].setModel(triangle_model)
                 self.analysis_containers[tab_name].setCurrentIndex(0)
-            else:
-                self.analysis_containers[tab_name].setCurrentIndex(1)
+
+        self.update_current_diagnostics()
+
+
+# Whether a garbage collection is due once control returns to the event loop.
+_collection_scheduled = False
+
+
+def schedule_collection() -> None:
+    """
+    Runs a garbage collection once control returns to the event loop, however many times this is called until then.
+    """
+
+    global _collection_scheduled
+
+    if _collection_scheduled:
+        return
+
+    _collection_scheduled = True
+
+    QTimer.singleShot(0, collect)
+
+
+def collect() -> None:
+
+    global _collection_scheduled
+
+    _collection_scheduled = False
+    gc.collect()
+
+
+class DeferredAnalysisTab(QWidget):
+    """
+    Lightweight stand-in for an AnalysisTab in the analysis pane. The AnalysisTab, with its views, models and
+    diagnostics, is only built the first time the tab is shown. While the tab is in the background it can be
+    unloaded, which releases the AnalysisTab but keeps the triangle and the user's selections, so that it is rebuilt
+    as it was when the tab is shown again.
+    """
+    def __init__(
+            self,
+            triangle: Triangle,
+            lob: str = None,
+            exclusions: dict = None,
+            selections: dict = None,
+            tails: dict = None,
+            view_id: int = None,
+            db_path: str = None,
+            client: DatabaseClient = None
+    ):
+        super().__init__()
+
+        self.triangle = triangle
+        self.lob = lob
+
+        self.view_id = view_id
+        self.db_path = db_path
+        self.client = client
+
+        self.tab = None
+
+        # What the user had selected when the tab was last unloaded, starting with the selections saved with the
+        # data view, if any.
+        self.value_type = None
+        self.column_index = None
+        self.exclusions = dict(exclusions or {})
+        self.selections = dict(selections or {})
+        self.tails = dict(tails or {})
+
+        # Monotonic time at which the tab went into the background, None while it is shown.
+        self.hidden_since = None
+
+        # Bytes allocated by the last build of the AnalysisTab, measured only while tracemalloc is tracing.
+        self.allocated = None
+
+        self.layout = QVBoxLayout()
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(self.layout)
+
+    @property
+    def is_loaded(self) -> bool:
+
+        return self.tab is not None
+
+    def materialize(self) -> AnalysisTab:
+        """
+        Builds the AnalysisTab if it is not loaded, restoring the selections saved when it was unloaded.
+        """
+
+        if self.tab is None:
+
+            with profile_span("Open triangle"):
+
+                traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+
+                self.tab = AnalysisTab(
+                    triangle=self.triangle,
+                    lob=self.lob,
+                    exclusions=self.exclusions,
+                    selections=self.selections,
+                    tails=self.tails,
+                    view_id=self.view_id,
+                    db_path=self.db_path,
+                    client=self.client
+                )
+
+                if self.column_index is not None:
+                    self.tab.column_tab.setCurrentIndex(self.column_index)
+
+                if self.value_type is not None:
+                    self.tab.value_box.setCurrentText(self.value_type)
+
+                self.layout.addWidget(self.tab)
+
+                if traced is not None and tracemalloc.is_tracing():
+                    self.allocated = tracemalloc.get_traced_memory()[0] - traced
+
+        return self.tab
+
+    def unload(self) -> bool:
+        """
+        Releases the AnalysisTab, unless the tab is being displayed or is running a bootstrap.
+
+        :return: Whether the AnalysisTab was released.
+        """
+
+        if self.tab is None or self.isVisible() or self.tab.is_busy():
+            return False
+
+        self.tab.release()
+
+        self.value_type = self.tab.value_box.currentText()
+        self.column_index = self.tab.column_tab.currentIndex()
+        self.exclusions = dict(self.tab.exclusions)
+        self.selections = dict(self.tab.selections)
+        self.tails = dict(self.tab.tails)
+
+        # Qt deletes the widgets once control returns to the event loop. The views' signal connections form reference
+        # cycles on the Python side, which are left to a single collection for all the tabs unloaded in the meantime,
+        # rather than a full collection per tab.
+        self.layout.removeWidget(self.tab)
+        self.tab.deleteLater()
+        self.tab = None
+        schedule_collection()
+
+        return True
+
+    def showEvent(
+            self,
+            event: QEvent
+    ) -> None:
+
+        self.hidden_since = None
+        self.materialize()
+
+        super().showEvent(event)
+
+    def hideEvent(
+            self,
+            event: QEvent
+    ) -> None:
+
+        # Spontaneous hide events come from the window system, e.g., when the main window is minimized, rather
+        # than from the tab moving to the background.
+        if not event.spontaneous():
+            self.hidden_since = time.monotonic()
+
+        super().hideEvent(event)
 
 
 class MackValuationModel(FAbstractTableModel):
     def __init__(
         self,
         triangle: Triangle,
-        critical: QDoubleSpinBox
+        critical: QDoubleSpinBox,
+        diagnostics: MackDiagnostics = None
     ):
         super(
             MackValuationModel,
@@ -275,6 +882,7 @@ class MackValuationModel(FAbstractTableModel):
         ).__init__()
 
         self.triangle = triangle
+        self.diagnostics = diagnostics or MackDiagnostics(triangle=triangle)
         self.spin_box = critical
         self.critical_value = self.spin_box.value()
         self._data = None
@@ -327,17 +935,11 @@ class MackValuationModel(FAbstractTableModel):
 
     def calculate(self):
         self.critical_value = self.spin_box.value()
-        corr = self.triangle.valuation_correlation(
-            p_critical=self.critical_value,
-            total=False
-        ).z_critical
 
-        self._data = corr.to_frame(
-            origin_as_datetime=False
+        self._data = self.diagnostics.valuation_individual(
+            p_critical=self.critical_value
         )
 
-        self._data = self._data.rename(index={min(self._data.index): 'Status'})
-
     def recalculate(self):
 
         self.calculate()
@@ -345,6 +947,71 @@ class MackValuationModel(FAbstractTableModel):
         self.layoutChanged.emit() # noqa
 
 
+class MackResultsModel(FAbstractTableModel):
+    """
+    Displays the Mack standard errors of a segment of a triangle, one row per origin period followed by the total.
+    """
+    def __init__(
+            self,
+            mack: MackStandardErrors,
+            index: int = 0,
+            column: int = 0
+    ):
+        super().__init__()
+
+        self.mack = mack
+        self.segment = (index, column)
+
+        self._data = self.mack.summary(*self.segment)
+
+    def recalculate(self) -> None:
+
+        self.beginResetModel()
+        self._data = self.mack.summary(*self.segment)
+        self.endResetModel()
+
+    def data(
+            self,
+            index: QModelIndex,
+            role: int = None
+    ) -> Any:
+
+        if role == Qt.ItemDataRole.DisplayRole:
+
+            value = self._data.iloc[index.row(), index.column()]
+
+            if pd.isna(value):
+                return ""
+            elif self._data.columns[index.column()] == 'CV':
+                return "{0:.1%}".format(value)
+            else:
+                return "{0:,.0f}".format(value)
+
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+    def headerData(
+            self,
+            section: int,
+            orientation: Qt.Orientation,
+            role: int = None
+    ) -> Any:
+
+        if role == Qt.ItemDataRole.DisplayRole:
+
+            if orientation == Qt.Orientation.Horizontal:
+                return str(self._data.columns[section])
+
+            if orientation == Qt.Orientation.Vertical:
+                return str(self._data.index[section])
+
+
+class MackResultsView(FTableView):
+    def __init__(self):
+        super().__init__()
+
+
 class MackValuationView(FTableView):
     def __init__(self):
         super().__init__()
@@ -365,7 +1032,8 @@ class MackResultLabel(QLabel):
             self,
             spin: QDoubleSpinBox,
             triangle: Triangle,
-            test_type: str
+            test_type: str,
+            diagnostics: MackDiagnostics = None
     ):
         super().__init__()
 
@@ -373,6 +1041,7 @@ class MackResultLabel(QLabel):
         self.triangle = triangle
         self.test_type = test_type
         self.test_bool = None
+        self.diagnostics = diagnostics or MackDiagnostics(triangle=triangle)
 
         self.update_result()
 
@@ -381,15 +1050,14 @@ class MackResultLabel(QLabel):
     def update_result(self):
 
         if self.test_type == "valuation correlation":
-            self.test_bool = self.triangle.valuation_correlation(
-                p_critical=self.spin.value(),
-                total=True
-            ).z_critical.values[0][0]
+            self.test_bool = self.diagnostics.valuation_total(
+                p_critical=self.spin.value()
+            )
 
         elif self.test_type == "development correlation":
-            self.test_bool = self.triangle.development_correlation(
+            self.test_bool = self.diagnostics.development(
                 p_critical=self.spin.value()
-            ).t_critical.values[0][0]
+            )
 
         else:
             raise ValueError("Invalid test-type indicated.")
@@ -420,13 +1088,15 @@ class MackAllYearGroupBox(QGroupBox):
             self,
             title: str,
             triangle: Triangle,
-            test_type: str
+            test_type: str,
+            diagnostics: MackDiagnostics = None
     ):
         super().__init__()
 
         self.setTitle(title)
         self.triangle = triangle
         self.test_type = test_type
+        self.diagnostics = diagnostics or MackDiagnostics(triangle=triangle)
 
         starting_value = starting_value_lookup[self.test_type]
 
@@ -443,7 +1113,8 @@ class MackAllYearGroupBox(QGroupBox):
         self.test_result_label = MackResultLabel(
             spin=self.spin_box,
             triangle=triangle,
-            test_type=self.test_type
+            test_type=self.test_type,
+            diagnostics=self.diagnostics
         )
 
         self.critical_layout.addRow(
@@ -474,12 +1145,14 @@ class MackIndividualGroupBox(QGroupBox):
     def __init__(
         self,
         title: str,
-        triangle: Triangle
+        triangle: Triangle,
+        diagnostics: MackDiagnostics = None
     ):
         super().__init__()
 
         self.setTitle(title)
         self.triangle = triangle
+        self.diagnostics = diagnostics or MackDiagnostics(triangle=triangle)
 
         # Holds 2 levels, one for the critical spin box,
         # the other for the individual years results
@@ -533,7 +1206,8 @@ class MackIndividualGroupBox(QGroupBox):
 
         self.individual_model = MackValuationModel(
             triangle=self.triangle,
-            critical=self.spin_box
+            critical=self.spin_box,
+            diagnostics=self.diagnostics
         )
 
         self.individual_view = MackValuationView()
@@ -1,6 +1,7 @@
 import csv
 import io
 
+import numpy as np
 import pandas as pd
 
 from faslr.grid_header import GridTableHeaderView
@@ -45,6 +46,43 @@ class FAbstractTableModel(QAbstractTableModel):
 
         return self._data.shape[1]
 
+    def display_block(
+            self,
+            top: int,
+            bottom: int,
+            left: int,
+            right: int
+    ) -> np.ndarray:
+        """
+        Returns the display text of the cells within the given rows and columns (inclusive), as a 2-D array.
+        Models that can produce the text of many cells at once should override this, the default asks data() for
+        each cell.
+        """
+
+        block = np.empty((bottom - top + 1, right - left + 1), dtype=object)
+
+        for row in range(top, bottom + 1):
+            for column in range(left, right + 1):
+                block[row - top, column - left] = self.data(
+                    self.index(row, column),
+                    Qt.ItemDataRole.DisplayRole
+                )
+
+        return block
+
+    def raw_block(
+            self,
+            top: int,
+            bottom: int,
+            left: int,
+            right: int
+    ) -> np.ndarray:
+        """
+        Returns the underlying values of the cells within the given rows and columns (inclusive), as a 2-D array.
+        """
+
+        return self._data.iloc[top:bottom + 1, left:right + 1].to_numpy()
+
 
 class FTableView(QTableView):
     def __init__(self):
@@ -104,20 +142,78 @@ class FTableView(QTableView):
 
         return True
 
-    def copy_selection(self):
-        """Method to copy selected values to clipboard, so they can be pasted elsewhere, like Excel."""
-        selection = self.selectedIndexes()
-        if selection:
-            rows = sorted(index.row() for index in selection)
-            columns = sorted(index.column() for index in selection)
-            rowcount = rows[-1] - rows[0] + 1
-            colcount = columns[-1] - columns[0] + 1
-            table = [[''] * colcount for _ in range(rowcount)]
-            for index in selection:
-                row = index.row() - rows[0]
-                column = index.column() - columns[0]
-                table[row][column] = index.data()
-            stream = io.StringIO()
-            csv.writer(stream, delimiter='\t').writerows(table)
-            QApplication.clipboard().setText(stream.getvalue())
-        return
+    def copy_selection(
+            self,
+            raw: bool = False
+    ) -> None:
+        """
+        Method to copy selected values to clipboard, so they can be pasted elsewhere, like Excel. The selected
+        rectangle is fetched from the model in one call, cells within it that are not selected are left blank.
+
+        :param raw: Copy the underlying full-precision values instead of the displayed text.
+        """
+
+        ranges = self.selectionModel().selection() if self.selectionModel() else []
+
+        if not ranges:
+            return
+
+        top = min(selection_range.top() for selection_range in ranges)
+        bottom = max(selection_range.bottom() for selection_range in ranges)
+        left = min(selection_range.left() for selection_range in ranges)
+        right = max(selection_range.right() for selection_range in ranges)
+
+        model = self.model()
+
+        if raw and hasattr(model, 'raw_block'):
+            block = model.raw_block(top, bottom, left, right)
+        elif hasattr(model, 'display_block'):
+            block = model.display_block(top, bottom, left, right)
+        else:
+            block = FAbstractTableModel.display_block(model, top, bottom, left, right) # noqa
+
+        table = format_block(block)
+
+        selected = np.zeros(table.shape, dtype=bool)
+        for selection_range in ranges:
+            selected[
+                selection_range.top() - top:selection_range.bottom() - top + 1,
+                selection_range.left() - left:selection_range.right() - left + 1
+            ] = True
+
+        table[~selected] = ''
+
+        QApplication.clipboard().setText(table_to_text(table))
+
+
+def format_block(block: np.ndarray) -> np.ndarray:
+    """
+    Converts a 2-D array of values to strings for the clipboard. Floats are written at full precision, and missing
+    values are written as blanks.
+    """
+
+    block = np.asarray(block)
+
+    if block.dtype.kind == 'f':
+        table = block.astype(str)
+        table[np.isnan(block)] = ''
+    else:
+        table = np.where(pd.isna(block), '', block).astype(str)
+
+    return table.astype(object)
+
+
+def table_to_text(table: np.ndarray) -> str:
+    """
+    Serializes a 2-D array of strings as tab-delimited text, rows ending with \\r\\n like csv.writer.
+    """
+
+    # Quoting is only needed if a cell contains a delimiter, a quote, or a line break, which is rare for numbers.
+    joined = ''.join(table.ravel().tolist())
+
+    if any(char in joined for char in '\t\r\n"'):
+        stream = io.StringIO()
+        csv.writer(stream, delimiter='\t').writerows(table.tolist())
+        return stream.getvalue()
+
+    return ''.join('\t'.join(row) + '\r\n' for row in table.tolist())
@@ -0,0 +1,575 @@
+"""
+Headless re-projection of the data views saved in a project database, e.g., for an unattended month-end run:
+
+    python -m faslr batch project.db --workers 4
+
+Each view's triangle is developed with the LDFs and tail factors saved for it in the view_factor and view_tail tables,
+falling back to volume-weighted LDFs, without the link ratios excluded in the view_exclusion table, and no tail, and
+projected to ultimate with the chain ladder method. The selections are saved from the view's analysis tab, see
+write_view_selections(). The records of all views are read with one query, the views are projected in parallel worker
+processes, and the results are written back to the view_result table with one batched statement. No QApplication is
+created, so batches can run on machines without a display.
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import pandas as pd
+import sys
+import time
+
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    as_completed
+)
+
+from datetime import datetime
+
+from faslr.database import run_db_job
+
+from faslr.schema import (
+    Base,
+    ProjectViewData,
+    ProjectViewTable,
+    ViewExclusionTable,
+    ViewFactorTable,
+    ViewResultTable,
+    ViewTailTable
+)
+
+from faslr.utilities.chainladder import ModelResults
+from faslr.utilities.lazy import lazy_import
+
+from functools import partial
+
+from sqlalchemy import (
+    delete,
+    insert,
+    inspect,
+    select
+)
+
+from sqlalchemy.orm.session import Session
+
+from typing import (
+    Callable,
+    TYPE_CHECKING
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from chainladder import Triangle
+
+cl = lazy_import('chainladder')
+
+# Loss columns of views saved without any.
+DEFAULT_VIEW_COLUMNS = ['Paid Loss', 'Reported Loss']
+
+
+def view_columns(view: ProjectViewTable) -> list:
+    """
+    The names of the loss columns of a data view.
+    """
+
+    return view.columns.split(';') if view.columns else DEFAULT_VIEW_COLUMNS
+
+
+def view_triangle(
+        data: pd.DataFrame,
+        columns: list,
+        cumulative: bool = None
+) -> Triangle:
+    """
+    Builds the triangle of a data view from its records.
+
+    :param data: The accident year, calendar year, paid loss and reported loss of each record, in that order.
+    :param columns: The names of the loss columns of the view.
+    :param cumulative: Whether the losses are cumulative, views saved without saying so are.
+    """
+
+    data = data.copy()
+
+    data.columns = [
+        'Accident Year',
+        'Calendar Year'
+    ] + columns
+
+    return cl.Triangle(
+        data=data,
+        origin='Accident Year',
+        development='Calendar Year',
+        columns=columns,
+        cumulative=True if cumulative is None else cumulative
+    )
+
+
+def create_batch_tables(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None
+) -> None:
+    """
+    Adds the tables used by batch runs to databases created before they existed.
+    """
+
+    Base.metadata.create_all(
+        bind=session.connection(),
+        tables=[
+            ViewExclusionTable.__table__,
+            ViewFactorTable.__table__,
+            ViewTailTable.__table__,
+            ViewResultTable.__table__
+        ]
+    )
+
+
+def read_batch_views(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        project_id: str = None,
+        view_ids: list = None
+) -> list:
+    """
+    Reads the data views to project along with their saved selections, with one query per table.
+
+    :param project_id: Limit the batch to the views of this project.
+    :param view_ids: Limit the batch to these views.
+    :return: One dict per view, with view_id, name, columns, cumulative, data, factors, exclusions and tails keys.
+    Factors map each column to its selected LDFs by age, exclusions map each column to its excluded link ratios as
+    (origin, age) tuples, and tails map each column to the arguments of its TailConstant.
+    """
+
+    query = select(ProjectViewTable)
+
+    if project_id is not None:
+        query = query.where(ProjectViewTable.project_id == project_id)
+
+    if view_ids is not None:
+        query = query.where(ProjectViewTable.view_id.in_(view_ids))
+
+    views = session.scalars(query.order_by(ProjectViewTable.view_id)).all()
+
+    ids = [view.view_id for view in views]
+
+    records = pd.read_sql(
+        select(
+            ProjectViewData.view_id,
+            ProjectViewData.accident_year,
+            ProjectViewData.calendar_year,
+            ProjectViewData.paid_loss,
+            ProjectViewData.reported_loss
+        ).where(
+            ProjectViewData.view_id.in_(ids)
+        ),
+        con=session.connection()
+    )
+
+    data = {
+        view_id: group.drop(columns='view_id').reset_index(drop=True)
+        for view_id, group in records.groupby('view_id')
+    }
+
+    factors, exclusions, tails = read_selections(
+        session=session,
+        view_ids=ids
+    )
+
+    return [
+        {
+            'view_id': view.view_id,
+            'name': view.name,
+            'columns': view_columns(view=view),
+            'cumulative': view.cumulative,
+            'data': data.get(view.view_id),
+            'factors': factors.get(view.view_id, {}),
+            'exclusions': exclusions.get(view.view_id, {}),
+            'tails': tails.get(view.view_id, {})
+        }
+        for view in views
+    ]
+
+
+def read_selections(
+        session: Session,
+        view_ids: list
+) -> tuple:
+    """
+    Reads the selected LDFs, excluded link ratios and tails saved for data views. Databases in which nothing has
+    been saved yet may not have the tables, in which case the views have no selections.
+
+    :return: A tuple of dicts (factors, exclusions, tails), keyed by view id, as described in read_batch_views().
+    """
+
+    tables = set(inspect(session.connection()).get_table_names())
+
+    factors = {}
+    if ViewFactorTable.__tablename__ in tables:
+        for factor in session.scalars(select(ViewFactorTable).where(ViewFactorTable.view_id.in_(view_ids))):
+            factors.setdefault(factor.view_id, {}).setdefault(factor.column, {})[factor.development] = factor.ldf
+
+    exclusions = {}
+    if ViewExclusionTable.__tablename__ in tables:
+        for exclusion in session.scalars(
+                select(ViewExclusionTable).where(
+                    ViewExclusionTable.view_id.in_(view_ids)
+                ).order_by(
+                    ViewExclusionTable.exclusion_id
+                )
+        ):
+            exclusions.setdefault(exclusion.view_id, {}).setdefault(exclusion.column, []).append(
+                (exclusion.origin, exclusion.development)
+            )
+
+    tails = {}
+    if ViewTailTable.__tablename__ in tables:
+        for tail in session.scalars(select(ViewTailTable).where(ViewTailTable.view_id.in_(view_ids))):
+            tails.setdefault(tail.view_id, {})[tail.column] = {
+                'tail': tail.factor,
+                'decay': 0.5 if tail.decay is None else tail.decay,
+                'attachment_age': tail.attachment_age,
+                'projection_period': 12 if tail.projection_period is None else tail.projection_period
+            }
+
+    return factors, exclusions, tails
+
+
+def write_view_selections(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        view_id: int = None,
+        factors: dict = None,
+        exclusions: dict = None,
+        tails: dict = None
+) -> dict:
+    """
+    Replaces the selected LDFs, excluded link ratios and tails saved for a data view, which are then applied by batch
+    runs and when the view is opened.
+
+    :param factors: The selected LDFs of each column, keyed by age.
+    :param exclusions: The excluded link ratios of each column, as (origin, age) tuples.
+    :param tails: The arguments of the TailConstant of each column that has a tail.
+    :return: The number of LDFs, exclusions and tails saved.
+    """
+
+    factors = factors or {}
+    exclusions = exclusions or {}
+    tails = tails or {}
+
+    # Databases created before the batch tables existed need them for the selections.
+    create_batch_tables(session=session)
+
+    for table in [ViewFactorTable, ViewExclusionTable, ViewTailTable]:
+        session.execute(
+            delete(table).where(table.view_id == view_id)
+        )
+
+    factor_rows = [
+        {
+            'view_id': view_id,
+            'column': column,
+            'development': int(age),
+            'ldf': float(ldf)
+        }
+        for column, ldfs in factors.items() for age, ldf in ldfs.items()
+    ]
+
+    exclusion_rows = [
+        {
+            'view_id': view_id,
+            'column': column,
+            'origin': str(origin),
+            'development': int(age)
+        }
+        for column, drop in exclusions.items() for origin, age in drop
+    ]
+
+    tail_rows = [
+        {
+            'view_id': view_id,
+            'column': column,
+            'factor': tail['tail'],
+            'decay': tail.get('decay'),
+            'attachment_age': tail.get('attachment_age'),
+            'projection_period': tail.get('projection_period')
+        }
+        for column, tail in tails.items()
+    ]
+
+    for table, rows in [
+        (ViewFactorTable, factor_rows),
+        (ViewExclusionTable, exclusion_rows),
+        (ViewTailTable, tail_rows)
+    ]:
+        if rows:
+            session.execute(insert(table), rows)
+
+    return {
+        'factors': len(factor_rows),
+        'exclusions': len(exclusion_rows),
+        'tails': len(tail_rows)
+    }
+
+
+def select_development(
+        triangle: Triangle,
+        factors: dict = None,
+        drop: list = None
+) -> Triangle:
+    """
+    Applies the selected LDFs of a single-column triangle, using the volume-weighted LDF for the ages without one.
+
+    :param factors: The selected LDFs, keyed by the age at the start of their development period.
+    :param drop: The link ratios excluded from the volume-weighted LDFs, as (origin, age) tuples.
+    """
+
+    development = cl.Development(drop=drop or None).fit(triangle)
+
+    if not factors:
+        return development.transform(triangle)
+
+    ldf = development.ldf_.to_frame(origin_as_datetime=False)
+
+    patterns = {}
+    for period, value in zip(ldf.columns, ldf.iloc[0]):
+        age = int(str(period).split('-')[0])
+        patterns[age] = factors.get(age, value)
+
+    return cl.DevelopmentConstant(
+        patterns=patterns,
+        style='ldf'
+    ).fit_transform(triangle)
+
+
+def project_view(view: dict) -> list:
+    """
+    Projects every column of a data view to ultimate. Runs in a worker process.
+
+    :param view: A view, as read by read_batch_views().
+    :return: One dict per column and origin period, with the fields of ViewResultTable.
+    """
+
+    triangle = view_triangle(
+        data=view['data'],
+        columns=view['columns'],
+        cumulative=view['cumulative']
+    )
+
+    results = []
+
+    for column in view['columns']:
+
+        development = select_development(
+            triangle=triangle[column],
+            factors=view['factors'].get(column),
+            drop=view.get('exclusions', {}).get(column)
+        )
+
+        tail = view['tails'].get(column)
+
+        if tail is not None:
+            development = cl.TailConstant(**tail).fit_transform(development)
+
+        model = ModelResults(triangle=cl.Chainladder().fit(development))
+
+        for origin, latest, cdf, ultimate, ibnr in zip(
+            model.origin.tolist(),
+            model.latest_diagonal.tolist(),
+            model.cdf.tolist(),
+            model.ultimate.tolist(),
+            model.ibnr.tolist()
+        ):
+            results.append({
+                'view_id': view['view_id'],
+                'column': column,
+                'origin': origin,
+                'latest': latest,
+                'cdf': cdf,
+                'ultimate': ultimate,
+                'ibnr': ibnr
+            })
+
+    return results
+
+
+def write_batch_results(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        view_ids: list = None,
+        results: list = None,
+        computed: datetime = None
+) -> None:
+    """
+    Replaces the results of the projected views, with one delete and one batched insert.
+    """
+
+    session.execute(
+        delete(ViewResultTable).where(ViewResultTable.view_id.in_(view_ids))
+    )
+
+    if results:
+        session.execute(
+            insert(ViewResultTable),
+            [dict(result, computed=computed) for result in results]
+        )
+
+
+def run_batch(
+        db_path: str,
+        project_id: str = None,
+        view_ids: list = None,
+        max_workers: int = None,
+        on_progress: Callable[[int, int], None] = None
+) -> dict:
+    """
+    Re-projects the data views saved in a project database and writes the results back to it. A view that fails to
+    project is logged and skipped, its previous results are kept.
+
+    :param db_path: The path to the project database.
+    :param project_id: Limit the batch to the views of this project.
+    :param view_ids: Limit the batch to these views.
+    :param max_workers: The number of worker processes. Set to 1 to project the views in the calling process.
+    :param on_progress: Called with (done, total) as each view is projected.
+    :return: The ids of the views projected and failed, the latter with the error, and the number of results written.
+    """
+
+    run_db_job(
+        db_path=db_path,
+        job=create_batch_tables,
+        write=True
+    )
+
+    views = run_db_job(
+        db_path=db_path,
+        job=partial(
+            read_batch_views,
+            project_id=project_id,
+            view_ids=view_ids
+        )
+    )
+
+    total = len(views)
+    projected = {}
+    failed = {}
+
+    def collect(view: dict, get_results: Callable[[], list]) -> None:
+        try:
+            projected[view['view_id']] = get_results()
+        except Exception as e:
+            logging.exception("Could not project view %d %s." % (view['view_id'], view['name']))
+            failed[view['view_id']] = str(e)
+
+        if on_progress:
+            on_progress(len(projected) + len(failed), total)
+
+    if max_workers == 1 or total <= 1:
+        for view in views:
+            collect(view, partial(project_view, view))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(project_view, view): view
+                for view in views
+            }
+
+            for future in as_completed(futures):
+                collect(futures[future], future.result)
+
+    # Keep the order of the views, regardless of the order in which the workers finished.
+    results = [
+        result
+        for view in views if view['view_id'] in projected
+        for result in projected[view['view_id']]
+    ]
+
+    if projected:
+        run_db_job(
+            db_path=db_path,
+            job=partial(
+                write_batch_results,
+                view_ids=list(projected),
+                results=results,
+                computed=datetime.now()
+            ),
+            write=True
+        )
+
+    return {
+        'projected': [view['view_id'] for view in views if view['view_id'] in projected],
+        'failed': failed,
+        'results': len(results)
+    }
+
+
+def main(argv: list = None) -> int:
+    """
+    Entry point of python -m faslr batch.
+
+    :return: The exit status, 1 if any view failed to project.
+    """
+
+    parser = argparse.ArgumentParser(
+        prog='python -m faslr batch',
+        description="Re-projects the data views saved in a project database and writes the results back to it."
+    )
+
+    parser.add_argument(
+        'db_path',
+        help="path to the project database"
+    )
+
+    parser.add_argument(
+        '--project',
+        dest='project_id',
+        help="only project the views of this project"
+    )
+
+    parser.add_argument(
+        '--view',
+        dest='view_ids',
+        type=int,
+        action='append',
+        help="only project this view, may be repeated"
+    )
+
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=None,
+        help="number of worker processes, defaults to the number of processors"
+    )
+
+    args = parser.parse_args(argv)
+
+    if not os.path.isfile(args.db_path):
+        parser.error("%s does not exist." % args.db_path)
+
+    logging.basicConfig(
+        format='%(asctime)s %(levelname)s %(message)s',
+        level=logging.INFO
+    )
+
+    start = time.perf_counter()
+
+    summary = run_batch(
+        db_path=args.db_path,
+        project_id=args.project_id,
+        view_ids=args.view_ids,
+        max_workers=args.workers,
+        on_progress=lambda done, total: logging.info("Projected %d of %d views." % (done, total))
+    )
+
+    print(
+        "Projected %d views, wrote %d results in %.1f s." % (
+            len(summary['projected']),
+            summary['results'],
+            time.perf_counter() - start
+        )
+    )
+
+    for view_id, error in summary['failed'].items():
+        print("View %d failed: %s" % (view_id, error), file=sys.stderr)
+
+    return 1 if summary['failed'] else 0
+
+
+if __name__ == "__main__":  # pragma no coverage
+    sys.exit(main())
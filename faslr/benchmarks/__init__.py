@@ -0,0 +1,5 @@
+"""
+Benchmarks of FASLR's performance-sensitive code paths. Each benchmark module can be run on its own, e.g.,
+python -m faslr.benchmarks.triangle_view, and python -m faslr.benchmarks.suite runs the hot paths over synthetic
+data of increasing size and tracks the results across commits.
+"""
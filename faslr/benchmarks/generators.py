@@ -0,0 +1,221 @@
+"""
+Generators of synthetic data for benchmarks.
+"""
+import chainladder as cl
+import numpy as np
+import os
+import pandas as pd
+
+from chainladder import Triangle
+
+from faslr import schema
+from faslr.database import create_faslr_engine
+
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from uuid import uuid4
+
+# pandas frequency of each triangle grain
+GRAIN_FREQUENCIES = {
+    'Y': 'YS',
+    'Q': 'QS',
+    'M': 'MS'
+}
+
+
+def synthetic_triangle(
+        n_origins: int = 240,
+        grain: str = 'M',
+        n_columns: int = 1,
+        n_segments: int = 1,
+        seed: int = 0
+) -> Triangle:
+    """
+    Generates a cumulative loss triangle with gamma-distributed incremental losses that decay with age.
+
+    :param n_origins: The number of origin (and development) periods.
+    :param grain: The grain of the origin and development periods, one of 'Y', 'Q', or 'M'.
+    :param n_columns: The number of loss columns, named 'Loss 1', 'Loss 2', etc.
+    :param n_segments: The number of segments, indexed by a Segment column if there is more than one.
+    :param seed: Seed of the random number generator.
+    :return: A chainladder Triangle.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    periods = pd.date_range(
+        start='2000-01-01',
+        periods=n_origins,
+        freq=GRAIN_FREQUENCIES[grain]
+    )
+
+    origin_idx, development_idx = np.triu_indices(n_origins)
+    # Only keep the upper-left triangle, i.e., development + origin < n.
+    development_idx = development_idx - origin_idx
+
+    df = pd.DataFrame({
+        'origin': np.tile(periods[origin_idx], n_segments),
+        'valuation': np.tile(periods[origin_idx + development_idx], n_segments)
+    })
+
+    if n_segments > 1:
+        df['Segment'] = np.repeat(
+            ['Segment ' + str(i + 1) for i in range(n_segments)],
+            len(origin_idx)
+        )
+
+    decay = np.tile(np.exp(-development_idx / max(n_origins / 4, 1)), n_segments)
+
+    columns = []
+    for i in range(n_columns):
+        column = 'Loss ' + str(i + 1)
+        df[column] = rng.gamma(shape=2, scale=1000, size=len(df)) * decay
+        columns.append(column)
+
+    triangle = cl.Triangle(
+        data=df,
+        origin='origin',
+        development='valuation',
+        columns=columns,
+        index=['Segment'] if n_segments > 1 else None,
+        cumulative=False
+    )
+
+    return triangle.incr_to_cum()
+
+
+def synthetic_project_db(
+        db_path: str,
+        n_segments: int = 10,
+        n_origins: int = 10,
+        lobs_per_state: int = 10,
+        seed: int = 0
+) -> list:
+    """
+    Generates a project database with one line of business and data view per segment, grouped into states of a
+    single country, as in the sample database. The views hold synthetic annual triangles.
+
+    :param db_path: The path of the database, which is replaced if it exists.
+    :param n_segments: The number of lines of business.
+    :param n_origins: The number of accident years of each view.
+    :param lobs_per_state: The number of lines of business per state.
+    :param seed: Seed of the random number generator.
+    :return: The ids of the data views.
+    """
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    engine = create_faslr_engine(
+        db_path=db_path,
+        check_exists=False
+    )
+
+    schema.Base.metadata.create_all(engine)
+
+    session = sessionmaker(bind=engine)()
+
+    rng = np.random.default_rng(seed)
+
+    origin_idx, development_idx = np.triu_indices(n_origins)
+    accident_years = 2000 + origin_idx
+    calendar_years = 2000 + development_idx
+    decay = np.exp(-(development_idx - origin_idx) / max(n_origins / 4, 1))
+
+    country_location = schema.LocationTable(hierarchy="country")
+    country_project = schema.ProjectTable(project_id=str(uuid4()))
+    session.add_all([country_location, country_project])
+    session.flush()
+
+    country = schema.CountryTable(
+        location_id=country_location.location_id,
+        country_name="Synthetic",
+        project_id=country_project.project_id
+    )
+    session.add(country)
+    session.flush()
+
+    view_ids = []
+    state = None
+    state_location = None
+
+    for segment in range(n_segments):
+
+        if segment % lobs_per_state == 0:
+            state_location = schema.LocationTable(hierarchy="state")
+            state_project = schema.ProjectTable(project_id=str(uuid4()))
+            session.add_all([state_location, state_project])
+            session.flush()
+
+            state = schema.StateTable(
+                location_id=state_location.location_id,
+                state_name="State " + str(segment // lobs_per_state + 1),
+                country_id=country.country_id,
+                project_id=state_project.project_id
+            )
+            session.add(state)
+
+        lob_project = schema.ProjectTable(project_id=str(uuid4()))
+        session.add(lob_project)
+        session.flush()
+
+        session.add(
+            schema.LOBTable(
+                lob_type="Segment " + str(segment + 1),
+                location_id=state_location.location_id,
+                project_id=lob_project.project_id
+            )
+        )
+
+        view = schema.ProjectViewTable(
+            name="Segment " + str(segment + 1),
+            origin="Accident Year",
+            development="Calendar Year",
+            columns="Paid Claims;Reported Claims",
+            cumulative=True,
+            project_id=lob_project.project_id
+        )
+        session.add(view)
+        session.flush()
+
+        paid = cumulative_by_origin(rng.gamma(shape=2, scale=1000, size=len(origin_idx)) * decay, origin_idx)
+        reported = paid * rng.uniform(1, 1.5, size=len(origin_idx))
+
+        session.execute(
+            insert(schema.ProjectViewData),
+            [
+                {
+                    'view_id': view.view_id,
+                    'accident_year': int(accident_year),
+                    'calendar_year': int(calendar_year),
+                    'paid_loss': float(paid_loss),
+                    'reported_loss': float(reported_loss)
+                }
+                for accident_year, calendar_year, paid_loss, reported_loss in zip(
+                    accident_years,
+                    calendar_years,
+                    paid,
+                    reported
+                )
+            ]
+        )
+
+        view_ids.append(view.view_id)
+
+    session.commit()
+    session.close()
+    engine.dispose()
+
+    return view_ids
+
+
+def cumulative_by_origin(
+        incremental: np.ndarray,
+        origin_idx: np.ndarray
+) -> np.ndarray:
+    """
+    Accumulates incremental losses ordered by origin and then development, within each origin.
+    """
+
+    return pd.Series(incremental).groupby(origin_idx).cumsum().to_numpy()
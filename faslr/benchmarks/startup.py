@@ -0,0 +1,138 @@
+"""
+Measures the time from interpreter start to the first paint of the main window, in a fresh interpreter run with
+python -X importtime, and reports which of the deferred modules were imported before the window was shown.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from faslr.constants import (
+    ROOT_PATH,
+    STARTUP_DEFERRED_MODULES
+)
+
+# Run in the child interpreter. Prints the timings as JSON on the last line of stdout.
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+
+import json
+import sys
+
+from PyQt6.QtWidgets import QApplication
+
+app = QApplication(sys.argv)
+
+from faslr.__main__ import MainWindow
+from faslr.core import FCore
+
+imported = time.perf_counter()
+
+window = MainWindow(
+    application=app,
+    core=FCore(config_path=''),
+    deferred={deferred}
+)
+window.show()
+app.processEvents()
+
+shown = time.perf_counter()
+
+loaded = [
+    name for name in {deferred_modules} if name in sys.modules and type(sys.modules[name]).__name__ != '_LazyModule'
+]
+
+print(json.dumps({{
+    'import': (imported - start) * 1000,
+    'first_window': (shown - start) * 1000,
+    'loaded': loaded
+}}))
+"""
+
+
+def parse_importtime(
+        stderr: str
+) -> dict:
+    """
+    Parses the output of python -X importtime into the time spent importing each top-level package, i.e., the sum
+    of the self times of its modules, in milliseconds.
+    """
+
+    times = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+
+        self_time, _, name = line[len('import time:'):].split('|')
+
+        try:
+            self_time = int(self_time) / 1000
+        except ValueError:
+            # Header line
+            continue
+
+        package = name.strip().split('.')[0]
+        times[package] = times.get(package, 0) + self_time
+
+    return times
+
+
+def benchmark_startup(
+        deferred: bool = True,
+        top: int = 10
+) -> dict:
+    """
+    Starts the main window in a fresh interpreter.
+
+    :param deferred: Whether the window defers loading the numerical libraries, as the application does.
+    :param top: The number of slowest top-level imports to report.
+    :return: Timings in milliseconds, along with the deferred modules that were loaded before the first paint and
+    the slowest top-level imports.
+    """
+
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [os.path.dirname(ROOT_PATH), env.get('PYTHONPATH')]))
+
+    process = subprocess.run(
+        [
+            sys.executable,
+            '-X',
+            'importtime',
+            '-c',
+            STARTUP_SCRIPT.format(
+                deferred=deferred,
+                deferred_modules=STARTUP_DEFERRED_MODULES
+            )
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True
+    )
+
+    results = json.loads(process.stdout.strip().splitlines()[-1])
+
+    imports = parse_importtime(stderr=process.stderr)
+
+    results['top_imports'] = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    return results
+
+
+if __name__ == "__main__":  # pragma no coverage
+
+    for mode in [True, False]:
+        timings = benchmark_startup(deferred=mode)
+        print(
+            "%s startup: %.0f ms to first window (%.0f ms importing), loaded before paint: %s" % (
+                'Deferred' if mode else 'Eager',
+                timings['first_window'],
+                timings['import'],
+                ', '.join(timings['loaded']) or 'none'
+            )
+        )
+        for package, ms in timings['top_imports']:
+            print("    %-20s %8.1f ms" % (package, ms))
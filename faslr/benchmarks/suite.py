@@ -0,0 +1,556 @@
+"""
+Benchmark suite of FASLR's hot paths, run over synthetic triangles and project databases of increasing size.
+
+Each case is timed over several repetitions, and its peak memory is measured in a separate run with tracemalloc, so
+that tracing does not inflate the timings. Runs are appended to a JSON history along with the commit they were made
+at, and the compare mode flags the cases that got slower or used more memory between two runs:
+
+    python -m faslr.benchmarks.suite run --size medium
+    python -m faslr.benchmarks.suite compare HEAD~1 HEAD
+
+Only compare runs made on the same machine.
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from faslr.benchmarks.generators import (
+    synthetic_project_db,
+    synthetic_triangle
+)
+
+from faslr.constants import ROOT_PATH
+
+from functools import partial
+
+from PyQt6.QtCore import Qt
+
+from PyQt6.QtWidgets import QApplication
+
+from typing import Callable
+
+BENCHMARK_HISTORY_PATH = os.path.join(ROOT_PATH, 'cache', 'benchmark_history.json')
+
+# Relative increase over the baseline beyond which a case is flagged as a regression.
+REGRESSION_THRESHOLD = 0.2
+
+# Triangles and databases each case is run over. Triangle sizes are (grain, number of origin periods), database sizes
+# are numbers of segments, i.e., lines of business each with a data view. Triangles span more than the 120 months of
+# the default tail attachment age of the tail pane.
+BENCHMARK_SIZES = {
+    'small': {
+        'triangles': [('Y', 12), ('Q', 48)],
+        'segments': [1, 10]
+    },
+    'medium': {
+        'triangles': [('Y', 20), ('Q', 60), ('M', 144)],
+        'segments': [1, 50, 100]
+    },
+    'large': {
+        'triangles': [('Y', 40), ('Q', 120), ('M', 240)],
+        'segments': [1, 100, 500]
+    }
+}
+
+SAMPLES = [
+    'us_industry_auto',
+    'uspp_incr_case',
+    'mack97'
+]
+
+
+def setup_factor_display_data(triangle) -> Callable:
+
+    from faslr.factor import FactorModel
+
+    model = FactorModel(triangle=triangle)
+
+    return model.get_display_data
+
+
+def setup_triangle_model_data(triangle) -> Callable:
+    """
+    Fetches the display text of every cell, as when scrolling through the whole triangle.
+    """
+
+    from faslr.triangle_model import TriangleModel
+
+    def run() -> None:
+
+        model = TriangleModel(
+            triangle=triangle,
+            value_type='value'
+        )
+
+        for row in range(model.rowCount()):
+            for column in range(model.columnCount()):
+                model.data(model.index(row, column), Qt.ItemDataRole.DisplayRole)
+
+    return run
+
+
+def setup_parse_styler(triangle) -> Callable:
+
+    from faslr.utilities.style_parser import parse_styler
+
+    return partial(parse_styler, triangle=triangle, cmap='coolwarm')
+
+
+def setup_tail_update_plot(triangle) -> Callable:
+
+    from faslr.tail import TailPane
+
+    pane = TailPane(triangle=triangle)
+
+    return pane.update_plot
+
+
+def setup_triangle_construction(n_segments: int) -> Callable:
+    """
+    Builds a quarterly triangle with one index entry per segment from its records.
+    """
+
+    return partial(synthetic_triangle, n_origins=40, grain='Q', n_segments=n_segments)
+
+
+def setup_populate_project_tree(db_path: str) -> Callable:
+
+    from faslr.__main__ import MainWindow
+    from faslr.connection import populate_project_tree
+    from faslr.core import FCore
+
+    window = MainWindow(
+        application=QApplication.instance(),
+        core=FCore(config_path=''),
+        deferred=True
+    )
+
+    def run() -> None:
+
+        window.project_model.removeRows(0, window.project_model.rowCount())
+
+        populate_project_tree(
+            db_filename=db_path,
+            main_window=window
+        )
+
+    return run
+
+
+def setup_save_to_db(db_path: str) -> Callable:
+    """
+    Writes a data view of every segment of the database, i.e., the database job of DataPane.save_to_db().
+    """
+
+    from faslr.batch import read_batch_views
+    from faslr.data import write_project_view
+    from faslr.database import run_db_job
+    from faslr.schema import ProjectViewTable
+
+    views = run_db_job(
+        db_path=db_path,
+        job=read_batch_views
+    )
+
+    def run() -> None:
+
+        for view in views:
+            run_db_job(
+                db_path=db_path,
+                job=partial(
+                    write_project_view,
+                    project_view=ProjectViewTable(
+                        name=view['name'],
+                        columns=';'.join(view['columns']),
+                        cumulative=True
+                    ),
+                    records=view['data'].to_dict('records')
+                ),
+                write=True
+            )
+
+    return run
+
+
+def setup_load_sample() -> Callable:
+
+    from faslr.utilities.sample import load_sample
+
+    def run() -> None:
+
+        for name in SAMPLES:
+            load_sample(name)
+
+    return run
+
+
+# Cases run over each triangle size, each database size, and once, respectively. Setup functions return the
+# function to benchmark, and are not timed.
+TRIANGLE_BENCHMARKS = {
+    'FactorModel.get_display_data': setup_factor_display_data,
+    'TriangleModel.data': setup_triangle_model_data,
+    'parse_styler': setup_parse_styler,
+    'TailPane.update_plot': setup_tail_update_plot
+}
+
+SEGMENT_BENCHMARKS = {
+    'Triangle construction': setup_triangle_construction
+}
+
+DATABASE_BENCHMARKS = {
+    'populate_project_tree': setup_populate_project_tree,
+    'save_to_db': setup_save_to_db
+}
+
+SINGLE_BENCHMARKS = {
+    'load_sample': setup_load_sample
+}
+
+
+def measure(
+        func: Callable,
+        repeat: int = 3
+) -> dict:
+    """
+    Times a function and measures the peak memory it allocates.
+
+    :param func: The function, called without arguments.
+    :param repeat: The number of timed calls. The function is called once more to measure its memory.
+    :return: The fastest and median times in milliseconds, and the peak memory in kilobytes.
+    """
+
+    times = []
+
+    for i in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'time_ms': min(times),
+        'median_ms': float(np.median(times)),
+        'peak_kb': peak / 1024
+    }
+
+
+def benchmark_cases(
+        size: str = 'small',
+        directory: str = None
+) -> dict:
+    """
+    Lists the cases of the suite at a given size.
+
+    :param directory: Where the synthetic databases are generated, one per number of segments.
+    :return: Setup functions keyed by case name, e.g., 'TriangleModel.data[M120]'.
+    """
+
+    sizes = BENCHMARK_SIZES[size]
+
+    cases = {}
+
+    for grain, n_origins in sizes['triangles']:
+        for name, setup in TRIANGLE_BENCHMARKS.items():
+            cases['%s[%s%d]' % (name, grain, n_origins)] = partial(
+                setup_with_triangle,
+                setup=setup,
+                grain=grain,
+                n_origins=n_origins
+            )
+
+    for n_segments in sizes['segments']:
+        for name, setup in SEGMENT_BENCHMARKS.items():
+            cases['%s[%d segments]' % (name, n_segments)] = partial(setup, n_segments)
+
+        for name, setup in DATABASE_BENCHMARKS.items():
+            cases['%s[%d segments]' % (name, n_segments)] = partial(
+                setup_with_db,
+                setup=setup,
+                db_path=os.path.join(directory or tempfile.gettempdir(), 'synthetic_%d.db' % n_segments),
+                n_segments=n_segments
+            )
+
+    cases.update(SINGLE_BENCHMARKS)
+
+    return cases
+
+
+def setup_with_triangle(
+        setup: Callable,
+        grain: str,
+        n_origins: int
+) -> Callable:
+
+    return setup(synthetic_triangle(n_origins=n_origins, grain=grain))
+
+
+def setup_with_db(
+        setup: Callable,
+        db_path: str,
+        n_segments: int
+) -> Callable:
+    """
+    Generates the synthetic database at db_path unless a previous case already has.
+    """
+
+    if not os.path.isfile(db_path):
+        synthetic_project_db(
+            db_path=db_path,
+            n_segments=n_segments
+        )
+
+    return setup(db_path)
+
+
+def run_suite(
+        size: str = 'small',
+        repeat: int = 3,
+        pattern: str = None,
+        on_result: Callable[[str, dict], None] = None
+) -> dict:
+    """
+    Runs the cases of the suite.
+
+    :param size: One of BENCHMARK_SIZES.
+    :param repeat: The number of timed calls of each case.
+    :param pattern: Only run the cases whose name contains this string.
+    :param on_result: Called with the name and the measurements of each case as it completes.
+    :return: A run, i.e., the measurements keyed by case name along with the commit and machine they were made on.
+    """
+
+    if QApplication.instance() is None:
+        app = QApplication(sys.argv)  # noqa
+
+    results = {}
+
+    with tempfile.TemporaryDirectory(prefix='faslr_benchmark_') as directory:
+
+        for name, setup in benchmark_cases(size=size, directory=directory).items():
+
+            if pattern is not None and pattern not in name:
+                continue
+
+            results[name] = measure(
+                func=setup(),
+                repeat=repeat
+            )
+
+            if on_result is not None:
+                on_result(name, results[name])
+
+    return {
+        'commit': current_commit(),
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'size': size,
+        'machine': platform.node(),
+        'python': platform.python_version(),
+        'results': results
+    }
+
+
+def current_commit() -> [str, None]:
+    """
+    The commit of the working tree, suffixed with -dirty if it has uncommitted changes, or None outside a git
+    checkout.
+    """
+
+    def git(*args) -> str:
+        return subprocess.run(
+            ['git'] + list(args),
+            cwd=ROOT_PATH,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+
+    try:
+        commit = git('rev-parse', 'HEAD')
+        dirty = git('status', '--porcelain', '--untracked-files=no')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return commit + ('-dirty' if dirty else '')
+
+
+def read_history(
+        path: str = BENCHMARK_HISTORY_PATH
+) -> list:
+
+    if not os.path.isfile(path):
+        return []
+
+    with open(path) as f:
+        return json.load(f)
+
+
+def append_history(
+        run: dict,
+        path: str = BENCHMARK_HISTORY_PATH
+) -> None:
+
+    history = read_history(path=path)
+    history.append(run)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, 'w') as f:
+        json.dump(history, f, indent=2)
+
+
+def find_run(
+        history: list,
+        commit: str
+) -> dict:
+    """
+    Returns the latest run made at a commit, given as a revision git understands, e.g., HEAD~1, or a prefix of its
+    hash.
+    """
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', commit],
+            cwd=ROOT_PATH,
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        pass
+
+    for run in reversed(history):
+        if run['commit'] is not None and run['commit'].startswith(commit):
+            return run
+
+    raise ValueError("No benchmark run was recorded at %s." % commit)
+
+
+def compare_runs(
+        baseline: dict,
+        current: dict,
+        threshold: float = REGRESSION_THRESHOLD
+) -> list:
+    """
+    Compares the cases two runs have in common.
+
+    :param threshold: The relative increase of the time or peak memory over the baseline beyond which a case
+    regressed.
+    :return: One dict per case, with the baseline and current measurements, their relative changes and whether the
+    case regressed.
+    """
+
+    comparisons = []
+
+    for name, result in current['results'].items():
+
+        base = baseline['results'].get(name)
+
+        if base is None:
+            continue
+
+        changes = {
+            metric: (result[metric] - base[metric]) / base[metric] if base[metric] else 0.
+            for metric in ['time_ms', 'peak_kb']
+        }
+
+        comparisons.append({
+            'case': name,
+            'baseline': base,
+            'current': result,
+            'changes': changes,
+            'regressed': any(change > threshold for change in changes.values())
+        })
+
+    return comparisons
+
+
+def main(argv: list = None) -> int:
+
+    parser = argparse.ArgumentParser(
+        prog='python -m faslr.benchmarks.suite',
+        description="Benchmarks FASLR's hot paths and compares the results between commits."
+    )
+
+    parser.add_argument(
+        '--history',
+        default=BENCHMARK_HISTORY_PATH,
+        help="path of the JSON history"
+    )
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="run the suite and append the results to the history")
+    run_parser.add_argument('--size', choices=list(BENCHMARK_SIZES), default='small')
+    run_parser.add_argument('--repeat', type=int, default=3)
+    run_parser.add_argument('--filter', dest='pattern', help="only run the cases whose name contains this string")
+
+    compare_parser = subparsers.add_parser('compare', help="flag the regressions between two recorded runs")
+    compare_parser.add_argument('baseline', nargs='?', help="commit of the baseline run, defaults to the one before")
+    compare_parser.add_argument('current', nargs='?', help="commit of the current run, defaults to the latest")
+    compare_parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+
+        run = run_suite(
+            size=args.size,
+            repeat=args.repeat,
+            pattern=args.pattern,
+            on_result=lambda name, result: print(
+                "%-50s %10.1f ms %12.0f KB" % (name, result['time_ms'], result['peak_kb'])
+            )
+        )
+
+        append_history(run=run, path=args.history)
+
+        return 0
+
+    history = read_history(path=args.history)
+
+    try:
+        current = history[-1] if args.current is None else find_run(history=history, commit=args.current)
+        baseline = history[-2] if args.baseline is None else find_run(history=history, commit=args.baseline)
+    except (IndexError, ValueError) as e:
+        print(e if str(e) else "The history holds fewer than two runs.", file=sys.stderr)
+        return 2
+
+    comparisons = compare_runs(
+        baseline=baseline,
+        current=current,
+        threshold=args.threshold
+    )
+
+    for comparison in comparisons:
+        print(
+            "%-50s %+7.1f%% time %+7.1f%% memory%s" % (
+                comparison['case'],
+                comparison['changes']['time_ms'] * 100,
+                comparison['changes']['peak_kb'] * 100,
+                "  REGRESSION" if comparison['regressed'] else ""
+            )
+        )
+
+    return 1 if any(comparison['regressed'] for comparison in comparisons) else 0
+
+
+if __name__ == "__main__":  # pragma no coverage
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Measures how long the TriangleView takes to set up and to paint each frame while scrolling through a large triangle.
+"""
+import sys
+import time
+
+import numpy as np
+
+from faslr.benchmarks.generators import synthetic_triangle
+
+from faslr.triangle_model import (
+    TriangleModel,
+    TriangleView
+)
+
+from PyQt6.QtWidgets import QApplication
+
+
+def benchmark_triangle_scroll(
+        n_origins: int = 240,
+        frames: int = 100,
+        width: int = 1200,
+        height: int = 800
+) -> dict:
+    """
+    Scrolls diagonally through a synthetic monthly triangle, repainting the viewport after each step.
+
+    :param n_origins: Size of the triangle.
+    :param frames: The number of frames to paint.
+    :param width: Width of the view, in pixels.
+    :param height: Height of the view, in pixels.
+    :return: Timings, in milliseconds.
+    """
+
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    triangle = synthetic_triangle(n_origins=n_origins)
+
+    start = time.perf_counter()
+    model = TriangleModel(
+        triangle=triangle,
+        value_type='value'
+    )
+    view = TriangleView()
+    view.resize(width, height)
+    view.setModel(model)
+    view.show()
+    app.processEvents()
+    setup_time = time.perf_counter() - start
+
+    v_bar = view.verticalScrollBar()
+    h_bar = view.horizontalScrollBar()
+
+    frame_times = []
+
+    for frame in range(frames):
+        start = time.perf_counter()
+        v_bar.setValue(int(v_bar.maximum() * (frame + 1) / frames))
+        h_bar.setValue(int(h_bar.maximum() * (frame + 1) / frames))
+        view.viewport().repaint()
+        frame_times.append(time.perf_counter() - start)
+
+    view.close()
+
+    frame_times = np.array(frame_times) * 1000
+
+    return {
+        'setup': setup_time * 1000,
+        'frame_mean': frame_times.mean(),
+        'frame_p95': np.percentile(frame_times, 95),
+        'frame_max': frame_times.max(),
+        'formatted_cells': int(model.formatted.sum()),
+        'total_cells': int(model.formatted.size)
+    }
+
+
+if __name__ == "__main__":  # pragma no coverage
+
+    results = benchmark_triangle_scroll()
+
+    for key, value in results.items():
+        print("{0}: {1:,.2f}".format(key, value))
@@ -0,0 +1,528 @@
+"""
+Bootstrap of the over-dispersed Poisson (ODP) chain ladder model, after England and Verrall (2002), for reserve ranges.
+
+chainladder's BootstrapODPSample materializes every simulated triangle, so 10,000 simulations of even a modest
+triangle take gigabytes, and they are simulated on a single core. Here, the simulations are split into shards of a
+fixed size that are run by worker processes, each shard drawing from its own random stream spawned from the seed of
+the run. Within a shard, simulations are vectorized in chunks of bounded size, and the simulated IBNR is folded into
+quantile sketches rather than kept. The sketches of the shards are merged into the distribution of the IBNR of each
+origin period and of their total, so memory stays bounded however many simulations are run, and the results only
+depend on the seed and the number of simulations, not on the number of workers.
+
+The engine works on plain arrays and does not depend on Qt, so that it can also be run headless.
+"""
+from __future__ import annotations
+
+import math
+import multiprocessing
+import numpy as np
+import os
+import pandas as pd
+
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    as_completed
+)
+
+from faslr.constants import (
+    BOOTSTRAP_CHUNK_CELLS,
+    BOOTSTRAP_PERCENTILES,
+    BOOTSTRAP_RELATIVE_ACCURACY,
+    BOOTSTRAP_SEED,
+    BOOTSTRAP_SHARD_SIZE,
+    BOOTSTRAP_SIMULATIONS
+)
+
+from typing import (
+    Callable,
+    TYPE_CHECKING
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from chainladder import Triangle
+
+# Values closer to zero than this are counted as zero by the quantile sketches.
+_SKETCH_MIN_VALUE = 1e-9
+
+
+class QuantileSketch:
+    """
+    Mergeable sketch of a distribution that answers quantile queries within a relative error, in the manner of
+    DDSketch. Values are counted in logarithmically sized buckets, so the number of buckets only grows with the
+    logarithm of the range of the values, e.g., about 2,800 buckets at 0.5% accuracy for values spanning 1 to 10^12.
+    The mean and standard deviation are tracked exactly.
+
+    :param relative_accuracy: The maximum relative error of the quantiles.
+    """
+    def __init__(
+            self,
+            relative_accuracy: float = BOOTSTRAP_RELATIVE_ACCURACY
+    ):
+
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+
+        # Counts by bucket key, for the positive values and the absolute values of the negative ones.
+        self.positive = {}
+        self.negative = {}
+        self.zeros = 0
+
+        self.count = 0
+        self.sum = 0.
+        self.sum_squares = 0.
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(
+            self,
+            values: np.ndarray
+    ) -> None:
+
+        values = np.asarray(values, dtype=float).ravel()
+
+        if values.size == 0:
+            return
+
+        self.count += values.size
+        self.sum += float(values.sum())
+        self.sum_squares += float(np.square(values).sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        self.zeros += int(np.count_nonzero(np.abs(values) < _SKETCH_MIN_VALUE))
+
+        self.add_buckets(store=self.positive, values=values[values >= _SKETCH_MIN_VALUE])
+        self.add_buckets(store=self.negative, values=-values[values <= -_SKETCH_MIN_VALUE])
+
+    def add_buckets(
+            self,
+            store: dict,
+            values: np.ndarray
+    ) -> None:
+
+        keys, counts = np.unique(
+            np.ceil(np.log(values) / self.log_gamma).astype(np.int64),
+            return_counts=True
+        )
+
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            store[key] = store.get(key, 0) + count
+
+    def merge(
+            self,
+            other: QuantileSketch
+    ) -> None:
+
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches of different accuracies.")
+
+        for store, other_store in [(self.positive, other.positive), (self.negative, other.negative)]:
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+
+        self.zeros += other.zeros
+        self.count += other.count
+        self.sum += other.sum
+        self.sum_squares += other.sum_squares
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def bucket_value(
+            self,
+            key: int
+    ) -> float:
+        """
+        The value representing a bucket, within the relative accuracy of every value counted in it.
+        """
+
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(
+            self,
+            q: float
+    ) -> float:
+
+        if self.count == 0:
+            return math.nan
+
+        if not 0 <= q <= 1:
+            raise ValueError("Quantiles must be between 0 and 1.")
+
+        # The extremes are tracked exactly.
+        if q == 0:
+            return self.min
+        elif q == 1:
+            return self.max
+
+        rank = q * (self.count - 1)
+        seen = 0
+
+        # From the most negative value to the most positive one.
+        buckets = [(-self.bucket_value(key), count) for key, count in sorted(self.negative.items(), reverse=True)]
+        buckets += [(0., self.zeros)]
+        buckets += [(self.bucket_value(key), count) for key, count in sorted(self.positive.items())]
+
+        for value, count in buckets:
+            seen += count
+            if seen > rank:
+                return min(max(value, self.min), self.max)
+
+        return self.max
+
+    @property
+    def mean(self) -> float:
+
+        return self.sum / self.count if self.count else math.nan
+
+    @property
+    def std(self) -> float:
+
+        if self.count < 2:
+            return math.nan
+
+        variance = (self.sum_squares - self.sum ** 2 / self.count) / (self.count - 1)
+
+        return math.sqrt(max(variance, 0.))
+
+    def __len__(self) -> int:
+
+        return len(self.positive) + len(self.negative) + 1
+
+
+def volume_weighted_ldfs(
+        cumulative: np.ndarray,
+        pair_mask: np.ndarray
+) -> np.ndarray:
+    """
+    Volume-weighted age-to-age factors of one or more triangles.
+
+    :param cumulative: Cumulative values of shape (..., origins, developments).
+    :param pair_mask: Whether both ages of each factor are observed, of shape (origins, developments - 1).
+    :return: The factors, of shape (..., developments - 1). Factors without any volume are 1.
+    """
+
+    numerator = np.where(pair_mask, cumulative[..., 1:], 0.).sum(axis=-2)
+    denominator = np.where(pair_mask, cumulative[..., :-1], 0.).sum(axis=-2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ldfs = numerator / denominator
+
+    return np.where(denominator > 0, ldfs, 1.)
+
+
+def development_to(
+        ldfs: np.ndarray,
+        latest_age: np.ndarray
+) -> np.ndarray:
+    """
+    Development from each origin's latest age to every age, i.e., the product of the factors in between, which is
+    below 1 for earlier ages.
+
+    :param ldfs: Age-to-age factors of shape (..., developments - 1).
+    :param latest_age: The index of the latest age of each origin.
+    :return: The development of shape (..., origins, developments).
+    """
+
+    log_cumulative = np.concatenate(
+        [np.zeros(ldfs.shape[:-1] + (1,)), np.cumsum(np.log(ldfs), axis=-1)],
+        axis=-1
+    )
+
+    latest = np.take(log_cumulative, latest_age, axis=-1)
+
+    return np.exp(log_cumulative[..., np.newaxis, :] - latest[..., np.newaxis])
+
+
+class BootstrapModel:
+    """
+    The ODP chain ladder model fitted to a triangle, i.e., everything the simulations need.
+
+    :param cumulative: Cumulative values of a single triangle, of shape (origins, developments), with NaN for the
+    cells that have not been observed yet.
+    """
+    def __init__(
+            self,
+            cumulative: np.ndarray
+    ):
+
+        cumulative = np.asarray(cumulative, dtype=float)
+
+        self.observed = ~np.isnan(cumulative)
+        self.pair_mask = self.observed[:, :-1] & self.observed[:, 1:]
+        self.future = ~self.observed
+
+        self.latest_age = self.observed.shape[1] - 1 - np.argmax(self.observed[:, ::-1], axis=1)
+
+        cumulative = np.where(self.observed, cumulative, 0.)
+        latest = cumulative[np.arange(cumulative.shape[0]), self.latest_age]
+
+        self.ldfs = volume_weighted_ldfs(cumulative=cumulative, pair_mask=self.pair_mask)
+
+        # Expected incremental values of the observed cells, backed out of the latest diagonal with the factors.
+        fitted = latest[:, np.newaxis] * development_to(ldfs=self.ldfs, latest_age=self.latest_age)
+        self.fitted = np.where(self.observed, np.diff(fitted, axis=1, prepend=0.), 0.)
+
+        incremental = np.diff(cumulative, axis=1, prepend=0.)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            residuals = (incremental - self.fitted) / np.sqrt(np.abs(self.fitted))
+
+        # The cells alone in their origin period or development age, i.e., the corners of the triangle, are fitted
+        # exactly, and their residuals of zero are left out of the resampling.
+        corners = (self.observed.sum(axis=1) == 1)[:, np.newaxis] | (self.observed.sum(axis=0) == 1)[np.newaxis, :]
+        usable = self.observed & (self.fitted != 0)
+
+        n_observations = int(self.observed.sum())
+        n_parameters = sum(self.observed.shape) - 1
+        degrees_of_freedom = n_observations - n_parameters
+
+        if degrees_of_freedom <= 0:
+            raise ValueError("The triangle is too small to bootstrap.")
+
+        # Scale parameter of the ODP model.
+        self.scale = float(np.sum(residuals[usable] ** 2) / degrees_of_freedom)
+
+        # Residuals adjusted for the degrees of freedom.
+        self.residuals = residuals[usable & ~corners] * math.sqrt(n_observations / degrees_of_freedom)
+
+        if self.residuals.size == 0:
+            raise ValueError("The triangle has no residuals to resample.")
+
+        # Deterministic chain ladder IBNR, for comparison with the simulated mean.
+        projected = latest[:, np.newaxis] * development_to(ldfs=self.ldfs, latest_age=self.latest_age)
+        self.ibnr = projected[:, -1] - latest
+
+    def simulate(
+            self,
+            rng: np.random.Generator,
+            n_sims: int
+    ) -> np.ndarray:
+        """
+        Simulates the IBNR of each origin period.
+
+        :return: The simulated IBNR of shape (n_sims, origins).
+        """
+
+        sqrt_fitted = np.sqrt(np.abs(self.fitted))
+
+        # Pseudo triangles from resampled residuals.
+        sampled = rng.choice(self.residuals, size=(n_sims,) + self.fitted.shape)
+        incremental = np.where(self.observed, self.fitted + sampled * sqrt_fitted, 0.)
+        cumulative = np.cumsum(incremental, axis=-1)
+
+        # Parameter error: refit the factors to each pseudo triangle and project its latest diagonal.
+        ldfs = volume_weighted_ldfs(cumulative=cumulative, pair_mask=self.pair_mask)
+
+        latest = np.take_along_axis(
+            cumulative,
+            np.broadcast_to(self.latest_age[:, np.newaxis], (n_sims, len(self.latest_age), 1)),
+            axis=-1
+        )
+
+        projected = latest * development_to(ldfs=ldfs, latest_age=self.latest_age)
+        means = np.where(self.future, np.diff(projected, axis=-1, prepend=0.), 0.)
+
+        # Process error: gamma distributed future payments with the mean and variance of the ODP model. Negative
+        # means have no such distribution and are kept as they are.
+        positive = means > 0
+        shape = np.where(positive, means / self.scale, 1.)
+        payments = np.where(positive, rng.gamma(shape=shape, scale=self.scale), means)
+
+        return payments.sum(axis=-1)
+
+
+def simulate_shard(
+        model: BootstrapModel,
+        seed: np.random.SeedSequence,
+        n_sims: int,
+        relative_accuracy: float = BOOTSTRAP_RELATIVE_ACCURACY,
+        chunk_cells: int = BOOTSTRAP_CHUNK_CELLS
+) -> list:
+    """
+    Runs a shard of simulations, in chunks of at most chunk_cells triangle cells.
+
+    :return: The sketches of the IBNR of each origin period, followed by that of the total.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    n_origins = model.observed.shape[0]
+
+    sketches = [QuantileSketch(relative_accuracy=relative_accuracy) for _ in range(n_origins + 1)]
+
+    chunk_size = max(1, chunk_cells // model.observed.size)
+
+    for start in range(0, n_sims, chunk_size):
+
+        ibnr = model.simulate(rng=rng, n_sims=min(chunk_size, n_sims - start))
+
+        for origin in range(n_origins):
+            sketches[origin].add(ibnr[:, origin])
+
+        sketches[-1].add(ibnr.sum(axis=1))
+
+    return sketches
+
+
+class BootstrapResults:
+    """
+    Distribution of the IBNR of each origin period and of the total, over all simulations of a bootstrap run.
+    """
+    def __init__(
+            self,
+            origins: list,
+            sketches: list,
+            ibnr: np.ndarray,
+            scale: float,
+            n_sims: int,
+            seed: int
+    ):
+
+        self.origins = origins
+        self.sketches = sketches
+        self.ibnr = ibnr
+        self.scale = scale
+        self.n_sims = n_sims
+        self.seed = seed
+
+    @property
+    def total(self) -> QuantileSketch:
+
+        return self.sketches[-1]
+
+    def summary(
+            self,
+            percentiles: list = None
+    ) -> pd.DataFrame:
+        """
+        Returns the chain ladder IBNR and the mean, standard deviation and percentiles of the simulated IBNR, one row
+        per origin period followed by the total.
+        """
+
+        if percentiles is None:
+            percentiles = BOOTSTRAP_PERCENTILES
+
+        rows = []
+
+        for sketch, ibnr in zip(self.sketches, list(self.ibnr) + [self.ibnr.sum()]):
+            rows.append(
+                [ibnr, sketch.mean, sketch.std] + [sketch.quantile(percentile / 100) for percentile in percentiles]
+            )
+
+        return pd.DataFrame(
+            rows,
+            index=list(self.origins) + ['Total'],
+            columns=['Chain Ladder', 'Mean', 'Std. Dev.'] + ['%g%%' % percentile for percentile in percentiles]
+        )
+
+
+def shard_sizes(
+        n_sims: int,
+        shard_size: int = BOOTSTRAP_SHARD_SIZE
+) -> list:
+
+    return [min(shard_size, n_sims - start) for start in range(0, n_sims, shard_size)]
+
+
+def bootstrap_odp(
+        cumulative: np.ndarray,
+        origins: list = None,
+        n_sims: int = BOOTSTRAP_SIMULATIONS,
+        seed: int = BOOTSTRAP_SEED,
+        max_workers: int = None,
+        relative_accuracy: float = BOOTSTRAP_RELATIVE_ACCURACY,
+        shard_size: int = BOOTSTRAP_SHARD_SIZE,
+        on_progress: Callable[[int, int], None] = None
+) -> BootstrapResults:
+    """
+    Runs a bootstrap of the ODP chain ladder model.
+
+    :param cumulative: Cumulative values of a single triangle, of shape (origins, developments), with NaN for the
+    cells that have not been observed yet.
+    :param origins: Labels of the origin periods.
+    :param n_sims: The number of simulations.
+    :param seed: Seeds the random streams of the shards.
+    :param max_workers: The number of worker processes, defaults to the number of processors. Set to 1 to run the
+    simulations in the calling process.
+    :param relative_accuracy: The relative accuracy of the percentiles.
+    :param shard_size: The number of simulations in each shard.
+    :param on_progress: Called with (simulations done, n_sims) as each shard completes.
+    """
+
+    model = BootstrapModel(cumulative=cumulative)
+
+    if origins is None:
+        origins = list(range(model.observed.shape[0]))
+
+    sizes = shard_sizes(n_sims=n_sims, shard_size=shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    shards = {}
+    done = 0
+
+    def collect(index: int, sketches: list) -> None:
+
+        nonlocal done
+
+        shards[index] = sketches
+        done += sizes[index]
+
+        if on_progress:
+            on_progress(done, n_sims)
+
+    if max_workers == 1 or len(sizes) == 1:
+        for index, (size, shard_seed) in enumerate(zip(sizes, seeds)):
+            collect(index, simulate_shard(model, shard_seed, size, relative_accuracy))
+    else:
+        # Workers are spawned rather than forked, since the application may be running other threads.
+        with ProcessPoolExecutor(
+                max_workers=min(max_workers, len(sizes)),
+                mp_context=multiprocessing.get_context('spawn')
+        ) as executor:
+            futures = {
+                executor.submit(simulate_shard, model, shard_seed, size, relative_accuracy): index
+                for index, (size, shard_seed) in enumerate(zip(sizes, seeds))
+            }
+
+            for future in as_completed(futures):
+                collect(futures[future], future.result())
+
+    # Merge in the order of the shards, so that the results do not depend on which worker finished first.
+    sketches = shards[0]
+
+    for index in range(1, len(sizes)):
+        for sketch, shard_sketch in zip(sketches, shards[index]):
+            sketch.merge(shard_sketch)
+
+    return BootstrapResults(
+        origins=origins,
+        sketches=sketches,
+        ibnr=model.ibnr,
+        scale=model.scale,
+        n_sims=n_sims,
+        seed=seed
+    )
+
+
+def bootstrap_triangle(
+        triangle: Triangle,
+        **kwargs
+) -> BootstrapResults:
+    """
+    Runs a bootstrap of the first segment of a chainladder Triangle. Keyword arguments are passed to bootstrap_odp().
+    """
+
+    if not triangle.is_cumulative:
+        triangle = triangle.incr_to_cum()
+
+    values = np.asarray(triangle.set_backend('numpy').values[0, 0], dtype=float)
+
+    return bootstrap_odp(
+        cumulative=values,
+        origins=triangle.origin.astype(str).tolist(),
+        **kwargs
+    )
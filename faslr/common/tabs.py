@@ -0,0 +1,76 @@
+"""
+Release of the resources held by tabs that have stayed in the background of a tab widget.
+"""
+import logging
+import time
+
+from faslr.constants import TAB_UNLOAD_CHECK_INTERVAL
+
+from PyQt6.QtCore import (
+    QObject,
+    QTimer
+)
+
+from PyQt6.QtWidgets import QTabWidget
+
+
+class BackgroundTabUnloader(QObject):
+    """
+    Periodically unloads the tabs of a tab widget that have been in the background for longer than a timeout. Tabs
+    take part by providing a hidden_since attribute, the monotonic time at which they were last hidden or None, and
+    an unload() method, such as DeferredAnalysisTab.
+
+    :param tab_widget: The tab widget whose tabs are unloaded.
+    :param timeout: Seconds a tab can stay in the background, 0 or less disables unloading.
+    :param interval: Milliseconds between checks.
+    """
+    def __init__(
+            self,
+            tab_widget: QTabWidget,
+            timeout: float,
+            interval: int = TAB_UNLOAD_CHECK_INTERVAL
+    ):
+        super().__init__(tab_widget)
+
+        self.tab_widget = tab_widget
+        self.timeout = timeout
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.unload_idle) # noqa
+
+        if self.timeout > 0:
+            self.timer.start()
+
+    def unload_idle(
+            self,
+            now: float = None
+    ) -> int:
+        """
+        Unloads the tabs that have been hidden for longer than the timeout.
+
+        :param now: The current monotonic time, defaults to time.monotonic().
+        :return: The number of tabs unloaded.
+        """
+
+        if self.timeout <= 0:
+            return 0
+
+        if now is None:
+            now = time.monotonic()
+
+        count = 0
+
+        for index in range(self.tab_widget.count()):
+            widget = self.tab_widget.widget(index)
+
+            hidden_since = getattr(widget, 'hidden_since', None)
+
+            if hidden_since is None or now - hidden_since < self.timeout:
+                continue
+
+            if widget.unload():
+                logging.info("Unloaded background tab %s." % self.tab_widget.tabText(index))
+                count += 1
+
+        return count
@@ -3,15 +3,19 @@ import configparser
 import logging
 import os
 import faslr.schema as schema
-import sqlalchemy as sa
 
 from faslr.constants import (
     CONFIG_PATH,
-    DB_NOT_FOUND_TEXT,
     DEFAULT_DIALOG_PATH,
     QT_FILEPATH_OPTION
 )
 
+from faslr.database import (
+    DatabaseClient,
+    create_faslr_engine,
+    run_db_job
+)
+
 from faslr.schema import (
     CountryTable,
     LOBTable,
@@ -19,8 +23,15 @@ from faslr.schema import (
     StateTable,
 )
 
+from faslr.profiler import (
+    profile_span,
+    profiled
+)
+
 from faslr.project_item import ProjectItem
 
+from faslr.utilities.results_cache import RESULTS_CACHE
+
 from PyQt6.QtCore import QEvent
 
 from PyQt6.QtGui import (
@@ -43,7 +54,10 @@ from sqlalchemy import event
 from sqlalchemy.orm.session import Session
 from sqlalchemy.engine.base import Connection
 
-from typing import TYPE_CHECKING
+from typing import (
+    Callable,
+    TYPE_CHECKING
+)
 
 if TYPE_CHECKING:  # pragma: no cover
     from faslr.__main__ import MainWindow
@@ -143,9 +157,9 @@ class ConnectionDialog(QDialog):
             os.remove(db_filename)
 
         if not db_filename == "":
-            engine = sa.create_engine(
-                'sqlite:///' + filename[0],
-                echo=True
+            engine = create_faslr_engine(
+                db_path=db_filename,
+                check_exists=False
             )
 
             schema.Base.metadata.create_all(engine)
@@ -216,23 +230,102 @@ def populate_project_tree(
 ) -> None:
     """
     Upon connection to an existing database, populates the project tree in the left-hand pane of the
-    main window based on what projects have been saved to the database.
+    main window based on what projects have been saved to the database. The query runs on the database
+    worker when one is available, and the tree is built once the results come back.
     """
 
-    # Open up the connection to the database
-    session, connection = connect_db(db_path=db_filename)
+    def on_result(tree: list) -> None:
+
+        with profile_span("Load tree"):
+            build_project_tree(
+                tree=tree,
+                main_window=main_window
+            )
+
+        main_window.connection_established = True
+        main_window.db = db_filename
+
+        # Fits made from now on are cached in the project database.
+        RESULTS_CACHE.set_db(db_path=db_filename)
+
+        main_window.menu_bar.toggle_project_actions()
+
+    run_db_job(
+        db_path=db_filename,
+        job=query_project_tree,
+        client=get_db_client(main_window),
+        on_result=on_result
+    )
+
+
+@profiled("Query project tree")
+def query_project_tree(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None
+) -> list:
+    """
+    Queries the country/state/LOB hierarchy of all projects in the database. Returns plain Python data so that
+    it can be safely passed back from the database worker thread.
+
+    :return: A list of (country, country_uuid, states) tuples, where states is a list of
+    (state, state_uuid, lobs) tuples and lobs is a list of (lob, lob_uuid) tuples.
+    """
 
-    # Query all the countries
     countries = session.query(
         CountryTable.country_id,
         CountryTable.country_name,
         CountryTable.project_id
     ).all()
 
-    # Append each row one at a time, brute force method. For each country, add state rows, and
-    # for each state, add LOB rows.
+    states = session.query(
+        StateTable.state_id,
+        StateTable.country_id,
+        StateTable.state_name,
+        StateTable.project_id
+    ).all()
 
-    for country_id, country, country_uuid in countries:
+    lobs = session.query(
+        StateTable.state_id,
+        LOBTable.lob_type,
+        LOBTable.project_id
+    ).select_from(
+        LOBTable
+    ).join(
+        LocationTable,
+        LOBTable.location_id == LocationTable.location_id
+    ).join(
+        StateTable,
+        StateTable.location_id == LocationTable.location_id
+    ).all()
+
+    # Group the flat query results by parent, rather than querying once per country and once per state.
+    lob_lookup = {}
+    for state_id, lob, lob_uuid in lobs:
+        lob_lookup.setdefault(state_id, []).append((lob, lob_uuid))
+
+    state_lookup = {}
+    for state_id, country_id, state, state_uuid in states:
+        state_lookup.setdefault(country_id, []).append(
+            (state, state_uuid, lob_lookup.get(state_id, []))
+        )
+
+    tree = [
+        (country, country_uuid, state_lookup.get(country_id, []))
+        for country_id, country, country_uuid in countries
+    ]
+
+    return tree
+
+
+def build_project_tree(
+        tree: list,
+        main_window: MainWindow
+) -> None:
+    """
+    Appends the results of query_project_tree to the project model of the main window.
+    """
+
+    for country, country_uuid, states in tree:
 
         country_item = ProjectItem(
             text=country,
@@ -244,15 +337,7 @@ def populate_project_tree(
             QStandardItem(country_uuid)
         ]
 
-        states = session.query(
-            StateTable.state_id,
-            StateTable.state_name,
-            StateTable.project_id
-        ).filter(
-            StateTable.country_id == country_id
-        )
-
-        for state_id, state, state_uuid in states:
+        for state, state_uuid, lobs in states:
 
             state_item = ProjectItem(
                 state,
@@ -260,16 +345,6 @@ def populate_project_tree(
 
             state_row = [state_item, QStandardItem(state_uuid)]
 
-            lobs = session.query(
-                LOBTable.lob_type, LOBTable.project_id
-            ).join(
-                LocationTable
-            ).join(
-                StateTable
-            ).filter(
-                StateTable.state_id == state_id
-            )
-
             for lob, lob_uuid in lobs:
                 lob_item = ProjectItem(
                     lob,
@@ -286,11 +361,15 @@ def populate_project_tree(
 
     main_window.project_pane.expandAll()
 
-    connection.close()
 
-    main_window.connection_established = True
-    main_window.db = db_filename
-    main_window.menu_bar.toggle_project_actions()
+def get_db_client(main_window: MainWindow) -> [DatabaseClient, None]:
+    """
+    Returns the database client of the application, if one is running.
+    """
+
+    core = getattr(main_window, 'core', None)
+
+    return getattr(core, 'db_client', None)
 
 
 class FaslrConnection:
@@ -299,13 +378,7 @@ class FaslrConnection:
             db_path: str
     ):
 
-        if not os.path.isfile(db_path):
-            raise FileNotFoundError(DB_NOT_FOUND_TEXT)
-
-        self.engine = sa.create_engine(
-            'sqlite:///' + db_path,
-            echo=True
-        )
+        self.engine = create_faslr_engine(db_path=db_path)
         self.raw_connection = self.engine.raw_connection()
 
         self.session = sessionmaker(bind=self.engine)()
@@ -317,13 +390,7 @@ def connect_db(db_path: str) -> (Session, Connection):
     Connects the db. Shortens amount of code required to do so.
     """
 
-    if not os.path.isfile(db_path):
-        raise FileNotFoundError(DB_NOT_FOUND_TEXT)
-
-    engine = sa.create_engine(
-        'sqlite:///' + db_path,
-        echo=True
-    )
+    engine = create_faslr_engine(db_path=db_path)
     session = sessionmaker(bind=engine)()
     connection = engine.connect()
     return session, connection
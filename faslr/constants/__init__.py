@@ -1,10 +1,24 @@
 from faslr.constants.analysis import (
+    TAB_UNLOAD_CHECK_INTERVAL,
+    TAB_UNLOAD_TIMEOUT,
     VALUE_TYPES,
     VALUE_TYPES_COMBO_BOX_WIDTH
 )
 
+from faslr.constants.bootstrap import (
+    BOOTSTRAP_CHUNK_CELLS,
+    BOOTSTRAP_PERCENTILES,
+    BOOTSTRAP_RELATIVE_ACCURACY,
+    BOOTSTRAP_SEED,
+    BOOTSTRAP_SHARD_SIZE,
+    BOOTSTRAP_SIMULATIONS
+)
+
 from faslr.constants.connection import (
-    DB_NOT_FOUND_TEXT
+    DB_NOT_FOUND_TEXT,
+    QUERY_LOG_DISPLAY_ROWS,
+    QUERY_LOG_SIZE,
+    RESULTS_CACHE_SIZE
 )
 
 from faslr.constants.development import (
@@ -17,6 +31,28 @@ from faslr.constants.diagnostics import (
     MACK_VALUATION_CRITICAL
 )
 
+from faslr.constants.exhibit import (
+    BATCH_EXHIBIT_SERIES,
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMATS
+)
+
+from faslr.constants.memory import (
+    MEMORY_ALLOCATION_ROWS,
+    MEMORY_TRACE_FRAMES,
+    MEMORY_WALK_DEPTH
+)
+
+from faslr.constants.profiler import (
+    PROFILE_TRACE_FILENAME,
+    PROFILER_SIZE
+)
+
+from faslr.constants.startup import (
+    STARTUP_DEFERRED_MODULES,
+    STARTUP_PRELOAD_MODULES
+)
+
 from faslr.constants.settings import (
     SETTINGS_LIST
 )
@@ -40,7 +76,8 @@ from faslr.constants.general import (
     ROOT_PATH,
     SAMPLE_DB_NAME,
     SAMPLE_DIALOG_PATH,
-    TEMPLATES_PATH
+    TEMPLATES_PATH,
+    TRIANGLE_CACHE_PATH
 )
 
 from faslr.constants.role import (
@@ -63,5 +100,7 @@ from faslr.constants.triangle import (
     GRAINS,
     LOSS_FIELDS,
     ORIGIN_FIELDS,
-    TIME_FIELDS
+    TIME_FIELDS,
+    TRIANGLE_PREFETCH_MARGIN,
+    TRIANGLE_WIDTH_SAMPLE_SIZE
 )
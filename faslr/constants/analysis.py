@@ -1,7 +1,16 @@
 VALUE_TYPES = [
     'Values',
     'Link Ratios',
-    'Diagnostics'
+    'Diagnostics',
+    'Bootstrap',
+    'Std. Errors'
 ]
 
 VALUE_TYPES_COMBO_BOX_WIDTH = 110
+
+# Seconds an analysis tab can stay in the background before its views and models are released. Overridden by the
+# tab_unload_timeout option of the PERFORMANCE section of the configuration file, 0 disables unloading.
+TAB_UNLOAD_TIMEOUT = 300
+
+# Milliseconds between checks for background tabs to unload
+TAB_UNLOAD_CHECK_INTERVAL = 30000
@@ -0,0 +1,25 @@
+# Default number of simulations of a bootstrap run
+BOOTSTRAP_SIMULATIONS = 10000
+
+# Default seed of a bootstrap run, the same seed and number of simulations always give the same results
+BOOTSTRAP_SEED = 42
+
+# Number of simulations in each shard handed to a worker process. Each shard draws from its own random stream, so
+# results do not depend on the number of workers.
+BOOTSTRAP_SHARD_SIZE = 2500
+
+# Maximum number of triangle cells simulated at once within a shard, which bounds the memory used by each worker
+BOOTSTRAP_CHUNK_CELLS = 2000000
+
+# Relative accuracy of the quantile sketches summarizing the simulated IBNR
+BOOTSTRAP_RELATIVE_ACCURACY = 0.005
+
+# Percentiles of the simulated IBNR shown in the bootstrap tab
+BOOTSTRAP_PERCENTILES = [
+    50,
+    75,
+    90,
+    95,
+    99,
+    99.5
+]
@@ -1 +1,11 @@
 DB_NOT_FOUND_TEXT = "Invalid database path specified. File does not exist."
+
+# Number of statements kept by the query log before the oldest ones are discarded
+QUERY_LOG_SIZE = 2000
+
+# Number of rows shown in each table of the database performance dialog
+QUERY_LOG_DISPLAY_ROWS = 20
+
+# Megabytes of fitted results kept in the results cache of a project database before the least recently used entries
+# are evicted, overridden by the results_cache_size option of the PERFORMANCE section of the configuration file
+RESULTS_CACHE_SIZE = 64
@@ -0,0 +1,16 @@
+# Number of rows read from an exhibit at a time when exporting it
+EXPORT_CHUNK_SIZE = 1000
+
+# File formats that exhibits can be exported to
+EXPORT_FORMATS = [
+    'xlsx',
+    'csv'
+]
+
+# Series placed under each triangle column in exhibits exported in batch
+BATCH_EXHIBIT_SERIES = [
+    'Latest',
+    'CDF',
+    'Ultimate',
+    'IBNR'
+]
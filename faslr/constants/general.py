@@ -22,6 +22,9 @@ ROOT_PATH = dirname(dirname(os.path.realpath(__file__)))
 # Path of the configuration file
 CONFIG_PATH = os.path.join(ROOT_PATH, 'faslr.ini')
 
+# Directory of the binary cache of triangles loaded from files, next to the configuration file
+TRIANGLE_CACHE_PATH = os.path.join(ROOT_PATH, 'cache', 'triangles')
+
 # Path for template files, i.e., the generic configuration file
 TEMPLATES_PATH = os.path.join(dirname(dirname(os.path.realpath(__file__))), 'templates')
 
@@ -0,0 +1,8 @@
+# Number of allocation sites listed in the Memory Usage dialog while allocations are traced
+MEMORY_ALLOCATION_ROWS = 25
+
+# Number of frames of each allocation's traceback kept by tracemalloc
+MEMORY_TRACE_FRAMES = 1
+
+# How deeply the attributes of a tab's widgets are followed when looking for DataFrames and arrays
+MEMORY_WALK_DEPTH = 8
@@ -0,0 +1,5 @@
+# Number of timing spans kept by the profiler before the oldest ones are discarded
+PROFILER_SIZE = 20000
+
+# Default file name of exported traces. cProfile statistics are saved next to the trace, with a .prof extension.
+PROFILE_TRACE_FILENAME = 'faslr_trace.json'
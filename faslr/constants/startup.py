@@ -0,0 +1,15 @@
+# Modules imported behind the splash screen once the main window is shown, in order, with the message displayed
+# while each one loads
+STARTUP_PRELOAD_MODULES = [
+    ('chainladder', "Loading chainladder..."),
+    ('faslr.analysis', "Loading analysis tools...")
+]
+
+# Modules that should not be loaded before the main window is first shown
+STARTUP_DEFERRED_MODULES = [
+    'chainladder',
+    'matplotlib',
+    'scipy',
+    'sklearn',
+    'faslr.analysis'
+]
@@ -28,3 +28,10 @@ GRAINS = [
     'Quarterly',
     'Monthly'
 ]
+
+# Number of rows and columns beyond the visible viewport of a triangle view whose display text is prepared ahead of
+# scrolling
+TRIANGLE_PREFETCH_MARGIN = 10
+
+# Number of rows sampled per column when sizing the columns of a triangle view
+TRIANGLE_WIDTH_SAMPLE_SIZE = 20
@@ -3,5 +3,7 @@
 # )
 
 from faslr.core.core import (
-    FCore
+    FCore,
+    get_results_cache_size,
+    get_tab_unload_timeout
 )
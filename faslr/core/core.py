@@ -1,6 +1,11 @@
+import configparser
 import os
 from faslr.connection import get_startup_db_path
-from faslr.constants import CONFIG_PATH
+from faslr.constants import (
+    CONFIG_PATH,
+    RESULTS_CACHE_SIZE,
+    TAB_UNLOAD_TIMEOUT
+)
 
 
 class FCore:
@@ -15,11 +20,54 @@ class FCore:
         else:
             self.startup_db = None
 
+        self.tab_unload_timeout = get_tab_unload_timeout(config_path=config_path)
+        self.results_cache_size = get_results_cache_size(config_path=config_path)
+
         # Flag to determine whether there is an active database connection. Most project-related functions
         # should be disabled unless a connection is established.
         self.connection_established = False
         self.db = None
 
+        # Handle to the background database worker. Set by the main application. When None, database jobs
+        # run on the calling thread.
+        self.db_client = None
+
     def set_db(self, path: str) -> None:
 
         self.db = path
+
+
+def get_tab_unload_timeout(
+        config_path: str = CONFIG_PATH
+) -> float:
+    """
+    Reads the number of seconds after which background analysis tabs are unloaded. Configuration files created
+    before the option existed get the default.
+    """
+
+    config = configparser.ConfigParser()
+    config.read(config_path)
+
+    return config.getfloat(
+        'PERFORMANCE',
+        'tab_unload_timeout',
+        fallback=TAB_UNLOAD_TIMEOUT
+    )
+
+
+def get_results_cache_size(
+        config_path: str = CONFIG_PATH
+) -> float:
+    """
+    Reads the number of megabytes of fitted results cached in a project database. Configuration files created
+    before the option existed get the default.
+    """
+
+    config = configparser.ConfigParser()
+    config.read(config_path)
+
+    return config.getfloat(
+        'PERFORMANCE',
+        'results_cache_size',
+        fallback=RESULTS_CACHE_SIZE
+    )
@@ -1,19 +1,16 @@
 from __future__ import annotations
 
-from chainladder import Triangle
 import datetime as dt
 import numpy as np
 import pandas as pd
 
-from faslr.analysis import AnalysisTab
-
 from faslr.base_table import (
     FAbstractTableModel,
     FTableView
 )
 
 from faslr.connection import (
-    FaslrConnection
+    get_db_client
 )
 
 from faslr.core import (
@@ -30,8 +27,14 @@ from faslr.constants import (
     SAMPLE_DIALOG_PATH
 )
 
+from faslr.database import run_db_job
+
+from faslr.profiler import profile_span
+
 from faslr.utilities import open_item_tab
 
+from faslr.utilities.lazy import lazy_import
+
 from faslr.schema import (
     ProjectViewTable,
     ProjectViewData
@@ -66,15 +69,27 @@ from PyQt6.QtWidgets import (
     QWidget
 )
 
+from functools import partial
+
+from sqlalchemy.orm.session import Session
+
 from typing import (
     Any,
+    Callable,
     TYPE_CHECKING
 )
 
 if TYPE_CHECKING:  # pragma no cover
+    from chainladder import Triangle
     from faslr.__main__ import MainWindow
     from pandas import DataFrame
 
+# Only needed once a triangle is built or analyzed, so they are not loaded at startup.
+cl = lazy_import('chainladder')
+analysis = lazy_import('faslr.analysis')
+batch = lazy_import('faslr.batch')
+diagonal = lazy_import('faslr.diagonal')
+
 # Starting contents of data preview when no files have been uploaded yet
 dummy_df = pd.DataFrame(
     data={
@@ -179,32 +194,41 @@ class DataPane(QWidget):
         self.triangle = triangle
         self.data = self.wizard.args_tab.data
 
-        view_id = self.save_to_db(
+        def on_result(view_id: int) -> None:
+
+            test_record = [
+                view_id,
+                name,
+                desc,
+                created,
+                modified
+            ]
+
+            self.data_model.add_record(record=test_record)
+
+        self.save_to_db(
             name=name,
             description=desc,
             created=created,
-            modified=modified
+            modified=modified,
+            on_result=on_result
         )
 
-        test_record = [
-            view_id,
-            name,
-            desc,
-            created,
-            modified
-        ]
-
-        self.data_model.add_record(record=test_record)
-
     def save_to_db(
             self,
             name: str,
             description: str,
             created,
             modified,
-    ):
+            on_result: Callable[[int], None] = None
+    ) -> [int, None]:
+        """
+        Saves the data view and its data to the database. The writes are carried out by the database worker,
+        which reports its progress to the status bar of the main window.
 
-        faslr_conn = FaslrConnection(db_path=self.core.db)
+        :return: The view id when the write runs inline, otherwise None - in which case on_result receives the
+        view id once the write is committed.
+        """
 
         project_view = ProjectViewTable(
             name=name,
@@ -218,11 +242,6 @@ class DataPane(QWidget):
             project_id=self.project_id
         )
 
-        faslr_conn.session.add(project_view)
-
-        faslr_conn.session.flush()
-        view_id = project_view.view_id
-
         data = self.data.copy()
 
         data.columns = [
@@ -232,29 +251,79 @@ class DataPane(QWidget):
             'reported_loss'
         ]
 
-        data['view_id'] = view_id
-        #
-        # data.to_sql(
-        #     name='project_view_data',
-        #     con=connection,
-        #     index=False,
-        #     if_exists='append'
-        # )
+        records = data.to_dict('records')
 
-        data_list = data.to_dict('records')
+        if self.main_window:
+            client = get_db_client(self.main_window)
+            on_progress = self.show_save_progress
+        else:
+            client = None
+            on_progress = None
+
+        view_id = run_db_job(
+            db_path=self.core.db,
+            job=partial(
+                write_project_view,
+                project_view=project_view,
+                records=records
+            ),
+            client=client,
+            on_result=on_result,
+            on_progress=on_progress,
+            write=True
+        )
 
-        obj_list = []
-        for record in data_list:
-            data_obj = ProjectViewData(**record)
-            obj_list.append(data_obj)
+        return view_id
 
-        faslr_conn.session.add_all(obj_list)
+    def show_save_progress(
+            self,
+            done: int,
+            total: int
+    ) -> None:
 
-        faslr_conn.session.commit()
+        self.main_window.statusBar().showMessage(
+            "Saving data view: %d of %d records written." % (done, total)
+        )
 
-        faslr_conn.connection.close()
 
-        return view_id
+def write_project_view(
+        session: Session,
+        report_progress: Callable[[int, int], None],
+        project_view: ProjectViewTable,
+        records: list,
+        chunk_size: int = 1000
+) -> int:
+    """
+    Writes a data view and its records to the database, reporting progress after each chunk of records.
+
+    :param project_view: The data view metadata.
+    :param records: The data view records, as a list of dicts keyed by ProjectViewData column.
+    :param chunk_size: The number of records written between progress reports.
+    :return: The id of the new data view.
+    """
+
+    session.add(project_view)
+
+    session.flush()
+    view_id = project_view.view_id
+
+    total = len(records)
+
+    for start in range(0, total, chunk_size):
+
+        obj_list = [
+            ProjectViewData(
+                view_id=view_id,
+                **record
+            ) for record in records[start:start + chunk_size]
+        ]
+
+        session.add_all(obj_list)
+        session.flush()
+
+        report_progress(min(start + chunk_size, total), total)
+
+    return view_id
 
 
 class DataImportWizard(QWidget):
@@ -561,13 +630,15 @@ class ImportArgumentsTab(QWidget):
 
         self.file_path.setText(filename)
 
-        self.upload_sample_model.read_header(
-            file_path=filename
-        )
+        with profile_span("Import file"):
+            self.upload_sample_model.read_header(
+                file_path=filename
+            )
+
+            self.upload_sample_view.resizeColumnsToContents()
 
-        self.upload_sample_view.resizeColumnsToContents()
+            self.data = pd.read_csv(filename)
 
-        self.data = pd.read_csv(filename)
         columns = self.data.columns
 
         # Resize mapping dropdowns to fit contents
@@ -805,7 +876,7 @@ class TrianglePreviewTab(QWidget):
 
         self.generate_triangle()
 
-        self.analysis_tab = AnalysisTab(
+        self.analysis_tab = analysis.AnalysisTab(
             triangle=self.parent.triangle
         )
 
@@ -823,7 +894,7 @@ class TrianglePreviewTab(QWidget):
         else:
             self.cumulative = False
 
-        self.parent.triangle = Triangle(
+        self.parent.triangle = cl.Triangle(
             data=self.sibling.data,
             origin=self.dropdowns['origin'].currentText(),
             development=self.sibling.dropdowns['development'].currentText(),
@@ -871,48 +942,37 @@ class ProjectDataModel(FAbstractTableModel):
             'Modified'
         ]
 
-        def read_sql(fc: FaslrConnection) -> DataFrame:
-
-            df_res = pd.read_sql_table(
-                table_name='project_view',
-                con=fc.connection
-            )
-
-            df_res = df_res[
-                [
-                    'view_id',
-                    'name',
-                    'description',
-                    'created',
-                    'modified'
-                ]
-            ]
-            df_res.columns = column_list
-
-            return df_res
+        self._data = pd.DataFrame(columns=column_list)
 
         # If running from main application, read project views from the database. Otherwise, return blank if
         # running in standalone demo mode.
         if self.parent.main_window:
-
-            faslr_connection = FaslrConnection(
-                db_path=self.parent.main_window.core.db
-            )
-
-            df = read_sql(fc=faslr_connection)
-
+            db_path = self.parent.main_window.core.db
+            client = get_db_client(self.parent.main_window)
         elif self.core:
+            db_path = self.core.db
+            client = None
+        else:
+            return
 
-            faslr_connection = FaslrConnection(
-                db_path=self.core.db
-            )
-
-            df = read_sql(fc=faslr_connection)
+        run_db_job(
+            db_path=db_path,
+            job=read_project_views,
+            client=client,
+            on_result=self.set_views
+        )
 
-        else:
-            df = pd.DataFrame(columns=column_list)
+    def set_views(
+            self,
+            df: DataFrame
+    ) -> None:
+        """
+        Replaces the data views with those read from the database.
+        """
 
+        self.beginResetModel()
         self._data = df
+        self.endResetModel()
 
     def data(
             self,
@@ -979,6 +1039,10 @@ class ProjectDataView(FTableView):
         self.open_action.setStatusTip("Open view in new window.")
         self.open_action.triggered.connect(self.open_triangle) # noqa
 
+        self.append_action = QAction("&Append Diagonal", self)
+        self.append_action.setStatusTip("Append the next calendar period to the view from a file.")
+        self.append_action.triggered.connect(self.append_diagonal) # noqa
+
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.contextMenuEvent)  # noqa
 
@@ -987,45 +1051,168 @@ class ProjectDataView(FTableView):
             val: QModelIndex
     ) -> None:
 
-        fc = FaslrConnection(db_path=self.parent.core.db)
-
         view_id = self.model().sibling(val.row(), 0, val).data()
-        query = fc.session.query(
-            ProjectViewData.accident_year,
-            ProjectViewData.calendar_year,
-            ProjectViewData.paid_loss,
-            ProjectViewData.reported_loss
-        ).filter(
-            ProjectViewData.view_id == view_id
-        )
 
-        df = pd.read_sql(query.statement, con=fc.connection)
+        client = get_db_client(self.parent.main_window)
 
-        df.columns = [
-            'Accident Year',
-            'Calendar Year',
-            'Paid Loss',
-            'Reported Loss'
-        ]
+        def on_result(views: list) -> None:
 
-        triangle = Triangle(
-            data=df,
-            origin='Accident Year',
-            development='Calendar Year',
-            columns=['Paid Loss', 'Reported Loss'],
-            cumulative=True
-        )
+            view = views[0]
+
+            # The triangle's columns are named after the view's, which are the columns the selections are saved for.
+            triangle = batch.view_triangle(
+                data=view['data'],
+                columns=view['columns'],
+                cumulative=view['cumulative']
+            )
 
-        open_item_tab(
-            title="Test Triangle",
-            tab_widget=self.parent.parent,
-            item_widget=AnalysisTab(triangle=triangle)
+            open_item_tab(
+                title="Test Triangle",
+                tab_widget=self.parent.parent,
+                item_widget=analysis.DeferredAnalysisTab(
+                    triangle=triangle,
+                    exclusions=view['exclusions'],
+                    selections=view['factors'],
+                    tails=view['tails'],
+                    view_id=view['view_id'],
+                    db_path=self.parent.core.db,
+                    client=client
+                )
+            )
+
+        run_db_job(
+            db_path=self.parent.core.db,
+            job=partial(
+                batch.read_batch_views,
+                view_ids=[int(view_id)]
+            ),
+            client=client,
+            on_result=on_result
         )
 
-        fc.connection.close()
+    def append_diagonal(self) -> None:
+        """
+        Appends a new calendar period, read from a file laid out like the one the view was uploaded from, to the
+        selected view, and re-projects the view with its saved selections and exclusions.
+        """
+
+        index = self.currentIndex()
+
+        if not index.isValid():
+            return
+
+        view_id = int(self.model().sibling(index.row(), 0, index).data())
+
+        filename = QFileDialog.getOpenFileName(
+            parent=self,
+            caption='Open Diagonal',
+            directory=SAMPLE_DIALOG_PATH,
+            filter='CSV (*.csv)',
+            options=QT_FILEPATH_OPTION
+        )[0]
+
+        # Do nothing if the user cancels loading the file
+        if filename == '':
+            return
+
+        main_window = self.parent.main_window
+
+        def show_message(message: str) -> None:
+
+            if main_window:
+                main_window.statusBar().showMessage(message)
+
+        def on_result(summary: dict) -> None:
+
+            show_message(
+                "Appended calendar year %d to view %d: %d records added, %d results written." % (
+                    summary['calendar_year'],
+                    summary['view_id'],
+                    summary['records'],
+                    summary['results']
+                )
+            )
+
+            # Refresh the modified date of the view.
+            run_db_job(
+                db_path=self.parent.core.db,
+                job=read_project_views,
+                client=get_db_client(main_window),
+                on_result=self.model().set_views
+            )
+
+        with profile_span("Read diagonal"):
+            data = pd.read_csv(filename)
+
+        diagonal.append_diagonal(
+            db_path=self.parent.core.db,
+            view_id=view_id,
+            data=data,
+            client=get_db_client(main_window),
+            on_result=on_result,
+            on_error=lambda message: show_message("Could not append the diagonal: %s" % message)
+        )
 
     def contextMenuEvent(self, event):
 
         menu = QMenu()
         menu.addAction(self.open_action)
+        menu.addAction(self.append_action)
         menu.exec(self.viewport().mapToGlobal(event))
+
+
+def read_project_views(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None
+) -> DataFrame:
+    """
+    Reads the data view metadata from the database.
+    """
+
+    df_res = pd.read_sql_table(
+        table_name='project_view',
+        con=session.connection()
+    )
+
+    df_res = df_res[
+        [
+            'view_id',
+            'name',
+            'description',
+            'created',
+            'modified'
+        ]
+    ]
+
+    df_res.columns = [
+        'View Id',
+        'Name',
+        'Description',
+        'Created',
+        'Modified'
+    ]
+
+    return df_res
+
+
+def read_view_data(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        view_id: int = None
+) -> DataFrame:
+    """
+    Reads the records belonging to a data view from the database.
+    """
+
+    query = session.query(
+        ProjectViewData.accident_year,
+        ProjectViewData.calendar_year,
+        ProjectViewData.paid_loss,
+        ProjectViewData.reported_loss
+    ).filter(
+        ProjectViewData.view_id == view_id
+    )
+
+    df = pd.read_sql(query.statement, con=session.connection())
+
+    return df
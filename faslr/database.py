@@ -0,0 +1,314 @@
+"""
+Database access that runs off the GUI thread. A DatabaseWorker lives in its own QThread and owns the engine for the
+current project database. Jobs are submitted through a DatabaseClient, which lives on the GUI thread and routes the
+results, progress updates, and errors back to the callbacks supplied with each job via Qt signals.
+
+When no client is running (e.g., in the demos and unit tests), run_db_job() executes the job inline so that the
+same code path works with or without the background thread.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sqlalchemy as sa
+
+from faslr.constants import DB_NOT_FOUND_TEXT
+
+from faslr.query_log import instrument_engine
+
+from PyQt6.QtCore import (
+    QObject,
+    QThread,
+    pyqtSignal,
+    pyqtSlot
+)
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.session import Session
+
+from typing import (
+    Any,
+    Callable,
+    Optional
+)
+
+# Signature of a job: job(session, report_progress) -> result
+DatabaseJob = Callable[[Session, Callable[[int, int], None]], Any]
+
+
+def create_faslr_engine(
+        db_path: str,
+        check_exists: bool = True
+) -> Engine:
+    """
+    Creates the SQLAlchemy engine used to talk to a FASLR project database. All engines in FASLR should be created
+    through this function, so that their statements are recorded in the query log.
+
+    :param db_path: The path to the sqlite database.
+    :param check_exists: Whether to raise an error if the database file does not exist.
+    :return: A SQLAlchemy engine.
+    """
+
+    if check_exists and not os.path.isfile(db_path):
+        raise FileNotFoundError(DB_NOT_FOUND_TEXT)
+
+    engine = sa.create_engine(
+        'sqlite:///' + db_path
+    )
+
+    return instrument_engine(engine)
+
+
+def execute_job(
+        job: DatabaseJob,
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        write: bool = False
+) -> Any:
+    """
+    Runs a single job against a session. Write jobs are committed upon success and rolled back upon failure.
+    """
+
+    if report_progress is None:
+        def report_progress(done: int, total: int) -> None:  # noqa
+            pass
+
+    try:
+        result = job(session, report_progress)
+        if write:
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    return result
+
+
+class DatabaseWorker(QObject):
+    """
+    Executes database jobs. Meant to be moved to a dedicated QThread, so that it is the only object that
+    touches the engine and no SQL runs on the GUI thread.
+    """
+
+    job_finished = pyqtSignal(int, object)
+    job_failed = pyqtSignal(int, str)
+    job_progress = pyqtSignal(int, int, int)
+
+    def __init__(self):
+        super().__init__()
+
+        self.db_path = None
+        self.engine = None
+        self.session_factory = None
+
+    def set_db(
+            self,
+            db_path: str
+    ) -> None:
+        """
+        Points the worker at a (possibly different) database. The previous engine, if any, is disposed of.
+        """
+
+        if db_path == self.db_path and self.engine is not None:
+            return
+
+        if self.engine is not None:
+            self.engine.dispose()
+
+        self.engine = create_faslr_engine(db_path=db_path)
+        self.session_factory = sessionmaker(bind=self.engine)
+        self.db_path = db_path
+
+    @pyqtSlot(int, str, object, bool)
+    def run_job(
+            self,
+            job_id: int,
+            db_path: str,
+            job: DatabaseJob,
+            write: bool
+    ) -> None:
+
+        try:
+            self.set_db(db_path=db_path)
+
+            result = execute_job(
+                job=job,
+                session=self.session_factory(),
+                report_progress=lambda done, total: self.job_progress.emit(job_id, done, total),
+                write=write
+            )
+        except Exception as e:
+            logging.exception("Database job %d failed." % job_id)
+            self.job_failed.emit(job_id, str(e))
+            return
+
+        self.job_finished.emit(job_id, result)
+
+    @pyqtSlot()
+    def shutdown(self) -> None:
+
+        if self.engine is not None:
+            self.engine.dispose()
+            self.engine = None
+
+
+class DatabaseClient(QObject):
+    """
+    GUI-side handle to the DatabaseWorker. Starts the worker thread, hands it jobs, and dispatches the results
+    to the callbacks registered for each job.
+    """
+
+    job_requested = pyqtSignal(int, str, object, bool)
+
+    def __init__(self):
+        super().__init__()
+
+        self.next_job_id = 0
+        self.callbacks = {}
+
+        self.thread = QThread()
+        self.worker = DatabaseWorker()
+        self.worker.moveToThread(self.thread)
+
+        self.job_requested.connect(self.worker.run_job)  # noqa
+        self.worker.job_finished.connect(self.on_finished)  # noqa
+        self.worker.job_failed.connect(self.on_failed)  # noqa
+        self.worker.job_progress.connect(self.on_progress)  # noqa
+
+        self.thread.start()
+
+    def submit(
+            self,
+            db_path: str,
+            job: DatabaseJob,
+            on_result: Callable[[Any], None] = None,
+            on_error: Callable[[str], None] = None,
+            on_progress: Callable[[int, int], None] = None,
+            write: bool = False
+    ) -> int:
+        """
+        Queue a job on the worker thread.
+
+        :param db_path: The database the job should run against.
+        :param job: A callable accepting a session and a progress-reporting function.
+        :param on_result: Called on the GUI thread with the return value of the job.
+        :param on_error: Called on the GUI thread with the error message if the job fails.
+        :param on_progress: Called on the GUI thread with (done, total) whenever the job reports progress.
+        :param write: Whether the session should be committed after the job completes.
+        :return: The id of the job.
+        """
+
+        job_id = self.next_job_id
+        self.next_job_id += 1
+
+        self.callbacks[job_id] = (on_result, on_error, on_progress)
+
+        self.job_requested.emit(job_id, db_path, job, write)  # noqa
+
+        return job_id
+
+    def pending(self) -> int:
+        """
+        Number of jobs that have been submitted but have not yet finished.
+        """
+
+        return len(self.callbacks)
+
+    def on_finished(
+            self,
+            job_id: int,
+            result: Any
+    ) -> None:
+
+        on_result, on_error, on_progress = self.callbacks.pop(job_id)
+
+        if on_result:
+            on_result(result)
+
+    def on_failed(
+            self,
+            job_id: int,
+            message: str
+    ) -> None:
+
+        on_result, on_error, on_progress = self.callbacks.pop(job_id)
+
+        if on_error:
+            on_error(message)
+
+    def on_progress(
+            self,
+            job_id: int,
+            done: int,
+            total: int
+    ) -> None:
+
+        try:
+            on_progress = self.callbacks[job_id][2]
+        except KeyError:
+            return
+
+        if on_progress:
+            on_progress(done, total)
+
+    def stop(self) -> None:
+        """
+        Stops the worker thread, waiting for any queued jobs to finish first.
+        """
+
+        self.thread.quit()
+        self.thread.wait()
+        self.worker.shutdown()
+
+
+def run_db_job(
+        db_path: str,
+        job: DatabaseJob,
+        client: Optional[DatabaseClient] = None,
+        on_result: Callable[[Any], None] = None,
+        on_error: Callable[[str], None] = None,
+        on_progress: Callable[[int, int], None] = None,
+        write: bool = False
+) -> Any:
+    """
+    Runs a job on the background worker if a client is available, otherwise runs it inline on the calling thread.
+    Either way, the callbacks receive the results, so callers do not need to care which path was taken.
+
+    :return: The result of the job when run inline, otherwise None.
+    """
+
+    if client is not None:
+        client.submit(
+            db_path=db_path,
+            job=job,
+            on_result=on_result,
+            on_error=on_error,
+            on_progress=on_progress,
+            write=write
+        )
+        return None
+
+    engine = create_faslr_engine(db_path=db_path)
+
+    try:
+        result = execute_job(
+            job=job,
+            session=sessionmaker(bind=engine)(),
+            report_progress=on_progress,
+            write=write
+        )
+    except Exception as e:
+        if on_error is None:
+            raise
+        on_error(str(e))
+        return None
+    finally:
+        engine.dispose()
+
+    if on_result:
+        on_result(result)
+
+    return result
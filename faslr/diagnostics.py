@@ -0,0 +1,359 @@
+"""
+Mack (1997) tests of the chain ladder assumptions.
+
+The test statistics are computed with NumPy across every segment (index and column) of a triangle in one call,
+which is much faster than chainladder's valuation_correlation() and development_correlation() on large monthly
+triangles and on triangles with many segments. The statistics only depend on the triangle, whereas the pass/fail
+status also depends on the critical value selected by the user, so MackDiagnostics computes the statistics once
+per triangle and re-thresholds them whenever a critical value changes.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from chainladder import Triangle
+from chainladder.core.correlation import validate_critical
+
+from faslr.utilities.results_cache import (
+    RESULTS_CACHE,
+    CachedResults
+)
+
+from scipy.special import comb
+
+from scipy.stats import (
+    binom,
+    norm,
+    rankdata
+)
+
+# Number of months in each triangle grain
+GRAIN_MONTHS = {
+    'Y': 12,
+    'S': 6,
+    'Q': 3,
+    'M': 1
+}
+
+
+def link_ratios(values: np.ndarray) -> np.ndarray:
+    """
+    Age-to-age factors of an array of cumulative triangle values, with the same conventions as
+    chainladder's Triangle.link_ratio, i.e., zero factors are treated as missing. The factors are calculated in the
+    same order of operations as chainladder, so that ties in the ranks are broken identically.
+
+    :param values: Array of shape (index, columns, origin, development).
+    :return: Array of shape (index, columns, origin, development - 1).
+    """
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = (1 / values[..., :-1]) * values[..., 1:]
+
+    ratios[ratios == 0] = np.nan
+
+    return ratios
+
+
+def rank_by_origin(values: np.ndarray) -> np.ndarray:
+    """
+    Ranks the values within each development period, ignoring missing values. Ties receive the average rank.
+    """
+
+    return rankdata(
+        values,
+        axis=-2,
+        nan_policy='omit'
+    )
+
+
+def valuation_periods(
+        shape: tuple,
+        step: int = 1
+) -> np.ndarray:
+    """
+    Positional valuation period of the numerator of each link ratio, relative to the first link ratio.
+
+    :param shape: Shape (origin, development) of the link ratios.
+    :param step: Number of development periods per origin period, e.g., 4 for annual origins and quarterly
+    development.
+    """
+
+    origins, developments = shape
+
+    return np.arange(origins)[:, None] * step + np.arange(developments)[None, :]
+
+
+def valuation_correlation_statistics(
+        values: np.ndarray,
+        step: int = 1
+) -> tuple:
+    """
+    Calculates the statistics of the Mack valuation (calendar year) correlation test for every segment at once.
+
+    :param values: Array of cumulative values, of shape (index, columns, origin, development).
+    :param step: Number of development periods per origin period.
+    :return: A tuple (periods, z, expectation, variance, probs). periods holds the positional valuation period of
+    each of the last axis entries of the other arrays, which are of shape (index, columns, periods). z is the number
+    of small or large factors in each period, whichever is smaller, expectation and variance are its moments under
+    the null hypothesis and probs is the probability of observing a value of z or less.
+    """
+
+    ratios = link_ratios(values)
+    valid = ~np.isnan(ratios)
+
+    ranks = rank_by_origin(ratios)
+
+    with np.errstate(invalid='ignore'):
+        median = np.nanmedian(ranks, axis=-2, keepdims=True)
+
+    large = (ranks > median) & valid
+    small = (ranks < median) & valid
+
+    # Map each cell to its valuation period, up to the latest period in which the triangle has factors.
+    cell_periods = valuation_periods(ratios.shape[-2:], step=step)
+    periods = np.arange(cell_periods[valid.any(axis=(0, 1))].max(initial=-1) + 1)
+
+    # One-hot matrix of shape (cells, periods), so that summing by valuation becomes a matrix product.
+    onehot = (cell_periods.reshape(-1, 1) == periods[None, :]).astype(float)
+
+    lead_shape = ratios.shape[:-2]
+    cells = ratios.shape[-2] * ratios.shape[-1]
+
+    s = small.reshape(lead_shape + (cells,)).astype(float) @ onehot
+    l = large.reshape(lead_shape + (cells,)).astype(float) @ onehot  # noqa
+
+    z = np.minimum(l, s)
+    n = l + s
+    m = np.floor((n - 1) / 2)
+    c = comb(n - 1, m)
+
+    expectation = (n / 2) - c * n / (2 ** n)
+    variance = n * (n - 1) / 4 - c * n * (n - 1) / (2 ** n) + expectation - expectation ** 2
+
+    probs = np.minimum(1, 2 * binom.cdf(z, n, 0.5))
+
+    return periods, z, expectation, variance, probs
+
+
+def development_correlation_statistics(
+        values: np.ndarray
+) -> tuple:
+    """
+    Calculates the statistics of the Mack development correlation test for every segment at once, using Spearman's
+    rank correlation between adjacent development periods.
+
+    :param values: Array of cumulative values, of shape (index, columns, origin, development).
+    :return: A tuple (t_k, weights, t, variance). t_k holds the rank correlation of each pair of adjacent
+    development periods, of shape (index, columns, I - 3), weights the weight of each pair, t the weighted average
+    correlation of shape (index, columns) and variance the variance of t under the null hypothesis.
+    """
+
+    ratios = link_ratios(values)
+    valid = ~np.isnan(ratios)
+
+    # Ranks of each column, and of each column without its latest factor.
+    cell_periods = valuation_periods(ratios.shape[-2:])
+    latest = cell_periods[valid.any(axis=(0, 1))].max(initial=-1)
+
+    ratios_prior = np.where(cell_periods == latest, np.nan, ratios)
+
+    ranks = rank_by_origin(ratios)
+    ranks_prior = rank_by_origin(ratios_prior)
+
+    i = values.shape[-1]
+    k = np.arange(2, i - 1)
+
+    # Compare the ranks of development period k against those of period k - 1, for the same origins.
+    numerator = np.nansum(
+        (ranks[..., 1:i - 2] - ranks_prior[..., :i - 3]) ** 2,
+        axis=-2
+    )
+
+    denominator = (i - k) ** 3 - i + k
+
+    t_k = 1 - 6 * numerator / denominator
+
+    weights = i - k - 1
+
+    t = np.sum(weights * t_k, axis=-1) / np.sum(weights)
+
+    variance = 2 / ((i - 2) * (i - 3))
+
+    return t_k, weights, t, variance
+
+
+class MackDiagnostics:
+    """
+    Shared by all the widgets displaying diagnostics for the same triangle. The statistics are computed on first
+    use, so building the cache is cheap. Results are reported for the first segment of the triangle.
+
+    :param triangle: A chainladder Triangle.
+    """
+    def __init__(
+            self,
+            triangle: Triangle
+    ):
+
+        self.triangle = triangle
+
+        # Valuation correlation test: positional valuation periods and their labels, Z values and their moments,
+        # and the probability of each calendar period's Z value.
+        self.valuation_periods = None
+        self.valuation_labels = None
+        self.z = None
+        self.z_expectation = None
+        self.z_variance = None
+        self.valuation_probs = None
+
+        # Development correlation test: weighted average of the Spearman correlations, and its variance.
+        self.development_t = None
+        self.development_variance = None
+
+    def get_values(self) -> np.ndarray:
+
+        return np.asarray(self.triangle.set_backend('numpy').values, dtype=float)
+
+    def get_step(self) -> int:
+
+        return GRAIN_MONTHS[self.triangle.origin_grain] // GRAIN_MONTHS[self.triangle.development_grain]
+
+    def compute_valuation(self) -> None:
+
+        if self.valuation_probs is not None:
+            return
+
+        results = RESULTS_CACHE.fetch(
+            triangle=self.triangle,
+            method='MackValuationCorrelation',
+            params={},
+            fit=self.fit_valuation,
+            outputs=['periods', 'labels', 'z', 'expectation', 'variance', 'probs']
+        )
+
+        self.valuation_periods = results.periods
+        self.valuation_labels = results.labels.tolist()
+        self.z = results.z
+        self.z_expectation = results.expectation
+        self.z_variance = results.variance
+        self.valuation_probs = results.probs
+
+    def fit_valuation(self) -> CachedResults:
+        """
+        Computes the statistics of the valuation correlation test, along with the labels of the calendar periods.
+        """
+
+        step = self.get_step()
+
+        periods, z, expectation, variance, probs = valuation_correlation_statistics(
+            values=self.get_values(),
+            step=step
+        )
+
+        # Label each period by the valuation of the factors' numerators, e.g., the 12-24 factor of the 1998 accident
+        # year is labeled 1999.
+        origins, developments = self.triangle.shape[2:]
+        valuations = pd.DatetimeIndex(self.triangle.valuation).values.reshape(origins, developments)[:, 1:]
+        cell_periods = valuation_periods((origins, developments - 1), step=step)
+
+        labels = []
+        for period in periods:
+            valuation = pd.Timestamp(valuations[cell_periods == period][0])
+            if self.triangle.development_grain == 'Y':
+                labels.append(valuation.year)
+            else:
+                labels.append(str(valuation.to_period(self.triangle.development_grain)))
+
+        return CachedResults(outputs={
+            'periods': periods,
+            'labels': np.asarray(labels),
+            'z': z,
+            'expectation': expectation,
+            'variance': variance,
+            'probs': probs
+        })
+
+    def compute_development(self) -> None:
+
+        if self.development_t is not None:
+            return
+
+        results = RESULTS_CACHE.fetch(
+            triangle=self.triangle,
+            method='MackDevelopmentCorrelation',
+            params={},
+            fit=self.fit_development,
+            outputs=['t', 'variance']
+        )
+
+        self.development_t = results.t
+        self.development_variance = results.variance
+
+    def fit_development(self) -> CachedResults:
+
+        t_k, weights, t, variance = development_correlation_statistics(
+            values=self.get_values()
+        )
+
+        return CachedResults(outputs={
+            't': t,
+            'variance': variance
+        })
+
+    def valuation_individual(
+            self,
+            p_critical: float
+    ) -> pd.DataFrame:
+        """
+        Results of the valuation correlation test for each calendar period, as a single row labeled 'Status'.
+        True means the calendar period fails the test.
+        """
+
+        validate_critical(p_critical=p_critical)
+
+        self.compute_valuation()
+
+        return pd.DataFrame(
+            [self.valuation_probs[0, 0] < p_critical],
+            columns=self.valuation_labels,
+            index=['Status']
+        )
+
+    def valuation_total(
+            self,
+            p_critical: float
+    ) -> bool:
+        """
+        Result of the valuation correlation test for all calendar periods combined. True means the triangle fails the
+        test, i.e., the total Z lies outside of its confidence interval.
+        """
+
+        validate_critical(p_critical=p_critical)
+
+        self.compute_valuation()
+
+        z = np.sum(self.z[0, 0])
+        expectation = np.sum(self.z_expectation[0, 0])
+        variance = np.sum(self.z_variance[0, 0])
+
+        ci = norm.ppf(0.5 + (1 - p_critical) / 2) * np.sqrt(variance)
+
+        return bool((z < expectation - ci) | (z > expectation + ci))
+
+    def development(
+            self,
+            p_critical: float
+    ) -> bool:
+        """
+        Result of the development correlation test. True means the triangle fails the test.
+        """
+
+        validate_critical(p_critical=p_critical)
+
+        self.compute_development()
+
+        ci = norm.ppf(0.5 + (1 - p_critical) / 2) * np.sqrt(self.development_variance)
+
+        t = self.development_t[0, 0]
+
+        return bool((t < -ci) | (t > ci))
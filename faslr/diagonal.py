@@ -0,0 +1,337 @@
+"""
+Appends a calendar period, i.e., a new diagonal, to a data view saved in a project database.
+
+Rolling a view forward by a quarter or a year used to mean uploading the full history again through the import
+wizard as a new view, and selecting the LDFs and excluding the link ratios all over again. append_diagonal() inserts
+only the records of the new calendar period into the existing view. The selected LDFs and tails, and the excluded
+link ratios, are keyed by age and origin period, so they still refer to the same cells and carry forward untouched.
+The view is then re-projected on its own, the other views of the project are left as they are. The view is fit
+by a read job, and a separate write job only holds the database's write lock while the records and results are
+written.
+
+The new diagonal adds a link ratio to every development period and moves the latest value of every origin period, so
+the LDFs of the periods without a selected LDF are refit and every result of the view is rewritten. The LDFs selected
+for the other periods are kept.
+"""
+from __future__ import annotations
+
+import pandas as pd
+
+from datetime import datetime
+
+from faslr.batch import (
+    create_batch_tables,
+    project_view,
+    read_batch_views,
+    write_batch_results
+)
+
+from faslr.database import (
+    DatabaseClient,
+    run_db_job
+)
+
+from faslr.profiler import profiled
+
+from faslr.schema import (
+    ProjectViewData,
+    ProjectViewTable
+)
+
+from functools import partial
+
+from sqlalchemy import (
+    insert,
+    select
+)
+
+from sqlalchemy.orm.session import Session
+
+from typing import (
+    Callable,
+    Optional
+)
+
+# Fields of the records of a data view, in the order of the columns of an uploaded file.
+RECORD_FIELDS = [
+    'accident_year',
+    'calendar_year',
+    'paid_loss',
+    'reported_loss'
+]
+
+
+def diagonal_records(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Maps the columns of a new diagonal, laid out like the file the view was uploaded from, i.e., accident year,
+    calendar year, paid loss and reported loss, to the fields of the view's records.
+    """
+
+    if data.shape[1] != len(RECORD_FIELDS):
+        raise ValueError(
+            "A diagonal needs %d columns: accident year, calendar year, paid loss and reported loss, got %d." % (
+                len(RECORD_FIELDS),
+                data.shape[1]
+            )
+        )
+
+    data = data.copy()
+    data.columns = RECORD_FIELDS
+
+    data['accident_year'] = data['accident_year'].astype(int)
+    data['calendar_year'] = data['calendar_year'].astype(int)
+
+    return data
+
+
+def validate_diagonal(
+        existing: pd.DataFrame,
+        diagonal: pd.DataFrame
+) -> int:
+    """
+    Checks that the records of a diagonal make up a single calendar period following the view's latest one, with a
+    record for every accident year that has not reached the view's last age.
+
+    :param existing: The accident and calendar years of the view's records.
+    :param diagonal: The records of the diagonal.
+    :return: The calendar year of the diagonal.
+    """
+
+    if diagonal.empty:
+        raise ValueError("The diagonal has no records.")
+
+    calendar_years = diagonal['calendar_year'].unique()
+
+    if len(calendar_years) != 1:
+        raise ValueError(
+            "A diagonal covers a single calendar year, got %s." % ', '.join(
+                str(year) for year in sorted(calendar_years)
+            )
+        )
+
+    calendar_year = int(calendar_years[0])
+    latest = int(existing['calendar_year'].max())
+
+    if calendar_year <= latest:
+        raise ValueError(
+            "The diagonal's calendar year %d is not after the view's latest calendar year %d." % (
+                calendar_year,
+                latest
+            )
+        )
+
+    if diagonal['accident_year'].duplicated().any():
+        raise ValueError("The diagonal has more than one record for an accident year.")
+
+    if (diagonal['accident_year'] > calendar_year).any():
+        raise ValueError("The diagonal has accident years after its calendar year.")
+
+    # Every accident year still developing must move on with the diagonal, only those that have reached the view's
+    # last age may be left out.
+    ages = existing['calendar_year'] - existing['accident_year']
+    latest_ages = ages.groupby(existing['accident_year']).max()
+
+    missing = set(latest_ages.index[latest_ages < ages.max()]) - set(diagonal['accident_year'])
+
+    if missing:
+        raise ValueError(
+            "The diagonal has no records for accident years %s." % ', '.join(str(year) for year in sorted(missing))
+        )
+
+    # New accident years may only start with the diagonal, the view's own accident years cannot be backfilled.
+    new_origins = set(diagonal['accident_year']) - set(existing['accident_year'])
+
+    if new_origins - {calendar_year}:
+        raise ValueError(
+            "The diagonal has accident years that are not in the view: %s." % ', '.join(
+                str(year) for year in sorted(new_origins - {calendar_year})
+            )
+        )
+
+    return calendar_year
+
+
+def read_view_years(
+        session: Session,
+        view_id: int
+) -> pd.DataFrame:
+    """
+    Reads the accident and calendar years of the records of a data view.
+    """
+
+    return pd.read_sql(
+        select(
+            ProjectViewData.accident_year,
+            ProjectViewData.calendar_year
+        ).where(
+            ProjectViewData.view_id == view_id
+        ),
+        con=session.connection()
+    )
+
+
+@profiled("Project diagonal")
+def project_diagonal(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        view_id: int = None,
+        data: pd.DataFrame = None
+) -> dict:
+    """
+    Validates a diagonal and projects the data view with the diagonal appended, without writing anything. Read job,
+    the view is fit outside of the transaction of write_diagonal(), which only holds the database's write lock for
+    as long as it takes to write the records and results.
+
+    :param view_id: The data view to append to.
+    :param data: The records of the new calendar period, laid out like the file the view was uploaded from.
+    :return: The diagonal's calendar year and records, and the results of the view with the diagonal appended, along
+    with the number of selected LDFs, tails and exclusions carried forward.
+    """
+
+    if session.get(ProjectViewTable, view_id) is None:
+        raise ValueError("Data view %s does not exist." % view_id)
+
+    diagonal = diagonal_records(data=data)
+
+    view = read_batch_views(session=session, view_ids=[view_id])[0]
+
+    calendar_year = validate_diagonal(
+        existing=view['data'],
+        diagonal=diagonal
+    )
+
+    view['data'] = pd.concat(
+        [view['data'], diagonal[RECORD_FIELDS]],
+        ignore_index=True
+    )
+
+    return {
+        'view_id': view_id,
+        'calendar_year': calendar_year,
+        'records': diagonal[RECORD_FIELDS].to_dict('records'),
+        'results': project_view(view=view),
+        'factors': sum(len(factors) for factors in view['factors'].values()),
+        'tails': len(view['tails']),
+        'exclusions': sum(len(drop) for drop in view['exclusions'].values())
+    }
+
+
+@profiled("Write diagonal")
+def write_diagonal(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        projection: dict = None,
+        computed: datetime = None
+) -> dict:
+    """
+    Writes the records and results of a diagonal projected by project_diagonal(). Write job, the records and results
+    are committed together, or not at all if anything fails.
+
+    :param computed: The time stamp of the new results, defaults to now.
+    :return: The calendar year appended and the number of records inserted, along with the number of selected LDFs,
+    tails and exclusions carried forward and the number of results written.
+    """
+
+    view_id = projection['view_id']
+    diagonal = pd.DataFrame(projection['records'], columns=RECORD_FIELDS)
+
+    # The view may have changed since it was projected, e.g., if the same diagonal was appended twice in a row.
+    validate_diagonal(
+        existing=read_view_years(session=session, view_id=view_id),
+        diagonal=diagonal
+    )
+
+    session.execute(
+        insert(ProjectViewData),
+        [dict(record, view_id=view_id) for record in projection['records']]
+    )
+
+    session.get(ProjectViewTable, view_id).modified = datetime.now()
+
+    # Databases created before the batch tables existed need them for the results.
+    create_batch_tables(session=session)
+
+    write_batch_results(
+        session=session,
+        view_ids=[view_id],
+        results=projection['results'],
+        computed=computed or datetime.now()
+    )
+
+    return {
+        'view_id': view_id,
+        'calendar_year': projection['calendar_year'],
+        'records': len(diagonal),
+        'factors': projection['factors'],
+        'tails': projection['tails'],
+        'exclusions': projection['exclusions'],
+        'results': len(projection['results'])
+    }
+
+
+def append_diagonal(
+        db_path: str,
+        view_id: int,
+        data: pd.DataFrame,
+        client: DatabaseClient = None,
+        on_result: Callable[[dict], None] = None,
+        on_error: Callable[[str], None] = None,
+        computed: datetime = None
+) -> Optional[dict]:
+    """
+    Appends a diagonal to a data view and re-projects the view, by running project_diagonal() and then
+    write_diagonal() through the database client if one is given, otherwise inline.
+
+    :param db_path: The path to the project database.
+    :param view_id: The data view to append to.
+    :param data: The records of the new calendar period, laid out like the file the view was uploaded from.
+    :param client: The database client of the application.
+    :param on_result: Called with the summary returned by write_diagonal().
+    :param on_error: Called with the error message if either job fails, otherwise the error is raised.
+    :param computed: The time stamp of the new results, defaults to now.
+    :return: The summary when run inline, otherwise None.
+    """
+
+    def write(projection: dict) -> Optional[dict]:
+
+        return run_db_job(
+            db_path=db_path,
+            job=partial(
+                write_diagonal,
+                projection=projection,
+                computed=computed
+            ),
+            client=client,
+            on_result=on_result,
+            on_error=on_error,
+            write=True
+        )
+
+    if client is not None:
+        run_db_job(
+            db_path=db_path,
+            job=partial(
+                project_diagonal,
+                view_id=view_id,
+                data=data
+            ),
+            client=client,
+            on_result=write,
+            on_error=on_error
+        )
+        return None
+
+    projection = run_db_job(
+        db_path=db_path,
+        job=partial(
+            project_diagonal,
+            view_id=view_id,
+            data=data
+        ),
+        on_error=on_error
+    )
+
+    if projection is None:
+        return None
+
+    return write(projection)
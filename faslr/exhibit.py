@@ -3,6 +3,7 @@ Model-view classes for displaying the results of reserve studies.
 """
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 import typing
 
@@ -16,9 +17,13 @@ from faslr.constants import (
     ExhibitColumnRole,
     ICONS_PATH,
     ColumnSwapRole,
-    ColumnRotateRole
+    ColumnRotateRole,
+    DEFAULT_DIALOG_PATH,
+    QT_FILEPATH_OPTION
 )
 
+from faslr.export import export_exhibit
+
 from faslr.grid_header import (
     GridTableHeaderView,
     GridTableView
@@ -29,6 +34,8 @@ from faslr.style.triangle import (
     RATIO_STYLE
 )
 
+from faslr.utilities.chainladder import fetch_results
+
 from PyQt6.QtCore import (
     QAbstractListModel,
     QItemSelectionModel,
@@ -46,6 +53,7 @@ from PyQt6.QtWidgets import (
     QAbstractItemView,
     QDialog,
     QDialogButtonBox,
+    QFileDialog,
     QFormLayout,
     QHBoxLayout,
     QLabel,
@@ -79,7 +87,9 @@ column_alias = {
     'Reported Claims CDF': 'Reported CDF',
     'Paid Claims CDF': 'Paid CDF',
     'Ultimate Reported Claims': 'Ultimate Reported Claims',
-    'Ultimate Paid Claims': 'Ultimate Paid Claims'
+    'Ultimate Paid Claims': 'Ultimate Paid Claims',
+    'Reported Claims IBNR': 'Reported IBNR',
+    'Paid Claims IBNR': 'Paid IBNR'
 }
 
 
@@ -88,11 +98,31 @@ class ExhibitModel(FAbstractTableModel):
     The data model behind the exhibit. An exhibit organizes model results and allows the user to
     compare the results between those models - and serves to assist the user in making selections. They
     can also be used as the final reports for model results.
+
+    Columns are stored in ._data in the order in which they were added and are never moved. The order in which
+    they are displayed is given by .permutation, which maps each displayed (logical) column to its position in
+    ._data (physical), so repositioning columns only updates the permutation rather than copying the data.
     """
     def __init__(self):
         super().__init__()
 
         self._data = pd.DataFrame()
+        self.permutation = []
+
+    @property
+    def columns(self) -> list:
+        """
+        Column names in display order.
+        """
+
+        return [self._data.columns[i] for i in self.permutation]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns a copy of the exhibit data with the columns in display order.
+        """
+
+        return self._data.iloc[:, self.permutation]
 
     def data(
             self,
@@ -100,18 +130,21 @@ class ExhibitModel(FAbstractTableModel):
             role: int = None
     ) -> typing.Any:
 
-        colname = self._data.columns[index.column()]
+        column = self.permutation[index.column()]
+        colname = self._data.columns[column]
 
         if role == Qt.ItemDataRole.DisplayRole:
 
-            value = self._data.iloc[index.row(), index.column()]
+            value = self._data.iloc[index.row(), column]
 
             # Financial figures displayed with thousands separator, rounded to main unit.
             if colname in [
                 'Paid Claims',
                 'Reported Claims',
                 'Ultimate Paid Claims',
-                'Ultimate Reported Claims'
+                'Ultimate Reported Claims',
+                'Paid Claims IBNR',
+                'Reported Claims IBNR'
             ]:
                 display_value = VALUE_STYLE.format(value)
 
@@ -135,6 +168,8 @@ class ExhibitModel(FAbstractTableModel):
                 'Reported Claims',
                 'Ultimate Paid Claims',
                 'Ultimate Reported Claims',
+                'Paid Claims IBNR',
+                'Reported Claims IBNR',
                 'Paid Claims CDF',
                 'Reported Claims CDF'
             ]:
@@ -142,6 +177,16 @@ class ExhibitModel(FAbstractTableModel):
             else:
                 return Qt.AlignmentFlag.AlignCenter
 
+    def raw_block(
+            self,
+            top: int,
+            bottom: int,
+            left: int,
+            right: int
+    ) -> np.ndarray:
+
+        return self._data.iloc[top:bottom + 1, self.permutation[left:right + 1]].to_numpy()
+
     def insertColumn(
             self,
             column: int,
@@ -165,6 +210,78 @@ class ExhibitModel(FAbstractTableModel):
 
         return True
 
+    def move_columns(
+            self,
+            first: int,
+            last: int,
+            destination: int
+    ) -> bool:
+        """
+        Moves the displayed columns first through last (inclusive) so that they are placed before the column
+        currently at position destination. Use the column count as the destination to move them to the end.
+
+        :return: False if the move would leave the columns where they are.
+        """
+
+        if first <= destination <= last + 1:
+            return False
+
+        self.beginMoveColumns(
+            QModelIndex(),
+            first,
+            last,
+            QModelIndex(),
+            destination
+        )
+
+        block = self.permutation[first:last + 1]
+        del self.permutation[first:last + 1]
+
+        if destination > last:
+            destination -= len(block)
+
+        self.permutation[destination:destination] = block
+
+        self.endMoveColumns()
+
+        return True
+
+    def swap_blocks(
+            self,
+            labels_a: list,
+            labels_b: list
+    ) -> None:
+        """
+        Swaps the positions of two blocks of adjacent columns, identified by their names.
+        """
+
+        cols = self.columns
+
+        a_first = cols.index(labels_a[0])
+        b_first = cols.index(labels_b[0])
+
+        if a_first > b_first:
+            labels_a, labels_b = labels_b, labels_a
+            a_first, b_first = b_first, a_first
+
+        a_last = a_first + len(labels_a) - 1
+        b_last = b_first + len(labels_b) - 1
+
+        # Move the right block in front of the left one, then move the left block to where the right one was,
+        # unless the blocks were next to each other, in which case the left block is already there.
+        self.move_columns(
+            first=b_first,
+            last=b_last,
+            destination=a_first
+        )
+
+        if b_first > a_last + 1:
+            self.move_columns(
+                first=a_first + len(labels_b),
+                last=a_last + len(labels_b),
+                destination=b_last + 1
+            )
+
     def setData(
             self,
             index: QModelIndex,
@@ -196,44 +313,21 @@ class ExhibitModel(FAbstractTableModel):
                     column_name = column_name + '.1'
 
             self._data[column_name] = column_values
+            self.permutation.append(self._data.shape[1] - 1)
+
+            self.dataChanged.emit(index, index)  # noqa
+            self.layoutChanged.emit()  # noqa
 
         # Swaps two columns. Need to consider if we are swapping groups with nested columns or just the columns.
         # For this role, the values provided are the two ExhibitOutputTreeItems selected for swapping. These
-        # are referred to as 'prior item' and 'item', respectively.
+        # are referred to as 'prior item' and 'item', respectively. If neither is a group, the labels are just
+        # the text of the items themselves.
         elif role == ColumnSwapRole:
 
-            cols = list(self._data.columns)
-
-            # Case when both columns are not groups, we can simply swap their column indexes.
-            if value[0].rowCount() == 0 and value[1].rowCount() == 0:
-                colname_a = value[0].text()
-                colname_b = value[1].text()
-
-                a, b = cols.index(colname_a), cols.index(colname_b)
-                cols[b], cols[a] = cols[a], cols[b]
-                self._data = self._data[cols]
-
-            # At least one column is a column group.
-            else:
-                # prior item children. If there are no children, item is not a group, and the list of labels
-                # just has one element, the text of the item itself.
-
-                prior_labels = get_item_labels(item=value[0])
-
-                # item
-                labels = get_item_labels(item=value[1])
-
-                # Note the column location within the DataFrame for the two items, then swap their positions.
-                # We do this by removing their associated column names and then re-adding them in their new locations.
-                prior_idx = cols.index(prior_labels[0])
-                curr_idx = cols.index(labels[0]) + value[1].rowCount() - 1
-
-                cols = [col for col in cols if col not in (prior_labels + labels)]
-
-                cols[prior_idx:prior_idx] = labels
-                cols[curr_idx:curr_idx] = prior_labels
-
-                self._data = self._data[cols]
+            self.swap_blocks(
+                labels_a=get_item_labels(item=value[0]),
+                labels_b=get_item_labels(item=value[1])
+            )
 
         # Happens when selected item is at the top or bottom of the exhibit output tree. In this case,
         # we need to rotate all the columns to the left or right.
@@ -241,38 +335,38 @@ class ExhibitModel(FAbstractTableModel):
 
             direction = value[0]
 
-            cols = list(self._data.columns)
+            if direction not in ['left', 'right']:
+                raise ValueError(
+                    'Invalid direction specified. Valid rotation values are "right" and "left".'
+                )
+
+            n_columns = self.columnCount()
+
+            # Rotate all columns, the leftmost column moves to the end or vice versa.
             if not value[1]:
-                if direction == 'left':
-                    cols = rotate_left(l=cols)
-                elif direction == 'right':
-                    cols = rotate_right(l=cols)
-                else:
-                    raise ValueError(
-                        'Invalid direction specified. Valid rotation values are "right" and "left".'
-                    )
+                first = last = 0 if direction == 'left' else n_columns - 1
+                destination = n_columns if direction == 'left' else 0
+            # Rotate a group, which moves as a block to the end or to the start.
             elif value[2]:
-                cols = [x for x in cols if x not in value[1]]
-                if direction == 'left':
-                    cols = cols + value[1]
-                else:
-                    cols = value[1] + cols
-            # Rotate sub group
+                first = self.columns.index(value[1][0])
+                last = first + len(value[1]) - 1
+                destination = n_columns if direction == 'left' else 0
+            # Rotate sub group, the columns rotate within the group.
             else:
-                idx = cols.index(value[1][0])
-                cols = [x for x in cols if x not in value[1]]
-                subcols = value[1]
+                group_first = self.columns.index(value[1][0])
+                group_last = group_first + len(value[1]) - 1
                 if direction == 'left':
-                    subcols = rotate_left(l=subcols)
+                    first = last = group_first
+                    destination = group_last + 1
                 else:
-                    subcols = rotate_right(l=subcols)
-                    print(subcols)
-                cols[idx:idx] = subcols
+                    first = last = group_last
+                    destination = group_first
 
-            self._data = self._data[cols]
-
-        self.dataChanged.emit(index, index)  # noqa
-        self.layoutChanged.emit()  # noqa
+            self.move_columns(
+                first=first,
+                last=last,
+                destination=destination
+            )
 
         return True
 
@@ -827,8 +921,14 @@ class ExhibitBuilder(QWidget):
         self.layout.addWidget(self.exhibit_preview)
         self.layout.addWidget(self.button_box)
 
+        self.export_btn = self.button_box.addButton(
+            "Export",
+            QDialogButtonBox.ButtonRole.ActionRole
+        )
+
         self.button_box.accepted.connect(self.close)  # noqa
         self.button_box.rejected.connect(self.close)  # noqa
+        self.export_btn.pressed.connect(self.export) # noqa
 
         self.input_btns.add_column_btn.pressed.connect( # noqa
             self.add_output
@@ -861,6 +961,32 @@ class ExhibitBuilder(QWidget):
             self.output_buttons.toggle_col_btns
         )
 
+    def export(
+            self,
+            path: str = None
+    ) -> None:
+        """
+        Exports the exhibit as previewed to an Excel workbook or CSV file. Prompts for the file if no path is given.
+        """
+
+        if path is None:
+            path = QFileDialog.getSaveFileName(
+                parent=self,
+                caption='Export Exhibit',
+                directory=DEFAULT_DIALOG_PATH,
+                filter="Excel Workbook (*.xlsx);;CSV (*.csv)",
+                options=QT_FILEPATH_OPTION
+            )[0]
+
+        if path == "":
+            return
+
+        export_exhibit(
+            path=path,
+            model=self.preview_model,
+            header=self.exhibit_preview.hheader
+        )
+
     def rename_column(self) -> None:
 
         selected_indexes = self.output_view.selectedIndexes()
@@ -1385,27 +1511,11 @@ def fetch_column_data(
         triangle: Chainladder
 ) -> list:
     """
-    Extract data from fitted triangle as lists, to be combined into a data frame when used in a Qt model.
+    Extract data from fitted triangle as lists, to be combined into a data frame when used in a Qt model. The series
+    are served from the results cache of the fitted model, so they are only extracted once per model.
     """
 
-    x = triangle.X_
-
-    if colname == 'Accident Year':
-        data = x.origin.to_frame().index.astype(str).tolist()
-    elif colname == 'Age':
-        data = list(x.development.sort_values(ascending=False))
-    elif colname in ['Reported Claims', 'Paid Claims']:
-        data = list(x.latest_diagonal.to_frame().iloc[:, 0])
-    elif colname in ['Reported Claims CDF', 'Paid Claims CDF']:
-        data = list(x.latest_diagonal.cdf_.to_frame().iloc[:, ].values.flatten())
-        data.pop()
-        data.reverse()
-    elif colname in ['Ultimate Reported Claims', 'Ultimate Paid Claims']:
-        data = list(triangle.ultimate_.to_frame().iloc[:, 0])
-    else:
-        raise ValueError("Invalid column name specified.")
-
-    return data
+    return fetch_results(triangle=triangle).get_column(colname)
 
 
 def get_column_listing(
@@ -1419,6 +1529,7 @@ def get_column_listing(
     columns.append(triangle.X_.columns.values.tolist()[0])
     columns.append(triangle.X_.columns.values.tolist()[0] + ' CDF')
     columns.append('Ultimate ' + triangle.X_.columns.values.tolist()[0])
+    columns.append(triangle.X_.columns.values.tolist()[0] + ' IBNR')
 
     return columns
 
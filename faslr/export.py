@@ -0,0 +1,668 @@
+"""
+Export of exhibits to Excel workbooks and CSV files.
+
+Rows are written as they are read from the exhibit, a chunk at a time, so that the memory used by an export does not
+grow with the size of the exhibit. Workbooks are written directly as SpreadsheetML, streamed into the zip archive,
+so no spreadsheet library is needed. Multi-level exhibit headers are exported as multiple header rows, with the
+cells spanned by a group merged in Excel and left blank in CSV.
+
+export_exhibits() renders many exhibits in parallel worker processes, e.g., one per segment at quarter-end, and
+export_project_exhibits() does so for every data view saved in a project database.
+"""
+from __future__ import annotations
+
+import chainladder as cl
+import csv
+import math
+import numbers
+import os
+import re
+import zipfile
+
+from chainladder import Triangle
+
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    as_completed
+)
+
+from faslr.constants import (
+    BATCH_EXHIBIT_SERIES,
+    ColumnSpanRole,
+    EXPORT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    RowSpanRole
+)
+
+from faslr.database import run_db_job
+from faslr.schema import ProjectViewTable
+from faslr.utilities.chainladder import fetch_results
+
+from PyQt6.QtCore import Qt
+
+from sqlalchemy.orm.session import Session
+
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    TYPE_CHECKING
+)
+
+from xml.sax.saxutils import escape
+
+if TYPE_CHECKING:  # pragma no coverage
+    from faslr.base_table import FAbstractTableModel
+    from faslr.grid_header import GridTableHeaderView
+
+
+class ExhibitHeader:
+    """
+    The header of an exhibit, independent of the Qt view displaying it.
+
+    :param labels: One list of labels per header level, with one label per column. Cells that are covered by a span
+    starting from another cell have an empty label.
+    :param merges: The spans of the header, as (row, column, row span, column span) tuples.
+    """
+    def __init__(
+            self,
+            labels: List[list],
+            merges: list = None
+    ):
+
+        self.labels = labels
+        self.merges = merges or []
+
+    @property
+    def n_columns(self) -> int:
+
+        return len(self.labels[0]) if self.labels else 0
+
+    @classmethod
+    def from_view(
+            cls,
+            header: GridTableHeaderView,
+            n_columns: int
+    ) -> ExhibitHeader:
+        """
+        Reads the labels and spans of a grid header, such as the horizontal header of an exhibit preview.
+        """
+
+        model = header.model()
+        n_levels = model.rowCount()
+
+        anchors = set(header.column_spans.values()) | set(header.row_spans.values())
+
+        labels = []
+        for row in range(n_levels):
+            level = []
+            for col in range(n_columns):
+                column_anchor = header.column_spans.get((row, col), (row, col))
+                row_anchor = header.row_spans.get((row, col), (row, col))
+                if column_anchor != (row, col) or row_anchor != (row, col):
+                    level.append('')
+                else:
+                    label = model.index(row, col).data(Qt.ItemDataRole.DisplayRole)
+                    level.append(' '.join(label.split()) if label else '')
+            labels.append(level)
+
+        merges = []
+        for row, col in sorted(anchors):
+            if col >= n_columns:
+                continue
+            index = model.index(row, col)
+            row_span = min(index.data(RowSpanRole) or 1, n_levels - row)
+            column_span = min(index.data(ColumnSpanRole) or 1, n_columns - col)
+            if row_span > 1 or column_span > 1:
+                merges.append((row, col, row_span, column_span))
+
+        return cls(
+            labels=labels,
+            merges=merges
+        )
+
+    @classmethod
+    def from_groups(
+            cls,
+            groups: list
+    ) -> ExhibitHeader:
+        """
+        Builds a two-level header from a list of (label, sub-labels) tuples. Columns without sub-labels span both
+        levels.
+        """
+
+        top = []
+        bottom = []
+        merges = []
+
+        for label, sub_labels in groups:
+            col = len(top)
+            if sub_labels:
+                top.extend([label] + [''] * (len(sub_labels) - 1))
+                bottom.extend(sub_labels)
+                if len(sub_labels) > 1:
+                    merges.append((0, col, 1, len(sub_labels)))
+            else:
+                top.append(label)
+                bottom.append('')
+                merges.append((0, col, 2, 1))
+
+        return cls(
+            labels=[top, bottom],
+            merges=merges
+        )
+
+
+def model_rows(
+        model: FAbstractTableModel,
+        chunk_size: int = EXPORT_CHUNK_SIZE
+) -> Iterator[list]:
+    """
+    Yields the rows of a table model, reading chunk_size rows from it at a time.
+    """
+
+    n_rows = model.rowCount()
+    n_columns = model.columnCount()
+
+    if n_columns == 0:
+        return
+
+    for top in range(0, n_rows, chunk_size):
+        bottom = min(top + chunk_size, n_rows) - 1
+        yield from model.raw_block(top, bottom, 0, n_columns - 1).tolist()
+
+
+def is_number(value) -> bool:
+
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def is_missing(value) -> bool:
+    """
+    Whether a value should be written as an empty cell. Spreadsheets have no representation of NaN or infinity.
+    """
+
+    return value is None or (isinstance(value, float) and not math.isfinite(value))
+
+
+def column_letter(column: int) -> str:
+    """
+    Converts a 0-based column number to its Excel letters, e.g., 0 -> A, 26 -> AA.
+    """
+
+    letters = ''
+    column += 1
+    while column:
+        column, remainder = divmod(column - 1, 26)
+        letters = chr(65 + remainder) + letters
+
+    return letters
+
+
+def cell_reference(
+        row: int,
+        column: int
+) -> str:
+    """
+    Converts a 0-based row and column to an Excel reference, e.g., (0, 0) -> A1.
+    """
+
+    return column_letter(column) + str(row + 1)
+
+
+# Cell styles defined in XLSX_STYLES, by position in cellXfs.
+XLSX_HEADER_STYLE = 1
+XLSX_VALUE_STYLE = 2
+XLSX_RATIO_STYLE = 3
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="%s" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="0.000"/></numFmts>'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="4">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1" applyAlignment="1">'
+    '<alignment horizontal="center" vertical="center" wrapText="1"/></xf>'
+    '<xf numFmtId="3" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    '</cellXfs>'
+    '</styleSheet>'
+)
+
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+)
+
+
+def column_styles(
+        header: ExhibitHeader
+) -> list:
+    """
+    Picks the number format of each column from its label. Development factors are shown with decimals, everything
+    else is shown rounded with a thousands separator.
+    """
+
+    styles = []
+    for col in range(header.n_columns):
+        labels = [level[col] for level in header.labels]
+        if any('CDF' in label or 'LDF' in label for label in labels):
+            styles.append(XLSX_RATIO_STYLE)
+        else:
+            styles.append(XLSX_VALUE_STYLE)
+
+    return styles
+
+
+def xlsx_cell(
+        row: int,
+        column: int,
+        value,
+        style: int
+) -> str:
+
+    ref = cell_reference(row, column)
+
+    if is_number(value):
+        return '<c r="%s" s="%d"><v>%r</v></c>' % (ref, style, float(value))
+
+    return '<c r="%s" t="inlineStr"%s><is><t xml:space="preserve">%s</t></is></c>' % (
+        ref,
+        ' s="%d"' % style if style == XLSX_HEADER_STYLE else '',
+        escape(str(value))
+    )
+
+
+def write_exhibit_xlsx(
+        path: str,
+        header: ExhibitHeader,
+        rows: Iterable[Sequence],
+        sheet_name: str = 'Exhibit'
+) -> int:
+    """
+    Writes an exhibit to an Excel workbook with a single sheet.
+
+    :param path: The path of the workbook.
+    :param header: The exhibit header, written as the first rows of the sheet.
+    :param rows: The rows of the exhibit, which are consumed one at a time.
+    :param sheet_name: The name of the sheet.
+    :return: The number of data rows written.
+    """
+
+    styles = column_styles(header=header)
+    n_levels = len(header.labels)
+    n_rows = 0
+
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', XLSX_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', XLSX_RELS)
+        archive.writestr('xl/workbook.xml', XLSX_WORKBOOK % escape(sheet_name[:31], {'"': '&quot;'}))
+        archive.writestr('xl/_rels/workbook.xml.rels', XLSX_WORKBOOK_RELS)
+        archive.writestr('xl/styles.xml', XLSX_STYLES)
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+
+            def write(text: str) -> None:
+                sheet.write(text.encode('utf-8'))
+
+            write(XLSX_SHEET_START)
+
+            if header.n_columns:
+                write('<cols><col min="1" max="%d" width="16" customWidth="1"/></cols>' % header.n_columns)
+
+            write('<sheetData>')
+
+            for row, level in enumerate(header.labels):
+                write('<row r="%d">' % (row + 1))
+                write(''.join(
+                    xlsx_cell(row, col, label, XLSX_HEADER_STYLE) for col, label in enumerate(level) if label
+                ))
+                write('</row>')
+
+            for row, values in enumerate(rows, start=n_levels):
+                write('<row r="%d">' % (row + 1))
+                write(''.join(
+                    xlsx_cell(row, col, value, styles[col])
+                    for col, value in enumerate(values) if not is_missing(value)
+                ))
+                write('</row>')
+                n_rows += 1
+
+            write('</sheetData>')
+
+            if header.merges:
+                write('<mergeCells count="%d">' % len(header.merges))
+                for row, col, row_span, column_span in header.merges:
+                    write('<mergeCell ref="%s:%s"/>' % (
+                        cell_reference(row, col),
+                        cell_reference(row + row_span - 1, col + column_span - 1)
+                    ))
+                write('</mergeCells>')
+
+            write('</worksheet>')
+
+    return n_rows
+
+
+def write_exhibit_csv(
+        path: str,
+        header: ExhibitHeader,
+        rows: Iterable[Sequence]
+) -> int:
+    """
+    Writes an exhibit to a CSV file, with one line per header level followed by the rows of the exhibit.
+
+    :return: The number of data rows written.
+    """
+
+    n_rows = 0
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerows(header.labels)
+
+        for values in rows:
+            writer.writerow(['' if is_missing(value) else value for value in values])
+            n_rows += 1
+
+    return n_rows
+
+
+def write_exhibit(
+        path: str,
+        header: ExhibitHeader,
+        rows: Iterable[Sequence]
+) -> int:
+    """
+    Writes an exhibit in the format given by the extension of the path.
+    """
+
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+
+    if extension == 'xlsx':
+        return write_exhibit_xlsx(
+            path=path,
+            header=header,
+            rows=rows
+        )
+    elif extension == 'csv':
+        return write_exhibit_csv(
+            path=path,
+            header=header,
+            rows=rows
+        )
+    else:
+        raise ValueError(
+            'Unsupported export format "%s". Valid formats are: %s.' % (extension, ', '.join(EXPORT_FORMATS))
+        )
+
+
+def export_exhibit(
+        path: str,
+        model: FAbstractTableModel,
+        header: GridTableHeaderView
+) -> int:
+    """
+    Exports an exhibit as displayed, i.e., with its columns in their current order and its multi-level header.
+
+    :param path: The path of the file, ending in .xlsx or .csv.
+    :param model: The model holding the exhibit data, e.g., an ExhibitModel.
+    :param header: The horizontal header of the view displaying the exhibit.
+    :return: The number of data rows written.
+    """
+
+    return write_exhibit(
+        path=path,
+        header=ExhibitHeader.from_view(
+            header=header,
+            n_columns=model.columnCount()
+        ),
+        rows=model_rows(model=model)
+    )
+
+
+def triangle_exhibit(
+        triangle: Triangle
+) -> tuple:
+    """
+    Fits a chain ladder model to each column of a triangle and lays out the results as an exhibit, with the origin
+    and age followed by a group of columns per triangle column.
+
+    :return: A tuple (header, rows), where rows is an iterator.
+    """
+
+    results = []
+    for column in triangle.columns:
+        development = cl.Development().fit_transform(triangle[column])
+        results.append(fetch_results(cl.Chainladder().fit(development)))
+
+    origin_label = 'Accident Year' if results[0].origin_grain == 'Y' else 'Origin'
+
+    header = ExhibitHeader.from_groups(
+        [(origin_label, []), ('Age', [])] + [(r.column, BATCH_EXHIBIT_SERIES) for r in results]
+    )
+
+    series = [results[0].origin, results[0].age]
+    for r in results:
+        series.extend([r.latest_diagonal, r.cdf, r.ultimate, r.ibnr])
+
+    rows = (list(values) for values in zip(*[s.tolist() for s in series]))
+
+    return header, rows
+
+
+def safe_filename(name: str) -> str:
+
+    return re.sub(r'[^\w\- ]+', '_', name).strip() or 'exhibit'
+
+
+def render_triangle_exhibit(
+        name: str,
+        triangle: Triangle,
+        directory: str,
+        fmt: str = 'xlsx'
+) -> str:
+    """
+    Writes the exhibit of a single triangle. Runs in the worker processes of export_exhibits().
+
+    :return: The path of the file written.
+    """
+
+    header, rows = triangle_exhibit(triangle=triangle)
+
+    path = os.path.join(directory, safe_filename(name) + '.' + fmt)
+
+    write_exhibit(
+        path=path,
+        header=header,
+        rows=rows
+    )
+
+    return path
+
+
+def export_exhibits(
+        triangles: list,
+        directory: str,
+        fmt: str = 'xlsx',
+        max_workers: int = None,
+        on_progress: Callable[[int, int], None] = None
+) -> list:
+    """
+    Writes one exhibit per triangle, in parallel worker processes.
+
+    :param triangles: A list of (name, triangle) tuples. The name is used for the file name.
+    :param directory: The directory in which to write the exhibits.
+    :param fmt: The file format, one of EXPORT_FORMATS.
+    :param max_workers: The number of worker processes. Set to 1 to write the exhibits in the calling process.
+    :param on_progress: Called with (done, total) as each exhibit is written.
+    :return: The paths of the files written, in the order of the triangles.
+    """
+
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(
+            'Unsupported export format "%s". Valid formats are: %s.' % (fmt, ', '.join(EXPORT_FORMATS))
+        )
+
+    os.makedirs(directory, exist_ok=True)
+
+    total = len(triangles)
+    paths = [None] * total
+
+    if max_workers == 1:
+        for i, (name, triangle) in enumerate(triangles):
+            paths[i] = render_triangle_exhibit(name, triangle, directory, fmt)
+            if on_progress:
+                on_progress(i + 1, total)
+        return paths
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(render_triangle_exhibit, name, triangle, directory, fmt): i
+            for i, (name, triangle) in enumerate(triangles)
+        }
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            paths[futures[future]] = future.result()
+            if on_progress:
+                on_progress(done, total)
+
+    return paths
+
+
+def read_project_triangles(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        project_id: str = None
+) -> list:
+    """
+    Reads the data views saved in the database as triangles, for a single project or for all projects.
+
+    :return: A list of (name, triangle) tuples, named after the id and name of each view.
+    """
+
+    # Only needed for exports from a project database, the exhibit tabs export without loading the data pane.
+    from faslr.batch import (
+        view_columns,
+        view_triangle
+    )
+    from faslr.data import read_view_data
+
+    query = session.query(ProjectViewTable)
+
+    if project_id is not None:
+        query = query.filter(ProjectViewTable.project_id == project_id)
+
+    views = query.order_by(ProjectViewTable.view_id).all()
+
+    triangles = []
+    for i, view in enumerate(views):
+        df = read_view_data(
+            session=session,
+            view_id=view.view_id
+        )
+
+        triangle = view_triangle(
+            data=df,
+            columns=view_columns(view=view),
+            cumulative=view.cumulative
+        )
+
+        triangles.append(("%d %s" % (view.view_id, view.name), triangle))
+
+        if report_progress:
+            report_progress(i + 1, len(views))
+
+    return triangles
+
+
+def export_project_exhibits(
+        db_path: str,
+        directory: str,
+        fmt: str = 'xlsx',
+        project_id: str = None,
+        max_workers: int = None,
+        on_progress: Callable[[int, int], None] = None
+) -> list:
+    """
+    Writes an exhibit for every data view saved in a project database.
+
+    :param db_path: The path to the project database.
+    :param directory: The directory in which to write the exhibits.
+    :param fmt: The file format, one of EXPORT_FORMATS.
+    :param project_id: Limit the export to the views of this project.
+    :param max_workers: The number of worker processes.
+    :param on_progress: Called with (done, total) as each exhibit is written.
+    :return: The paths of the files written.
+    """
+
+    def job(session: Session, report_progress: Callable[[int, int], None]) -> list:
+        return read_project_triangles(
+            session=session,
+            report_progress=report_progress,
+            project_id=project_id
+        )
+
+    triangles = run_db_job(
+        db_path=db_path,
+        job=job
+    )
+
+    return export_exhibits(
+        triangles=triangles,
+        directory=directory,
+        fmt=fmt,
+        max_workers=max_workers,
+        on_progress=on_progress
+    )
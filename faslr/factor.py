@@ -16,6 +16,13 @@ from faslr.constants import (
     TEMP_LDF_LIST
 )
 
+from faslr.profiler import profiled
+
+from faslr.utilities.results_cache import (
+    RESULTS_CACHE,
+    CachedResults
+)
+
 from pandas import DataFrame
 
 from PyQt6.QtCore import (
@@ -23,7 +30,8 @@ from PyQt6.QtCore import (
     QModelIndex,
     Qt,
     QSize,
-    QVariant
+    QVariant,
+    pyqtSignal
 )
 
 from PyQt6.QtGui import (
@@ -66,6 +74,9 @@ from typing import Any
 
 class FactorModel(FAbstractTableModel):
 
+    # Emitted with the list of excluded link ratios, as (origin, age) tuples, whenever it changes.
+    exclusions_changed = pyqtSignal(list)
+
     def __init__(
             self,
             triangle: Triangle,
@@ -123,6 +134,9 @@ class FactorModel(FAbstractTableModel):
         self.excl_frame = self.link_frame.copy()
         self.excl_frame.loc[:] = False
 
+        # The excluded link ratios as of the last recalculation, in the form of chainladder's drop argument.
+        self.drop_list = []
+
         # Get the position of a blank row to be inserted between the end of the triangle
         # and before the development factors
 
@@ -223,6 +237,73 @@ class FactorModel(FAbstractTableModel):
                 font.setStrikeOut(False)
             return font
 
+    def blank_block(
+            self,
+            top: int,
+            bottom: int,
+            left: int,
+            right: int
+    ) -> np.ndarray:
+        """
+        Returns whether each cell within the given rows and columns (inclusive) is displayed blank, as data() does.
+        """
+
+        rows = np.arange(top, bottom + 1)[:, np.newaxis]
+        ultimate = (self._data.columns[left:right + 1] == "Ultimate Loss")[np.newaxis, :]
+
+        values = self._data.iloc[top:bottom + 1, left:right + 1].to_numpy(dtype=float)
+
+        cdf_blank = (rows == self.cdf_row_num) & self.selected_row.isnull().all().all()
+
+        return np.where(
+            ultimate,
+            rows > self.n_triangle_rows,
+            cdf_blank | np.isnan(values)
+        )
+
+    def display_block(
+            self,
+            top: int,
+            bottom: int,
+            left: int,
+            right: int
+    ) -> np.ndarray:
+        """
+        Returns the display text of the cells within the given rows and columns (inclusive), formatted straight from
+        the underlying frame rather than cell by cell through data().
+        """
+
+        values = self._data.iloc[top:bottom + 1, left:right + 1].to_numpy(dtype=float)
+        blank = self.blank_block(top, bottom, left, right)
+
+        ultimate = self._data.columns[left:right + 1] == "Ultimate Loss"
+        style = VALUE_STYLE if self.value_type == "value" else RATIO_STYLE
+
+        block = np.full(values.shape, BLANK_TEXT, dtype=object)
+
+        for column in range(values.shape[1]):
+            column_style = VALUE_STYLE if ultimate[column] else style
+            shown = ~blank[:, column]
+            block[shown, column] = [column_style.format(value) for value in values[shown, column]]
+
+        return block
+
+    def raw_block(
+            self,
+            top: int,
+            bottom: int,
+            left: int,
+            right: int
+    ) -> np.ndarray:
+        """
+        Returns the full-precision values of the cells within the given rows and columns (inclusive), with the cells
+        that are displayed blank as NaN.
+        """
+
+        values = self._data.iloc[top:bottom + 1, left:right + 1].to_numpy(dtype=float)
+
+        return np.where(self.blank_block(top, bottom, left, right), np.nan, values)
+
     def flags(
             self,
             index: QModelIndex
@@ -291,6 +372,53 @@ class FactorModel(FAbstractTableModel):
         self.selected_row.iloc[[0], [index.column()]] = np.nan
         self.recalculate_factors()
 
+    def set_drop(
+            self,
+            drop_list: list
+    ) -> None:
+        """
+        Excludes the given link ratios, and only those, e.g., to restore the exclusions of a column.
+
+        :param drop_list: The link ratios to exclude, as (origin, age) tuples.
+        """
+
+        drop = {(str(origin), int(age)) for origin, age in drop_list}
+
+        for i in range(self.link_frame.shape[0]):
+            for j in range(self.link_frame.shape[1]):
+                self.excl_frame.iloc[i, j] = (
+                    str(self.link_frame.iloc[i].name),
+                    int(str(self.link_frame.columns[j]).split('-')[0])
+                ) in drop
+
+        self.recalculate_factors()
+        self.layoutChanged.emit() # noqa
+
+    def selected_ldfs(self) -> dict:
+        """
+        Returns the selected LDFs, keyed by the age at the start of their development period.
+        """
+
+        return {
+            int(str(column).split('-')[0]): float(ldf)
+            for column, ldf in self.selected_row.iloc[0].items() if not pd.isna(ldf)
+        }
+
+    def set_selected_ldfs(
+            self,
+            ldfs: dict
+    ) -> None:
+        """
+        Selects the given LDFs, keyed by the age at the start of their development period, clearing the others.
+        """
+
+        for j, column in enumerate(self.selected_row.columns):
+            self.selected_row.iloc[0, j] = ldfs.get(int(str(column).split('-')[0]), np.nan)
+
+        self.recalculate_factors()
+        self.layoutChanged.emit() # noqa
+
+    @profiled("Recalculate factors")
     def recalculate_factors(self) -> None:
         """
         Method to update the view and LDFs as the user strikes out link ratios.
@@ -314,6 +442,10 @@ class FactorModel(FAbstractTableModel):
 
         self._data = self.get_display_data(drop_list=drop_list)
 
+        if drop_list != self.drop_list:
+            self.drop_list = drop_list
+            self.exclusions_changed.emit(drop_list) # noqa
+
     def get_display_data(
             self,
             drop_list: list = None
@@ -333,13 +465,19 @@ class FactorModel(FAbstractTableModel):
             ldf_years = int(df_ldfs_to_calc["Number of Years"].iloc[i])
             average = df_ldfs_to_calc['Type'].iloc[i]
 
-            development = cl.Development(
-                drop=drop_list,
-                n_periods=[ldf_years] * ratios.shape[1],
-                average=LDF_AVERAGES[average]
-            )
+            params = {
+                'drop': drop_list,
+                'n_periods': [ldf_years] * ratios.shape[1],
+                'average': LDF_AVERAGES[average]
+            }
 
-            factors = development.fit(X=self.triangle)
+            factors = RESULTS_CACHE.fetch(
+                triangle=self.triangle,
+                method='Development',
+                params=params,
+                fit=lambda: cl.Development(**params).fit(X=self.triangle),
+                outputs=['ldf_']
+            )
 
             # noinspection PyUnresolvedReferences
             factor_row = factors.ldf_.to_frame(origin_as_datetime=False)
@@ -366,16 +504,32 @@ class FactorModel(FAbstractTableModel):
             col = int(str(self.link_frame.columns[i]).split('-')[0])
             patterns[col] = self.selected_row.iloc[[0], [i]].squeeze().copy()
 
-        selected_dev = cl.DevelopmentConstant(
-            patterns=patterns,
-            style="ldf"
-        ).fit_transform(self.triangle)
+        def fit_selected() -> CachedResults:
+
+            selected_dev = cl.DevelopmentConstant(
+                patterns=patterns,
+                style="ldf"
+            ).fit_transform(self.triangle)
+
+            selected_model = cl.Chainladder().fit(selected_dev)
+
+            return CachedResults(outputs={
+                'cdf_': selected_dev.cdf_,
+                'ultimate_': selected_model.ultimate_
+            })
+
+        selected = RESULTS_CACHE.fetch(
+            triangle=self.triangle,
+            method='Chainladder',
+            params={'patterns': patterns},
+            fit=fit_selected,
+            outputs=['cdf_', 'ultimate_']
+        )
 
-        selected_model = cl.Chainladder().fit(selected_dev)
         # noinspection PyUnresolvedReferences
-        ultimate_frame = selected_model.ultimate_.to_frame(origin_as_datetime=False)
+        ultimate_frame = selected.ultimate_.to_frame(origin_as_datetime=False)
 
-        self.cdf_row.iloc[[0]] = selected_dev.cdf_.to_frame(origin_as_datetime=False).iloc[[0]]
+        self.cdf_row.iloc[[0]] = selected.cdf_.to_frame(origin_as_datetime=False).iloc[[0]]
 
         # ratios["To Ult"] = np.nan
         ratios[""] = np.nan
@@ -446,7 +600,7 @@ class FactorView(FTableView):
         self.copy_action.setShortcut(QKeySequence("Ctrl+c"))
         self.copy_action.setStatusTip("Copy selection to clipboard.")
         # noinspection PyUnresolvedReferences
-        self.copy_action.triggered.connect(self.copy_selection)
+        self.copy_action.triggered.connect(lambda: self.copy_selection())
 
         self.delete_action = QAction("&Delete Selected LDF(s)", self)
         self.delete_action.setShortcut(QKeySequence("Del"))
@@ -559,7 +713,7 @@ class FactorView(FTableView):
 
         for index in selection:
             index.model().toggle_exclude(index=index)
-            index.model().recalculate_factors(index=index)
+            index.model().recalculate_factors()
 
     def custom_menu_event(
             self,
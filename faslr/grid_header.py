@@ -270,6 +270,11 @@ class GridTableHeaderView(QHeaderView):
         self.n_columns = columns
         self.parent = parent
 
+        # Map each header cell covered by a span to the (row, column) of the cell the span starts from, so that
+        # painting does not need to search the model for spans. Rebuilt whenever a span is set or removed.
+        self.column_spans = {}
+        self.row_spans = {}
+
         # Store each header cell in the model as a TableHeaderItem containing the row and column number, and the size.
         self.base_section_size = QSize()
 
@@ -353,6 +358,8 @@ class GridTableHeaderView(QHeaderView):
                 role=ColumnSpanRole
             )
 
+        self.rebuildSpanMap()
+
     def removeSpan( # noqa
             self,
             row: int,
@@ -378,6 +385,41 @@ class GridTableHeaderView(QHeaderView):
                 role=RemoveColumnSpanRole
             )
 
+        self.rebuildSpanMap()
+
+    def rebuildSpanMap( # noqa
+            self
+    ) -> None:
+        """
+        Recomputes the cells covered by each span. Where spans overlap, a cell belongs to the span starting closest
+        to it, which is the span that a search outward from the cell would find first.
+        """
+
+        column_spans = {}
+        row_spans = {}
+
+        items = self.model().rootItem.childItems
+
+        for (row, col) in sorted(items):
+            item = items[(row, col)]
+
+            column_span = item.data(ColumnSpanRole)
+            if column_span:
+                for i in range(col, col + column_span):
+                    column_spans[(row, i)] = (row, col)
+
+        # Likewise for row spans, visiting the cells of each column from the top down.
+        for (row, col) in sorted(items, key=lambda key: (key[1], key[0])):
+            item = items[(row, col)]
+
+            row_span = item.data(RowSpanRole)
+            if row_span:
+                for i in range(row, row + row_span):
+                    row_spans[(i, col)] = (row, col)
+
+        self.column_spans = column_spans
+        self.row_spans = row_spans
+
     def checkData( # noqa
             self,
             row: int,
@@ -393,40 +435,24 @@ class GridTableHeaderView(QHeaderView):
             index: QModelIndex
     ) -> QModelIndex:
 
-        cur_row = index.row()
-        cur_col = index.column()
-        i = cur_col
-
-        while i >= 0:
-            span_index = self.model().index(cur_row, i)
-            try:
-                span = span_index.data(ColumnSpanRole)
-            except KeyError:
-                span = None
-            if span and (span_index.column() + span - 1 >= cur_col):
-                return span_index
-            i -= 1
-        return QModelIndex()
+        anchor = self.column_spans.get((index.row(), index.column()))
+
+        if anchor is None:
+            return QModelIndex()
+
+        return self.model().index(*anchor)
 
     def rowSpanIndex( # noqa
             self,
             index: QModelIndex
     ) -> QModelIndex:
 
-        cur_row = index.row()
-        cur_col = index.column()
-        i = cur_row
-        while i >= 0:
-            span_index = self.model().index(i, cur_col)
-            try:
-                span = span_index.data(RowSpanRole)
-            except KeyError:
-                span = None
-            if span and (span_index.row() + span - 1 >= cur_row):
-                return span_index
-            i -= 1
-
-        return QModelIndex()
+        anchor = self.row_spans.get((index.row(), index.column()))
+
+        if anchor is None:
+            return QModelIndex()
+
+        return self.model().index(*anchor)
 
     def rowSpanSize( # noqa
             self,
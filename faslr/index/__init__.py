@@ -1,5 +1,8 @@
 from .index import (
     calculate_index_factors,
+    index_factors,
+    INDEX_FACTOR_CACHE,
+    IndexFactorCache,
     IndexConstantDialog,
     IndexTableView,
     IndexTableModel,
@@ -7,4 +10,11 @@ from .index import (
     IndexInventory,
     IndexInventoryModel,
     IndexInventoryView
-)
\ No newline at end of file
+)
+from .repository import (
+    create_index,
+    IndexMatrix,
+    IndexRepository,
+    read_indexes,
+    write_index_values
+)
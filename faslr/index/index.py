@@ -120,7 +120,9 @@ class IndexTableModel(FAbstractTableModel):
 
         elif role == Qt.ItemDataRole.EditRole:
 
-            value = calculate_index_factors(index=value)
+            # Callers may supply factors that they have already calculated, e.g., from INDEX_FACTOR_CACHE.
+            if 'Factor' not in value.columns:
+                value = calculate_index_factors(index=value)
 
             self._data = value
             self._data = self._data.set_index('Origin')
@@ -374,17 +376,126 @@ class IndexInventoryModel(FAbstractTableModel):
                 return str(self._data.index[p_int])
 
 
+def index_factors(changes: np.ndarray) -> np.ndarray:
+    """
+    Calculates the factors that bring each origin period to the level of the latest one, i.e., the reverse cumulative
+    product of one plus the change in each subsequent period. The latest origin period has a factor of 1.
+
+    :param changes: The changes of a single index, of shape (origin,), or of many indexes, of shape (origin, index).
+    :return: An array of factors of the same shape.
+    """
+
+    changes = np.asarray(changes, dtype=float)
+
+    factors = np.ones_like(changes)
+    factors[:-1] = np.cumprod(1 + changes[:0:-1], axis=0)[::-1]
+
+    return factors
+
+
 def calculate_index_factors(index: DataFrame) -> DataFrame:
+    """
+    Returns a copy of an index with a Factor column calculated from its Change column.
+    """
 
-    # index['Factor'] = 1
+    return index.assign(Factor=index_factors(index['Change'].to_numpy()))
+
+
+class IndexFactorCache:
+    """
+    Memoizes index factors by index id and version. Bump the version of an index whenever its changes are edited, the
+    factors of the prior version are then discarded on the next lookup.
+
+    Since the factors of a combination of indexes are the products of the factors of each index, combined trends
+    are composed from the cached factors without recalculating them.
+    """
+    def __init__(self):
+
+        self.factors = {}
+        self.versions = {}
+
+    def get_factors(
+            self,
+            keys: list,
+            changes: np.ndarray
+    ) -> np.ndarray:
+        """
+        Returns the factors of many indexes at once. Only the indexes that are not cached are calculated, in a single
+        vectorized call.
+
+        :param keys: The (index id, version) of each index.
+        :param changes: The changes of the indexes, of shape (origin, index), in the same order as keys.
+        :return: The factors, of shape (origin, index).
+        """
+
+        changes = np.asarray(changes, dtype=float).reshape(len(changes), len(keys))
+
+        missing = [i for i, key in enumerate(keys) if key not in self.factors]
+
+        if missing:
+            calculated = index_factors(changes[:, missing])
+
+            for column, i in enumerate(missing):
+                self.store(key=keys[i], factors=calculated[:, column])
+
+        return np.column_stack([self.factors[key] for key in keys])
+
+    def get_index_factors(
+            self,
+            index_id: typing.Hashable,
+            version: int,
+            changes: np.ndarray
+    ) -> np.ndarray:
+        """
+        Returns the factors of a single index, as an array of shape (origin,).
+        """
+
+        return self.get_factors(
+            keys=[(index_id, version)],
+            changes=np.asarray(changes, dtype=float)[:, None]
+        )[:, 0]
+
+    def combine(
+            self,
+            keys: list
+    ) -> np.ndarray:
+        """
+        Composes the cached factors of several indexes into the factors of their combined trend.
+        """
+
+        return np.prod([self.factors[key] for key in keys], axis=0)
+
+    def store(
+            self,
+            key: tuple,
+            factors: np.ndarray
+    ) -> None:
+
+        index_id, version = key
+
+        prior_version = self.versions.get(index_id)
+        if prior_version is not None and prior_version != version:
+            self.factors.pop((index_id, prior_version), None)
+
+        factors = factors.copy()
+        factors.flags.writeable = False
+
+        self.factors[key] = factors
+        self.versions[index_id] = version
+
+    def invalidate(
+            self,
+            index_id: typing.Hashable
+    ) -> None:
+
+        version = self.versions.pop(index_id, None)
+        self.factors.pop((index_id, version), None)
+
+    def clear(self) -> None:
+
+        self.factors.clear()
+        self.versions.clear()
 
-    row_count = len(index)
-    factors = [1 for x in range(row_count)]
-    for i in range(row_count - 1, -1, -1):
-        if i == row_count - 1:
-            pass
-        else:
-            factors[i] = factors[i + 1] * (1 + index['Change'].iloc[i + 1])
-    index['Factor'] = factors
 
-    return index
+# The cache shared by every index view in the application.
+INDEX_FACTOR_CACHE = IndexFactorCache()
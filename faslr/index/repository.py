@@ -0,0 +1,398 @@
+"""
+Persistence of indexes in the project database.
+
+All the indexes available to a project, i.e., those belonging to the project plus the global ones, are loaded in a
+single query and pivoted into an origin x index matrix of changes, so that their factors can be calculated in one
+vectorized call. Edits are saved with batched upserts. IndexRepository keeps the loaded matrix in memory and
+discards it whenever it writes to the database.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from faslr.database import run_db_job
+
+from functools import partial
+
+from faslr.index.index import (
+    INDEX_FACTOR_CACHE,
+    IndexFactorCache
+)
+
+from faslr.schema import (
+    IndexTable,
+    IndexValuesTable
+)
+
+from sqlalchemy import (
+    insert,
+    or_,
+    select,
+    update
+)
+
+from sqlalchemy.orm.session import Session
+
+from typing import Callable
+
+
+class IndexMatrix:
+    """
+    A set of indexes pivoted into a matrix of changes, with one row per origin year and one column per index.
+    Years in which an index has no value are NaN.
+
+    :param index_ids: The id of each index.
+    :param names: The name of each index.
+    :param descriptions: The description of each index.
+    :param scopes: The scope of each index, either 'project' or 'global'.
+    :param origins: The origin years, in ascending order.
+    :param changes: Array of shape (origin, index).
+    """
+    def __init__(
+            self,
+            index_ids: list,
+            names: list,
+            descriptions: list,
+            scopes: list,
+            origins: np.ndarray,
+            changes: np.ndarray
+    ):
+
+        self.index_ids = index_ids
+        self.names = names
+        self.descriptions = descriptions
+        self.scopes = scopes
+        self.origins = origins
+        self.changes = changes
+
+        self.positions = {index_id: i for i, index_id in enumerate(index_ids)}
+
+    def __len__(self) -> int:
+
+        return len(self.index_ids)
+
+    def find(
+            self,
+            name: str
+    ) -> int:
+        """
+        Returns the id of the first index with the given name.
+        """
+
+        try:
+            return self.index_ids[self.names.index(name)]
+        except ValueError:
+            raise KeyError("No index named %s." % name)
+
+    def inventory(self) -> list:
+        """
+        Index metadata in the format displayed by IndexInventory.
+        """
+
+        return [
+            {
+                'Name': [name],
+                'Description': [description]
+            } for name, description in zip(self.names, self.descriptions)
+        ]
+
+    def index_changes(
+            self,
+            index_id: int
+    ) -> pd.DataFrame:
+        """
+        The changes of a single index, over the years in which it has values.
+        """
+
+        changes = self.changes[:, self.positions[index_id]]
+        has_value = ~np.isnan(changes)
+
+        return pd.DataFrame({
+            'Origin': self.origins[has_value],
+            'Change': changes[has_value]
+        })
+
+
+def read_indexes(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        project_id: str = None
+) -> IndexMatrix:
+    """
+    Reads the global indexes, and those of a project if one is given, in a single query.
+    """
+
+    scope_filter = IndexTable.scope == 'global'
+
+    if project_id is not None:
+        scope_filter = or_(scope_filter, IndexTable.project_id == project_id)
+
+    query = select(
+        IndexTable.index_id,
+        IndexTable.name,
+        IndexTable.description,
+        IndexTable.scope,
+        IndexValuesTable.year,
+        IndexValuesTable.change
+    ).outerjoin(
+        IndexValuesTable,
+        IndexValuesTable.index_id == IndexTable.index_id
+    ).where(
+        scope_filter
+    ).order_by(
+        IndexTable.index_id
+    )
+
+    df = pd.read_sql(query, con=session.connection())
+
+    meta = df.drop_duplicates('index_id')
+
+    index_ids = meta['index_id'].tolist()
+    df_values = df.dropna(subset=['year'])
+
+    origins = np.unique(df_values['year'].to_numpy()).astype(int)
+
+    changes = np.full((len(origins), len(index_ids)), np.nan)
+
+    rows = np.searchsorted(origins, df_values['year'].to_numpy())
+    columns = np.searchsorted(meta['index_id'].to_numpy(), df_values['index_id'].to_numpy())
+
+    changes[rows, columns] = df_values['change'].to_numpy(dtype=float)
+
+    return IndexMatrix(
+        index_ids=index_ids,
+        names=meta['name'].tolist(),
+        descriptions=meta['description'].tolist(),
+        scopes=meta['scope'].tolist(),
+        origins=origins,
+        changes=changes
+    )
+
+
+def write_index_values(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        index_id: int = None,
+        values: pd.DataFrame = None
+) -> None:
+    """
+    Saves the changes of an index, updating the years already in the database and inserting the others, with one
+    batched statement each.
+
+    :param values: A DataFrame with Origin and Change columns.
+    """
+
+    existing = dict(
+        session.execute(
+            select(
+                IndexValuesTable.year,
+                IndexValuesTable.value_id
+            ).where(
+                IndexValuesTable.index_id == index_id
+            )
+        ).all()
+    )
+
+    updates = []
+    inserts = []
+
+    for year, change in zip(values['Origin'].tolist(), values['Change'].tolist()):
+        if year in existing:
+            updates.append({'value_id': existing[year], 'change': change})
+        else:
+            inserts.append({'index_id': index_id, 'year': year, 'change': change})
+
+    if updates:
+        session.execute(update(IndexValuesTable), updates)
+
+    if inserts:
+        session.execute(insert(IndexValuesTable), inserts)
+
+
+def create_index(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        name: str = None,
+        description: str = None,
+        scope: str = 'global',
+        project_id: str = None,
+        values: pd.DataFrame = None
+) -> int:
+    """
+    Adds an index to the database.
+
+    :return: The id of the new index.
+    """
+
+    index = IndexTable(
+        name=name,
+        description=description,
+        scope=scope,
+        project_id=project_id
+    )
+
+    session.add(index)
+    session.flush()
+
+    if values is not None:
+        write_index_values(
+            session=session,
+            index_id=index.index_id,
+            values=values
+        )
+
+    return index.index_id
+
+
+class IndexRepository:
+    """
+    Loads and saves the indexes available to a project, keeping the loaded indexes in memory until the next write.
+
+    :param db_path: The path to the project database.
+    :param project_id: The project whose indexes are loaded along with the global ones.
+    :param factor_cache: Where index factors are memoized.
+    """
+    def __init__(
+            self,
+            db_path: str,
+            project_id: str = None,
+            factor_cache: IndexFactorCache = INDEX_FACTOR_CACHE
+    ):
+
+        self.db_path = db_path
+        self.project_id = project_id
+        self.factor_cache = factor_cache
+
+        self.matrix = None
+
+        # Incremented whenever an index is written, so that its cached factors are recalculated.
+        self.versions = {}
+
+    def load(self) -> IndexMatrix:
+        """
+        Returns the indexes, reading them from the database if they are not in memory.
+        """
+
+        if self.matrix is None:
+            self.matrix = run_db_job(
+                db_path=self.db_path,
+                job=partial(
+                    read_indexes,
+                    project_id=self.project_id
+                )
+            )
+
+        return self.matrix
+
+    def invalidate(
+            self,
+            index_id: int = None
+    ) -> None:
+        """
+        Discards the loaded indexes, along with the cached factors of the index that was written, if given.
+        """
+
+        self.matrix = None
+
+        if index_id is not None:
+            self.versions[index_id] = self.versions.get(index_id, 0) + 1
+            self.factor_cache.invalidate(index_id=self.cache_key(index_id))
+
+    def cache_key(
+            self,
+            index_id: int
+    ) -> tuple:
+        """
+        Ids are only unique within a database, so the factor cache is keyed by the database as well.
+        """
+
+        return self.db_path, index_id
+
+    def factors(
+            self,
+            index_ids: list = None
+    ) -> np.ndarray:
+        """
+        Returns the factors of the given indexes, or of all indexes, as an array of shape (origin, index). Years
+        without a value have no change.
+        """
+
+        matrix = self.load()
+
+        if index_ids is None:
+            index_ids = matrix.index_ids
+
+        positions = [matrix.positions[index_id] for index_id in index_ids]
+
+        # The factors span the years of every loaded index, which widen when any index is written, not just the one
+        # whose version is bumped. So the years are part of the version too.
+        origins = hash(matrix.origins.tobytes())
+
+        return self.factor_cache.get_factors(
+            keys=[(self.cache_key(index_id), (self.versions.get(index_id, 0), origins)) for index_id in index_ids],
+            changes=np.nan_to_num(matrix.changes[:, positions])
+        )
+
+    def fetch_index(
+            self,
+            name: str
+    ) -> pd.DataFrame:
+        """
+        Returns an index by name, in the Origin, Change, Factor format used by IndexTableModel.
+        """
+
+        matrix = self.load()
+
+        index_id = matrix.find(name=name)
+
+        df_idx = matrix.index_changes(index_id=index_id)
+
+        factors = self.factors(index_ids=[index_id])[:, 0]
+
+        return df_idx.assign(
+            Factor=factors[np.isin(matrix.origins, df_idx['Origin'])]
+        )
+
+    def save_values(
+            self,
+            index_id: int,
+            values: pd.DataFrame
+    ) -> None:
+
+        run_db_job(
+            db_path=self.db_path,
+            job=partial(
+                write_index_values,
+                index_id=index_id,
+                values=values
+            ),
+            write=True
+        )
+
+        self.invalidate(index_id=index_id)
+
+    def create_index(
+            self,
+            name: str,
+            description: str = None,
+            scope: str = 'global',
+            values: pd.DataFrame = None
+    ) -> int:
+
+        index_id = run_db_job(
+            db_path=self.db_path,
+            job=partial(
+                create_index,
+                name=name,
+                description=description,
+                scope=scope,
+                project_id=self.project_id if scope == 'project' else None,
+                values=values
+            ),
+            write=True
+        )
+
+        self.invalidate(index_id=index_id)
+
+        return index_id
@@ -0,0 +1,359 @@
+"""
+Mack (1993) standard errors of the chain ladder reserves.
+
+chainladder's MackChainladder refits the development factors, projects the full triangle and runs its recursions
+through Triangle objects on every call, and a change to a single excluded link ratio means starting over. Here, the
+statistics of the volume-weighted development factors are computed with NumPy across every segment (index and column)
+of a triangle in one pass and kept per development period. When the exclusions change, only the statistics of the
+development periods whose exclusions changed are recomputed, and the recursions for the parameter and process risk
+are resumed from the first development period whose factors changed, since the risk up to that period is unaffected.
+
+The results match MackChainladder fit to a Development with the same dropped link ratios and no tail.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from chainladder import Triangle
+
+
+def development_statistics(
+        values: np.ndarray,
+        excluded: np.ndarray,
+        periods: np.ndarray
+) -> tuple:
+    """
+    Fits volume-weighted age-to-age factors through the origin for the given development periods of every segment,
+    with the same conventions as chainladder's Development.
+
+    :param values: Array of cumulative values, of shape (index, columns, origin, development), with missing values
+    as NaN.
+    :param excluded: Whether each link ratio is excluded, of shape (index, columns, origin, development - 1).
+    :param periods: The positions of the development periods to fit, i.e., of the link ratio columns.
+    :return: A tuple (ldf, sigma, std_err, weight), each of shape (index, columns, len(periods)). sigma and std_err
+    are NaN for periods with fewer than two link ratios, see fill_sigma() and fill_std_err().
+    """
+
+    x = values[..., periods]
+    y = values[..., periods + 1]
+
+    kept = ~excluded[..., periods] & ~np.isnan(y)
+    valid = kept & ~np.isnan(x)
+
+    x = np.where(valid, x, 0.)
+    y = np.where(valid, y, 0.)
+
+    weight = x.sum(axis=-2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ldf = y.sum(axis=-2) / np.where(weight == 0, np.nan, weight)
+
+        squares = np.where(valid, (y - ldf[..., np.newaxis, :] * x) ** 2 / x, 0.).sum(axis=-2)
+
+        degrees_of_freedom = kept.sum(axis=-2) - 1.
+        mse = squares / np.where(degrees_of_freedom <= 0, np.nan, degrees_of_freedom)
+
+        sigma = np.sqrt(mse)
+        std_err = np.sqrt(mse / np.where(weight == 0, np.nan, weight))
+
+    return ldf, sigma, std_err, weight
+
+
+def fill_sigma(sigma: np.ndarray) -> np.ndarray:
+    """
+    Extrapolates the missing sigmas log-linearly from the others, as chainladder does by default.
+
+    :param sigma: Array of shape (..., development - 1).
+    """
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+
+        log_sigma = np.log(np.where(sigma == 0, 1e-320, sigma))
+
+        valid = ~np.isnan(log_sigma)
+        periods = np.broadcast_to(np.arange(1., sigma.shape[-1] + 1), sigma.shape)
+
+        x = np.where(valid, periods, np.nan)
+        y = np.where(valid, log_sigma, np.nan)
+
+        mean_x = np.nanmean(x, axis=-1, keepdims=True)
+        mean_y = np.nanmean(y, axis=-1, keepdims=True)
+
+        slope = (
+            (np.nansum(x * y, axis=-1, keepdims=True) - np.nansum(x, axis=-1, keepdims=True) * mean_y) /
+            (np.nansum(x * x, axis=-1, keepdims=True) - mean_x * np.nansum(x, axis=-1, keepdims=True))
+        )
+        intercept = mean_y - slope * mean_x
+
+        return np.where(valid, sigma, np.exp(periods * slope + intercept))
+
+
+def fill_std_err(
+        std_err: np.ndarray,
+        sigma: np.ndarray,
+        values: np.ndarray
+) -> np.ndarray:
+    """
+    Fills the missing standard errors of the factors from the extrapolated sigmas and the values of the oldest origin
+    period, as chainladder does.
+    """
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        filled = sigma / np.sqrt(values[..., 0, :-1])
+
+    return np.where(np.isnan(std_err), np.nan_to_num(filled), std_err)
+
+
+class MackStandardErrors:
+    """
+    Mack standard errors of the reserves of every segment of a triangle, kept up to date as link ratios are
+    excluded.
+
+    :param triangle: A chainladder Triangle.
+    """
+    def __init__(
+            self,
+            triangle: Triangle
+    ):
+
+        if not triangle.is_cumulative:
+            triangle = triangle.incr_to_cum()
+
+        self.triangle = triangle
+
+        values = np.asarray(triangle.set_backend('numpy').values, dtype=float)
+
+        # Zero values are treated as missing, as chainladder does.
+        self.values = np.where(values == 0, np.nan, values)
+
+        self.origins = triangle.origin.astype(str).tolist()
+        self.ages = [int(age) for age in triangle.development]
+
+        # Whether each cell has been observed, and each origin period's latest age.
+        self.observed = ~np.isnan(np.asarray(triangle.nan_triangle, dtype=float))
+        self.latest_age = self.observed.shape[1] - 1 - np.argmax(self.observed[:, ::-1], axis=1)
+
+        self.latest = np.nan_to_num(np.take_along_axis(
+            self.values,
+            np.broadcast_to(self.latest_age[:, np.newaxis], self.values.shape[:-1] + (1,)),
+            axis=-1
+        )[..., 0])
+
+        n_periods = self.values.shape[-1] - 1
+
+        self.excluded = np.zeros(self.values.shape[:-1] + (n_periods,), dtype=bool)
+
+        # Statistics of the factors of each development period, of shape (index, columns, development - 1).
+        self.ldf = np.ones(self.values.shape[:2] + (n_periods,))
+        self.raw_sigma = np.full(self.ldf.shape, np.nan)
+        self.raw_std_err = np.full(self.ldf.shape, np.nan)
+        self.sigma = np.full(self.ldf.shape, np.nan)
+        self.std_err = np.full(self.ldf.shape, np.nan)
+
+        # Projected cumulative values, and the risks at each age, of shape (index, columns, origin, development).
+        self.full = np.zeros(self.values.shape)
+        self.parameter_risk = np.zeros(self.values.shape)
+        self.process_risk = np.zeros(self.values.shape)
+
+        # Parameter risk of the total of the origin periods, of shape (index, columns, development).
+        self.total_parameter_risk = np.zeros(self.values.shape[:2] + (self.values.shape[-1],))
+
+        # Number of development periods whose statistics were fitted, and from which the recursions were resumed, by
+        # the last update.
+        self.fitted_periods = 0
+        self.resumed_from = 0
+
+        self.update(periods=np.arange(n_periods))
+
+    def update(
+            self,
+            periods: np.ndarray
+    ) -> None:
+        """
+        Refits the statistics of the given development periods and resumes the recursions from the first period
+        whose factors changed.
+        """
+
+        self.fitted_periods = len(periods)
+
+        if len(periods) == 0:
+            return
+
+        previous = np.stack([self.ldf, self.sigma, self.std_err])
+
+        ldf, sigma, std_err, weight = development_statistics(
+            values=self.values,
+            excluded=self.excluded,
+            periods=periods
+        )
+
+        self.ldf[..., periods] = ldf
+        self.raw_sigma[..., periods] = sigma
+        self.raw_std_err[..., periods] = std_err
+
+        # The extrapolated sigmas depend on every fitted sigma, so they are refilled whenever any of them changes.
+        self.sigma = fill_sigma(sigma=self.raw_sigma)
+        self.std_err = fill_std_err(
+            std_err=self.raw_std_err,
+            sigma=self.sigma,
+            values=self.values
+        )
+
+        unchanged = np.isclose(
+            np.stack([self.ldf, self.sigma, self.std_err]),
+            previous,
+            rtol=0,
+            atol=0,
+            equal_nan=True
+        )
+
+        changed = ~unchanged.all(axis=(0, 1, 2))
+
+        if changed.any():
+            self.project(start=int(np.argmax(changed)))
+
+    def project(
+            self,
+            start: int = 0
+    ) -> None:
+        """
+        Projects the triangle with the current factors, and runs Mack's recursions for the risks at each age from the
+        development period start onwards.
+        """
+
+        self.resumed_from = start
+
+        ldf = np.nan_to_num(self.ldf)
+
+        # Development from each origin period's latest age to every later age.
+        cumulative = np.concatenate([np.ones(ldf.shape[:-1] + (1,)), np.cumprod(ldf, axis=-1)], axis=-1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            development = cumulative[..., np.newaxis, :] / cumulative[..., self.latest_age][..., np.newaxis]
+
+        self.full = np.where(
+            self.observed,
+            np.nan_to_num(self.values),
+            np.nan_to_num(self.latest[..., np.newaxis] * development)
+        )
+
+        future = ~self.observed
+        std_err = np.nan_to_num(self.std_err)
+        variance = np.nan_to_num(self.sigma) ** 2
+
+        for period in range(start, ldf.shape[-1]):
+
+            values = self.full[..., period]
+
+            self.parameter_risk[..., period + 1] = future[:, period + 1] * np.sqrt(
+                (values * std_err[..., period, np.newaxis]) ** 2 +
+                (ldf[..., period, np.newaxis] * self.parameter_risk[..., period]) ** 2
+            )
+
+            # Negative values have no process variance, as in chainladder.
+            self.process_risk[..., period + 1] = future[:, period + 1] * np.sqrt(
+                np.maximum(values, 0.) * variance[..., period, np.newaxis] +
+                (ldf[..., period, np.newaxis] * self.process_risk[..., period]) ** 2
+            )
+
+            # The total only includes the origin periods that are yet to develop past this age.
+            projected = np.where(self.latest_age <= period, values, 0.).sum(axis=-1)
+
+            self.total_parameter_risk[..., period + 1] = np.sqrt(
+                (projected * std_err[..., period]) ** 2 +
+                (ldf[..., period] * self.total_parameter_risk[..., period]) ** 2
+            )
+
+    def set_exclusions(
+            self,
+            excluded: np.ndarray,
+            index: int = 0,
+            column: int = 0
+    ) -> None:
+        """
+        Sets the excluded link ratios of a segment, updating the results of the development periods affected.
+
+        :param excluded: Whether each link ratio is excluded, of shape (origin, development - 1).
+        :param index: The position of the segment's index.
+        :param column: The position of the segment's column.
+        """
+
+        excluded = np.asarray(excluded, dtype=bool)
+
+        periods = np.flatnonzero((excluded != self.excluded[index, column]).any(axis=0))
+
+        self.excluded[index, column] = excluded
+
+        self.update(periods=periods)
+
+    def set_drop(
+            self,
+            drop: list,
+            index: int = 0,
+            column: int = 0
+    ) -> None:
+        """
+        Sets the excluded link ratios of a segment from a list of (origin, age) tuples, as taken by chainladder's
+        Development and built by FactorModel.
+        """
+
+        excluded = np.zeros(self.excluded.shape[-2:], dtype=bool)
+
+        for origin, age in drop or []:
+            excluded[self.origins.index(str(origin)), self.ages.index(int(age))] = True
+
+        self.set_exclusions(
+            excluded=excluded,
+            index=index,
+            column=column
+        )
+
+    @property
+    def mack_std_err(self) -> np.ndarray:
+        """
+        Standard error of the reserve of each origin period, of shape (index, columns, origin).
+        """
+
+        return np.sqrt(self.parameter_risk[..., -1] ** 2 + self.process_risk[..., -1] ** 2)
+
+    @property
+    def total_mack_std_err(self) -> np.ndarray:
+        """
+        Standard error of the total reserve, of shape (index, columns).
+        """
+
+        total_process_risk = np.sum(self.process_risk[..., -1] ** 2, axis=-1)
+
+        return np.sqrt(total_process_risk + self.total_parameter_risk[..., -1] ** 2)
+
+    def summary(
+            self,
+            index: int = 0,
+            column: int = 0
+    ) -> pd.DataFrame:
+        """
+        Returns the latest values, IBNR, ultimates and standard errors of a segment, one row per origin period
+        followed by the total. The coefficient of variation is the standard error relative to the IBNR.
+        """
+
+        latest = self.latest[index, column]
+        ultimate = self.full[index, column, :, -1]
+
+        df = pd.DataFrame(
+            {
+                'Latest': np.append(latest, latest.sum()),
+                'IBNR': np.append(ultimate - latest, (ultimate - latest).sum()),
+                'Ultimate': np.append(ultimate, ultimate.sum()),
+                'Mack Std. Err.': np.append(
+                    self.mack_std_err[index, column],
+                    self.total_mack_std_err[index, column]
+                )
+            },
+            index=self.origins + ['Total']
+        )
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['CV'] = np.where(df['IBNR'] != 0, df['Mack Std. Err.'] / df['IBNR'], np.nan)
+
+        return df
@@ -0,0 +1,494 @@
+"""
+Accounting of the memory held by the tabs of the analysis pane. The footprint of a tab is estimated by walking the
+attributes of its widgets and models and adding up the DataFrames and arrays found along the way, which is where
+nearly all of a triangle's memory ends up. While allocation tracing is on, tracemalloc also measures what each tab
+allocated when it was built, and the largest allocation sites can be inspected. The Memory Usage dialog under the
+Tools menu lists the tabs by footprint and releases the caches of those in the background.
+"""
+from __future__ import annotations
+
+import gc
+import numpy as np
+import os
+import pandas as pd
+import tracemalloc
+
+from collections import deque
+
+from faslr.base_table import (
+    FAbstractTableModel,
+    FTableView
+)
+
+from faslr.constants import (
+    MEMORY_ALLOCATION_ROWS,
+    MEMORY_TRACE_FRAMES,
+    MEMORY_WALK_DEPTH,
+    ROOT_PATH
+)
+
+from faslr.utilities.chainladder import clear_results_cache
+
+from PyQt6.QtCore import (
+    QModelIndex,
+    QObject,
+    Qt
+)
+
+from PyQt6.QtWidgets import (
+    QAbstractItemView,
+    QCheckBox,
+    QDialog,
+    QDialogButtonBox,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTabWidget,
+    QVBoxLayout,
+    QWidget
+)
+
+from typing import Any
+
+# Objects of these packages are followed into their attributes, e.g., chainladder Triangles and fitted estimators.
+_WALKED_PACKAGES = (
+    'faslr',
+    'chainladder'
+)
+
+
+def object_nbytes(obj: Any) -> int | None:
+    """
+    Returns the size of the data held by a DataFrame, Series, Index or array, or None for any other object.
+    """
+
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    elif isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    elif isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    else:
+        return None
+
+
+def widget_footprint(
+        widget: QWidget,
+        max_depth: int = MEMORY_WALK_DEPTH
+) -> dict:
+    """
+    Estimates the memory held by a widget, its child widgets and the models of its views.
+
+    Each DataFrame or array is counted once per widget, however many attributes refer to it. Data shared between
+    two widgets, such as a triangle opened in two tabs, is counted in both.
+
+    :param widget: The widget, e.g., a tab of the analysis pane.
+    :param max_depth: How deeply attributes are followed from each widget or model.
+    :return: The number of frames and arrays found, and their total size in bytes.
+    """
+
+    roots = [widget] + widget.findChildren(QObject)
+
+    # Models are not necessarily children of the views displaying them.
+    roots += [
+        view.model() for view in widget.findChildren(QAbstractItemView) if view.model() is not None
+    ]
+
+    footprint = {
+        'frames': 0,
+        'arrays': 0,
+        'bytes': 0
+    }
+
+    seen = set()
+    stack = [(root, 0) for root in roots]
+
+    while stack:
+        obj, depth = stack.pop()
+
+        if id(obj) in seen:
+            continue
+
+        seen.add(id(obj))
+
+        nbytes = object_nbytes(obj)
+
+        if nbytes is not None:
+            footprint['arrays' if isinstance(obj, np.ndarray) else 'frames'] += 1
+            footprint['bytes'] += nbytes
+            continue
+
+        if depth > max_depth:
+            continue
+
+        if isinstance(obj, dict):
+            children = obj.values()
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            children = obj
+        elif depth > 0 and isinstance(obj, QObject):
+            # Widgets and models are only reached as roots, otherwise references to parents would lead the walk to
+            # the rest of the application.
+            continue
+        elif depth == 0 or type(obj).__module__.startswith(_WALKED_PACKAGES):
+            children = getattr(obj, '__dict__', {}).values()
+        else:
+            continue
+
+        stack.extend((child, depth + 1) for child in children)
+
+    return footprint
+
+
+def tab_footprints(tab_widget: QTabWidget) -> pd.DataFrame:
+    """
+    Returns the footprint of each tab of a tab widget, largest first.
+    """
+
+    rows = []
+
+    for index in range(tab_widget.count()):
+        widget = tab_widget.widget(index)
+        footprint = widget_footprint(widget)
+
+        rows.append([
+            tab_widget.tabText(index),
+            getattr(widget, 'is_loaded', True),
+            footprint['frames'],
+            footprint['arrays'],
+            footprint['bytes'],
+            getattr(widget, 'allocated', None),
+            index
+        ])
+
+    df = pd.DataFrame(
+        rows,
+        columns=['tab', 'loaded', 'frames', 'arrays', 'bytes', 'allocated', 'index']
+    )
+
+    return df.sort_values('bytes', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def start_tracing() -> None:
+    """
+    Starts tracing allocations, which slows down FASLR noticeably while it is on.
+    """
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(MEMORY_TRACE_FRAMES)
+
+
+def stop_tracing() -> None:
+
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def allocation_summary(
+        n: int = MEMORY_ALLOCATION_ROWS
+) -> pd.DataFrame:
+    """
+    Returns the source lines holding the most memory among the allocations traced so far.
+    """
+
+    columns = ['location', 'bytes', 'count']
+
+    if not tracemalloc.is_tracing():
+        return pd.DataFrame(columns=columns)
+
+    snapshot = tracemalloc.take_snapshot().filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__)
+    ])
+
+    rows = []
+
+    for statistic in snapshot.statistics('lineno')[:n]:
+        frame = statistic.traceback[0]
+        filename = frame.filename
+
+        if filename.startswith(ROOT_PATH):
+            filename = os.path.relpath(filename, ROOT_PATH)
+
+        rows.append(["%s:%d" % (filename, frame.lineno), statistic.size, statistic.count])
+
+    return pd.DataFrame(rows, columns=columns)
+
+
+def release_caches(
+        tab_widget: QTabWidget,
+        indexes: list = None
+) -> int:
+    """
+    Unloads tabs that are not being displayed, and drops the results cached for fitted models.
+
+    :param tab_widget: The tab widget whose tabs are unloaded.
+    :param indexes: The indexes of the tabs to unload, defaults to all of them. Tabs without an unload() method, such
+    as DeferredAnalysisTab's, are left as they are.
+    :return: The number of tabs unloaded.
+    """
+
+    if indexes is None:
+        indexes = range(tab_widget.count())
+
+    count = 0
+
+    for index in indexes:
+        unload = getattr(tab_widget.widget(index), 'unload', None)
+
+        if unload is not None and unload():
+            count += 1
+
+    clear_results_cache()
+    gc.collect()
+
+    return count
+
+
+class TabMemoryModel(FAbstractTableModel):
+    """
+    Displays the footprints of the tabs of a tab widget, as produced by tab_footprints().
+    """
+    def __init__(
+            self,
+            data: pd.DataFrame = None
+    ):
+        super().__init__()
+
+        self.headers = [
+            'Tab',
+            'Loaded',
+            'Frames',
+            'Arrays',
+            'Size (KB)',
+            'Allocated on Build (KB)'
+        ]
+
+        self._data = data if data is not None else pd.DataFrame(columns=self.headers)
+
+    def set_footprints(
+            self,
+            data: pd.DataFrame
+    ) -> None:
+
+        self.beginResetModel()
+        self._data = data
+        self.endResetModel()
+
+    def columnCount(
+            self,
+            parent=None,
+            *args,
+            **kwargs
+    ):
+
+        # The tab index is kept for releasing the tab, but not displayed.
+        return len(self.headers)
+
+    def data(
+            self,
+            index: QModelIndex,
+            role: int = None
+    ) -> Any:
+
+        if role == Qt.ItemDataRole.DisplayRole:
+
+            value = self._data.iloc[index.row(), index.column()]
+
+            if index.column() == 1:
+                return "Yes" if value else "No"
+            elif index.column() in [4, 5]:
+                return "" if pd.isna(value) else "{0:,.0f}".format(value / 1024)
+            elif index.column() in [2, 3]:
+                return "{0:,.0f}".format(value)
+            else:
+                return str(value)
+
+    def headerData(
+            self,
+            section: int,
+            orientation: Qt.Orientation,
+            role: int = None
+    ) -> Any:
+
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+
+
+class AllocationModel(FAbstractTableModel):
+    """
+    Displays the largest allocation sites, as produced by allocation_summary().
+    """
+    def __init__(
+            self,
+            data: pd.DataFrame = None
+    ):
+        super().__init__()
+
+        self.headers = [
+            'Location',
+            'Size (KB)',
+            'Blocks'
+        ]
+
+        self._data = data if data is not None else pd.DataFrame(columns=self.headers)
+
+    def set_allocations(
+            self,
+            data: pd.DataFrame
+    ) -> None:
+
+        self.beginResetModel()
+        self._data = data
+        self.endResetModel()
+
+    def data(
+            self,
+            index: QModelIndex,
+            role: int = None
+    ) -> Any:
+
+        if role == Qt.ItemDataRole.DisplayRole:
+
+            value = self._data.iloc[index.row(), index.column()]
+
+            if index.column() == 1:
+                return "{0:,.0f}".format(value / 1024)
+            elif index.column() == 2:
+                return "{0:,.0f}".format(value)
+            else:
+                return str(value)
+
+    def headerData(
+            self,
+            section: int,
+            orientation: Qt.Orientation,
+            role: int = None
+    ) -> Any:
+
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+
+
+class MemoryUsageDialog(QDialog):
+    """
+    Lists the tabs of the analysis pane by footprint, and releases the caches of the selected tabs or of every tab in
+    the background.
+    """
+    def __init__(
+            self,
+            tab_widget: QTabWidget,
+            parent: QWidget = None
+    ):
+        super().__init__(parent)
+
+        self.tab_widget = tab_widget
+        self.footprints = None
+
+        self.setWindowTitle("Memory Usage")
+
+        self.layout = QVBoxLayout()
+
+        self.summary_label = QLabel()
+
+        self.tab_model = TabMemoryModel()
+        self.tab_view = FTableView()
+        self.tab_view.setModel(self.tab_model)
+        self.tab_view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+
+        self.allocation_model = AllocationModel()
+        self.allocation_view = FTableView()
+        self.allocation_view.setModel(self.allocation_model)
+
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.tab_view, "Tabs")
+        self.tabs.addTab(self.allocation_view, "Allocations")
+
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.clicked.connect(self.refresh) # noqa
+
+        self.release_selected_btn = QPushButton("Release Selected")
+        self.release_selected_btn.clicked.connect(self.release_selected) # noqa
+
+        self.release_all_btn = QPushButton("Release Background Tabs")
+        self.release_all_btn.clicked.connect(self.release_all) # noqa
+
+        self.trace_box = QCheckBox("Trace Allocations")
+        self.trace_box.setChecked(tracemalloc.is_tracing())
+        self.trace_box.setToolTip("Measure what each tab allocates when it is built. Slows down FASLR while on.")
+        self.trace_box.toggled.connect(self.toggle_tracing) # noqa
+
+        btn_container = QWidget()
+        btn_layout = QHBoxLayout()
+        btn_layout.setContentsMargins(0, 0, 0, 0)
+        btn_layout.addWidget(self.refresh_btn)
+        btn_layout.addWidget(self.release_selected_btn)
+        btn_layout.addWidget(self.release_all_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.trace_box)
+        btn_container.setLayout(btn_layout)
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        self.button_box.rejected.connect(self.close) # noqa
+
+        self.layout.addWidget(self.summary_label)
+        self.layout.addWidget(btn_container)
+        self.layout.addWidget(self.tabs)
+        self.layout.addWidget(self.button_box)
+
+        self.setLayout(self.layout)
+
+        self.resize(700, 450)
+
+        self.refresh()
+
+    def refresh(self) -> None:
+
+        self.footprints = tab_footprints(tab_widget=self.tab_widget)
+        self.tab_model.set_footprints(self.footprints)
+        self.allocation_model.set_allocations(allocation_summary())
+
+        summary = "%d tabs hold about %.1f MB." % (
+            len(self.footprints),
+            self.footprints['bytes'].sum() / 1024 ** 2
+        )
+
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            summary += " Traced: %.1f MB, peak %.1f MB." % (current / 1024 ** 2, peak / 1024 ** 2)
+
+        self.summary_label.setText(summary)
+
+        for view in [self.tab_view, self.allocation_view]:
+            view.resizeColumnsToContents()
+
+    def release_selected(self) -> int:
+
+        rows = {index.row() for index in self.tab_view.selectionModel().selectedRows()}
+
+        count = release_caches(
+            tab_widget=self.tab_widget,
+            indexes=[self.footprints['index'].iloc[row] for row in sorted(rows)]
+        )
+
+        self.refresh()
+
+        return count
+
+    def release_all(self) -> int:
+
+        count = release_caches(tab_widget=self.tab_widget)
+
+        self.refresh()
+
+        return count
+
+    def toggle_tracing(
+            self,
+            checked: bool
+    ) -> None:
+
+        if checked:
+            start_tracing()
+        else:
+            stop_tracing()
+
+        self.refresh()
@@ -3,6 +3,7 @@ Contains the menu bar of the main window i.e., the horizontal bar that has stuff
 """
 from __future__ import annotations
 
+import os
 import webbrowser
 
 from faslr.about import AboutDialog
@@ -11,22 +12,36 @@ from faslr.connection import ConnectionDialog
 
 from faslr.constants import (
     CONFIG_PATH,
+    DEFAULT_DIALOG_PATH,
     DISCUSSIONS_URL,
     DOCUMENTATION_URL,
     GITHUB_URL,
     ICONS_PATH,
     ISSUES_URL,
-    OCTICONS_PATH
+    OCTICONS_PATH,
+    PROFILE_TRACE_FILENAME,
+    QT_FILEPATH_OPTION
 )
 
 from faslr.core import FCore
 
 from faslr.engine import EngineDialog
 
+from faslr.memory import MemoryUsageDialog
+
+from faslr.profiler import (
+    PROFILER,
+    ProfilerStatusLabel
+)
+
 from faslr.project import ProjectDialog
 
+from faslr.query_log import DatabasePerformanceDialog
+
 from faslr.settings import SettingsDialog
 
+from faslr.utilities.results_cache import RESULTS_CACHE
+
 from PyQt6.QtGui import (
     QAction,
     QIcon,
@@ -34,6 +49,7 @@ from PyQt6.QtGui import (
 )
 
 from PyQt6.QtWidgets import (
+    QFileDialog,
     QMenu,
     QMenuBar
 )
@@ -76,6 +92,36 @@ class MainMenuBar(QMenuBar):
         self.engine_action.setStatusTip("Select a reserving engine.")
         self.engine_action.triggered.connect(self.display_engine) # noqa
 
+        self.db_performance_action = QAction("&Database Performance")
+        self.db_performance_action.setStatusTip("Show the slowest and most frequent database queries.")
+        self.db_performance_action.triggered.connect(self.display_db_performance) # noqa
+
+        self.memory_action = QAction("&Memory Usage", self)
+        self.memory_action.setStatusTip("Show the memory held by each open tab and release their caches.")
+        self.memory_action.triggered.connect(self.display_memory_usage) # noqa
+
+        self.clear_results_action = QAction("&Clear Results Cache", self)
+        self.clear_results_action.setStatusTip("Delete the fitted results cached in the project database.")
+        self.clear_results_action.triggered.connect(self.clear_results_cache) # noqa
+
+        self.profiling_action = QAction("&Profiling", self)
+        self.profiling_action.setCheckable(True)
+        self.profiling_action.setShortcut("Ctrl+Shift+p")
+        self.profiling_action.setStatusTip("Time FASLR's operations and show the latency of the last one.")
+        self.profiling_action.toggled.connect(self.toggle_profiling) # noqa
+
+        self.cprofile_action = QAction("Profile with &cProfile", self)
+        self.cprofile_action.setCheckable(True)
+        self.cprofile_action.setStatusTip("Also run the timed operations under cProfile, which slows them down.")
+        self.cprofile_action.toggled.connect(self.toggle_profiling) # noqa
+
+        self.export_profile_action = QAction("E&xport Profile...", self)
+        self.export_profile_action.setStatusTip("Save the timed operations as a Chrome trace.")
+        self.export_profile_action.triggered.connect(self.export_profile) # noqa
+
+        # Status bar overlay, created when profiling is first turned on.
+        self.profiler_label = None
+
         self.settings_action = QAction("&Settings")
         self.settings_action.setShortcut("Ctrl+Shift+t")
         self.settings_action.setStatusTip("Open settings dialog box.")
@@ -118,6 +164,13 @@ class MainMenuBar(QMenuBar):
         file_menu.addAction(self.settings_action)
 
         tools_menu.addAction(self.engine_action)
+        tools_menu.addAction(self.db_performance_action)
+        tools_menu.addAction(self.memory_action)
+        tools_menu.addAction(self.clear_results_action)
+        tools_menu.addSeparator()
+        tools_menu.addAction(self.profiling_action)
+        tools_menu.addAction(self.cprofile_action)
+        tools_menu.addAction(self.export_profile_action)
 
         help_menu.addAction(self.documentation_action)
         help_menu.addSeparator()
@@ -139,6 +192,77 @@ class MainMenuBar(QMenuBar):
         dlg = EngineDialog(self)
         dlg.show()
 
+    def display_db_performance(self) -> None:
+        dlg = DatabasePerformanceDialog(self)
+        dlg.show()
+
+    def display_memory_usage(self) -> MemoryUsageDialog:
+        dlg = MemoryUsageDialog(
+            tab_widget=self.parent.analysis_pane,
+            parent=self
+        )
+        dlg.show()
+
+        return dlg
+
+    def clear_results_cache(self) -> int:
+        """
+        Deletes the fitted results cached in the project database, so that every model is refit when next shown.
+
+        :return: The number of entries deleted.
+        """
+
+        count = RESULTS_CACHE.clear()
+
+        if self.parent is not None:
+            self.parent.statusBar().showMessage("Cleared %d cached results." % count)
+
+        return count
+
+    def toggle_profiling(self) -> None:
+        """
+        Turns the profiler on or off according to the profiling actions, showing the overlay while it is on.
+        """
+
+        if self.profiling_action.isChecked():
+            PROFILER.enable(use_cprofile=self.cprofile_action.isChecked())
+        else:
+            PROFILER.disable()
+
+        if self.parent is None:
+            return
+
+        if self.profiler_label is None:
+            self.profiler_label = ProfilerStatusLabel(profiler=PROFILER)
+            self.parent.statusBar().addPermanentWidget(self.profiler_label)
+
+        self.profiler_label.setVisible(PROFILER.enabled)
+
+    def export_profile(
+            self,
+            path: str = None
+    ) -> list:
+        """
+        Writes the timed operations to a Chrome trace, asking where unless a path is given.
+
+        :return: The paths of the files written.
+        """
+
+        if path is None:
+            path = QFileDialog.getSaveFileName(
+                parent=self,
+                caption='Export Profile',
+                directory=os.path.join(DEFAULT_DIALOG_PATH, PROFILE_TRACE_FILENAME),
+                filter='Chrome Trace (*.json)',
+                options=QT_FILEPATH_OPTION
+            )[0]
+
+        # Do nothing if the user cancels
+        if path == '':
+            return []
+
+        return PROFILER.export(path=path)
+
     def display_about(self) -> None:
         # function to display about dialog box
         dlg = AboutDialog(self)
@@ -0,0 +1,242 @@
+"""
+Headless engine for the a priori selection of the expected claims method.
+
+Projected ultimate claims are averaged across methods into an initial selection, adjusted to the cost level of the
+latest accident year with loss trend and tort reform indexes, and divided by the on-level earned premium, itself
+trended with premium indexes. The resulting claim ratios are averaged into a selected ratio per segment, which is
+converted back to expected claims at the cost level of each accident year.
+
+Every step is an array operation over (segment, origin), so that any number of segments, e.g., the index
+dimension of a chainladder triangle, is computed in one call. ExpectedLossModel renders one segment of the results.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from typing import (
+    List,
+    TYPE_CHECKING
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from chainladder import Chainladder
+
+# Ways in which claim ratios are averaged into the selected ratio
+APRIORI_AVERAGES = [
+    'simple',
+    'weighted'
+]
+
+
+class AprioriResults:
+    """
+    The intermediate and final arrays of an a priori selection. Arrays indexed by origin are of shape
+    (segment, origin).
+
+    :param origin: The origin periods.
+    :param segments: The name of each segment.
+    :param methods: The name of each method whose ultimates were averaged.
+    :param ultimates: Projected ultimate claims, of shape (segment, method, origin).
+    """
+    def __init__(
+            self,
+            origin: np.ndarray,
+            segments: list,
+            methods: list,
+            ultimates: np.ndarray,
+            initial_selected: np.ndarray,
+            premium: np.ndarray,
+            premium_factor: np.ndarray,
+            trended_premium: np.ndarray,
+            loss_factor: np.ndarray,
+            adjusted_ultimate: np.ndarray,
+            claim_ratio: np.ndarray,
+            selected_ratio: np.ndarray,
+            expected_claims: np.ndarray
+    ):
+
+        self.origin = origin
+        self.segments = segments
+        self.methods = methods
+        self.ultimates = ultimates
+        self.initial_selected = initial_selected
+        self.premium = premium
+        self.premium_factor = premium_factor
+        self.trended_premium = trended_premium
+        self.loss_factor = loss_factor
+        self.adjusted_ultimate = adjusted_ultimate
+        self.claim_ratio = claim_ratio
+        self.selected_ratio = selected_ratio
+        self.expected_claims = expected_claims
+
+    def segment_frame(
+            self,
+            segment: int = 0
+    ) -> pd.DataFrame:
+        """
+        The results of a single segment, with one row per origin period.
+        """
+
+        df = pd.DataFrame({'Origin': self.origin})
+
+        for i, method in enumerate(self.methods):
+            df['%s Ultimate' % method] = self.ultimates[segment, i]
+
+        for column, values in [
+            ('Initial Selected', self.initial_selected),
+            ('On-Level Earned Premium', self.premium),
+            ('Premium Factor', self.premium_factor),
+            ('Trended Premium', self.trended_premium),
+            ('Loss Factor', self.loss_factor),
+            ('Adjusted Ultimate', self.adjusted_ultimate),
+            ('Claim Ratio', self.claim_ratio),
+            ('Expected Claims', self.expected_claims)
+        ]:
+            df[column] = values[segment]
+
+        return df
+
+
+def combine_factors(
+        factors: list,
+        shape: tuple
+) -> np.ndarray:
+    """
+    Multiplies index factors together. Each set of factors is either of shape (origin,), in which case it applies to
+    every segment, or of shape (segment, origin).
+
+    :param factors: A list of factor arrays, possibly empty.
+    :param shape: The (segment, origin) shape of the result.
+    """
+
+    combined = np.ones(shape)
+
+    for factor in factors:
+        combined = combined * np.asarray(factor, dtype=float)
+
+    return combined
+
+
+def apriori_selection(
+        origin: np.ndarray,
+        ultimates: np.ndarray,
+        premium: np.ndarray,
+        premium_factors: list = None,
+        loss_factors: list = None,
+        method_weights: np.ndarray = None,
+        ratio_origins: np.ndarray = None,
+        average: str = 'simple',
+        segments: list = None,
+        methods: list = None
+) -> AprioriResults:
+    """
+    Calculates the a priori expected claims of every segment.
+
+    :param origin: The origin periods, of length n_origin.
+    :param ultimates: Projected ultimate claims, of shape (segment, method, origin).
+    :param premium: On-level earned premium, of shape (origin,) or (segment, origin).
+    :param premium_factors: Factors that trend premium to the latest level, e.g., from calculate_index_factors().
+    :param loss_factors: Factors that adjust claims to the latest cost level, e.g., loss trend and tort reform.
+    :param method_weights: Weight of each method in the initial selection. Methods are weighted equally by default.
+    :param ratio_origins: Boolean mask of the origin periods whose claim ratios are averaged. All by default.
+    :param average: 'simple' for the mean of the claim ratios, 'weighted' for the ratio of their sums.
+    :param segments: The name of each segment.
+    :param methods: The name of each method.
+    """
+
+    if average not in APRIORI_AVERAGES:
+        raise ValueError("Invalid average specified, must be one of %s." % APRIORI_AVERAGES)
+
+    ultimates = np.asarray(ultimates, dtype=float)
+    n_segments, n_methods, n_origin = ultimates.shape
+    shape = (n_segments, n_origin)
+
+    if method_weights is None:
+        method_weights = np.ones(n_methods)
+
+    method_weights = np.asarray(method_weights, dtype=float)
+
+    initial_selected = np.einsum('smo,m->so', ultimates, method_weights / method_weights.sum())
+
+    premium = np.broadcast_to(np.asarray(premium, dtype=float), shape)
+    premium_factor = combine_factors(factors=premium_factors or [], shape=shape)
+    loss_factor = combine_factors(factors=loss_factors or [], shape=shape)
+
+    trended_premium = premium * premium_factor
+    adjusted_ultimate = initial_selected * loss_factor
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        claim_ratio = adjusted_ultimate / trended_premium
+
+    if ratio_origins is None:
+        ratio_origins = np.ones(n_origin, dtype=bool)
+
+    ratio_origins = np.asarray(ratio_origins, dtype=bool)
+
+    included = ratio_origins & ~np.isnan(claim_ratio)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if average == 'simple':
+            selected_ratio = np.where(included, claim_ratio, 0).sum(axis=1) / included.sum(axis=1)
+        else:
+            selected_ratio = np.where(included, adjusted_ultimate, 0).sum(axis=1) / \
+                np.where(included, trended_premium, 0).sum(axis=1)
+
+        # Bring the expected claims, which are at the latest cost level, back to that of each origin period.
+        expected_claims = selected_ratio[:, None] * trended_premium / loss_factor
+
+    return AprioriResults(
+        origin=np.asarray(origin),
+        segments=list(range(n_segments)) if segments is None else list(segments),
+        methods=list(range(n_methods)) if methods is None else list(methods),
+        ultimates=ultimates,
+        initial_selected=initial_selected,
+        premium=np.array(premium),
+        premium_factor=premium_factor,
+        trended_premium=trended_premium,
+        loss_factor=loss_factor,
+        adjusted_ultimate=adjusted_ultimate,
+        claim_ratio=claim_ratio,
+        selected_ratio=selected_ratio,
+        expected_claims=expected_claims
+    )
+
+
+def projected_ultimates(
+        triangles: List[Chainladder]
+) -> tuple:
+    """
+    Stacks the ultimates of fitted models into the array taken by apriori_selection(). The models must share their
+    origin periods and index, each model being one method, fitted to a single column.
+
+    :return: A tuple (ultimates, segments), with ultimates of shape (segment, method, origin).
+    """
+
+    ultimates = np.stack(
+        [
+            triangle.ultimate_.set_backend('numpy').values[:, 0, :, -1] for triangle in triangles
+        ],
+        axis=1
+    )
+
+    key_labels = triangles[0].ultimate_.key_labels
+    segments = [
+        ' '.join(str(key) for key in keys) for keys in triangles[0].ultimate_.index[key_labels].itertuples(index=False)
+    ]
+
+    return ultimates, segments
+
+
+def align_factors(
+        index: pd.DataFrame,
+        origin: np.ndarray
+) -> np.ndarray:
+    """
+    Lines up the factors of an index, in the Origin, Change, Factor format, with annual origin periods. Periods
+    not covered by the index are NaN.
+    """
+
+    return index.set_index('Origin')['Factor'].reindex(
+        np.asarray(origin).astype(int)
+    ).to_numpy(dtype=float)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import numpy as np
 import pandas as pd
 
 from faslr.base_table import (
@@ -13,23 +14,29 @@ from faslr.common import (
 from faslr.grid_header import GridTableView
 
 from faslr.index import (
-    calculate_index_factors,
+    INDEX_FACTOR_CACHE,
     IndexInventory,
     IndexTableModel,
     IndexTableView
 )
 
+from faslr.methods.apriori import (
+    align_factors,
+    apriori_selection,
+    projected_ultimates
+)
+
 from faslr.style.triangle import (
+    BLANK_TEXT,
+    PERCENT_STYLE,
     RATIO_STYLE,
     VALUE_STYLE
 )
 
 from faslr.utilities import (
     auto_bi_olep,
-    fetch_cdf,
-    fetch_latest_diagonal,
     fetch_origin,
-    fetch_ultimate,
+    fetch_results,
     ppa_loss_trend,
     ppa_premium_trend,
     subset_dict,
@@ -61,6 +68,7 @@ from typing import (
 
 if TYPE_CHECKING:
     from chainladder import Chainladder
+    from faslr.index.repository import IndexRepository
 
 sample_indexes = {
     tort_index['Name'][0]: tort_index,
@@ -68,116 +76,259 @@ sample_indexes = {
     ppa_premium_trend['Name'][0]: ppa_premium_trend
 }
 
+# Sample indexes are never edited, so their factors are cached under a single version.
+SAMPLE_INDEX_VERSION = 0
+
+
+def fetch_sample_index(name: str) -> pd.DataFrame:
+    """
+    Returns a sample index with its factors, which are calculated once per index.
+    """
+
+    df_idx = pd.DataFrame(
+        subset_dict(
+            input_dict=sample_indexes[name],
+            keys=['Origin', 'Change']
+        )
+    )
+
+    return df_idx.assign(
+        Factor=INDEX_FACTOR_CACHE.get_index_factors(
+            index_id=name,
+            version=SAMPLE_INDEX_VERSION,
+            changes=df_idx['Change'].to_numpy()
+        )
+    )
+
+
 class ExpectedLossModel(FAbstractTableModel):
+    """
+    Renders the a priori selection of a segment, as calculated by apriori_selection(). Index columns are added and
+    removed with set_index() and remove_index(), each of which recalculates the selection.
+
+    :param triangles: Fitted models, one per method, whose ultimates are averaged into the initial selection.
+    :param premium: On-level earned premium by origin period.
+    :param segment: The segment displayed.
+    """
     def __init__(
             self,
-            triangles: List[Chainladder]
+            triangles: List[Chainladder],
+            premium: list = None,
+            segment: int = 0
     ):
         super().__init__()
 
-        self.origin = fetch_origin(triangles[0])
-        self.reported = fetch_latest_diagonal(triangles[0])
-        self.paid = fetch_latest_diagonal(triangles[1])
-        self.reported_cdf = fetch_cdf(triangles[0])
-        self.paid_cdf = fetch_cdf(triangles[1])
-        self.reported_ultimate = fetch_ultimate(triangles[0])
-        self.paid_ultimate = fetch_ultimate(triangles[1])
+        self.segment = segment
 
+        self.premium = auto_bi_olep if premium is None else premium
 
-        self._data = pd.DataFrame({
-            'Accident Year': self.origin,
-            'Reported Losses': self.reported,
-            'Paid Losses': self.paid,
-            'Reported CDF': self.reported_cdf,
-            'Paid CDF': self.paid_cdf,
-            'Reported Ultimate': self.reported_ultimate,
-            'Paid Ultimate': self.paid_ultimate
-        })
+        self.origin = np.asarray(fetch_origin(triangles[0]))
+        self.valuation_date = triangles[0].X_.valuation_date
 
-        self._data['Initial Selected'] = (self._data['Reported Ultimate'] + self._data['Paid Ultimate']) / 2
+        self.methods = []
+        self.latest = []
+        self.cdf = []
 
-        self._data['On-Level Earned Premium'] = auto_bi_olep
+        for triangle in triangles:
+            results = fetch_results(triangle=triangle)
+            self.methods.append(results.column.replace(' Claims', ''))
+            self.latest.append(results.latest_diagonal)
+            self.cdf.append(results.cdf)
 
-    def data(self, index: QModelIndex, role: int = ...) -> Any:
+        self.ultimates, self.segments = projected_ultimates(triangles=triangles)
 
-        colname = self._data.columns[index.column()]
+        # Factors of the indexes applied to premium and to losses, by index name.
+        self.premium_indexes = {}
+        self.loss_indexes = {}
 
-        if role == Qt.ItemDataRole.DisplayRole:
+        self.results = None
 
-            value = self._data.iloc[index.row(), index.column()]
+        # Two-level header, as a list of (label, sub-labels) tuples, and the display format of each column.
+        self.header_groups = []
+        self.styles = []
+
+        self.calculate()
 
-            if colname in [
-                'Reported Losses',
-                'Paid Losses',
-                'Reported Ultimate',
-                'Paid Ultimate',
-                'Initial Selected',
-                'On-Level Earned Premium'
-            ]:
+    def calculate(self) -> None:
+        """
+        Recalculates the a priori selection and lays out the columns of the displayed segment.
+        """
+
+        self.beginResetModel()
+
+        self.results = apriori_selection(
+            origin=self.origin,
+            ultimates=self.ultimates,
+            premium=self.premium,
+            premium_factors=list(self.premium_indexes.values()),
+            loss_factors=list(self.loss_indexes.values()),
+            segments=self.segments,
+            methods=self.methods
+        )
+
+        results = self.results
+        segment = self.segment
+
+        groups = [
+            ("Accident\nYear", [(None, self.origin, None)]),
+            (
+                "Claims at %s" % self.valuation_date.strftime('%m/%d/%y'),
+                [(method, latest, VALUE_STYLE) for method, latest in zip(self.methods, self.latest)]
+            ),
+            (
+                "CDF to Ultimate",
+                [(method, cdf, RATIO_STYLE) for method, cdf in zip(self.methods, self.cdf)]
+            ),
+            (
+                "Projected Ultimate Claims",
+                [(method, results.ultimates[segment, i], VALUE_STYLE) for i, method in enumerate(self.methods)]
+            ),
+            ("Initial Selected\nUltimate Claims", [(None, results.initial_selected[segment], VALUE_STYLE)]),
+            ("On-Level\nEarned Premium", [(None, results.premium[segment], VALUE_STYLE)])
+        ]
+
+        for name, factors in self.premium_indexes.items():
+            groups.append(("Premium Index:\n" + name, [(None, factors, RATIO_STYLE)]))
+
+        if self.premium_indexes:
+            groups.append(
+                ("Trended On-Level\nEarned Premium", [(None, results.trended_premium[segment], VALUE_STYLE)])
+            )
 
-                display_value = VALUE_STYLE.format(value)
+        for name, factors in self.loss_indexes.items():
+            groups.append(("Loss Index:\n" + name, [(None, factors, RATIO_STYLE)]))
 
-            elif colname in [
-                    'Reported CDF',
-                    'Paid CDF'
-            ]:
+        if self.loss_indexes:
+            groups.append(
+                ("Adjusted Ultimate\nClaims", [(None, results.adjusted_ultimate[segment], VALUE_STYLE)])
+            )
 
-                display_value = RATIO_STYLE.format(value)
+        groups.extend([
+            ("Adjusted\nClaim Ratio", [(None, results.claim_ratio[segment], PERCENT_STYLE)]),
+            ("Expected\nClaims", [(None, results.expected_claims[segment], VALUE_STYLE)])
+        ])
 
-            else:
-                print(str(value))
-                display_value = str(value)
+        columns = []
+        self.header_groups = []
+        self.styles = []
+
+        for label, series in groups:
+            sub_labels = [sub_label for sub_label, values, style in series if sub_label is not None]
+            self.header_groups.append((label, sub_labels))
+            for sub_label, values, style in series:
+                columns.append(values)
+                self.styles.append(style)
+
+        self._data = pd.DataFrame(dict(enumerate(columns)))
 
-            return display_value
+        self.endResetModel()
 
-    def insertColumn(
+    def set_index(
             self,
-            column: int,
-            parent: QModelIndex = ...
-    ) -> bool:
+            prem_loss: str,
+            name: str,
+            index: pd.DataFrame
+    ) -> None:
         """
-        Adds a column to the model. This is triggered when the user adds a column to the ._data DataFrame.
+        Applies an index, in the Origin, Change, Factor format, to premium or to losses.
+
+        :param prem_loss: Either 'premium' or 'loss'.
         """
-        idx = QModelIndex()
 
-        new_column = self.columnCount()
+        indexes = self.premium_indexes if prem_loss == 'premium' else self.loss_indexes
 
-        self.beginInsertColumns(
-            idx,
-            new_column,
-            new_column
+        indexes[name] = align_factors(
+            index=index,
+            origin=self.origin
         )
 
-        self.endInsertColumns()
-        self.layoutChanged.emit() # noqa
+        self.calculate()
 
-        return True
+    def remove_index(
+            self,
+            prem_loss: str,
+            name: str
+    ) -> None:
 
-    def setData(self, index: QModelIndex, value: Any, role: int = ...) -> bool:
+        indexes = self.premium_indexes if prem_loss == 'premium' else self.loss_indexes
 
-        if role == Qt.ItemDataRole.EditRole:
+        if indexes.pop(name, None) is not None:
+            self.calculate()
 
-            self._data['factor'] = list(value)
+    def data(self, index: QModelIndex, role: int = ...) -> Any:
 
-            self.layoutChanged.emit()
+        if role == Qt.ItemDataRole.DisplayRole:
 
-        return True
+            value = self._data.iloc[index.row(), index.column()]
+            style = self.styles[index.column()]
+
+            if style is None:
+                return str(value)
+            elif pd.isna(value):
+                return BLANK_TEXT
+            else:
+                return style.format(value)
 
 
 class ExpectedLossView(GridTableView):
     def __int__(self):
         super().__init__()
 
-    # def insert_column(self):
+    def setHeaderGroups( # noqa
+            self,
+            groups: list
+    ) -> None:
+        """
+        Labels the horizontal header from a list of (label, sub-labels) tuples. Columns without sub-labels span both
+        levels of the header.
+        """
+
+        column = 0
+
+        for label, sub_labels in groups:
+            if sub_labels:
+                self.hheader.setSpan(
+                    row=0,
+                    column=column,
+                    row_span_count=0,
+                    column_span_count=len(sub_labels)
+                )
+                for i, sub_label in enumerate(sub_labels):
+                    self.hheader.setCellLabel(
+                        row=1,
+                        column=column + i,
+                        label=sub_label
+                    )
+                width = len(sub_labels)
+            else:
+                self.hheader.setSpan(
+                    row=0,
+                    column=column,
+                    row_span_count=2,
+                    column_span_count=0
+                )
+                width = 1
+
+            self.hheader.setCellLabel(
+                row=0,
+                column=column,
+                label=label
+            )
+
+            column += width
 
 
 class ExpectedLossWidget(QWidget):
     def __init__(
             self,
-            triangles: List[Chainladder]
+            triangles: List[Chainladder],
+            index_repository: IndexRepository = None
     ):
         super().__init__()
 
+        # Where indexes are loaded from. The sample indexes are offered if there is none.
+        self.index_repository = index_repository
+
         self.setWindowTitle("Expected Loss Method")
 
         self.layout = QVBoxLayout()
@@ -197,140 +348,43 @@ class ExpectedLossWidget(QWidget):
         self.selection_view = ExpectedLossView()
         self.selection_model = ExpectedLossModel(triangles=triangles)
         self.selection_view.setModel(self.selection_model)
-        self.selection_view.setGridHeaderView(
-            orientation=Qt.Orientation.Horizontal,
-            levels=2
-        )
-
-        self.selection_view.hheader.setSpan(
-            row=0,
-            column=0,
-            row_span_count=2,
-            column_span_count=1
-        )
-
-        self.selection_view.hheader.setSpan(
-            row=0,
-            column=1,
-            row_span_count=0,
-            column_span_count=2
-        )
-
-        self.selection_view.hheader.setSpan(
-            row=0,
-            column=3,
-            row_span_count=0,
-            column_span_count=2
-        )
-
-        self.selection_view.hheader.setSpan(
-            row=0,
-            column=5,
-            row_span_count=0,
-            column_span_count=2
-        )
-
-        self.selection_view.hheader.setSpan(
-            row=0,
-            column=7,
-            row_span_count=2,
-            column_span_count=0
-        )
-
-        self.selection_view.hheader.setSpan(
-            row=0,
-            column=8,
-            row_span_count=2,
-            column_span_count=0
-        )
-
-        self.selection_view.hheader.setSpan(
-            row=0,
-            column=9,
-            row_span_count=2,
-            column_span_count=0
-        )
 
-        self.selection_view.hheader.setCellLabel(
-            row=0,
-            column=0,
-            label="Accident\nYear"
-        )
+        self.selected_ratio_label = QLabel()
 
-        self.selection_view.hheader.setCellLabel(
-            row=0,
-            column=1,
-            label="Claims at 12/31/08\n"
-        )
+        self.selection_model.modelReset.connect(self.update_selection) # noqa
+        self.update_selection()
 
-        self.selection_view.hheader.setCellLabel(
-            row=1,
-            column=1,
-            label="Reported"
-        )
+        ly_selection_tab = QVBoxLayout()
+        ly_selection_tab.addWidget(self.selection_view)
+        ly_selection_tab.addWidget(self.selected_ratio_label)
+        self.selection_tab.setLayout(ly_selection_tab)
 
-        self.selection_view.hheader.setCellLabel(
-            row=1,
-            column=2,
-            label="Paid"
-        )
+        self.layout.addWidget(self.main_tabs)
 
-        self.selection_view.hheader.setCellLabel(
-            row=0,
-            column=3,
-            label="CDF to Ultimate"
-        )
+        self.setLayout(self.layout)
 
-        self.selection_view.hheader.setCellLabel(
-            row=1,
-            column=3,
-            label="Reported"
-        )
 
-        self.selection_view.hheader.setCellLabel(
-            row=1,
-            column=4,
-            label="Paid"
-        )
+    def update_selection(self) -> None:
+        """
+        Rebuilds the header of the selection table to match the columns of the model.
+        """
 
-        self.selection_view.hheader.setCellLabel(
-            row=0,
-            column=5,
-            label="Projected Ultimate Claims"
+        self.selection_view.setGridHeaderView(
+            orientation=Qt.Orientation.Horizontal,
+            levels=2
         )
 
-        self.selection_view.hheader.setCellLabel(
-            row=1,
-            column=5,
-            label="Reported"
-        )
+        self.selection_view.setHeaderGroups(groups=self.selection_model.header_groups)
 
-        self.selection_view.hheader.setCellLabel(
-            row=1,
-            column=6,
-            label="Paid"
-        )
+        # A header that replaces another one while the view is visible is not shown on its own.
+        self.selection_view.hheader.show()
 
-        self.selection_view.hheader.setCellLabel(
-            row=0,
-            column=7,
-            label="Initial Selected\nUltimate Claims"
-        )
+        results = self.selection_model.results
 
-        self.selection_view.hheader.setCellLabel(
-            row=0,
-            column=8,
-            label="On-Level\nEarned Premium"
+        self.selected_ratio_label.setText(
+            "Selected Claim Ratio: " + PERCENT_STYLE.format(results.selected_ratio[self.selection_model.segment])
         )
 
-        ly_selection_tab = QVBoxLayout()
-        ly_selection_tab.addWidget(self.selection_view)
-        self.selection_tab.setLayout(ly_selection_tab)
-
-        self.layout.addWidget(self.main_tabs)
-
-        self.setLayout(self.layout)
-
 
 class ExpectedLossIndex(QWidget):
     def __init__(
@@ -415,14 +469,7 @@ class IndexSelector(QWidget):
             if index_list_view.model.rowCount() != 0:
                 return
 
-        index = sample_indexes[selected_indexes[0].data()]
-
-        idx_dict = subset_dict(
-            input_dict=index,
-            keys=['Origin', 'Change']
-        )
-
-        df_idx = pd.DataFrame(idx_dict)
+        df_idx = self.fetch_index(name=selected_indexes[0].data())
 
         model_idx = QModelIndex()
         self.parent.index_model.setData(
@@ -432,6 +479,31 @@ class IndexSelector(QWidget):
         )
 
 
+    def fetch_index(
+            self,
+            name: str
+    ) -> pd.DataFrame:
+
+        repository = self.parent.parent.index_repository
+
+        if repository is None:
+            return fetch_sample_index(name=name)
+
+        return repository.fetch_index(name=name)
+
+    def index_inventory(self) -> list:
+        """
+        The indexes that can be added, in the format displayed by IndexInventory.
+        """
+
+        repository = self.parent.parent.index_repository
+
+        if repository is None:
+            return list(sample_indexes.values())
+
+        return repository.load().inventory()
+
+
 class IndexListView(QWidget):
     def __init__(
             self,
@@ -507,11 +579,7 @@ class IndexListView(QWidget):
         current_count = self.model.rowCount()
 
         index_inventory = IndexInventory(
-            indexes=[
-                tort_index,
-                ppa_loss_trend,
-                ppa_premium_trend
-            ],
+            indexes=self.parent.index_inventory(),
             parent=self
         )
 
@@ -526,46 +594,23 @@ class IndexListView(QWidget):
                 role=Qt.ItemDataRole.DisplayRole
             )
 
-            idx_dict = sample_indexes[idx_name]
+            idx_df = self.parent.fetch_index(name=idx_name)
 
-            idx_dict = subset_dict(
-                input_dict=idx_dict,
-                keys=['Origin', 'Change']
+            self.parent.parent.parent.selection_model.set_index(
+                prem_loss=self.prem_loss,
+                name=idx_name,
+                index=idx_df
             )
 
-            idx_df = pd.DataFrame(idx_dict)
-
-            idx_df = calculate_index_factors(index=idx_df)
-
-            self.parent.parent.parent.selection_model.setData(
-                index=QModelIndex(),
-                value=idx_df['Factor'],
-                role=Qt.ItemDataRole.EditRole
-            )
-
-            column_position = self.parent.parent.parent.selection_model.columnCount()
-
-            self.parent.parent.parent.selection_model.insertColumn(column_position+1)
-            self.parent.parent.parent.selection_model.layoutChanged.emit()
-            self.parent.parent.parent.selection_view.hheader.model().insertColumn(column_position + 1)
-
-            if self.prem_loss == "premium":
-                header_prefix = "Premium Index:\n"
-            else:
-                header_prefix = "Loss Index:\n"
-            self.parent.parent.parent.selection_view.hheader.setCellLabel(
-                row=0,
-                column=9,
-                label=header_prefix + idx_name
-            )
-
-
-
     def remove_premium_index(self) -> None:
 
         selected_indexes = self.index_view.selectedIndexes()
 
-        for idx in selected_indexes:
+        for idx in sorted(selected_indexes, key=lambda x: x.row(), reverse=True):
+            self.parent.parent.parent.selection_model.remove_index(
+                prem_loss=self.prem_loss,
+                name=idx.data()
+            )
             self.model.removeRow(idx.row())
 
         idx_count = self.model.rowCount()
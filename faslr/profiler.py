@@ -0,0 +1,331 @@
+"""
+Profiling mode, toggled from the Tools menu. Named operations, such as recalculating factors or fitting a tail, are
+wrapped in timing spans that cost next to nothing while profiling is off. While it is on, each span is recorded into
+an in-memory ring buffer, the latency of the last operation is shown in the status bar, and the outermost spans can
+optionally be run under cProfile. The spans can be exported in the Chrome trace format, which chrome://tracing,
+Perfetto and speedscope open, for offline analysis.
+"""
+from __future__ import annotations
+
+import cProfile
+import functools
+import inspect
+import json
+import os
+import pstats
+import threading
+import time
+
+from collections import deque
+
+from contextlib import contextmanager
+
+from faslr.constants import PROFILER_SIZE
+
+from PyQt6.QtCore import pyqtSignal
+
+from PyQt6.QtWidgets import QLabel
+
+from typing import (
+    Callable,
+    Iterator
+)
+
+
+class SpanRecord:
+    """
+    A single timed operation.
+    """
+    __slots__ = (
+        'name',
+        'start',
+        'duration',
+        'depth',
+        'thread_id',
+        'thread_name'
+    )
+
+    def __init__(
+            self,
+            name: str,
+            start: float,
+            duration: float,
+            depth: int,
+            thread_id: int,
+            thread_name: str
+    ):
+
+        self.name = name
+        self.start = start
+        self.duration = duration
+        self.depth = depth
+        self.thread_id = thread_id
+        self.thread_name = thread_name
+
+
+class Profiler:
+    """
+    Records timing spans while enabled. Spans may be recorded from the database worker thread while the GUI thread
+    reads them, so access goes through a lock.
+
+    :param size: The number of spans kept before the oldest ones are discarded.
+    """
+    def __init__(
+            self,
+            size: int = PROFILER_SIZE
+    ):
+
+        self.enabled = False
+        self.use_cprofile = False
+
+        self.records = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+        # Called with each SpanRecord as it completes, from the thread that ran the span.
+        self.listeners = []
+
+        # Accumulated cProfile statistics of the outermost spans.
+        self.stats = None
+
+        # Nesting depth of the spans running on each thread.
+        self.local = threading.local()
+
+    def enable(
+            self,
+            use_cprofile: bool = False
+    ) -> None:
+
+        self.use_cprofile = use_cprofile
+        self.enabled = True
+
+    def disable(self) -> None:
+
+        self.enabled = False
+
+    def clear(self) -> None:
+
+        with self.lock:
+            self.records.clear()
+            self.stats = None
+
+    def __len__(self) -> int:
+
+        return len(self.records)
+
+    @contextmanager
+    def span(
+            self,
+            name: str
+    ) -> Iterator[None]:
+        """
+        Times the enclosed block as an operation called name.
+        """
+
+        if not self.enabled:
+            yield
+            return
+
+        depth = getattr(self.local, 'depth', 0)
+        self.local.depth = depth + 1
+
+        profile = None
+
+        if self.use_cprofile and depth == 0:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler, e.g., a debugger, is already active.
+                profile = None
+
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+
+            if profile is not None:
+                profile.disable()
+                self.add_stats(profile=profile)
+
+            self.local.depth = depth
+
+            thread = threading.current_thread()
+
+            self.record(
+                SpanRecord(
+                    name=name,
+                    start=start,
+                    duration=duration,
+                    depth=depth,
+                    thread_id=thread.ident,
+                    thread_name=thread.name
+                )
+            )
+
+    def record(
+            self,
+            record: SpanRecord
+    ) -> None:
+
+        with self.lock:
+            self.records.append(record)
+
+        for listener in list(self.listeners):
+            listener(record)
+
+    def add_stats(
+            self,
+            profile: cProfile.Profile
+    ) -> None:
+
+        with self.lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+
+    def to_chrome_trace(self) -> dict:
+        """
+        Returns the recorded spans as complete events of the Chrome trace format, with timestamps in microseconds
+        since the first span.
+        """
+
+        with self.lock:
+            records = list(self.records)
+
+        origin = min((record.start for record in records), default=0)
+        pid = os.getpid()
+
+        events = [
+            {
+                'name': record.name,
+                'cat': 'faslr',
+                'ph': 'X',
+                'ts': (record.start - origin) * 1e6,
+                'dur': record.duration * 1e6,
+                'pid': pid,
+                'tid': record.thread_id,
+                'args': {'depth': record.depth}
+            }
+            for record in records
+        ]
+
+        # Name the threads, so that the viewers label their tracks.
+        events += [
+            {
+                'name': 'thread_name',
+                'ph': 'M',
+                'pid': pid,
+                'tid': thread_id,
+                'args': {'name': thread_name}
+            }
+            for thread_id, thread_name in {(r.thread_id, r.thread_name) for r in records}
+        ]
+
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms'
+        }
+
+    def export(
+            self,
+            path: str
+    ) -> list:
+        """
+        Writes the spans as a Chrome trace, along with the cProfile statistics if any were collected.
+
+        :param path: The path of the trace. The statistics are written to the same path with a .prof extension, and
+        can be read with pstats or snakeviz.
+        :return: The paths of the files written.
+        """
+
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+
+        paths = [path]
+
+        with self.lock:
+            if self.stats is not None:
+                stats_path = os.path.splitext(path)[0] + '.prof'
+                self.stats.dump_stats(stats_path)
+                paths.append(stats_path)
+
+        return paths
+
+
+# The profiler shared by the whole application.
+PROFILER = Profiler()
+
+
+def profile_span(name: str):
+    """
+    Times the enclosed block with the application profiler, e.g., with profile_span("Import file"): ...
+    """
+
+    return PROFILER.span(name)
+
+
+def profiled(name: str) -> Callable:
+    """
+    Decorator that times each call of a function with the application profiler.
+    """
+
+    def decorator(func: Callable) -> Callable:
+
+        # Qt drops the arguments of a signal that a slot does not accept. It cannot tell how many the wrapper
+        # accepts, so the wrapper drops them instead, and decorated methods can still be connected to signals.
+        code = func.__code__
+        max_args = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if max_args is not None:
+                args = args[:max_args]
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with PROFILER.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class ProfilerStatusLabel(QLabel):
+    """
+    Status bar overlay displaying the latency of the last operation timed by a profiler. Spans completed on other
+    threads are passed through a signal, so that the label is only touched from the GUI thread.
+    """
+
+    span_finished = pyqtSignal(str, float)
+
+    def __init__(
+            self,
+            profiler: Profiler = PROFILER
+    ):
+        super().__init__()
+
+        self.profiler = profiler
+
+        self.span_finished.connect(self.show_span) # noqa
+
+        self.profiler.listeners.append(self.on_span)
+
+    def on_span(
+            self,
+            record: SpanRecord
+    ) -> None:
+
+        # Only show whole operations, not the steps nested within them.
+        if record.depth == 0:
+            self.span_finished.emit(record.name, record.duration * 1000) # noqa
+
+    def show_span(
+            self,
+            name: str,
+            duration: float
+    ) -> None:
+
+        self.setText("%s: %.1f ms" % (name, duration))
@@ -1,5 +1,11 @@
 from __future__ import annotations
-from faslr.connection import connect_db
+from faslr.connection import (
+    build_project_tree,
+    get_db_client,
+    query_project_tree
+)
+
+from faslr.database import run_db_job
 
 from faslr.data import (
     DataPane
@@ -40,7 +46,14 @@ from PyQt6.QtWidgets import (
     QTreeView
 )
 
-from typing import TYPE_CHECKING
+from functools import partial
+
+from sqlalchemy.orm.session import Session
+
+from typing import (
+    Callable,
+    TYPE_CHECKING
+)
 from uuid import uuid4
 
 if TYPE_CHECKING:  # pragma: no coverage
@@ -108,102 +121,172 @@ class ProjectDialog(QDialog):
             main_window: MainWindow
     ) -> None:
 
-        # connect to the database
-        session, connection = connect_db(db_path=main_window.core.db)
-
         # Take values from the form
         country_text = self.country_edit.text()
         state_text = self.state_edit.text()
         lob_text = self.lob_edit.text()
 
-        # Create an entries for the project tree
-        country = ProjectItem(
-            country_text,
-            set_bold=True
+        def on_result(result: tuple) -> None:
+
+            add_project_items(
+                main_window=main_window,
+                country_text=country_text,
+                state_text=state_text,
+                lob_text=lob_text,
+                result=result
+            )
+
+            print("new project created")
+
+        # The database writes happen on the database worker, the tree is updated once they are committed.
+        run_db_job(
+            db_path=main_window.core.db,
+            job=partial(
+                save_project,
+                country_text=country_text,
+                state_text=state_text,
+                lob_text=lob_text
+            ),
+            client=get_db_client(main_window),
+            on_result=on_result,
+            write=True
+        )
+
+        self.close()
+
+
+def save_project(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        country_text: str = None,
+        state_text: str = None,
+        lob_text: str = None
+) -> tuple:
+    """
+    Writes a new project to the database. Creates the country and state if they do not already exist.
+
+    :return: A tuple of (level, country_uuid, state_uuid, lob_uuid), where level is the highest level of the
+    hierarchy that had to be created: 'country', 'state', or 'lob'.
+    """
+
+    # Check if the country is already in the database
+    country_query = session.query(CountryTable).filter(CountryTable.country_name == country_text)
+
+    # If the country is not already in the database, create a new entry for it
+    if country_query.first() is None:
+
+        level = 'country'
+
+        # Generate project UUIDs for each of the three fields
+        country_uuid = str(uuid4())
+        state_uuid = str(uuid4())
+        lob_uuid = str(uuid4())
+
+        # Create location ids for country and state
+        new_country_location = LocationTable(hierarchy="country")
+
+        new_state_location = LocationTable(hierarchy="state")
+
+        session.add(new_country_location)
+        session.add(new_state_location)
+
+        # flush the session to get the newly created location ids
+        session.flush()
+
+        # Create state and country db entries
+        new_country = CountryTable(
+            country_name=country_text,
+            project_id=country_uuid,
+            location_id=new_country_location.location_id
         )
 
-        state = ProjectItem(
-            state_text,
+        new_state = StateTable(
+            state_name=state_text,
+            project_id=state_uuid,
+            location_id=new_state_location.location_id
         )
 
-        lob = ProjectItem(
-            lob_text,
-            text_color=QColor(
-                155,
-                0,
-                0
-            )
+        # Create corresponding projects
+        new_country_project = ProjectTable(
+            project_id=country_uuid
+        )
+
+        new_state_project = ProjectTable(
+            project_id=state_uuid
+        )
+
+        # fill out object hierarchy
+        new_country.state = [new_state]
+        new_country_project.country = [new_country]
+        new_state_project.state = [new_state]
+
+        # Add entries to the database session
+        session.add(new_country_project)
+        session.add(new_state_project)
+
+        # define lob entry, we need to do this after state and country because we depend on the ids
+        new_lob_project = ProjectTable(
+            project_id=lob_uuid
+        )
+
+        lob_location = new_state_location.location_id
+
+        new_lob = LOBTable(
+            lob_type=lob_text,
+            project_id=lob_uuid,
+            location_id=lob_location
         )
 
-        # Check if the country is already in the database
-        country_query = session.query(CountryTable).filter(CountryTable.country_name == country_text)
+        new_lob.country = new_country
+        new_lob.state = new_state
+        new_lob_project.lob = [new_lob]
+
+        session.add(new_lob_project)
+
+    # Otherwise, check if the state is already in the database
+    else:
+
+        existing_country = country_query.first()
+        country_id = existing_country.country_id
+        country_uuid = existing_country.project_id
+
+        # If the state is in the database, this query should return it
+        state_query = session.query(StateTable).filter(
+            StateTable.state_name == state_text
+        ).filter(
+            StateTable.country_id == country_id
+        )
 
-        # new_project = ProjectTable()
+        # If the state isn't already in the database, create an entry for it
+        if state_query.first() is None:
 
-        # If the country is not already in the database, create a new entry for it
-        if country_query.first() is None:
+            level = 'state'
 
-            # Generate project UUIDs for each of the three fields
-            country_uuid = str(uuid4())
+            # create project ids for state and lob only, since country uuid already exists
             state_uuid = str(uuid4())
             lob_uuid = str(uuid4())
 
-            # Create location ids for country and state
-            new_country_location = LocationTable(hierarchy="country")
-
             new_state_location = LocationTable(hierarchy="state")
-
-            session.add(new_country_location)
             session.add(new_state_location)
-
-            # flush the session to get the newly created location ids
+            # flush the session to get the newly created location id
             session.flush()
 
-            # Create state and country db entries
-            new_country = CountryTable(
-                country_name=country_text,
-                project_id=country_uuid,
-                location_id=new_country_location.location_id
-            )
-
+            # Create database entry for the state and its associated project
             new_state = StateTable(
                 state_name=state_text,
                 project_id=state_uuid,
                 location_id=new_state_location.location_id
             )
 
-            # Create corresponding projects
-            new_country_project = ProjectTable(
-                project_id=country_uuid
-            )
-
             new_state_project = ProjectTable(
                 project_id=state_uuid
             )
 
-            # fill out object hierarchy
-            new_country.state = [new_state]
-            new_country_project.country = [new_country]
-            new_state_project.state = [new_state]
-
-            # Add entries into the project tree
-            country.appendRow([state, QStandardItem(state_uuid)])
-            state.appendRow([lob, QStandardItem(lob_uuid)])
-
-            main_window.project_model.project_root.appendRow([
-                country,
-                QStandardItem(country_uuid)
-            ])
+            new_state.country = existing_country
 
-            # Add entries to the database session
-            session.add(new_country_project)
             session.add(new_state_project)
 
-            # define lob entry, we need to do this after state and country because we depend on the ids
-            new_lob_project = ProjectTable(
-                project_id=lob_uuid
-            )
-
+            # Define the new LOB
             lob_location = new_state_location.location_id
 
             new_lob = LOBTable(
@@ -212,132 +295,120 @@ class ProjectDialog(QDialog):
                 location_id=lob_location
             )
 
-            new_lob.country = new_country
+            new_lob_project = ProjectTable(
+                project_id=lob_uuid
+            )
+
+            new_lob.country = existing_country
             new_lob.state = new_state
             new_lob_project.lob = [new_lob]
 
             session.add(new_lob_project)
 
-        # Otherwise, check if the state is already in the database
+        # If the state already exists append the LOB to it
         else:
 
-            existing_country = country_query.first()
-            country_id = existing_country.country_id
-            country_uuid = existing_country.project_id
+            level = 'lob'
 
-            # If the state is in the database, this query should return it
-            state_query = session.query(StateTable).filter(
-                StateTable.state_name == state_text
-            ).filter(
-                StateTable.country_id == country_id
-            )
-
-            # If the state isn't already in the database, create an entry for it
-            if state_query.first() is None:
-
-                # create project ids for state and lob only, since country uuid already exists
-                state_uuid = str(uuid4())
-                lob_uuid = str(uuid4())
-
-                new_state_location = LocationTable(hierarchy="state")
-                session.add(new_state_location)
-                # flush the session to get the newly created location id
-                session.flush()
-
-                # Create database entry for the state and its associated project
-                new_state = StateTable(
-                    state_name=state_text,
-                    project_id=state_uuid,
-                    location_id=new_state_location.location_id
-                )
+            existing_state = state_query.first()
+            state_uuid = existing_state.project_id
+            lob_uuid = str(uuid4())
 
-                new_state_project = ProjectTable(
-                    project_id=state_uuid
-                )
+            lob_location = existing_state.location_id
 
-                new_state.country = existing_country
+            new_lob = LOBTable(
+                lob_type=lob_text,
+                project_id=lob_uuid,
+                location_id=lob_location
+            )
 
-                session.add(new_state_project)
+            new_lob.country = existing_country
+            new_lob.state = existing_state
 
-                # Define the new LOB
-                lob_location = new_state_location.location_id
+            new_lob_project = ProjectTable(
+                project_id=lob_uuid
+            )
 
-                new_lob = LOBTable(
-                    lob_type=lob_text,
-                    project_id=lob_uuid,
-                    location_id=lob_location
-                )
+            session.add(new_lob)
+            session.add(new_lob_project)
 
-                new_lob_project = ProjectTable(
-                    project_id=lob_uuid
-                )
+    return level, country_uuid, state_uuid, lob_uuid
 
-                new_lob.country = existing_country
-                new_lob.state = new_state
-                new_lob_project.lob = [new_lob]
 
-                session.add(new_lob_project)
+def add_project_items(
+        main_window: MainWindow,
+        country_text: str,
+        state_text: str,
+        lob_text: str,
+        result: tuple
+) -> None:
+    """
+    Adds the entries of a newly saved project to the project tree.
 
-                # populate the project tree
-                # find the existing country and append the new state to it
-                country_tree_item = main_window.project_model.findItems(
-                    country_uuid,
-                    Qt.MatchFlag.MatchExactly,
-                    1
-                )
+    :param result: The tuple returned by save_project.
+    """
 
-                if country_tree_item:
-                    ix = main_window.project_model.indexFromItem(country_tree_item[0])
-                    ix_col_0 = main_window.project_model.sibling(ix.row(), 0, ix)
-                    it_col_0 = main_window.project_model.itemFromIndex(ix_col_0)
-                    it_col_0.appendRow([state, QStandardItem(state_uuid)])
-                    state.appendRow([lob, QStandardItem(lob_uuid)])
+    level, country_uuid, state_uuid, lob_uuid = result
 
-            # If the state already exists append the LOB to it
-            else:
-                existing_state = state_query.first()
-                state_uuid = existing_state.project_id
-                lob_uuid = str(uuid4())
+    # Create an entries for the project tree
+    country = ProjectItem(
+        country_text,
+        set_bold=True
+    )
 
-                lob_location = existing_state.location_id
+    state = ProjectItem(
+        state_text,
+    )
 
-                new_lob = LOBTable(
-                    lob_type=lob_text,
-                    project_id=lob_uuid,
-                    location_id=lob_location
-                )
+    lob = ProjectItem(
+        lob_text,
+        text_color=QColor(
+            155,
+            0,
+            0
+        )
+    )
 
-                new_lob.country = existing_country
-                new_lob.state = existing_state
+    if level == 'country':
 
-                new_lob_project = ProjectTable(
-                    project_id=lob_uuid
-                )
+        # Add entries into the project tree
+        country.appendRow([state, QStandardItem(state_uuid)])
+        state.appendRow([lob, QStandardItem(lob_uuid)])
 
-                session.add(new_lob)
-                session.add(new_lob_project)
+        main_window.project_model.project_root.appendRow([
+            country,
+            QStandardItem(country_uuid)
+        ])
 
-                state_tree_item = main_window.project_model.findItems(
-                    state_uuid,
-                    Qt.MatchFlag.MatchRecursive,
-                    1
-                )
-                # state_tree_item = country_tree_item.findItems(state_uuid, Qt.MatchExactly, 1)
-                if state_tree_item:
-                    ix = main_window.project_model.indexFromItem(state_tree_item[0])
-                    ix_col_0 = main_window.project_model.sibling(ix.row(), 0, ix)
-                    it_col_0 = main_window.project_model.itemFromIndex(ix_col_0)
-                    it_col_0.appendRow([lob, QStandardItem(lob_uuid)])
+    elif level == 'state':
 
-        session.commit()
+        # find the existing country and append the new state to it
+        country_tree_item = main_window.project_model.findItems(
+            country_uuid,
+            Qt.MatchFlag.MatchExactly,
+            1
+        )
 
-        connection.close()
+        if country_tree_item:
+            ix = main_window.project_model.indexFromItem(country_tree_item[0])
+            ix_col_0 = main_window.project_model.sibling(ix.row(), 0, ix)
+            it_col_0 = main_window.project_model.itemFromIndex(ix_col_0)
+            it_col_0.appendRow([state, QStandardItem(state_uuid)])
+            state.appendRow([lob, QStandardItem(lob_uuid)])
 
-        # main_window.project_pane.expandAll()
+    else:
 
-        print("new project created")
+        state_tree_item = main_window.project_model.findItems(
+            state_uuid,
+            Qt.MatchFlag.MatchRecursive,
+            1
+        )
 
-        self.close()
+        if state_tree_item:
+            ix = main_window.project_model.indexFromItem(state_tree_item[0])
+            ix_col_0 = main_window.project_model.sibling(ix.row(), 0, ix)
+            it_col_0 = main_window.project_model.itemFromIndex(ix_col_0)
+            it_col_0.appendRow([lob, QStandardItem(lob_uuid)])
 
 
 class ProjectTreeView(QTreeView):
@@ -437,112 +508,75 @@ class ProjectTreeView(QTreeView):
         """print uuid of current selected index"""
         uuid = self.currentIndex().siblingAtColumn(1).data()
         current_item = self.model().itemFromIndex(self.currentIndex())
-        # connect to the database
-        session, connection = connect_db(db_path=self.parent.core.db)
-        
-        # delete the item from the database with uuid
 
         if current_item.parent():
-            parent = current_item.parent()
             # case when selection is an LOB
-            if parent.parent():
-                lob = session.query(LOBTable).filter(LOBTable.project_id == uuid).one()
-                session.delete(lob)
-
+            if current_item.parent().parent():
+                level = 'lob'
             # Case when selection is a state
             else:
-                state = session.query(StateTable).filter(StateTable.project_id == uuid)
-                state_first = state.first()
-                location_id = state_first.location_id
-                location = session.query(LocationTable).filter(LocationTable.location_id == location_id).one()
-                session.delete(location)
-
+                level = 'state'
         # Case when selection is a country
         else:
-            country = session.query(CountryTable).filter(CountryTable.project_id == uuid)
-            country_first = country.first()
-            location_id = country_first.location_id
-            location = session.query(LocationTable).filter(LocationTable.location_id == location_id).one()
-            session.delete(location)
-
-        session.commit()
-        
-        "remove all rows from qtreeview and refresh"
-        self.model().removeRows(0, self.model().rowCount())
-        """
-    Upon connection to an existing database, populates the project tree in the left-hand pane of the
-    main window based on what projects have been saved to the database.
-    """
-
-    # Open up the connection to the database
-        
-        # Query all the countries
-        countries = session.query(
-            CountryTable.country_id,
-            CountryTable.country_name,
-            CountryTable.project_id
-        ).all()
-
-        # Append each row one at a time, brute force method. For each country, add state rows, and
-        # for each state, add LOB rows.
-
-        for country_id, country, country_uuid in countries:
+            level = 'country'
 
-            country_item = ProjectItem(
-                text=country,
-                set_bold=True
-            )
+        def on_result(tree: list) -> None:
+            # remove all rows from qtreeview and refresh
+            self.model().removeRows(0, self.model().rowCount())
 
-            country_row = [
-                country_item,
-                QStandardItem(country_uuid)
-            ]
-
-            states = session.query(
-                StateTable.state_id,
-                StateTable.state_name,
-                StateTable.project_id
-            ).filter(
-                StateTable.country_id == country_id
+            build_project_tree(
+                tree=tree,
+                main_window=self.parent
             )
 
-            for state_id, state, state_uuid in states:
-
-                state_item = ProjectItem(
-                    state,
-                )
-
-                state_row = [state_item, QStandardItem(state_uuid)]
+        run_db_job(
+            db_path=self.parent.core.db,
+            job=partial(
+                remove_project,
+                uuid=uuid,
+                level=level
+            ),
+            client=get_db_client(self.parent),
+            on_result=on_result,
+            write=True
+        )
 
-                lobs = session.query(
-                    LOBTable.lob_type, LOBTable.project_id
-                ).join(
-                    LocationTable
-                ).join(
-                    StateTable
-                ).filter(
-                    StateTable.country_id == country_id
-                ).filter(
-                    StateTable.state_id == state_id
-                )
 
-                for lob, lob_uuid in lobs:
-                    lob_item = ProjectItem(
-                        lob,
-                        text_color=QColor(0, 77, 122)
-                    )
+def remove_project(
+        session: Session,
+        report_progress: Callable[[int, int], None] = None,
+        uuid: str = None,
+        level: str = None
+) -> list:
+    """
+    Deletes a project from the database, then returns the refreshed project hierarchy.
 
-                    lob_row = [lob_item, QStandardItem(lob_uuid)]
+    :param uuid: The project id of the item to be deleted.
+    :param level: The level of the item in the hierarchy, 'country', 'state', or 'lob'.
+    :return: The project tree, in the format returned by query_project_tree.
+    """
 
-                    state_item.appendRow(lob_row)
+    if level == 'lob':
+        lob = session.query(LOBTable).filter(LOBTable.project_id == uuid).one()
+        session.delete(lob)
 
-                country_item.appendRow(state_row)
+    elif level == 'state':
+        state = session.query(StateTable).filter(StateTable.project_id == uuid)
+        state_first = state.first()
+        location_id = state_first.location_id
+        location = session.query(LocationTable).filter(LocationTable.location_id == location_id).one()
+        session.delete(location)
 
-            self.parent.project_model.project_root.appendRow(country_row)
+    else:
+        country = session.query(CountryTable).filter(CountryTable.project_id == uuid)
+        country_first = country.first()
+        location_id = country_first.location_id
+        location = session.query(LocationTable).filter(LocationTable.location_id == location_id).one()
+        session.delete(location)
 
-        self.parent.project_pane.expandAll()
+    session.flush()
 
-        connection.close()
+    return query_project_tree(session=session)
 
 
 class ProjectModel(QStandardItemModel):
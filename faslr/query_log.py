@@ -0,0 +1,431 @@
+"""
+Instrumentation for the SQL sent to the project database. Every engine created through create_faslr_engine() records
+the latency, row count, and calling code of each statement into an in-memory ring buffer, which can be inspected via
+the Database Performance dialog under the Tools menu.
+"""
+from __future__ import annotations
+
+import os
+import pandas as pd
+import sys
+import threading
+import time
+
+from collections import deque
+
+from faslr.base_table import (
+    FAbstractTableModel,
+    FTableView
+)
+
+from faslr.constants import (
+    QUERY_LOG_DISPLAY_ROWS,
+    QUERY_LOG_SIZE,
+    ROOT_PATH
+)
+
+from PyQt6.QtCore import (
+    QModelIndex,
+    Qt
+)
+
+from PyQt6.QtWidgets import (
+    QDialog,
+    QDialogButtonBox,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTabWidget,
+    QVBoxLayout,
+    QWidget
+)
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from typing import Any
+
+
+class QueryRecord:
+    """
+    A single executed statement.
+    """
+    __slots__ = (
+        'statement',
+        'duration',
+        'rows',
+        'call_site',
+        'executed'
+    )
+
+    def __init__(
+            self,
+            statement: str,
+            duration: float,
+            rows: int,
+            call_site: str,
+            executed: float
+    ):
+
+        self.statement = statement
+        self.duration = duration
+        self.rows = rows
+        self.call_site = call_site
+        self.executed = executed
+
+
+class QueryLog:
+    """
+    Ring buffer of the most recently executed statements. Statements may be recorded from the database worker
+    thread while the GUI thread reads them, so access goes through a lock.
+    """
+    def __init__(
+            self,
+            size: int = QUERY_LOG_SIZE
+    ):
+
+        self.records = deque(maxlen=size)
+        self.lock = threading.Lock()
+
+    def record(
+            self,
+            record: QueryRecord
+    ) -> None:
+
+        with self.lock:
+            self.records.append(record)
+
+    def clear(self) -> None:
+
+        with self.lock:
+            self.records.clear()
+
+    def __len__(self) -> int:
+
+        return len(self.records)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Returns the recorded statements as a DataFrame, one row per execution.
+        """
+
+        with self.lock:
+            records = list(self.records)
+
+        return pd.DataFrame(
+            [[r.statement, r.duration, r.rows, r.call_site, r.executed] for r in records],
+            columns=['statement', 'duration', 'rows', 'call_site', 'executed']
+        )
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Aggregates the recorded executions by statement and call site.
+        """
+
+        df = self.to_frame()
+
+        if df.empty:
+            return pd.DataFrame(
+                columns=['statement', 'call_site', 'calls', 'total', 'mean', 'max', 'rows']
+            )
+
+        df['rows'] = df['rows'].fillna(0)
+
+        df_summary = df.groupby(
+            ['statement', 'call_site'],
+            sort=False
+        ).agg(
+            calls=('duration', 'size'),
+            total=('duration', 'sum'),
+            mean=('duration', 'mean'),
+            max=('duration', 'max'),
+            rows=('rows', 'sum')
+        ).reset_index()
+
+        return df_summary
+
+    def slowest(
+            self,
+            n: int = QUERY_LOG_DISPLAY_ROWS
+    ) -> pd.DataFrame:
+
+        return self.summary().sort_values('max', ascending=False).head(n).reset_index(drop=True)
+
+    def most_frequent(
+            self,
+            n: int = QUERY_LOG_DISPLAY_ROWS
+    ) -> pd.DataFrame:
+
+        return self.summary().sort_values('calls', ascending=False).head(n).reset_index(drop=True)
+
+
+class RowCountingCursor:
+    """
+    Proxy of a DBAPI cursor that adds the rows fetched through it to the row count of a record. sqlite does not know
+    how many rows a SELECT returns until they are fetched, which happens after the statement has been recorded.
+    """
+    def __init__(
+            self,
+            cursor: Any,
+            record: QueryRecord
+    ):
+
+        self._cursor = cursor
+        self._record = record
+
+    def __getattr__(
+            self,
+            name: str
+    ) -> Any:
+
+        return getattr(self._cursor, name)
+
+    def fetchone(self) -> Any:
+
+        row = self._cursor.fetchone()
+
+        if row is not None:
+            self._record.rows += 1
+
+        return row
+
+    def fetchmany(self, *args) -> list:
+
+        rows = self._cursor.fetchmany(*args)
+        self._record.rows += len(rows)
+
+        return rows
+
+    def fetchall(self) -> list:
+
+        rows = self._cursor.fetchall()
+        self._record.rows += len(rows)
+
+        return rows
+
+
+# The log shared by every engine in the application.
+QUERY_LOG = QueryLog()
+
+# Frames from these modules are skipped when looking for the code that issued a statement.
+_SKIPPED_PATHS = (
+    os.path.join(ROOT_PATH, 'database.py'),
+    os.path.join(ROOT_PATH, 'query_log.py')
+)
+
+
+def find_call_site() -> str:
+    """
+    Walks up the stack to the first frame within FASLR that is not part of the database plumbing.
+    """
+
+    frame = sys._getframe(2)  # noqa
+
+    while frame is not None:
+        filename = frame.f_code.co_filename
+
+        if filename.startswith(ROOT_PATH) and not filename.startswith(_SKIPPED_PATHS):
+            return "%s:%d (%s)" % (
+                os.path.relpath(filename, ROOT_PATH),
+                frame.f_lineno,
+                frame.f_code.co_name
+            )
+
+        frame = frame.f_back
+
+    return "<unknown>"
+
+
+def instrument_engine(
+        engine: Engine,
+        query_log: QueryLog = QUERY_LOG
+) -> Engine:
+    """
+    Attaches the timing listeners to an engine.
+
+    :param engine: The engine to instrument.
+    :param query_log: The log in which to record the statements.
+    :return: The same engine.
+    """
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa
+
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:  # noqa
+
+        duration = time.perf_counter() - conn.info['query_start_time'].pop()
+
+        # Statements that return rows are counted as the rows are fetched.
+        returns_rows = cursor.description is not None and context is not None
+
+        if returns_rows:
+            rows = 0
+        else:
+            rows = cursor.rowcount if cursor.rowcount >= 0 else None
+
+        record = QueryRecord(
+            statement=statement,
+            duration=duration,
+            rows=rows,
+            call_site=find_call_site(),
+            executed=time.time()
+        )
+
+        query_log.record(record)
+
+        # The result of the statement fetches its rows from the context's cursor.
+        if returns_rows:
+            context.cursor = RowCountingCursor(
+                cursor=context.cursor,
+                record=record
+            )
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+    return engine
+
+
+class QueryStatsModel(FAbstractTableModel):
+    """
+    Displays a summary of the query log, as produced by QueryLog.slowest() or QueryLog.most_frequent().
+    """
+    def __init__(
+            self,
+            data: pd.DataFrame = None
+    ):
+        super().__init__()
+
+        self.headers = [
+            'Statement',
+            'Call Site',
+            'Calls',
+            'Total (ms)',
+            'Mean (ms)',
+            'Max (ms)',
+            'Rows'
+        ]
+
+        self._data = data if data is not None else pd.DataFrame(columns=self.headers)
+
+    def set_stats(
+            self,
+            data: pd.DataFrame
+    ) -> None:
+
+        self.beginResetModel()
+        self._data = data
+        self.endResetModel()
+
+    def data(
+            self,
+            index: QModelIndex,
+            role: int = None
+    ) -> Any:
+
+        if role == Qt.ItemDataRole.DisplayRole:
+
+            value = self._data.iloc[index.row(), index.column()]
+
+            if index.column() == 0:
+                # Collapse whitespace so multi-line statements fit on one row.
+                return " ".join(str(value).split())
+            elif index.column() in [3, 4, 5]:
+                return "{0:,.3f}".format(value * 1000)
+            elif index.column() in [2, 6]:
+                return "{0:,.0f}".format(value)
+            else:
+                return str(value)
+
+        if role == Qt.ItemDataRole.ToolTipRole and index.column() == 0:
+            return str(self._data.iloc[index.row(), 0])
+
+    def headerData(
+            self,
+            section: int,
+            orientation: Qt.Orientation,
+            role: int = None
+    ) -> Any:
+
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+
+
+class DatabasePerformanceDialog(QDialog):
+    """
+    Shows the slowest and most frequently executed statements in the query log.
+    """
+    def __init__(
+            self,
+            parent: QWidget = None,
+            query_log: QueryLog = QUERY_LOG
+    ):
+        super().__init__(parent)
+
+        self.query_log = query_log
+
+        self.setWindowTitle("Database Performance")
+
+        self.layout = QVBoxLayout()
+
+        self.summary_label = QLabel()
+
+        self.slowest_model = QueryStatsModel()
+        self.slowest_view = FTableView()
+        self.slowest_view.setModel(self.slowest_model)
+
+        self.frequent_model = QueryStatsModel()
+        self.frequent_view = FTableView()
+        self.frequent_view.setModel(self.frequent_model)
+
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.slowest_view, "Slowest")
+        self.tabs.addTab(self.frequent_view, "Most Frequent")
+
+        self.refresh_btn = QPushButton("Refresh")
+        self.refresh_btn.clicked.connect(self.refresh) # noqa
+
+        self.clear_btn = QPushButton("Clear")
+        self.clear_btn.clicked.connect(self.clear) # noqa
+
+        btn_container = QWidget()
+        btn_layout = QHBoxLayout()
+        btn_layout.setContentsMargins(0, 0, 0, 0)
+        btn_layout.addWidget(self.refresh_btn)
+        btn_layout.addWidget(self.clear_btn)
+        btn_layout.addStretch()
+        btn_container.setLayout(btn_layout)
+
+        self.button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        self.button_box.rejected.connect(self.close) # noqa
+
+        self.layout.addWidget(self.summary_label)
+        self.layout.addWidget(btn_container)
+        self.layout.addWidget(self.tabs)
+        self.layout.addWidget(self.button_box)
+
+        self.setLayout(self.layout)
+
+        self.resize(900, 500)
+
+        self.refresh()
+
+    def refresh(self) -> None:
+
+        self.slowest_model.set_stats(self.query_log.slowest())
+        self.frequent_model.set_stats(self.query_log.most_frequent())
+
+        df = self.query_log.to_frame()
+
+        self.summary_label.setText(
+            "%d statements recorded, %.3f ms total." % (len(df), df['duration'].sum() * 1000)
+        )
+
+        for view in [self.slowest_view, self.frequent_view]:
+            view.resizeColumnsToContents()
+
+    def clear(self) -> None:
+
+        self.query_log.clear()
+        self.refresh()
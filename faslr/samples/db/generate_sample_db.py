@@ -16,6 +16,8 @@ from faslr.constants import SAMPLE_DB_NAME
 
 from faslr.schema import (
     CountryTable,
+    IndexTable,
+    IndexValuesTable,
     LocationTable,
     StateTable,
     LOBTable,
@@ -24,6 +26,12 @@ from faslr.schema import (
     ProjectViewData
 )
 
+from faslr.utilities.sample import (
+    ppa_loss_trend,
+    ppa_premium_trend,
+    tort_index
+)
+
 from sqlalchemy.orm import sessionmaker
 from uuid import uuid4
 
@@ -38,7 +46,6 @@ except OSError:
 # Create and connect to the database.
 engine = sa.create_engine(
     'sqlite:///' + db_name,
-    echo=True,
     connect_args={
         'check_same_thread': False
     }
@@ -125,6 +132,29 @@ for record in data_list:
 
 session.add_all(obj_list)
 
+# Add the sample indexes, which are available to every project.
+for sample_index in [
+    tort_index,
+    ppa_loss_trend,
+    ppa_premium_trend
+]:
+    index = IndexTable(
+        name=sample_index['Name'][0],
+        description=sample_index['Description'][0],
+        scope='global'
+    )
+
+    session.add(index)
+    session.flush()
+
+    session.add_all([
+        IndexValuesTable(
+            index_id=index.index_id,
+            year=year,
+            change=change
+        ) for year, change in zip(sample_index['Origin'], sample_index['Change'])
+    ])
+
 session.commit()
 
 
@@ -7,6 +7,7 @@ from sqlalchemy import (
     DateTime,
     Integer,
     ForeignKey,
+    LargeBinary,
     String,
 )
 
@@ -403,6 +404,256 @@ class ProjectViewData(Base):
     )
 
 
+# LDFs selected for a column of a data view. Development periods without a selected LDF use the volume-weighted
+# average.
+class ViewFactorTable(Base):
+    __tablename__ = 'view_factor'
+
+    factor_id = Column(
+        Integer,
+        primary_key=True
+    )
+
+    view_id = Column(
+        Integer,
+        ForeignKey('project_view.view_id')
+    )
+
+    column = Column(
+        String
+    )
+
+    # Age at the start of the development period, e.g., 12 for the 12-24 LDF.
+    development = Column(
+        Integer
+    )
+
+    ldf = Column(
+        Float
+    )
+
+    def __repr__(self):
+        return "ViewFactorTable(" \
+               "view_id='%s', " \
+               "column='%s', " \
+               "development='%s', " \
+               "ldf='%s'" \
+               ")>" % (
+                   self.view_id,
+                   self.column,
+                   self.development,
+                   self.ldf
+               )
+
+
+# Link ratio excluded from the LDFs of a column of a data view, i.e., an entry of chainladder's drop argument.
+class ViewExclusionTable(Base):
+    __tablename__ = 'view_exclusion'
+
+    exclusion_id = Column(
+        Integer,
+        primary_key=True
+    )
+
+    view_id = Column(
+        Integer,
+        ForeignKey('project_view.view_id')
+    )
+
+    column = Column(
+        String
+    )
+
+    origin = Column(
+        String
+    )
+
+    # Age at the start of the development period of the link ratio, e.g., 12 for the 12-24 link ratio.
+    development = Column(
+        Integer
+    )
+
+    def __repr__(self):
+        return "ViewExclusionTable(" \
+               "view_id='%s', " \
+               "column='%s', " \
+               "origin='%s', " \
+               "development='%s'" \
+               ")>" % (
+                   self.view_id,
+                   self.column,
+                   self.origin,
+                   self.development
+               )
+
+
+# Constant tail factor selected for a column of a data view, i.e., the parameters of chainladder's TailConstant.
+class ViewTailTable(Base):
+    __tablename__ = 'view_tail'
+
+    tail_id = Column(
+        Integer,
+        primary_key=True
+    )
+
+    view_id = Column(
+        Integer,
+        ForeignKey('project_view.view_id')
+    )
+
+    column = Column(
+        String
+    )
+
+    factor = Column(
+        Float
+    )
+
+    decay = Column(
+        Float,
+        default=0.5
+    )
+
+    attachment_age = Column(
+        Integer
+    )
+
+    projection_period = Column(
+        Integer,
+        default=12
+    )
+
+    def __repr__(self):
+        return "ViewTailTable(" \
+               "view_id='%s', " \
+               "column='%s', " \
+               "factor='%s', " \
+               "decay='%s'" \
+               ")>" % (
+                   self.view_id,
+                   self.column,
+                   self.factor,
+                   self.decay
+               )
+
+
+# Chain ladder projection of a column of a data view, as written by a batch run.
+class ViewResultTable(Base):
+    __tablename__ = 'view_result'
+
+    result_id = Column(
+        Integer,
+        primary_key=True
+    )
+
+    view_id = Column(
+        Integer,
+        ForeignKey('project_view.view_id')
+    )
+
+    column = Column(
+        String
+    )
+
+    origin = Column(
+        String
+    )
+
+    latest = Column(
+        Float
+    )
+
+    cdf = Column(
+        Float
+    )
+
+    ultimate = Column(
+        Float
+    )
+
+    ibnr = Column(
+        Float
+    )
+
+    computed = Column(
+        DateTime,
+        default=datetime.now
+    )
+
+    def __repr__(self):
+        return "ViewResultTable(" \
+               "view_id='%s', " \
+               "column='%s', " \
+               "origin='%s', " \
+               "ultimate='%s', " \
+               "computed='%s'" \
+               ")>" % (
+                   self.view_id,
+                   self.column,
+                   self.origin,
+                   self.ultimate,
+                   self.computed
+               )
+
+
+# Serialized output of a fitted model, e.g., the LDFs of a Development fit, keyed by a hash of the triangle, the
+# method and its parameters. An entry has one row per output. See faslr.utilities.results_cache.
+class ResultCacheTable(Base):
+    __tablename__ = 'result_cache'
+
+    entry_id = Column(
+        Integer,
+        primary_key=True
+    )
+
+    key = Column(
+        String,
+        index=True
+    )
+
+    method = Column(
+        String
+    )
+
+    # Name of the fitted attribute, e.g., ldf_.
+    output = Column(
+        String
+    )
+
+    # How the output is serialized: triangle, frame or array.
+    kind = Column(
+        String
+    )
+
+    data = Column(
+        LargeBinary
+    )
+
+    size = Column(
+        Integer
+    )
+
+    last_used = Column(
+        DateTime,
+        default=datetime.now
+    )
+
+    def __repr__(self):
+        return "ResultCacheTable(" \
+               "key='%s', " \
+               "method='%s', " \
+               "output='%s', " \
+               "size='%s', " \
+               "last_used='%s'" \
+               ")>" % (
+                   self.key,
+                   self.method,
+                   self.output,
+                   self.size,
+                   self.last_used
+               )
+
+
 class IndexTable(Base):
     __tablename__ = 'index'
 
@@ -411,6 +662,10 @@ class IndexTable(Base):
         primary_key=True
     )
 
+    name = Column(
+        String
+    )
+
     description = Column(
         String
     )
@@ -420,7 +675,7 @@ class IndexTable(Base):
     )
 
     project_id = Column(
-        Integer,
+        String,
         ForeignKey('project.project_id')
     )
 
@@ -431,10 +686,12 @@ class IndexTable(Base):
 
     def __repr__(self):
         return "IndexTable(" \
+            "name='%s', " \
             "description='%s', " \
             "scope='%s', " \
             "project_id='%s'" \
             ")>" % (
+               self.name,
                self.description,
                self.scope,
                self.project_id
@@ -0,0 +1,118 @@
+"""
+Deferred initialization of the application. The main window is shown as soon as it is built, and the numerical
+libraries, which take longer to import than the window takes to build, are loaded afterwards behind a splash screen.
+"""
+import importlib
+import logging
+import time
+
+from faslr.constants import (
+    BUILD_VERSION,
+    STARTUP_PRELOAD_MODULES
+)
+
+from faslr.style.main import (
+    MAIN_WINDOW_TITLE,
+    SPLASH_HEIGHT,
+    SPLASH_WIDTH
+)
+
+from PyQt6.QtCore import Qt
+
+from PyQt6.QtGui import (
+    QColor,
+    QFont,
+    QPainter,
+    QPixmap
+)
+
+from PyQt6.QtWidgets import (
+    QApplication,
+    QSplashScreen
+)
+
+from typing import Callable
+
+
+class StartupSplash(QSplashScreen):
+    """
+    Splash screen displayed while the application finishes loading, with the current step at the bottom.
+    """
+    def __init__(self):
+
+        pixmap = QPixmap(SPLASH_WIDTH, SPLASH_HEIGHT)
+        pixmap.fill(QColor('white'))
+
+        painter = QPainter(pixmap)
+
+        font = QFont()
+        font.setPointSize(28)
+        font.setBold(True)
+        painter.setFont(font)
+        painter.drawText(
+            pixmap.rect().adjusted(0, 0, 0, -SPLASH_HEIGHT // 3),
+            Qt.AlignmentFlag.AlignCenter,
+            "FASLR"
+        )
+
+        font.setPointSize(10)
+        font.setBold(False)
+        painter.setFont(font)
+        painter.drawText(
+            pixmap.rect(),
+            Qt.AlignmentFlag.AlignCenter,
+            MAIN_WINDOW_TITLE.split(" - ")[-1] + "\nv" + BUILD_VERSION
+        )
+
+        painter.end()
+
+        super().__init__(pixmap)
+
+    def set_status(
+            self,
+            message: str
+    ) -> None:
+        """
+        Displays a message and repaints right away, since the caller blocks the event loop until the next one.
+        """
+
+        self.showMessage(
+            message,
+            Qt.AlignmentFlag.AlignBottom | Qt.AlignmentFlag.AlignHCenter
+        )
+
+        QApplication.processEvents()
+
+
+def preload_modules(
+        modules: list = None,
+        on_status: Callable[[str], None] = None
+) -> dict:
+    """
+    Imports the modules whose loading was deferred at startup.
+
+    :param modules: A list of (module name, status message) tuples. Defaults to STARTUP_PRELOAD_MODULES.
+    :param on_status: Called with the message of each module before it is imported.
+    :return: The time taken to import each module, in milliseconds.
+    """
+
+    if modules is None:
+        modules = STARTUP_PRELOAD_MODULES
+
+    timings = {}
+
+    for name, message in modules:
+
+        if on_status is not None:
+            on_status(message)
+
+        start = time.perf_counter()
+
+        # Touching an attribute executes modules that were bound by lazy_import().
+        getattr(importlib.import_module(name), '__name__')
+
+        timings[name] = (time.perf_counter() - start) * 1000
+
+        logging.info("Loaded %s in %.0f ms." % (name, timings[name]))
+
+    return timings
@@ -0,0 +1,268 @@
+"""
+Stochastic view of the analysis tab, which shows the distribution of the IBNR of each origin period from a bootstrap
+of the ODP chain ladder model. Bootstrapping takes seconds to minutes depending on the number of simulations, so runs
+are made on a separate thread, which hands the simulations to worker processes, see faslr.bootstrap, and the GUI
+stays responsive while the progress bar fills.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import pandas as pd
+
+from chainladder import Triangle
+
+from faslr.base_table import (
+    FAbstractTableModel,
+    FTableView
+)
+
+from faslr.bootstrap import (
+    BootstrapResults,
+    bootstrap_triangle
+)
+
+from faslr.constants import (
+    BOOTSTRAP_PERCENTILES,
+    BOOTSTRAP_SEED,
+    BOOTSTRAP_SIMULATIONS
+)
+
+from PyQt6.QtCore import (
+    QModelIndex,
+    QThread,
+    Qt,
+    pyqtSignal
+)
+
+from PyQt6.QtWidgets import (
+    QHBoxLayout,
+    QLabel,
+    QProgressBar,
+    QPushButton,
+    QSpinBox,
+    QVBoxLayout,
+    QWidget
+)
+
+from typing import Any
+
+
+class BootstrapSummaryModel(FAbstractTableModel):
+    """
+    Displays the summary of a bootstrap run, as produced by BootstrapResults.summary().
+    """
+    def __init__(
+            self,
+            data: pd.DataFrame = None
+    ):
+        super().__init__()
+
+        self._data = data if data is not None else pd.DataFrame()
+
+    def set_summary(
+            self,
+            data: pd.DataFrame
+    ) -> None:
+
+        self.beginResetModel()
+        self._data = data
+        self.endResetModel()
+
+    def data(
+            self,
+            index: QModelIndex,
+            role: int = None
+    ) -> Any:
+
+        if role == Qt.ItemDataRole.DisplayRole:
+
+            value = self._data.iloc[index.row(), index.column()]
+
+            return "" if pd.isna(value) else "{0:,.0f}".format(value)
+
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+
+    def headerData(
+            self,
+            section: int,
+            orientation: Qt.Orientation,
+            role: int = None
+    ) -> Any:
+
+        if role == Qt.ItemDataRole.DisplayRole:
+
+            if orientation == Qt.Orientation.Horizontal:
+                return str(self._data.columns[section])
+
+            if orientation == Qt.Orientation.Vertical:
+                return str(self._data.index[section])
+
+
+class BootstrapThread(QThread):
+    """
+    Runs a bootstrap off the GUI thread, reporting progress as each shard of simulations completes.
+    """
+
+    progress = pyqtSignal(int, int)
+    completed = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(
+            self,
+            triangle: Triangle,
+            n_sims: int,
+            seed: int,
+            max_workers: int
+    ):
+        super().__init__()
+
+        self.triangle = triangle
+        self.n_sims = n_sims
+        self.seed = seed
+        self.max_workers = max_workers
+
+    def run(self) -> None:
+
+        try:
+            results = bootstrap_triangle(
+                triangle=self.triangle,
+                n_sims=self.n_sims,
+                seed=self.seed,
+                max_workers=self.max_workers,
+                on_progress=self.progress.emit
+            )
+        except Exception as e:
+            logging.exception("Bootstrap failed.")
+            self.failed.emit(str(e)) # noqa
+            return
+
+        self.completed.emit(results) # noqa
+
+
+class BootstrapWidget(QWidget):
+    """
+    Runs bootstraps of a triangle column and displays the summary of the latest run.
+    """
+    def __init__(
+            self,
+            triangle: Triangle
+    ):
+        super().__init__()
+
+        self.triangle = triangle
+        self.results = None
+        self.thread = None
+
+        self.layout = QVBoxLayout()
+
+        self.sims_spin_box = QSpinBox()
+        self.sims_spin_box.setRange(100, 1000000)
+        self.sims_spin_box.setSingleStep(1000)
+        self.sims_spin_box.setValue(BOOTSTRAP_SIMULATIONS)
+
+        self.seed_spin_box = QSpinBox()
+        self.seed_spin_box.setRange(0, 2 ** 31 - 1)
+        self.seed_spin_box.setValue(BOOTSTRAP_SEED)
+
+        self.workers_spin_box = QSpinBox()
+        self.workers_spin_box.setRange(1, os.cpu_count() or 1)
+        self.workers_spin_box.setValue(os.cpu_count() or 1)
+
+        self.run_btn = QPushButton("Run")
+        self.run_btn.clicked.connect(self.run) # noqa
+
+        self.controls = QHBoxLayout()
+
+        for label, widget in [
+            ("Simulations:", self.sims_spin_box),
+            ("Seed:", self.seed_spin_box),
+            ("Workers:", self.workers_spin_box)
+        ]:
+            self.controls.addWidget(QLabel(label))
+            self.controls.addWidget(widget)
+
+        self.controls.addStretch()
+        self.controls.addWidget(self.run_btn)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+
+        self.status_label = QLabel("Run a bootstrap of the ODP chain ladder model to display the IBNR distribution.")
+
+        self.summary_model = BootstrapSummaryModel()
+        self.summary_view = FTableView()
+        self.summary_view.setModel(self.summary_model)
+
+        self.layout.addLayout(self.controls)
+        self.layout.addWidget(self.progress_bar)
+        self.layout.addWidget(self.status_label)
+        self.layout.addWidget(self.summary_view)
+
+        self.setLayout(self.layout)
+
+    def run(self) -> None:
+
+        if self.thread is not None:
+            return
+
+        self.run_btn.setEnabled(False)
+        self.progress_bar.setRange(0, self.sims_spin_box.value())
+        self.progress_bar.setValue(0)
+        self.status_label.setText("Simulating...")
+
+        self.thread = BootstrapThread(
+            triangle=self.triangle,
+            n_sims=self.sims_spin_box.value(),
+            seed=self.seed_spin_box.value(),
+            max_workers=self.workers_spin_box.value()
+        )
+
+        self.thread.progress.connect(self.update_progress) # noqa
+        self.thread.completed.connect(self.show_results) # noqa
+        self.thread.failed.connect(self.show_error) # noqa
+        self.thread.finished.connect(self.finish_run) # noqa
+
+        self.thread.start()
+
+    def update_progress(
+            self,
+            done: int,
+            total: int
+    ) -> None:
+
+        self.progress_bar.setValue(done)
+
+    def show_results(
+            self,
+            results: BootstrapResults
+    ) -> None:
+
+        self.results = results
+
+        self.summary_model.set_summary(results.summary(percentiles=BOOTSTRAP_PERCENTILES))
+
+        self.status_label.setText(
+            "{0:,} simulations with seed {1}, scale parameter {2:,.0f}.".format(
+                results.n_sims,
+                results.seed,
+                results.scale
+            )
+        )
+
+    def show_error(
+            self,
+            message: str
+    ) -> None:
+
+        self.status_label.setText("Bootstrap failed: %s" % message)
+
+    def finish_run(self) -> None:
+
+        self.thread.deleteLater()
+        self.thread = None
+
+        self.run_btn.setEnabled(True)
@@ -2,3 +2,6 @@ MAIN_WINDOW_WIDTH = 2500
 MAIN_WINDOW_HEIGHT = 900
 
 MAIN_WINDOW_TITLE = "FASLR - Free Actuarial System for Loss Reserving"
+
+SPLASH_WIDTH = 480
+SPLASH_HEIGHT = 240
@@ -26,6 +26,10 @@ from faslr.constants import (
     ICONS_PATH
 )
 
+from faslr.profiler import profiled
+
+from faslr.utilities.results_cache import RESULTS_CACHE
+
 from functools import partial
 
 from matplotlib.backends.backend_qt5agg import (
@@ -58,6 +62,7 @@ from PyQt6.QtWidgets import (
 )
 
 from typing import (
+    Optional,
     TYPE_CHECKING
 )
 
@@ -175,6 +180,7 @@ class TailPane(QWidget):
         vlayout.addWidget(self.button_box)
         self.update_plot()
 
+    @profiled("Fit tail")
     def update_plot(self) -> None:
 
         self.sc.axes.cla()
@@ -189,90 +195,74 @@ class TailPane(QWidget):
 
             if gb_tail_type.constant_btn.isChecked():
 
-                tail_constant = tail_params.constant_config.sb_tail_constant.spin_box.value()
-                decay = tail_params.constant_config.sb_decay.spin_box.value()
-                attach = tail_params.constant_config.sb_attach.spin_box.value()
-                projection = tail_params.constant_config.sb_projection.spin_box.value()
+                estimator = cl.TailConstant
 
-                tc = cl.TailConstant(
-                    tail=tail_constant,
-                    decay=decay,
-                    attachment_age=attach,
-                    projection_period=projection
-                ).fit_transform(self.triangle)
+                params = tail_params.constant_config.params()
 
             elif gb_tail_type.curve_btn.isChecked():
 
                 curve_config = tail_params.curve_config
 
-                curve = curve_alias[curve_config.curve_type.combo_box.currentText()]
-                fit_from = curve_config.fit_from.spin_box.value()
-                fit_to = curve_config.fit_to.spin_box.value()
-                extrap_periods = curve_config.extrap_periods.spin_box.value()
-                errors = fit_errors[curve_config.bg_errors.checkedButton().text()]
-                attachment_age = curve_config.attachment_age.spin_box.value()
-                projection_period = curve_config.projection.spin_box.value()
-
-                tc = cl.TailCurve(
-                    curve=curve,
-                    fit_period=(
-                        fit_from,
-                        fit_to
-                    ),
-                    extrap_periods=extrap_periods,
-                    errors=errors,
-                    attachment_age=attachment_age,
-                    projection_period=projection_period
-
-                ).fit_transform(self.triangle)
-
-                tcd = cl.TailCurve(
-                    curve=curve,
-                    fit_period=(
-                        fit_from,
-                        fit_to
-                    ),
-                    extrap_periods=extrap_periods,
-                    errors=errors,
-                    attachment_age=attachment_age,
-                    projection_period=projection_period
-
-                ).fit(self.triangle)
+                estimator = cl.TailCurve
 
-                tcds.append(tcd)
+                params = {
+                    'curve': curve_alias[curve_config.curve_type.combo_box.currentText()],
+                    'fit_period': (
+                        curve_config.fit_from.spin_box.value(),
+                        curve_config.fit_to.spin_box.value()
+                    ),
+                    'extrap_periods': curve_config.extrap_periods.spin_box.value(),
+                    'errors': fit_errors[curve_config.bg_errors.checkedButton().text()],
+                    'attachment_age': curve_config.attachment_age.spin_box.value(),
+                    'projection_period': curve_config.projection.spin_box.value()
+                }
 
             elif gb_tail_type.bondy_btn.isChecked():
 
                 bondy = tail_params.bondy_config
-                earliest_age = bondy.earliest_age.spin_box.value()
-                attachment_age = bondy.attachment_age.spin_box.value()
-                projection_period = bondy.projection.spin_box.value()
 
-                tc = cl.TailBondy(
-                    earliest_age=earliest_age,
-                    attachment_age=attachment_age,
-                    projection_period=projection_period
-                ).fit_transform(self.triangle)
+                estimator = cl.TailBondy
+
+                params = {
+                    'earliest_age': bondy.earliest_age.spin_box.value(),
+                    'attachment_age': bondy.attachment_age.spin_box.value(),
+                    'projection_period': bondy.projection.spin_box.value()
+                }
 
             elif gb_tail_type.clark_btn.isChecked():
 
                 clark = tail_params.clark_config
 
-                growth = clark_alias[clark.growth.combo_box.currentText()]
-                truncation_age = clark.truncation_age.spin_box.value()
-                attachment_age = clark.attachment_age.spin_box.value()
-                projection_period = clark.projection.spin_box.value()
+                estimator = cl.TailClark
 
-                tc = cl.TailClark(
-                    growth=growth,
-                    truncation_age=truncation_age,
-                    attachment_age=attachment_age,
-                    projection_period=projection_period
-                ).fit_transform(self.triangle)
+                params = {
+                    'growth': clark_alias[clark.growth.combo_box.currentText()],
+                    'truncation_age': clark.truncation_age.spin_box.value(),
+                    'attachment_age': clark.attachment_age.spin_box.value(),
+                    'projection_period': clark.projection.spin_box.value()
+                }
 
             else:
                 raise Exception("Invalid tail type selected.")
 
+            # The fitted estimator has the same cdf_ and tail_ as the triangle it transforms. The parameters of the
+            # curve are also needed for the extrapolation chart.
+            outputs = ['cdf_', 'tail_']
+
+            if estimator is cl.TailCurve:
+                outputs += ['slope_', 'intercept_']
+
+            tc = RESULTS_CACHE.fetch(
+                triangle=self.triangle,
+                method=estimator.__name__,
+                params=params,
+                fit=lambda: estimator(**params).fit(self.triangle), # noqa
+                outputs=outputs
+            )
+
+            if estimator is cl.TailCurve:
+                tcds.append(tc)
+
             tcs.append(tc)
 
         if self.toggled_chart == 'curve_btn':
@@ -429,6 +419,33 @@ class TailPane(QWidget):
 
             self.sc.draw()
 
+    def selected_tail(self) -> Optional[dict]:
+        """
+        Returns the arguments of the TailConstant of the candidate marked as selected, or None if no candidate is.
+        Only constant tails can be saved with a data view, so a selected candidate of another type is ignored.
+        """
+
+        for config in self.tail_candidates:
+            if config.cb_mark_selected.isChecked() and config.gb_tail_type.constant_btn.isChecked():
+                return config.gb_tail_params.constant_config.params()
+
+        return None
+
+    def select_tail(
+            self,
+            params: dict
+    ) -> None:
+        """
+        Sets the first candidate to a constant tail with the given TailConstant arguments and marks it as selected,
+        e.g., to restore the tail saved with a data view.
+        """
+
+        config = self.tail_candidates[0]
+
+        config.gb_tail_type.constant_btn.setChecked(True)
+        config.gb_tail_params.constant_config.set_params(params=params)
+        config.cb_mark_selected.setChecked(True)
+
     def toggle_chart(self, value) -> None:
 
         self.toggled_chart = value
@@ -591,6 +608,34 @@ class ConstantConfig(QWidget):
         self.sb_attach.spin_box.valueChanged.connect(parent.parent.parent.update_plot)
         self.sb_projection.spin_box.valueChanged.connect(parent.parent.parent.update_plot)
 
+    def params(self) -> dict:
+        """
+        The arguments of the TailConstant.
+        """
+
+        return {
+            'tail': self.sb_tail_constant.spin_box.value(),
+            'decay': self.sb_decay.spin_box.value(),
+            'attachment_age': self.sb_attach.spin_box.value(),
+            'projection_period': self.sb_projection.spin_box.value()
+        }
+
+    def set_params(
+            self,
+            params: dict
+    ) -> None:
+
+        self.sb_tail_constant.spin_box.setValue(params['tail'])
+
+        if params.get('decay') is not None:
+            self.sb_decay.spin_box.setValue(params['decay'])
+
+        if params.get('attachment_age') is not None:
+            self.sb_attach.spin_box.setValue(params['attachment_age'])
+
+        if params.get('projection_period') is not None:
+            self.sb_projection.spin_box.setValue(params['projection_period'])
+
 
 class CurveConfig(QWidget):
     def __init__(
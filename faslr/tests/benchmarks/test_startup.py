@@ -0,0 +1,81 @@
+import pytest
+
+from faslr.__main__ import MainWindow
+
+from faslr.benchmarks.startup import (
+    benchmark_startup,
+    parse_importtime
+)
+
+from faslr.core import FCore
+
+from faslr.startup import (
+    StartupSplash,
+    preload_modules
+)
+
+from pytestqt.qtbot import QtBot
+
+
+def test_parse_importtime() -> None:
+
+    stderr = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |     numpy.core",
+        "import time:       200 |        300 |   numpy",
+        "import time:      1000 |       1300 | faslr"
+    ])
+
+    assert parse_importtime(stderr=stderr) == pytest.approx({
+        'numpy': .3,
+        'faslr': 1
+    })
+
+
+def test_benchmark_startup() -> None:
+
+    results = benchmark_startup(deferred=True)
+
+    assert results['first_window'] >= results['import'] > 0
+
+    # None of the numerical libraries are loaded before the window is shown.
+    assert results['loaded'] == []
+
+    assert results['top_imports']
+
+
+def test_deferred_initialize(qtbot: QtBot) -> None:
+
+    core = FCore(config_path='')
+
+    window = MainWindow(
+        core=core,
+        deferred=True
+    )
+    qtbot.addWidget(window)
+
+    assert window.analysis_pane.count() == 0
+
+    splash = StartupSplash()
+    qtbot.addWidget(splash)
+    splash.show()
+
+    window.show()
+    window.initialize(splash=splash)
+
+    assert window.analysis_pane.count() == 2
+    assert window.analysis_pane.tabText(0) == 'Auto'
+    assert not splash.isVisible()
+
+
+def test_preload_modules() -> None:
+
+    messages = []
+
+    timings = preload_modules(
+        modules=[('json', 'Loading json...')],
+        on_status=messages.append
+    )
+
+    assert messages == ['Loading json...']
+    assert list(timings) == ['json']
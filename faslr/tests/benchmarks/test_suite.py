@@ -0,0 +1,153 @@
+import pytest
+
+from faslr.batch import read_batch_views
+
+from faslr.benchmarks.generators import (
+    synthetic_project_db,
+    synthetic_triangle
+)
+
+from faslr.benchmarks.suite import (
+    append_history,
+    benchmark_cases,
+    compare_runs,
+    main,
+    measure,
+    read_history,
+    run_suite
+)
+
+from faslr.connection import query_project_tree
+from faslr.database import run_db_job
+
+from pathlib import Path
+
+from pytestqt.qtbot import QtBot
+
+
+def test_synthetic_triangle_segments() -> None:
+
+    triangle = synthetic_triangle(
+        n_origins=8,
+        grain='Y',
+        n_segments=3
+    )
+
+    assert triangle.shape == (3, 1, 8, 8)
+    assert triangle.key_labels == ['Segment']
+
+
+def test_synthetic_project_db(tmp_path: Path) -> None:
+
+    db_path = str(tmp_path / 'synthetic.db')
+
+    view_ids = synthetic_project_db(
+        db_path=db_path,
+        n_segments=12,
+        n_origins=5,
+        lobs_per_state=5
+    )
+
+    assert len(view_ids) == 12
+
+    tree = run_db_job(
+        db_path=db_path,
+        job=query_project_tree
+    )
+
+    country, country_uuid, states = tree[0]
+
+    assert country == 'Synthetic'
+    assert [len(lobs) for state, state_uuid, lobs in states] == [5, 5, 2]
+
+    views = run_db_job(
+        db_path=db_path,
+        job=read_batch_views
+    )
+
+    # Cumulative losses of 5 accident years.
+    data = views[0]['data']
+    assert len(data) == 15
+    assert data.groupby('accident_year')['paid_loss'].is_monotonic_increasing.all()
+
+
+def test_measure() -> None:
+
+    calls = []
+
+    result = measure(
+        func=lambda: calls.append(bytearray(1024 * 1024)),
+        repeat=2
+    )
+
+    assert len(calls) == 3
+    assert result['time_ms'] <= result['median_ms']
+    assert result['peak_kb'] >= 1024
+
+
+def test_compare_runs() -> None:
+
+    baseline = {'results': {
+        'a': {'time_ms': 100., 'peak_kb': 100.},
+        'b': {'time_ms': 100., 'peak_kb': 100.},
+        'removed': {'time_ms': 100., 'peak_kb': 100.}
+    }}
+
+    current = {'results': {
+        'a': {'time_ms': 110., 'peak_kb': 90.},
+        'b': {'time_ms': 100., 'peak_kb': 150.},
+        'added': {'time_ms': 100., 'peak_kb': 100.}
+    }}
+
+    comparisons = compare_runs(
+        baseline=baseline,
+        current=current,
+        threshold=0.2
+    )
+
+    assert [comparison['case'] for comparison in comparisons] == ['a', 'b']
+    assert comparisons[0]['changes']['time_ms'] == pytest.approx(.1)
+    assert not comparisons[0]['regressed']
+    assert comparisons[1]['regressed']
+
+
+def test_benchmark_cases() -> None:
+
+    cases = benchmark_cases(size='small')
+
+    assert 'TriangleModel.data[Q48]' in cases
+    assert 'save_to_db[10 segments]' in cases
+    assert 'load_sample' in cases
+
+
+def test_run_suite(
+        qtbot: QtBot,
+        tmp_path: Path
+) -> None:
+
+    history_path = str(tmp_path / 'history.json')
+
+    run = run_suite(
+        size='small',
+        repeat=1,
+        pattern='[1 segments]'
+    )
+
+    assert sorted(run['results']) == [
+        'Triangle construction[1 segments]',
+        'populate_project_tree[1 segments]',
+        'save_to_db[1 segments]'
+    ]
+
+    append_history(run=run, path=history_path)
+
+    # A slower copy of the run regresses.
+    slower = dict(run, results={
+        name: dict(result, time_ms=result['time_ms'] * 2) for name, result in run['results'].items()
+    })
+    append_history(run=slower, path=history_path)
+
+    assert len(read_history(path=history_path)) == 2
+
+    assert main(['--history', history_path, 'compare']) == 1
+    assert main(['--history', history_path, 'compare', '--threshold', '1.5']) == 0
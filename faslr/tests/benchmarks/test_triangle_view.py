@@ -0,0 +1,30 @@
+from faslr.benchmarks.generators import synthetic_triangle
+from faslr.benchmarks.triangle_view import benchmark_triangle_scroll
+
+from pytestqt.qtbot import QtBot
+
+
+def test_synthetic_triangle() -> None:
+
+    triangle = synthetic_triangle(
+        n_origins=24,
+        n_columns=2
+    )
+
+    assert triangle.shape == (1, 2, 24, 24)
+    assert triangle.is_cumulative
+
+
+def test_benchmark_triangle_scroll(qtbot: QtBot) -> None:
+
+    results = benchmark_triangle_scroll(
+        n_origins=120,
+        frames=10,
+        width=600,
+        height=400
+    )
+
+    assert results['frame_mean'] > 0
+
+    # Only the cells that have come into view, plus the prefetch margin, get formatted.
+    assert results['formatted_cells'] < results['total_cells']
@@ -1,8 +1,42 @@
+from faslr.constants import (
+    RESULTS_CACHE_SIZE,
+    TAB_UNLOAD_TIMEOUT
+)
+
 from faslr.core import (
-    FCore
+    FCore,
+    get_results_cache_size,
+    get_tab_unload_timeout
 )
 
 
 def test_f_core(qtbot) -> None:
 
     core = FCore()
+
+
+def test_get_tab_unload_timeout(tmp_path) -> None:
+
+    config_path = tmp_path / 'faslr.ini'
+
+    # Configuration files without the option get the default.
+    config_path.write_text("[STARTUP_CONNECTION]\ndefault_connection = None\n")
+
+    assert get_tab_unload_timeout(config_path=str(config_path)) == TAB_UNLOAD_TIMEOUT
+
+    config_path.write_text("[PERFORMANCE]\ntab_unload_timeout = 45\n")
+
+    assert get_tab_unload_timeout(config_path=str(config_path)) == 45
+
+
+def test_get_results_cache_size(tmp_path) -> None:
+
+    config_path = tmp_path / 'faslr.ini'
+
+    config_path.write_text("[PERFORMANCE]\ntab_unload_timeout = 45\n")
+
+    assert get_results_cache_size(config_path=str(config_path)) == RESULTS_CACHE_SIZE
+
+    config_path.write_text("[PERFORMANCE]\nresults_cache_size = 8\n")
+
+    assert get_results_cache_size(config_path=str(config_path)) == 8
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import chainladder as cl
+import faslr.index.index
+import numpy as np
 import pandas as pd
 import pytest
 
 from faslr.index import (
     calculate_index_factors,
+    index_factors,
+    IndexFactorCache,
     IndexPane,
     IndexInventory
 )
@@ -32,6 +36,8 @@ from PyQt6.QtCore import (
 
 from PyQt6.QtWidgets import QApplication
 
+from pytest_mock import MockFixture
+
 from pytestqt.qtbot import QtBot
 
 from typing import TYPE_CHECKING
@@ -311,3 +317,79 @@ def test_add_indexes(
         Qt.MouseButton.LeftButton,
         delay=1
     )
+
+
+def test_calculate_index_factors_copy(
+        df_tort_index: DataFrame
+) -> None:
+    """
+    The input index should not be modified.
+    """
+
+    df_idx = df_tort_index[['Origin', 'Change']]
+
+    calculate_index_factors(index=df_idx)
+
+    assert list(df_idx.columns) == ['Origin', 'Change']
+
+
+def test_index_factors_2d(
+        df_tort_index: DataFrame
+) -> None:
+
+    changes = np.column_stack([
+        df_tort_index['Change'],
+        ppa_loss_trend['Change']
+    ])
+
+    factors = index_factors(changes)
+
+    np.testing.assert_allclose(factors[:, 0], df_tort_index['Factor'])
+    np.testing.assert_allclose(factors[:, 1], [1.145 ** i for i in range(8, -1, -1)])
+
+    assert index_factors(np.array([])).shape == (0,)
+
+
+def test_index_factor_cache(
+        df_tort_index: DataFrame,
+        mocker: MockFixture
+) -> None:
+
+    cache = IndexFactorCache()
+
+    spy = mocker.spy(faslr.index.index, 'index_factors')
+
+    tort = cache.get_index_factors(
+        index_id='tort',
+        version=0,
+        changes=df_tort_index['Change']
+    )
+
+    both = cache.get_factors(
+        keys=[('tort', 0), ('trend', 0)],
+        changes=np.column_stack([df_tort_index['Change'], ppa_loss_trend['Change']])
+    )
+
+    # The tort reform factors are not calculated again.
+    assert spy.call_count == 2
+    assert spy.call_args[0][0].shape == (9, 1)
+
+    np.testing.assert_allclose(both[:, 0], tort)
+
+    combined = cache.combine(keys=[('tort', 0), ('trend', 0)])
+
+    np.testing.assert_allclose(combined, both[:, 0] * both[:, 1])
+
+    # A new version replaces the prior one.
+    cache.get_index_factors(
+        index_id='tort',
+        version=1,
+        changes=np.zeros(9)
+    )
+
+    assert ('tort', 0) not in cache.factors
+    np.testing.assert_allclose(cache.combine(keys=[('tort', 1)]), np.ones(9))
+
+    cache.invalidate(index_id='tort')
+
+    assert ('tort', 1) not in cache.factors
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from faslr.index import (
+    calculate_index_factors,
+    IndexFactorCache,
+    IndexRepository
+)
+
+from faslr.schema import ProjectTable
+
+from faslr.utilities import subset_dict
+
+from faslr.utilities.sample import tort_index
+
+from sqlalchemy import (
+    create_engine,
+    select
+)
+
+from sqlalchemy.orm import sessionmaker
+
+
+def test_load_indexes(sample_db: str) -> None:
+
+    repository = IndexRepository(
+        db_path=sample_db,
+        factor_cache=IndexFactorCache()
+    )
+
+    matrix = repository.load()
+
+    assert matrix.names == ['Tort Reform', 'PPA Loss Trend', 'PPA Premium Trend']
+    assert matrix.scopes == ['global'] * 3
+    assert matrix.origins.tolist() == list(range(2000, 2009))
+    assert matrix.changes.shape == (9, 3)
+
+    # The loaded indexes are kept in memory.
+    assert repository.load() is matrix
+
+    assert matrix.inventory()[0] == {
+        'Name': ['Tort Reform'],
+        'Description': tort_index['Description']
+    }
+
+
+def test_fetch_index(sample_db: str) -> None:
+
+    repository = IndexRepository(
+        db_path=sample_db,
+        factor_cache=IndexFactorCache()
+    )
+
+    df_idx = repository.fetch_index(name='Tort Reform')
+
+    df_expected = calculate_index_factors(
+        index=pd.DataFrame(
+            subset_dict(
+                input_dict=tort_index,
+                keys=['Origin', 'Change']
+            )
+        )
+    )
+
+    pd.testing.assert_frame_equal(
+        df_idx,
+        df_expected,
+        check_dtype=False
+    )
+
+
+def test_save_values(sample_db: str) -> None:
+
+    repository = IndexRepository(
+        db_path=sample_db,
+        factor_cache=IndexFactorCache()
+    )
+
+    matrix = repository.load()
+    index_id = matrix.find(name='Tort Reform')
+    factors = repository.factors(index_ids=[index_id])
+
+    # Update the last year and add a new one.
+    repository.save_values(
+        index_id=index_id,
+        values=pd.DataFrame({
+            'Origin': [2008, 2009],
+            'Change': [.1, .2]
+        })
+    )
+
+    assert repository.versions[index_id] == 1
+
+    reloaded = repository.load()
+
+    assert reloaded is not matrix
+    assert reloaded.origins.tolist() == list(range(2000, 2010))
+
+    df_idx = reloaded.index_changes(index_id=index_id)
+
+    assert df_idx['Change'].tolist()[-2:] == [.1, .2]
+
+    # The factors reflect the new values rather than the cached ones.
+    new_factors = repository.factors(index_ids=[index_id])
+
+    assert new_factors.shape == (10, 1)
+    assert not np.allclose(new_factors[:9, 0], factors[:, 0])
+    np.testing.assert_allclose(new_factors[-3:, 0], [1.1 * 1.2, 1.2, 1])
+
+
+def test_origins_widened(sample_db: str) -> None:
+
+    repository = IndexRepository(
+        db_path=sample_db,
+        factor_cache=IndexFactorCache()
+    )
+
+    repository.create_index(
+        name='A',
+        values=pd.DataFrame({
+            'Origin': [2000, 2001, 2002],
+            'Change': [.1, .1, .1]
+        })
+    )
+
+    df_a = repository.fetch_index(name='A')
+
+    # Widening the years of the loaded indexes does not bump the version of A, its cached factors are still replaced.
+    repository.create_index(
+        name='B',
+        values=pd.DataFrame({
+            'Origin': [2001, 2002, 2003, 2004, 2009, 2010],
+            'Change': [.2, .2, .2, .2, .2, .2]
+        })
+    )
+
+    pd.testing.assert_frame_equal(
+        repository.fetch_index(name='A'),
+        df_a
+    )
+
+    assert repository.factors().shape == (11, 5)
+
+
+def test_create_project_index(sample_db: str) -> None:
+
+    session = sessionmaker(bind=create_engine('sqlite:///' + sample_db))()
+    project_ids = session.execute(select(ProjectTable.project_id)).scalars().all()
+    session.close()
+
+    repository = IndexRepository(
+        db_path=sample_db,
+        project_id=project_ids[0],
+        factor_cache=IndexFactorCache()
+    )
+
+    index_id = repository.create_index(
+        name='Project Trend',
+        description='A project index.',
+        scope='project',
+        values=pd.DataFrame({
+            'Origin': [2007, 2008],
+            'Change': [.05, .05]
+        })
+    )
+
+    matrix = repository.load()
+
+    assert matrix.names[-1] == 'Project Trend'
+    assert matrix.scopes[-1] == 'project'
+    assert matrix.index_changes(index_id=index_id)['Origin'].tolist() == [2007, 2008]
+
+    # Project indexes are not available to other projects.
+    other = IndexRepository(
+        db_path=sample_db,
+        project_id=project_ids[1],
+        factor_cache=IndexFactorCache()
+    )
+
+    assert 'Project Trend' not in other.load().names
@@ -0,0 +1,171 @@
+import chainladder as cl
+import numpy as np
+import pytest
+
+from faslr.methods.apriori import (
+    align_factors,
+    apriori_selection,
+    projected_ultimates
+)
+
+from faslr.methods.expected_loss import (
+    ExpectedLossWidget,
+    fetch_sample_index
+)
+
+from faslr.utilities import (
+    auto_bi_olep,
+    load_sample
+)
+
+from pytestqt.qtbot import QtBot
+
+
+@pytest.fixture()
+def auto_bi_models() -> list:
+    """
+    Reported and paid chain ladder models of the auto BI sample, as in the expected loss demo.
+    """
+
+    triangle = load_sample('auto_bi')
+
+    reported = cl.Chainladder().fit(
+        cl.TailConstant(tail=1.005).fit_transform(triangle['Reported Claims'])
+    )
+
+    paid = cl.Chainladder().fit(
+        cl.TailConstant(tail=1.05).fit_transform(triangle['Paid Claims'])
+    )
+
+    yield [reported, paid]
+
+
+def test_apriori_selection() -> None:
+
+    ultimates = np.array([[[100., 200.], [300., 400.]]])
+
+    results = apriori_selection(
+        origin=np.array([2007, 2008]),
+        ultimates=ultimates,
+        premium=[400., 500.],
+        premium_factors=[np.array([1.25, 1.])],
+        loss_factors=[np.array([1.5, 1.]), np.array([2., 1.])]
+    )
+
+    np.testing.assert_allclose(results.initial_selected, [[200., 300.]])
+    np.testing.assert_allclose(results.trended_premium, [[500., 500.]])
+    np.testing.assert_allclose(results.adjusted_ultimate, [[600., 300.]])
+    np.testing.assert_allclose(results.claim_ratio, [[1.2, .6]])
+    np.testing.assert_allclose(results.selected_ratio, [.9])
+    np.testing.assert_allclose(results.expected_claims, [[150., 450.]])
+
+    weighted = apriori_selection(
+        origin=np.array([2007, 2008]),
+        ultimates=ultimates,
+        premium=[400., 500.],
+        method_weights=[1, 0],
+        ratio_origins=[False, True],
+        average='weighted'
+    )
+
+    np.testing.assert_allclose(weighted.initial_selected, [[100., 200.]])
+    np.testing.assert_allclose(weighted.selected_ratio, [.4])
+
+    with pytest.raises(ValueError):
+        apriori_selection(
+            origin=np.array([2007, 2008]),
+            ultimates=ultimates,
+            premium=[400., 500.],
+            average='median'
+        )
+
+
+def test_apriori_selection_segments() -> None:
+    """
+    Segments computed together match those computed one at a time.
+    """
+
+    rng = np.random.default_rng(1)
+
+    ultimates = rng.uniform(100, 200, size=(5, 3, 10))
+    premium = rng.uniform(200, 300, size=(5, 10))
+    loss_factors = [rng.uniform(1, 2, size=10), rng.uniform(1, 2, size=(5, 10))]
+
+    batched = apriori_selection(
+        origin=np.arange(10),
+        ultimates=ultimates,
+        premium=premium,
+        loss_factors=loss_factors
+    )
+
+    for segment in range(5):
+        single = apriori_selection(
+            origin=np.arange(10),
+            ultimates=ultimates[[segment]],
+            premium=premium[segment],
+            loss_factors=[loss_factors[0], loss_factors[1][segment]]
+        )
+
+        np.testing.assert_allclose(batched.expected_claims[segment], single.expected_claims[0])
+        np.testing.assert_allclose(batched.selected_ratio[segment], single.selected_ratio[0])
+
+
+def test_projected_ultimates(auto_bi_models: list) -> None:
+
+    ultimates, segments = projected_ultimates(triangles=auto_bi_models)
+
+    assert ultimates.shape == (1, 2, 9)
+    assert segments == ['Total']
+
+    np.testing.assert_allclose(
+        ultimates[0, 1],
+        auto_bi_models[1].ultimate_.to_frame().iloc[:, 0].to_numpy()
+    )
+
+
+def test_align_factors() -> None:
+
+    factors = align_factors(
+        index=fetch_sample_index(name='Tort Reform'),
+        origin=np.array(['1999', '2000', '2008'])
+    )
+
+    assert np.isnan(factors[0])
+    np.testing.assert_allclose(factors[1:], [.67, 1.])
+
+
+def test_expected_loss_model(
+        qtbot: QtBot,
+        auto_bi_models: list
+) -> None:
+
+    widget = ExpectedLossWidget(triangles=auto_bi_models)
+    qtbot.addWidget(widget)
+
+    model = widget.selection_model
+
+    assert model.columnCount() == 11
+
+    model.set_index(
+        prem_loss='loss',
+        name='Tort Reform',
+        index=fetch_sample_index(name='Tort Reform')
+    )
+
+    assert model.columnCount() == 13
+    assert model.header_groups[-4] == ('Loss Index:\nTort Reform', [])
+
+    label = widget.selection_view.hheader.model().index(0, 9).data()
+    assert label == 'Loss Index:\nTort Reform'
+
+    # The first accident year is adjusted by the tort reform factor.
+    assert model.index(0, 10).data() == '6,708,375'
+    assert model.results.premium[0].tolist() == auto_bi_olep
+
+    model.remove_index(
+        prem_loss='loss',
+        name='Tort Reform'
+    )
+
+    assert model.columnCount() == 11
+    assert widget.selection_view.hheader.model().columnCount() == 11
@@ -1,18 +1,36 @@
+import numpy as np
 import sys
 
+from faslr import analysis
+
 from faslr.analysis import (
     AnalysisTab,
+    DeferredAnalysisTab,
     MackCriticalSpinBox,
     MackValuationModel
 )
 
+from faslr.batch import (
+    read_batch_views,
+    view_triangle
+)
+
+from faslr.common.tabs import BackgroundTabUnloader
+
 from faslr.constants import (
     MACK_VALUATION_CRITICAL
 )
 
+from faslr.database import run_db_job
+
 from faslr.utilities.sample import load_sample
+
+from functools import partial
+
 from PyQt6.QtWidgets import (
-    QDoubleSpinBox
+    QDoubleSpinBox,
+    QTabWidget,
+    QWidget
 )
 from PyQt6.QtCore import QSize, Qt
 from PyQt6.QtWidgets import QApplication
@@ -79,3 +97,319 @@ def test_mack_valuation_model(qtbot) -> None:
 
     assert value_test == 'Pass'
 
+
+
+def test_analysis_lazy_diagnostics(qtbot) -> None:
+    auto = load_sample('us_industry_auto')
+    auto_tab = AnalysisTab(
+        triangle=auto
+    )
+
+    # Nothing is built until the diagnostics are displayed.
+    assert auto_tab.mack_valuation_groupboxes == {}
+
+    auto_tab.resizeEvent(QSize())
+
+    auto_tab.value_box.setCurrentText("Diagnostics")
+
+    # Only the selected column is built.
+    assert list(auto_tab.mack_valuation_groupboxes.keys()) == [auto_tab.column_tab.tabText(0)]
+
+    auto_tab.column_tab.setCurrentIndex(1)
+
+    assert len(auto_tab.mack_valuation_individual_groupboxes) == 2
+
+    # Switching back does not rebuild the diagnostics.
+    groupbox = auto_tab.mack_development_groupboxes[auto_tab.column_tab.tabText(0)]
+    auto_tab.column_tab.setCurrentIndex(0)
+
+    assert auto_tab.mack_development_groupboxes[auto_tab.column_tab.tabText(0)] is groupbox
+
+
+def test_deferred_analysis_tab(qtbot) -> None:
+
+    tab_widget = QTabWidget()
+    qtbot.addWidget(tab_widget)
+
+    auto_tab = DeferredAnalysisTab(triangle=load_sample('us_industry_auto'))
+    xyz_tab = DeferredAnalysisTab(triangle=load_sample('uspp_incr_case'))
+
+    tab_widget.addTab(auto_tab, "Auto")
+    tab_widget.addTab(xyz_tab, "XYZ")
+
+    # Nothing is built before the tab widget is displayed.
+    assert not auto_tab.is_loaded
+    assert not xyz_tab.is_loaded
+
+    tab_widget.show()
+
+    assert auto_tab.is_loaded
+    assert not xyz_tab.is_loaded
+
+    auto_tab.tab.value_box.setCurrentText("Link Ratios")
+    auto_tab.tab.column_tab.setCurrentIndex(1)
+
+    # The displayed tab is never unloaded.
+    assert not auto_tab.unload()
+
+    tab_widget.setCurrentIndex(1)
+
+    assert xyz_tab.is_loaded
+    assert auto_tab.hidden_since is not None
+    assert xyz_tab.hidden_since is None
+
+    assert auto_tab.unload()
+    assert not auto_tab.is_loaded
+
+    # The selections are restored when the tab is rebuilt.
+    tab_widget.setCurrentIndex(0)
+
+    assert auto_tab.is_loaded
+    assert auto_tab.tab.value_box.currentText() == "Link Ratios"
+    assert auto_tab.tab.column_tab.currentIndex() == 1
+    assert auto_tab.tab.triangle_views['Reported Claims'].model().value_type == "ratio"
+
+
+def test_background_tab_unloader(qtbot) -> None:
+
+    tab_widget = QTabWidget()
+    qtbot.addWidget(tab_widget)
+
+    auto_tab = DeferredAnalysisTab(triangle=load_sample('us_industry_auto'))
+    xyz_tab = DeferredAnalysisTab(triangle=load_sample('uspp_incr_case'))
+
+    tab_widget.addTab(auto_tab, "Auto")
+    tab_widget.addTab(xyz_tab, "XYZ")
+    tab_widget.show()
+    tab_widget.setCurrentIndex(1)
+
+    unloader = BackgroundTabUnloader(
+        tab_widget=tab_widget,
+        timeout=60
+    )
+
+    assert unloader.timer.isActive()
+
+    # Not in the background for long enough.
+    assert unloader.unload_idle(now=auto_tab.hidden_since + 30) == 0
+    assert auto_tab.is_loaded
+
+    assert unloader.unload_idle(now=auto_tab.hidden_since + 60) == 1
+    assert not auto_tab.is_loaded
+    assert xyz_tab.is_loaded
+
+    disabled = BackgroundTabUnloader(
+        tab_widget=tab_widget,
+        timeout=0
+    )
+
+    assert not disabled.timer.isActive()
+    assert disabled.unload_idle(now=xyz_tab.hidden_since or 0) == 0
+
+
+def test_analysis_bootstrap(qtbot) -> None:
+    auto = load_sample('us_industry_auto')
+    auto_tab = AnalysisTab(
+        triangle=auto
+    )
+
+    assert auto_tab.bootstrap_widgets == {}
+
+    auto_tab.value_box.setCurrentText("Bootstrap")
+
+    column = auto_tab.column_tab.tabText(0)
+
+    # Only the selected column is built, and nothing is simulated until the bootstrap is run.
+    assert list(auto_tab.bootstrap_widgets.keys()) == [column]
+    assert auto_tab.bootstrap_widgets[column].results is None
+    assert auto_tab.analysis_containers[column].currentIndex() == 2
+    assert not auto_tab.is_busy()
+
+    auto_tab.value_box.setCurrentText("Diagnostics")
+
+    assert auto_tab.analysis_containers[column].currentIndex() == 1
+
+    auto_tab.value_box.setCurrentText("Values")
+
+    assert auto_tab.analysis_containers[column].currentIndex() == 0
+
+
+def test_analysis_mack(qtbot) -> None:
+    auto = load_sample('us_industry_auto')
+    auto_tab = AnalysisTab(
+        triangle=auto
+    )
+
+    assert auto_tab.mack is None
+
+    auto_tab.value_box.setCurrentText("Std. Errors")
+
+    column = auto_tab.column_tab.tabText(0)
+    model = auto_tab.mack_views[column].model()
+
+    assert auto_tab.analysis_containers[column].currentIndex() == 3
+    assert model.rowCount() == len(auto.origin) + 1
+    assert model.headerData(4, Qt.Orientation.Horizontal, Qt.ItemDataRole.DisplayRole) == 'CV'
+    assert model.headerData(model.rowCount() - 1, Qt.Orientation.Vertical, Qt.ItemDataRole.DisplayRole) == 'Total'
+    assert model.data(model.index(0, 4), Qt.ItemDataRole.DisplayRole) == ""
+
+    # Excluding link ratios in the development window of the column updates the standard errors.
+    development_tab = auto_tab.open_development()
+    qtbot.addWidget(development_tab)
+
+    factor_model = development_tab.factor_model
+
+    assert auto_tab.open_development() is development_tab
+    assert auto_tab.is_busy()
+
+    total = model.data(model.index(model.rowCount() - 1, 3), Qt.ItemDataRole.DisplayRole)
+
+    factor_model.toggle_exclude(index=factor_model.index(1, 0))
+    factor_model.recalculate_factors()
+
+    assert factor_model.drop_list == [('1999', 12)]
+    assert auto_tab.exclusions == {column: [('1999', 12)]}
+    assert auto_tab.mack.fitted_periods == 1
+    assert model.data(model.index(model.rowCount() - 1, 3), Qt.ItemDataRole.DisplayRole) != total
+
+    # Once released, the tab is no longer called back.
+    auto_tab.release()
+
+    assert auto_tab.development_tabs == {}
+    assert not auto_tab.is_busy()
+
+    factor_model.set_drop(drop_list=[])
+
+    assert factor_model.drop_list == []
+    assert auto_tab.exclusions == {column: [('1999', 12)]}
+
+
+def test_deferred_analysis_exclusions(
+        qtbot,
+        monkeypatch
+) -> None:
+
+    tab_widget = QTabWidget()
+    qtbot.addWidget(tab_widget)
+
+    auto_tab = DeferredAnalysisTab(triangle=load_sample('us_industry_auto'))
+
+    tab_widget.addTab(auto_tab, "Auto")
+    tab_widget.addTab(QWidget(), "Other")
+    tab_widget.show()
+
+    auto_tab.tab.value_box.setCurrentText("Std. Errors")
+
+    column = auto_tab.tab.column_tab.tabText(0)
+    development_tab = auto_tab.tab.open_development(column=column)
+    qtbot.addWidget(development_tab)
+
+    development_tab.factor_model.set_drop(drop_list=[('1999', 12)])
+    development_tab.factor_model.set_selected_ldfs(ldfs={12: 1.8})
+
+    total = auto_tab.tab.mack.total_mack_std_err.copy()
+
+    tab_widget.setCurrentIndex(1)
+
+    # Not while the development window is open.
+    assert not auto_tab.unload()
+
+    development_tab.close()
+
+    collections = []
+    monkeypatch.setattr(analysis.gc, 'collect', lambda: collections.append(1))
+
+    assert auto_tab.unload()
+
+    # The tab is collected once control returns to the event loop.
+    assert collections == []
+    qtbot.wait(10)
+    assert collections == [1]
+
+    # The exclusions are restored along with the standard errors, and in the development window.
+    tab_widget.setCurrentIndex(0)
+
+    assert auto_tab.tab.exclusions == {column: [('1999', 12)]}
+    np.testing.assert_allclose(auto_tab.tab.mack.total_mack_std_err, total)
+
+    development_tab = auto_tab.tab.open_development(column=column)
+    qtbot.addWidget(development_tab)
+
+    assert development_tab.factor_model.drop_list == [('1999', 12)]
+    assert development_tab.factor_model.selected_ldfs() == {12: 1.8}
+
+
+def test_save_selections(
+        qtbot,
+        sample_db: str
+) -> None:
+
+    def read_view() -> dict:
+
+        return run_db_job(
+            db_path=sample_db,
+            job=partial(read_batch_views, view_ids=[1])
+        )[0]
+
+    view = read_view()
+
+    def open_tab() -> AnalysisTab:
+
+        tab = AnalysisTab(
+            triangle=view_triangle(
+                data=view['data'],
+                columns=view['columns'],
+                cumulative=view['cumulative']
+            ),
+            exclusions=view['exclusions'],
+            selections=view['factors'],
+            tails=view['tails'],
+            view_id=1,
+            db_path=sample_db
+        )
+        qtbot.addWidget(tab)
+
+        return tab
+
+    auto_tab = open_tab()
+
+    development_tab = auto_tab.open_development(column='Paid Claims')
+    qtbot.addWidget(development_tab)
+
+    development_tab.factor_model.set_drop(drop_list=[('2000', 24)])
+    development_tab.factor_model.set_selected_ldfs(ldfs={12: 1.8})
+
+    tail_tab = auto_tab.open_tail(column='Reported Claims')
+    qtbot.addWidget(tail_tab)
+
+    tail_tab.select_tail(params={'tail': 1.05, 'decay': 0.5, 'attachment_age': 108, 'projection_period': 12})
+
+    # Saved straight from the open windows.
+    auto_tab.save_selections()
+
+    assert auto_tab.save_label.text() == "Saved 1 LDFs, 1 exclusions and 1 tails."
+
+    view = read_view()
+
+    assert view['factors'] == {'Paid Claims': {12: 1.8}}
+    assert view['exclusions'] == {'Paid Claims': [('2000', 24)]}
+    assert view['tails']['Reported Claims']['tail'] == 1.05
+    assert view['tails']['Reported Claims']['attachment_age'] == 108
+
+    auto_tab.release()
+
+    # The saved selections are restored when the view is opened again.
+    auto_tab = open_tab()
+
+    development_tab = auto_tab.open_development(column='Paid Claims')
+    qtbot.addWidget(development_tab)
+
+    assert development_tab.factor_model.drop_list == [('2000', 24)]
+    assert development_tab.factor_model.selected_ldfs() == {12: 1.8}
+
+    tail_tab = auto_tab.open_tail(column='Reported Claims')
+    qtbot.addWidget(tail_tab)
+
+    assert tail_tab.selected_tail()['tail'] == 1.05
+
+    auto_tab.release()
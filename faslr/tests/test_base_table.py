@@ -3,9 +3,11 @@ from faslr.base_table import (
     FTableView
 )
 
+from faslr.grid_header import GridTableHeaderView
+
 from pytestqt.qtbot import QtBot
 
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QModelIndex, Qt
 
 
 def test_f_abstract_table_model(qtbot: QtBot) -> None:
@@ -46,4 +48,33 @@ def test_f_table_view_vertical(qtbot: QtBot) -> None:
         levels=1
     )
 
-    table_view.copy_selection()
\ No newline at end of file
+    table_view.copy_selection()
+
+def test_grid_header_span_map(qtbot: QtBot) -> None:
+
+    header = GridTableHeaderView(
+        orientation=Qt.Orientation.Horizontal,
+        rows=2,
+        columns=6
+    )
+
+    header.setSpan(row=0, column=0, row_span_count=2, column_span_count=0)
+    header.setSpan(row=0, column=1, row_span_count=0, column_span_count=3)
+    header.setSpan(row=0, column=4, row_span_count=2, column_span_count=2)
+
+    def span_anchor(index: QModelIndex) -> tuple:
+        return (index.row(), index.column()) if index.isValid() else None
+
+    model = header.model()
+
+    assert span_anchor(header.columnSpanIndex(model.index(0, 3))) == (0, 1)
+    assert span_anchor(header.columnSpanIndex(model.index(0, 5))) == (0, 4)
+    assert span_anchor(header.columnSpanIndex(model.index(1, 2))) is None
+    assert span_anchor(header.rowSpanIndex(model.index(1, 0))) == (0, 0)
+    assert span_anchor(header.rowSpanIndex(model.index(1, 4))) == (0, 4)
+    assert span_anchor(header.rowSpanIndex(model.index(1, 5))) is None
+
+    header.removeSpan(row=0, column=1)
+
+    assert span_anchor(header.columnSpanIndex(model.index(0, 3))) is None
+    assert span_anchor(header.rowSpanIndex(model.index(1, 0))) == (0, 0)
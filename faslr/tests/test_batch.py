@@ -0,0 +1,294 @@
+import chainladder as cl
+import numpy as np
+import pytest
+import os
+import subprocess
+import sys
+
+from faslr.batch import (
+    main,
+    read_batch_views,
+    run_batch,
+    select_development,
+    view_triangle,
+    write_view_selections
+)
+
+from faslr.constants import ROOT_PATH
+from faslr.database import run_db_job
+
+from faslr.schema import (
+    ProjectViewData,
+    ProjectViewTable,
+    ViewFactorTable,
+    ViewResultTable,
+    ViewTailTable
+)
+
+from functools import partial
+
+from sqlalchemy import select
+
+from sqlalchemy.orm.session import Session
+
+
+def save_selections(
+        session: Session,
+        report_progress=None
+) -> None:
+    """
+    Selects a 12-24 LDF and a tail for the reported claims of the sample view, and adds a copy of the view without
+    selections.
+    """
+
+    view = session.scalars(select(ProjectViewTable)).one()
+
+    session.add(ViewFactorTable(view_id=view.view_id, column='Reported Claims', development=12, ldf=1.5))
+    session.add(ViewTailTable(view_id=view.view_id, column='Reported Claims', factor=1.05))
+
+    copy = ProjectViewTable(
+        name="Auto Copy",
+        columns=view.columns,
+        cumulative=view.cumulative,
+        project_id=view.project_id
+    )
+    session.add(copy)
+    session.flush()
+
+    session.add_all([
+        ProjectViewData(
+            view_id=copy.view_id,
+            accident_year=record.accident_year,
+            calendar_year=record.calendar_year,
+            paid_loss=record.paid_loss,
+            reported_loss=record.reported_loss
+        )
+        for record in session.scalars(select(ProjectViewData).where(ProjectViewData.view_id == view.view_id))
+    ])
+
+
+def read_results(
+        session: Session,
+        report_progress=None
+) -> list:
+
+    return [
+        (result.view_id, result.column, result.origin, result.ultimate)
+        for result in session.scalars(select(ViewResultTable).order_by(ViewResultTable.result_id))
+    ]
+
+
+def test_select_development() -> None:
+
+    triangle = cl.load_sample('raa')
+
+    volume_weighted = cl.Development().fit_transform(triangle)
+    selected = select_development(triangle=triangle, factors={12: 3.})
+
+    ldf = selected.ldf_.to_frame(origin_as_datetime=False).iloc[0].to_numpy()
+    expected = volume_weighted.ldf_.to_frame(origin_as_datetime=False).iloc[0].to_numpy()
+
+    assert ldf[0] == pytest.approx(3.)
+    np.testing.assert_allclose(ldf[1:], expected[1:])
+
+    # No selections use the volume-weighted LDFs.
+    np.testing.assert_allclose(
+        select_development(triangle=triangle).ldf_.values,
+        volume_weighted.ldf_.values
+    )
+
+    # Excluded link ratios are left out of the volume-weighted LDFs.
+    np.testing.assert_allclose(
+        select_development(triangle=triangle, drop=[('1982', 12)]).ldf_.values,
+        cl.Development(drop=[('1982', 12)]).fit_transform(triangle).ldf_.values
+    )
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_run_batch(
+        sample_db: str,
+        max_workers: int
+) -> None:
+
+    run_batch(db_path=sample_db, max_workers=1)
+
+    run_db_job(
+        db_path=sample_db,
+        job=save_selections,
+        write=True
+    )
+
+    views = run_db_job(
+        db_path=sample_db,
+        job=partial(read_batch_views, view_ids=[1])
+    )
+
+    assert len(views) == 1
+    assert views[0]['factors'] == {'Reported Claims': {12: 1.5}}
+    assert views[0]['tails']['Reported Claims']['tail'] == 1.05
+
+    progress = []
+
+    summary = run_batch(
+        db_path=sample_db,
+        max_workers=max_workers,
+        on_progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert summary['projected'] == [1, 2]
+    assert summary['failed'] == {}
+    assert progress[-1] == (2, 2)
+
+    results = run_db_job(
+        db_path=sample_db,
+        job=read_results
+    )
+
+    # The results of the first run are replaced rather than added to.
+    assert len(results) == summary['results'] == 2 * 2 * 10
+
+    ultimates = {
+        (view_id, column): ultimate for view_id, column, origin, ultimate in results if origin == '2001'
+    }
+
+    # The copy of the view has no selections.
+    assert ultimates[(1, 'Paid Claims')] == pytest.approx(ultimates[(2, 'Paid Claims')])
+    assert ultimates[(1, 'Reported Claims')] > ultimates[(2, 'Reported Claims')]
+
+
+def test_write_view_selections(sample_db: str) -> None:
+
+    # Databases without the selection tables read as having no selections.
+    view = run_db_job(
+        db_path=sample_db,
+        job=partial(read_batch_views, view_ids=[1])
+    )[0]
+
+    assert view['factors'] == view['exclusions'] == view['tails'] == {}
+
+    factors = {'Reported Claims': {12: 1.5, 24: 1.2}}
+    exclusions = {'Paid Claims': [('2000', 24), ('2001', 12)]}
+    tails = {
+        'Paid Claims': {
+            'tail': 1.05,
+            'decay': 0.4,
+            'attachment_age': 108,
+            'projection_period': 24
+        }
+    }
+
+    counts = run_db_job(
+        db_path=sample_db,
+        job=partial(
+            write_view_selections,
+            view_id=1,
+            factors=factors,
+            exclusions=exclusions,
+            tails=tails
+        ),
+        write=True
+    )
+
+    assert counts == {'factors': 2, 'exclusions': 2, 'tails': 1}
+
+    view = run_db_job(
+        db_path=sample_db,
+        job=partial(read_batch_views, view_ids=[1])
+    )[0]
+
+    assert view['factors'] == factors
+    assert view['exclusions'] == exclusions
+    assert view['tails'] == tails
+
+    # Saving again replaces the previous selections.
+    run_db_job(
+        db_path=sample_db,
+        job=partial(
+            write_view_selections,
+            view_id=1,
+            factors={'Paid Claims': {12: 1.8}}
+        ),
+        write=True
+    )
+
+    view = run_db_job(
+        db_path=sample_db,
+        job=partial(read_batch_views, view_ids=[1])
+    )[0]
+
+    assert view['factors'] == {'Paid Claims': {12: 1.8}}
+    assert view['exclusions'] == view['tails'] == {}
+
+
+def test_run_batch_saved_selections(sample_db: str) -> None:
+
+    # Selections saved from the analysis tab are applied by batch runs.
+    run_db_job(
+        db_path=sample_db,
+        job=partial(
+            write_view_selections,
+            view_id=1,
+            factors={'Reported Claims': {12: 1.5}},
+            exclusions={'Reported Claims': [('2000', 24)]},
+            tails={'Reported Claims': {'tail': 1.05, 'decay': 0.5, 'attachment_age': None, 'projection_period': 12}}
+        ),
+        write=True
+    )
+
+    run_batch(db_path=sample_db, view_ids=[1], max_workers=1)
+
+    ultimates = {
+        origin: ultimate
+        for view_id, column, origin, ultimate in run_db_job(db_path=sample_db, job=read_results)
+        if column == 'Reported Claims'
+    }
+
+    view = run_db_job(
+        db_path=sample_db,
+        job=partial(read_batch_views, view_ids=[1])
+    )[0]
+
+    triangle = view_triangle(
+        data=view['data'],
+        columns=view['columns'],
+        cumulative=view['cumulative']
+    )['Reported Claims']
+
+    development = cl.Development(drop=[('2000', 24)]).fit(triangle)
+    patterns = dict(zip(
+        [int(str(period).split('-')[0]) for period in development.ldf_.development],
+        development.ldf_.values[0, 0, 0]
+    ))
+    patterns[12] = 1.5
+
+    expected = cl.Chainladder().fit(
+        cl.TailConstant(tail=1.05).fit_transform(
+            cl.DevelopmentConstant(patterns=patterns, style='ldf').fit_transform(triangle)
+        )
+    ).ultimate_.to_frame(origin_as_datetime=False).iloc[:, 0]
+
+    assert len(ultimates) == len(expected)
+
+    # Ultimates that cannot be projected are written as nulls.
+    np.testing.assert_allclose(
+        np.array([ultimates[str(origin)] for origin in expected.index], dtype=float),
+        expected.to_numpy()
+    )
+
+
+def test_batch_cli(sample_db: str) -> None:
+
+    assert main([sample_db, '--view', '1', '--workers', '1']) == 0
+
+    process = subprocess.run(
+        [sys.executable, '-m', 'faslr', 'batch', sample_db, '--workers', '1'],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(ROOT_PATH)
+    )
+
+    assert process.returncode == 0
+    assert "Projected 1 views, wrote 20 results" in process.stdout
+
+    with pytest.raises(SystemExit):
+        main(['missing.db'])
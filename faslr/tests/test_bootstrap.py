@@ -0,0 +1,148 @@
+import chainladder as cl
+import numpy as np
+import pytest
+
+from faslr.bootstrap import (
+    BootstrapModel,
+    QuantileSketch,
+    bootstrap_triangle,
+    shard_sizes
+)
+
+from faslr.stochastic import BootstrapWidget
+
+from PyQt6.QtCore import Qt
+
+from pytestqt.qtbot import QtBot
+
+
+@pytest.fixture()
+def genins() -> cl.Triangle:
+
+    yield cl.load_sample('genins')
+
+
+def test_quantile_sketch() -> None:
+
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.lognormal(10, 1, 50000), -rng.lognormal(5, 1, 1000), np.zeros(100)])
+
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    sketch.add(values)
+
+    for q in [0.001, 0.01, 0.5, 0.9, 0.995]:
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.02)
+
+    assert sketch.quantile(0) == values.min()
+    assert sketch.quantile(1) == values.max()
+    assert sketch.mean == pytest.approx(values.mean())
+    assert sketch.std == pytest.approx(values.std(ddof=1))
+
+    # The buckets grow with the range of the values, not their number.
+    assert len(sketch) < 2000
+
+
+def test_quantile_sketch_merge() -> None:
+
+    rng = np.random.default_rng(1)
+    values = rng.gamma(2, 1000, 20000)
+
+    whole = QuantileSketch()
+    whole.add(values)
+
+    merged = QuantileSketch()
+    for part in np.array_split(values, 4):
+        sketch = QuantileSketch()
+        sketch.add(part)
+        merged.merge(sketch)
+
+    assert merged.count == whole.count
+    assert merged.positive == whole.positive
+    assert merged.quantile(0.75) == whole.quantile(0.75)
+
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(relative_accuracy=0.1))
+
+
+def test_bootstrap_model(genins: cl.Triangle) -> None:
+
+    model = BootstrapModel(cumulative=genins.values[0, 0])
+
+    expected = cl.Chainladder().fit(genins)
+
+    assert model.ldfs == pytest.approx(cl.Development().fit(genins).ldf_.values[0, 0, 0])
+    assert model.ibnr == pytest.approx(np.nan_to_num(expected.ibnr_.values[0, 0, :, -1]))
+    assert model.residuals.size == 53
+
+
+def test_bootstrap_odp(genins: cl.Triangle) -> None:
+
+    assert shard_sizes(n_sims=6000, shard_size=2500) == [2500, 2500, 1000]
+
+    progress = []
+
+    results = bootstrap_triangle(
+        triangle=genins,
+        n_sims=6000,
+        seed=7,
+        max_workers=1,
+        shard_size=2500,
+        on_progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert progress == [(2500, 6000), (5000, 6000), (6000, 6000)]
+    assert results.total.count == 6000
+
+    summary = results.summary(percentiles=[50, 99])
+
+    assert list(summary.columns) == ['Chain Ladder', 'Mean', 'Std. Dev.', '50%', '99%']
+    assert list(summary.index) == genins.origin.astype(str).tolist() + ['Total']
+
+    # The bootstrap mean is close to the chain ladder IBNR.
+    assert summary.loc['Total', 'Mean'] == pytest.approx(summary.loc['Total', 'Chain Ladder'], rel=0.02)
+    assert summary.loc['Total', '99%'] > summary.loc['Total', '50%']
+
+    # The results only depend on the seed, not on the number of workers.
+    parallel = bootstrap_triangle(
+        triangle=genins,
+        n_sims=6000,
+        seed=7,
+        max_workers=2,
+        shard_size=2500
+    )
+
+    assert parallel.summary(percentiles=[50, 99]).equals(summary)
+
+    other_seed = bootstrap_triangle(
+        triangle=genins,
+        n_sims=6000,
+        seed=8,
+        max_workers=1,
+        shard_size=2500
+    )
+
+    assert not other_seed.summary(percentiles=[50, 99]).equals(summary)
+
+
+def test_bootstrap_widget(
+        qtbot: QtBot,
+        genins: cl.Triangle
+) -> None:
+
+    widget = BootstrapWidget(triangle=genins)
+    qtbot.addWidget(widget)
+
+    widget.sims_spin_box.setValue(1000)
+    widget.workers_spin_box.setValue(1)
+
+    widget.run()
+
+    assert not widget.run_btn.isEnabled()
+
+    qtbot.waitUntil(lambda: widget.thread is None, timeout=30000)
+
+    assert widget.run_btn.isEnabled()
+    assert widget.results.n_sims == 1000
+    assert widget.progress_bar.value() == 1000
+    assert widget.summary_model.rowCount() == len(genins.origin) + 1
+    assert widget.summary_model.headerData(0, Qt.Orientation.Horizontal, Qt.ItemDataRole.DisplayRole) == 'Chain Ladder'
@@ -0,0 +1,130 @@
+import pytest
+
+from faslr.connection import query_project_tree
+from faslr.constants import DB_NOT_FOUND_TEXT
+
+from faslr.database import (
+    DatabaseClient,
+    create_faslr_engine,
+    run_db_job
+)
+
+from faslr.schema import CountryTable
+
+from pytestqt.qtbot import QtBot
+
+from sqlalchemy.orm.session import Session
+
+
+def count_countries(
+        session: Session,
+        report_progress
+) -> int:
+
+    report_progress(0, 1)
+    n = session.query(CountryTable).count()
+    report_progress(1, 1)
+
+    return n
+
+
+def failing_job(
+        session: Session,
+        report_progress
+) -> None:
+
+    raise ValueError("bad job")
+
+
+def test_create_faslr_engine_missing() -> None:
+
+    with pytest.raises(FileNotFoundError, match=DB_NOT_FOUND_TEXT):
+        create_faslr_engine(db_path='does_not_exist.db')
+
+
+def test_run_db_job_inline(sample_db: str) -> None:
+
+    results = []
+    progress = []
+
+    n = run_db_job(
+        db_path=sample_db,
+        job=count_countries,
+        on_result=results.append,
+        on_progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert n > 0
+    assert results == [n]
+    assert progress == [(0, 1), (1, 1)]
+
+
+def test_run_db_job_inline_error(sample_db: str) -> None:
+
+    errors = []
+
+    run_db_job(
+        db_path=sample_db,
+        job=failing_job,
+        on_error=errors.append
+    )
+
+    assert errors == ["bad job"]
+
+    with pytest.raises(ValueError):
+        run_db_job(
+            db_path=sample_db,
+            job=failing_job
+        )
+
+
+def test_database_client(
+        qtbot: QtBot,
+        sample_db: str
+) -> None:
+
+    client = DatabaseClient()
+
+    results = []
+    errors = []
+    progress = []
+
+    run_db_job(
+        db_path=sample_db,
+        job=count_countries,
+        client=client,
+        on_result=results.append,
+        on_progress=lambda done, total: progress.append((done, total))
+    )
+
+    run_db_job(
+        db_path=sample_db,
+        job=failing_job,
+        client=client,
+        on_error=errors.append
+    )
+
+    qtbot.waitUntil(lambda: client.pending() == 0)
+
+    client.stop()
+
+    assert results[0] > 0
+    assert errors == ["bad job"]
+    assert progress == [(0, 1), (1, 1)]
+
+
+def test_query_project_tree(sample_db: str) -> None:
+
+    tree = run_db_job(
+        db_path=sample_db,
+        job=query_project_tree
+    )
+
+    assert len(tree) > 0
+
+    for country, country_uuid, states in tree:
+        assert isinstance(country, str)
+        for state, state_uuid, lobs in states:
+            assert isinstance(state, str)
+            for lob, lob_uuid in lobs:
+                assert isinstance(lob, str)
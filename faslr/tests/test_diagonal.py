@@ -0,0 +1,233 @@
+import pandas as pd
+import pytest
+
+from faslr.batch import (
+    create_batch_tables,
+    run_batch
+)
+from faslr.database import (
+    DatabaseClient,
+    run_db_job
+)
+from faslr.diagonal import (
+    append_diagonal,
+    project_diagonal,
+    write_diagonal
+)
+
+from faslr.schema import (
+    ProjectViewData,
+    ViewExclusionTable,
+    ViewFactorTable,
+    ViewResultTable
+)
+
+from functools import partial
+
+from pytestqt.qtbot import QtBot
+
+from sqlalchemy import (
+    delete,
+    func,
+    select
+)
+
+from sqlalchemy.orm.session import Session
+
+
+def roll_back_diagonal(
+        session: Session,
+        report_progress=None
+) -> pd.DataFrame:
+    """
+    Rolls the sample view back to calendar year 2006, selects a 12-24 LDF for the reported claims and excludes a
+    paid link ratio.
+
+    :return: The records of calendar year 2007, laid out like an uploaded file.
+    """
+
+    create_batch_tables(session=session)
+
+    records = pd.read_sql(
+        select(
+            ProjectViewData.accident_year,
+            ProjectViewData.calendar_year,
+            ProjectViewData.paid_loss,
+            ProjectViewData.reported_loss
+        ).where(
+            ProjectViewData.view_id == 1,
+            ProjectViewData.calendar_year == 2007
+        ),
+        con=session.connection()
+    )
+
+    session.execute(
+        delete(ProjectViewData).where(
+            ProjectViewData.view_id == 1,
+            ProjectViewData.calendar_year >= 2007
+        )
+    )
+
+    session.add(ViewFactorTable(view_id=1, column='Reported Claims', development=12, ldf=1.5))
+    session.add(ViewExclusionTable(view_id=1, column='Paid Claims', origin='2000', development=24))
+
+    records.columns = [
+        'Accident Year',
+        'Calendar Year',
+        'Paid Loss',
+        'Reported Loss'
+    ]
+
+    return records
+
+
+def read_state(
+        session: Session,
+        report_progress=None
+) -> dict:
+
+    return {
+        'records': session.scalar(select(func.count()).select_from(ProjectViewData)),
+        'factors': session.scalar(select(func.count()).select_from(ViewFactorTable)),
+        'exclusions': session.scalar(select(func.count()).select_from(ViewExclusionTable)),
+        'results': {
+            (result.column, result.origin): result.ultimate
+            for result in session.scalars(select(ViewResultTable))
+        }
+    }
+
+
+def test_append_diagonal(sample_db: str) -> None:
+
+    diagonal = run_db_job(
+        db_path=sample_db,
+        job=roll_back_diagonal,
+        write=True
+    )
+
+    before = run_db_job(db_path=sample_db, job=read_state)
+
+    # The view is projected before anything is written.
+    projection = run_db_job(
+        db_path=sample_db,
+        job=partial(
+            project_diagonal,
+            view_id=1,
+            data=diagonal
+        )
+    )
+
+    assert run_db_job(db_path=sample_db, job=read_state) == before
+
+    summary = append_diagonal(
+        db_path=sample_db,
+        view_id=1,
+        data=diagonal
+    )
+
+    assert summary['calendar_year'] == 2007
+    assert summary['records'] == 9
+    assert summary['factors'] == summary['exclusions'] == 1
+
+    appended = run_db_job(db_path=sample_db, job=read_state)
+
+    # Only the new diagonal is inserted, and the selections and exclusions carry forward.
+    assert appended['records'] == before['records'] + 9
+    assert appended['factors'] == before['factors'] == 1
+    assert appended['exclusions'] == before['exclusions'] == 1
+    # Accident year 2007 starts with the diagonal.
+    assert len(appended['results']) == summary['results'] == 2 * 9
+
+    # The results match a full re-projection of the view.
+    run_batch(db_path=sample_db, max_workers=1)
+
+    projected = run_db_job(db_path=sample_db, job=read_state)
+
+    assert appended['results'].keys() == projected['results'].keys()
+
+    for key, ultimate in projected['results'].items():
+        assert appended['results'][key] == pytest.approx(ultimate)
+
+    # The same diagonal cannot be appended twice, even if it was projected before the first one was written.
+    with pytest.raises(ValueError):
+        append_diagonal(
+            db_path=sample_db,
+            view_id=1,
+            data=diagonal
+        )
+
+    with pytest.raises(ValueError):
+        run_db_job(
+            db_path=sample_db,
+            job=partial(
+                write_diagonal,
+                projection=projection
+            ),
+            write=True
+        )
+
+    assert run_db_job(db_path=sample_db, job=read_state)['records'] == appended['records']
+
+
+@pytest.mark.parametrize(
+    'records',
+    [
+        # More than one calendar year.
+        [[2008, 2009, 1., 1.], [2007, 2010, 1., 1.]],
+        # The latest calendar year.
+        [[2008, 2008, 1., 1.]],
+        # Duplicate accident years.
+        [[2008, 2009, 1., 1.], [2008, 2009, 2., 2.]],
+        # An accident year after the calendar year.
+        [[2010, 2009, 1., 1.]],
+        # A new accident year before the diagonal.
+        [[1990, 2009, 1., 1.]],
+        # Accident years that are still developing are left out.
+        [[1999, 2009, 1., 1.], [2000, 2009, 1., 1.], [2009, 2009, 1., 1.]]
+    ]
+)
+def test_invalid_diagonal(
+        sample_db: str,
+        records: list
+) -> None:
+
+    with pytest.raises(ValueError):
+        append_diagonal(
+            db_path=sample_db,
+            view_id=1,
+            data=pd.DataFrame(records)
+        )
+
+
+def test_append_diagonal_client(
+        qtbot: QtBot,
+        sample_db: str
+) -> None:
+
+    diagonal = run_db_job(
+        db_path=sample_db,
+        job=roll_back_diagonal,
+        write=True
+    )
+
+    client = DatabaseClient()
+
+    summaries = []
+    errors = []
+
+    append_diagonal(
+        db_path=sample_db,
+        view_id=1,
+        data=diagonal,
+        client=client,
+        on_result=summaries.append,
+        on_error=errors.append
+    )
+
+    qtbot.waitUntil(lambda: len(summaries + errors) > 0)
+
+    client.stop()
+
+    assert errors == []
+    assert summaries[0]['records'] == 9
+    assert summaries[0]['results'] == 2 * 9
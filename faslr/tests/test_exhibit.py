@@ -1,17 +1,27 @@
 import chainladder as cl
+import csv
 import pytest
 
+from faslr.constants import (
+    AddColumnRole,
+    ColumnRotateRole,
+    ColumnSwapRole
+)
+
 from faslr.exhibit import (
     ExhibitBuilder,
     ExhibitGroupDialog,
     ExhibitInputListModel,
+    ExhibitModel,
     ExhibitOutputTreeView,
     RenameColumnDialog
 )
 from faslr.utilities.sample import load_sample
 
-from PyQt6.QtCore import QAbstractListModel, Qt, QTimer
-from PyQt6.QtGui import QStandardItemModel
+from pathlib import Path
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer
+from PyQt6.QtGui import QStandardItem, QStandardItemModel
 from PyQt6.QtWidgets import (
     QApplication,
     QListView
@@ -369,3 +379,91 @@ def test_exhibit_data(qtbot: QtBot, exhibit_builder: ExhibitBuilder) -> None:
     paid_cdf_display_test = exhibit_builder.preview_model.data(paid_cdf_idx, role=Qt.ItemDataRole.DisplayRole)
 
     assert paid_cdf_display_test == '1.000'
+
+
+def test_exhibit_model_permutation(qtbot: QtBot) -> None:
+
+    model = ExhibitModel()
+
+    for colname in ['A', 'B', 'C', 'D', 'E']:
+        model.setData(
+            index=QModelIndex(),
+            value=(colname, [colname.lower()] * 3),
+            role=AddColumnRole
+        )
+
+    store = model._data # noqa
+
+    # Swap two single columns which are not next to each other.
+    with qtbot.waitSignal(model.columnsMoved):
+        model.setData(
+            index=QModelIndex(),
+            value=(QStandardItem('B'), QStandardItem('D')),
+            role=ColumnSwapRole
+        )
+
+    assert model.columns == ['A', 'D', 'C', 'B', 'E']
+    assert model.data(model.index(0, 1), Qt.ItemDataRole.DisplayRole) == 'd'
+
+    # Swap a column with a group of two adjacent columns.
+    group = QStandardItem('Group')
+    group.appendRow(QStandardItem('C'))
+    group.appendRow(QStandardItem('B'))
+
+    model.setData(
+        index=QModelIndex(),
+        value=(QStandardItem('D'), group),
+        role=ColumnSwapRole
+    )
+
+    assert model.columns == ['A', 'C', 'B', 'D', 'E']
+
+    # Rotate all columns.
+    model.setData(index=QModelIndex(), value=('left', [], False), role=ColumnRotateRole)
+    assert model.columns == ['C', 'B', 'D', 'E', 'A']
+
+    model.setData(index=QModelIndex(), value=('right', [], False), role=ColumnRotateRole)
+    assert model.columns == ['A', 'C', 'B', 'D', 'E']
+
+    # Rotate a group to the end, and rotate within a group.
+    model.setData(index=QModelIndex(), value=('left', ['C', 'B'], True), role=ColumnRotateRole)
+    assert model.columns == ['A', 'D', 'E', 'C', 'B']
+
+    model.setData(index=QModelIndex(), value=('right', ['D', 'E'], False), role=ColumnRotateRole)
+    assert model.columns == ['A', 'E', 'D', 'C', 'B']
+
+    assert model.raw_block(0, 0, 0, 4).tolist() == [['a', 'e', 'd', 'c', 'b']]
+    assert list(model.to_frame().columns) == model.columns
+
+    # The column store itself is never reordered or copied.
+    assert model._data is store # noqa
+    assert list(store.columns) == ['A', 'B', 'C', 'D', 'E']
+
+    with pytest.raises(ValueError):
+        model.setData(index=QModelIndex(), value=('up', [], False), role=ColumnRotateRole)
+
+
+def test_export(
+        qtbot: QtBot,
+        exhibit_builder: ExhibitBuilder,
+        tmp_path: Path
+) -> None:
+
+    list_view: QListView = exhibit_builder.model_tabs.currentWidget().list_view
+    list_model: ExhibitInputListModel = exhibit_builder.input_models[0].list_model
+    list_view.setCurrentIndex(list_model.index(0))
+
+    qtbot.mouseClick(
+        exhibit_builder.input_btns.add_column_btn,
+        Qt.MouseButton.LeftButton,
+        delay=1
+    )
+
+    path = tmp_path / 'exhibit.csv'
+
+    exhibit_builder.export(path=str(path))
+
+    with open(path, newline='') as f:
+        lines = list(csv.reader(f))
+
+    assert lines[:3] == [['Accident Year'], [''], ['1998']]
@@ -0,0 +1,244 @@
+import csv
+import os
+import pytest
+import zipfile
+
+from faslr.constants import ColumnRotateRole
+
+from faslr.exhibit import (
+    ExhibitModel,
+    ExhibitView
+)
+
+from faslr.export import (
+    ExhibitHeader,
+    column_letter,
+    export_exhibit,
+    export_exhibits,
+    export_project_exhibits,
+    model_rows,
+    write_exhibit
+)
+
+from faslr.utilities.sample import load_sample
+
+from pathlib import Path
+
+from PyQt6.QtCore import (
+    QModelIndex,
+    Qt
+)
+
+from pytestqt.qtbot import QtBot
+
+from xml.etree import ElementTree
+
+SHEET_NS = {'s': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def read_sheet(path: str) -> tuple:
+    """
+    Reads the cells and merged ranges of the first sheet of a workbook written by the exporter.
+    """
+
+    with zipfile.ZipFile(path) as archive:
+        assert '[Content_Types].xml' in archive.namelist()
+        root = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+
+    cells = {}
+    for cell in root.iterfind('.//s:c', SHEET_NS):
+        value = cell.find('s:v', SHEET_NS)
+        if value is not None:
+            cells[cell.get('r')] = float(value.text)
+        else:
+            cells[cell.get('r')] = cell.find('.//s:t', SHEET_NS).text
+
+    merges = [merge.get('ref') for merge in root.iterfind('.//s:mergeCell', SHEET_NS)]
+
+    return cells, merges
+
+
+@pytest.fixture()
+def exhibit_view(qtbot: QtBot) -> ExhibitView:
+    """
+    An exhibit with the accident year followed by a group of two columns.
+    """
+
+    model = ExhibitModel()
+    view = ExhibitView()
+    view.setModel(model)
+    view.setGridHeaderView(
+        orientation=Qt.Orientation.Horizontal,
+        levels=2
+    )
+
+    view.insertColumn(colname='Accident Year', data=['1998', '1999', '2000'])
+    view.insertColumn(colname='Paid Claims', data=[100.0, 200.0, float('nan')])
+    view.insertColumn(colname='Paid Claims CDF', data=[1.0, 1.25, 2.5])
+
+    header = view.hheader
+    for col in [1, 2]:
+        header.removeSpan(row=0, column=col)
+        header.removeCellLabel(row=0, column=col)
+    header.setCellLabel(row=1, column=1, label='Paid Claims')
+    header.setCellLabel(row=1, column=2, label='Paid CDF')
+    header.setSpan(row=0, column=1, row_span_count=1, column_span_count=2)
+    header.setCellLabel(row=0, column=1, label='Paid')
+
+    qtbot.addWidget(view)
+
+    yield view
+
+
+def test_column_letter() -> None:
+
+    assert column_letter(0) == 'A'
+    assert column_letter(25) == 'Z'
+    assert column_letter(26) == 'AA'
+    assert column_letter(701) == 'ZZ'
+    assert column_letter(702) == 'AAA'
+
+
+def test_header_from_view(exhibit_view: ExhibitView) -> None:
+
+    header = ExhibitHeader.from_view(
+        header=exhibit_view.hheader,
+        n_columns=3
+    )
+
+    assert header.labels == [
+        ['Accident Year', 'Paid', ''],
+        ['', 'Paid Claims', 'Paid CDF']
+    ]
+
+    assert header.merges == [(0, 0, 2, 1), (0, 1, 1, 2)]
+
+
+def test_export_exhibit_xlsx(
+        exhibit_view: ExhibitView,
+        tmp_path: Path
+) -> None:
+
+    path = str(tmp_path / 'exhibit.xlsx')
+
+    n_rows = export_exhibit(
+        path=path,
+        model=exhibit_view.model(),
+        header=exhibit_view.hheader
+    )
+
+    assert n_rows == 3
+
+    cells, merges = read_sheet(path)
+
+    assert cells['A1'] == 'Accident Year'
+    assert cells['B1'] == 'Paid'
+    assert cells['C2'] == 'Paid CDF'
+    assert cells['A3'] == '1998'
+    assert cells['B4'] == 200
+    assert cells['C5'] == 2.5
+    # Missing values are left blank.
+    assert 'B5' not in cells
+
+    assert merges == ['A1:A2', 'B1:C1']
+
+
+def test_export_exhibit_csv(
+        exhibit_view: ExhibitView,
+        tmp_path: Path
+) -> None:
+
+    model: ExhibitModel = exhibit_view.model()
+
+    # Exported columns follow the displayed order.
+    model.setData(index=QModelIndex(), value=('left', [], False), role=ColumnRotateRole)
+
+    path = str(tmp_path / 'exhibit.csv')
+
+    export_exhibit(
+        path=path,
+        model=model,
+        header=exhibit_view.hheader
+    )
+
+    with open(path, newline='') as f:
+        lines = list(csv.reader(f))
+
+    assert len(lines) == 5
+    assert lines[2] == ['100.0', '1.0', '1998']
+    assert lines[4] == ['', '2.5', '2000']
+
+
+def test_model_rows_chunked(exhibit_view: ExhibitView) -> None:
+
+    rows = list(model_rows(model=exhibit_view.model(), chunk_size=2))
+
+    assert [row[0] for row in rows] == ['1998', '1999', '2000']
+
+
+def test_write_exhibit_invalid_format(tmp_path: Path) -> None:
+
+    with pytest.raises(ValueError):
+        write_exhibit(
+            path=str(tmp_path / 'exhibit.pdf'),
+            header=ExhibitHeader(labels=[['A']]),
+            rows=[]
+        )
+
+
+@pytest.mark.parametrize('max_workers', [1, 2])
+def test_export_exhibits(
+        tmp_path: Path,
+        max_workers: int
+) -> None:
+
+    triangle = load_sample('xyz')
+
+    progress = []
+
+    paths = export_exhibits(
+        triangles=[('XYZ', triangle), ('XYZ/Paid', triangle[['Paid Claims']])],
+        directory=str(tmp_path),
+        max_workers=max_workers,
+        on_progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert [os.path.basename(path) for path in paths] == ['XYZ.xlsx', 'XYZ_Paid.xlsx']
+    assert progress[-1] == (2, 2)
+
+    cells, merges = read_sheet(paths[0])
+
+    assert cells['A1'] == 'Accident Year'
+    assert cells['C1'] == 'Paid Claims'
+    assert cells['G1'] == 'Reported Claims'
+    assert cells['D2'] == 'CDF'
+    assert cells['A3'] == '1998'
+    assert merges == ['A1:A2', 'B1:B2', 'C1:F1', 'G1:J1']
+
+    with pytest.raises(ValueError):
+        export_exhibits(
+            triangles=[],
+            directory=str(tmp_path),
+            fmt='pdf'
+        )
+
+
+def test_export_project_exhibits(
+        sample_db: str,
+        tmp_path: Path
+) -> None:
+
+    paths = export_project_exhibits(
+        db_path=sample_db,
+        directory=str(tmp_path),
+        fmt='csv',
+        max_workers=1
+    )
+
+    assert len(paths) == 1
+
+    with open(paths[0], newline='') as f:
+        lines = list(csv.reader(f))
+
+    assert lines[0][:3] == ['Accident Year', 'Age', 'Paid Claims']
+    assert lines[1][2:6] == ['Latest', 'CDF', 'Ultimate', 'IBNR']
@@ -110,6 +110,37 @@ def test_factor_data(development_tab):
     assert first_back == MAIN_TRIANGLE_COLOR
 
 
+def test_factor_copy(development_tab: DevelopmentTab) -> None:
+
+    factor_model = development_tab.factor_model
+    factor_view = development_tab.factor_view
+
+    # The first row of link ratios, with the blank cells past the diagonal and the ultimate loss.
+    factor_view.selectRow(0)
+    factor_view.copy_selection()
+
+    copy_test = QApplication.clipboard().text().rstrip('\r\n').split('\t')
+
+    assert copy_test == [
+        factor_model.data(factor_model.index(0, column), Qt.ItemDataRole.DisplayRole)
+        for column in range(factor_model.columnCount())
+    ]
+
+    assert copy_test[0] == '1.792'
+    assert copy_test[-1] == '47,644,187'
+
+    # The blank CDF row copies as blanks, at full precision too.
+    factor_view.selectRow(14)
+    factor_view.copy_selection(raw=True)
+
+    assert QApplication.clipboard().text().strip('\t\r\n') == ''
+
+    factor_view.selectRow(0)
+    factor_view.copy_selection(raw=True)
+
+    assert float(QApplication.clipboard().text().split('\t')[0]) == factor_model._data.iloc[0, 0]
+
+
 # def test_add_vol_wtd(qtbot: QtBot, development_tab: DevelopmentTab) -> None:
 #     """
 #     Opens the ldf average box and adds the three-ear vol wtd. average.
@@ -0,0 +1,110 @@
+import chainladder as cl
+import numpy as np
+import pytest
+
+from faslr.mack import MackStandardErrors
+
+from faslr.utilities.sample import load_sample
+
+
+def mack_reference(
+        triangle: cl.Triangle,
+        drop: list = None
+) -> tuple:
+    """
+    Standard errors of each origin period and of the total, according to chainladder.
+    """
+
+    development = cl.Development(drop=drop) if drop else cl.Development()
+
+    model = cl.MackChainladder().fit(development.fit_transform(triangle))
+
+    return (
+        np.nan_to_num(model.mack_std_err_.values[0, 0, :, -1]),
+        model.total_mack_std_err_.values[0, 0]
+    )
+
+
+def test_mack_standard_errors() -> None:
+
+    genins = cl.load_sample('genins')
+
+    mack = MackStandardErrors(triangle=genins)
+
+    std_err, total_std_err = mack_reference(triangle=genins)
+
+    assert mack.mack_std_err[0, 0] == pytest.approx(std_err)
+    assert mack.total_mack_std_err[0, 0] == pytest.approx(total_std_err)
+
+    summary = mack.summary()
+
+    assert list(summary.columns) == ['Latest', 'IBNR', 'Ultimate', 'Mack Std. Err.', 'CV']
+    assert list(summary.index) == genins.origin.astype(str).tolist() + ['Total']
+
+    assert summary['IBNR'].iloc[:-1].to_numpy() == pytest.approx(
+        np.nan_to_num(cl.Chainladder().fit(genins).ibnr_.values[0, 0, :, -1])
+    )
+
+    assert summary.loc['Total', 'Mack Std. Err.'] == pytest.approx(total_std_err)
+    assert summary.loc['Total', 'CV'] == pytest.approx(total_std_err / summary.loc['Total', 'IBNR'])
+
+    # The oldest origin period is fully developed.
+    assert np.isnan(summary['CV'].iloc[0])
+
+
+def test_mack_batched() -> None:
+
+    # Every column is computed in one pass, and matches chainladder fit to each column on its own.
+    auto = load_sample('us_industry_auto')
+
+    mack = MackStandardErrors(triangle=auto)
+
+    for position, column in enumerate(auto.columns):
+
+        std_err, total_std_err = mack_reference(triangle=auto[column])
+
+        assert mack.mack_std_err[0, position] == pytest.approx(std_err)
+        assert mack.total_mack_std_err[0, position] == pytest.approx(total_std_err)
+
+
+def test_mack_exclusions() -> None:
+
+    auto = load_sample('us_industry_auto')
+
+    mack = MackStandardErrors(triangle=auto)
+
+    reported = mack.summary(column=1)
+
+    drop = [('1999', 12), ('1998', 24)]
+
+    mack.set_drop(drop=drop, column=0)
+
+    # Only the development periods whose exclusions changed are refit.
+    assert mack.fitted_periods == 2
+    assert mack.resumed_from == 0
+
+    std_err, total_std_err = mack_reference(triangle=auto['Paid Claims'], drop=drop)
+
+    assert mack.mack_std_err[0, 0] == pytest.approx(std_err)
+    assert mack.total_mack_std_err[0, 0] == pytest.approx(total_std_err)
+
+    # The other column is unaffected.
+    assert mack.summary(column=1).equals(reported)
+
+    # Excluding a later link ratio resumes the recursions from its development period.
+    drop = drop + [('2000', 72)]
+
+    mack.set_drop(drop=drop, column=0)
+
+    assert mack.fitted_periods == 1
+    assert mack.resumed_from == mack.ages.index(72)
+
+    std_err, total_std_err = mack_reference(triangle=auto['Paid Claims'], drop=drop)
+
+    assert mack.mack_std_err[0, 0] == pytest.approx(std_err)
+    assert mack.total_mack_std_err[0, 0] == pytest.approx(total_std_err)
+
+    # Setting the same exclusions again does nothing.
+    mack.set_drop(drop=drop, column=0)
+
+    assert mack.fitted_periods == 0
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import pytest
+import tracemalloc
+
+from faslr.analysis import DeferredAnalysisTab
+
+from faslr.memory import (
+    MemoryUsageDialog,
+    allocation_summary,
+    object_nbytes,
+    release_caches,
+    start_tracing,
+    stop_tracing,
+    tab_footprints,
+    widget_footprint
+)
+
+from faslr.utilities import load_sample
+
+from PyQt6.QtWidgets import (
+    QTabWidget,
+    QWidget
+)
+
+from pytestqt.qtbot import QtBot
+
+
+@pytest.fixture()
+def tab_widget(qtbot: QtBot) -> QTabWidget:
+
+    tab_widget = QTabWidget()
+    qtbot.addWidget(tab_widget)
+
+    tab_widget.addTab(DeferredAnalysisTab(triangle=load_sample('uspp_incr_case')), "XYZ")
+    tab_widget.addTab(DeferredAnalysisTab(triangle=load_sample('us_industry_auto')), "Auto")
+
+    tab_widget.show()
+    qtbot.waitExposed(tab_widget)
+
+    yield tab_widget
+
+
+def test_object_nbytes() -> None:
+
+    array = np.zeros(100)
+    df = pd.DataFrame({'a': np.zeros(10)})
+
+    assert object_nbytes(array) == 800
+    assert object_nbytes(df) == df.memory_usage(deep=True).sum()
+    assert object_nbytes(df['a']) == df['a'].memory_usage(deep=True)
+    assert object_nbytes([array]) is None
+
+
+def test_widget_footprint(qtbot: QtBot) -> None:
+
+    widget = QWidget()
+    qtbot.addWidget(widget)
+
+    array = np.zeros(100)
+
+    # Shared references are counted once.
+    widget.arrays = {'a': array, 'b': [array, np.zeros(50)]}
+    widget.frame = pd.DataFrame({'a': np.zeros(10)})
+
+    child = QWidget(widget)
+    child.array = np.zeros(25)
+
+    assert widget_footprint(widget) == {
+        'frames': 1,
+        'arrays': 3,
+        'bytes': 800 + 400 + 200 + widget.frame.memory_usage(deep=True).sum()
+    }
+
+
+def test_tab_footprints(tab_widget: QTabWidget) -> None:
+
+    df = tab_footprints(tab_widget=tab_widget)
+
+    # Only the displayed tab has been built, so it holds the most.
+    assert df['tab'].tolist() == ["XYZ", "Auto"]
+    assert df['loaded'].tolist() == [True, False]
+    assert (df['bytes'] > 0).all()
+
+
+def test_release_caches(tab_widget: QTabWidget) -> None:
+
+    tab_widget.setCurrentIndex(1)
+
+    assert all(tab_widget.widget(index).is_loaded for index in range(2))
+
+    loaded = widget_footprint(tab_widget.widget(0))['bytes']
+
+    # The displayed tab is kept.
+    assert release_caches(tab_widget=tab_widget) == 1
+
+    assert not tab_widget.widget(0).is_loaded
+    assert tab_widget.widget(1).is_loaded
+    assert widget_footprint(tab_widget.widget(0))['bytes'] < loaded
+
+
+def test_allocation_tracing(tab_widget: QTabWidget) -> None:
+
+    assert allocation_summary().empty
+
+    start_tracing()
+
+    try:
+        tab_widget.setCurrentIndex(1)
+
+        assert tab_widget.widget(1).allocated > 0
+
+        df = allocation_summary(n=5)
+
+        assert len(df) == 5
+        assert df['bytes'].is_monotonic_decreasing
+    finally:
+        stop_tracing()
+
+    assert not tracemalloc.is_tracing()
+
+
+def test_memory_usage_dialog(
+        qtbot: QtBot,
+        tab_widget: QTabWidget
+) -> None:
+
+    dialog = MemoryUsageDialog(tab_widget=tab_widget)
+    qtbot.addWidget(dialog)
+
+    assert dialog.tab_model.rowCount() == 2
+    assert dialog.tab_model.columnCount() == 6
+
+    tab_widget.setCurrentIndex(1)
+    dialog.refresh()
+
+    # Releasing the tab being displayed does nothing.
+    dialog.tab_view.selectRow(dialog.footprints['tab'].tolist().index("Auto"))
+
+    assert dialog.release_selected() == 0
+
+    assert dialog.release_all() == 1
+    assert dialog.footprints.set_index('tab').loc["XYZ", 'loaded'] == False  # noqa
+
+    dialog.trace_box.setChecked(True)
+
+    try:
+        assert "Traced" in dialog.summary_label.text()
+    finally:
+        dialog.trace_box.setChecked(False)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import chainladder as cl
 import pytest
 
 from faslr.__main__ import MainWindow
@@ -12,6 +13,9 @@ from faslr.menu import (
     open_discussions
 )
 
+from faslr.utilities.results_cache import RESULTS_CACHE
+from faslr.utilities.sample import load_sample
+
 from PyQt6.QtCore import Qt, QTimer
 
 from PyQt6.QtWidgets import QApplication
@@ -78,6 +82,59 @@ def test_display_engine(main_window: MainWindow) -> None:
     main_window.menu_bar.display_engine()
 
 
+def test_display_db_performance(main_window: MainWindow) -> None:
+    """
+    Test to display the database performance dialog.
+
+    :param main_window: The main_window fixture.
+    :return: None
+    """
+
+    main_window.menu_bar.display_db_performance()
+
+
+def test_display_memory_usage(main_window: MainWindow) -> None:
+    """
+    Test to display the memory usage dialog.
+
+    :param main_window: The main_window fixture.
+    :return: None
+    """
+
+    dialog = main_window.menu_bar.display_memory_usage()
+
+    assert dialog.tab_model.rowCount() == main_window.analysis_pane.count()
+
+
+def test_clear_results_cache(
+        main_window: MainWindow,
+        sample_db: str
+) -> None:
+    """
+    Test to clear the results cached in the project database.
+
+    :param main_window: The main_window fixture.
+    :param sample_db: The sample database the cache is kept in.
+    :return: None
+    """
+
+    RESULTS_CACHE.set_db(db_path=sample_db)
+
+    try:
+        RESULTS_CACHE.fetch(
+            triangle=load_sample('xyz'),
+            method='Development',
+            params={},
+            fit=lambda: cl.Development().fit(load_sample('xyz')),
+            outputs=['ldf_']
+        )
+
+        assert main_window.menu_bar.clear_results_cache() == 1
+        assert main_window.statusBar().currentMessage() == "Cleared 1 cached results."
+    finally:
+        RESULTS_CACHE.set_db(db_path=None)
+
+
 def test_display_edit_connection(
         qtbot: QtBot,
         main_window: MainWindow
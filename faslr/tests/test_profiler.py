@@ -0,0 +1,194 @@
+import json
+import os
+import pstats
+import pytest
+import threading
+
+from faslr.__main__ import MainWindow
+from faslr.core import FCore
+
+from faslr.profiler import (
+    PROFILER,
+    Profiler,
+    ProfilerStatusLabel,
+    profiled
+)
+
+from pathlib import Path
+
+from pytestqt.qtbot import QtBot
+
+
+def run_span(
+        profiler: Profiler,
+        name: str
+) -> None:
+
+    with profiler.span(name):
+        pass
+
+
+@pytest.fixture()
+def profiler() -> Profiler:
+
+    profiler = Profiler(size=10)
+
+    yield profiler
+
+
+def test_profiler_span(profiler: Profiler) -> None:
+
+    # Nothing is recorded while profiling is off.
+    with profiler.span("Disabled"):
+        pass
+
+    assert len(profiler) == 0
+
+    profiler.enable()
+
+    with profiler.span("Outer"):
+        with profiler.span("Inner"):
+            pass
+
+    inner, outer = profiler.records
+
+    assert (inner.name, inner.depth) == ("Inner", 1)
+    assert (outer.name, outer.depth) == ("Outer", 0)
+    assert outer.duration >= inner.duration
+    assert profiler.stats is None
+
+    # The span is recorded even if the operation fails.
+    with pytest.raises(ValueError):
+        with profiler.span("Failed"):
+            raise ValueError
+
+    assert profiler.records[-1].name == "Failed"
+    assert profiler.records[-1].depth == 0
+
+
+def test_profiler_export(
+        profiler: Profiler,
+        tmp_path: Path
+) -> None:
+
+    profiler.enable(use_cprofile=True)
+
+    with profiler.span("Sort"):
+        sorted(range(1000), reverse=True)
+
+    thread = threading.Thread(target=run_span, args=(profiler, "Worker"))
+    thread.start()
+    thread.join()
+
+    trace = profiler.to_chrome_trace()
+
+    spans = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+
+    assert [span['name'] for span in spans] == ["Sort", "Worker"]
+    assert spans[0]['ts'] == 0
+    assert spans[1]['ts'] >= spans[0]['dur']
+    assert spans[0]['tid'] != spans[1]['tid']
+
+    # The worker thread gets its own named track.
+    assert len([event for event in trace['traceEvents'] if event['ph'] == 'M']) == 2
+
+    paths = profiler.export(path=str(tmp_path / 'trace.json'))
+
+    assert paths == [str(tmp_path / 'trace.json'), str(tmp_path / 'trace.prof')]
+
+    with open(paths[0]) as f:
+        assert json.load(f) == json.loads(json.dumps(trace))
+
+    stats = pstats.Stats(paths[1])
+    assert any(function[2] == "<built-in method builtins.sorted>" for function in stats.stats)
+
+    profiler.clear()
+
+    assert len(profiler) == 0
+    assert profiler.stats is None
+
+
+def test_profiled(profiler: Profiler) -> None:
+
+    @profiled("Add")
+    def add(a: int, b: int) -> int:
+        return a + b
+
+    PROFILER.enable()
+
+    try:
+        assert add(1, b=2) == 3
+    finally:
+        PROFILER.disable()
+
+    assert PROFILER.records[-1].name == "Add"
+
+    assert add.__name__ == 'add'
+
+    # Arguments the function does not accept, e.g., those of a signal it is connected to, are dropped.
+    assert add(1, 2, True) == 3
+
+
+def test_profiler_status_label(
+        qtbot: QtBot,
+        profiler: Profiler
+) -> None:
+
+    label = ProfilerStatusLabel(profiler=profiler)
+    qtbot.addWidget(label)
+
+    profiler.enable()
+
+    with profiler.span("Fit tail"):
+        with profiler.span("Nested"):
+            pass
+
+    qtbot.waitUntil(lambda: label.text().startswith("Fit tail: "))
+
+    # Spans from other threads reach the label through the event loop.
+    thread = threading.Thread(target=run_span, args=(profiler, "Load tree"))
+    thread.start()
+    thread.join()
+
+    qtbot.waitUntil(lambda: label.text().startswith("Load tree: "))
+
+
+def test_profiling_menu(
+        qtbot: QtBot,
+        tmp_path: Path
+) -> None:
+
+    main_window = MainWindow(core=FCore(config_path=''))
+    qtbot.addWidget(main_window)
+
+    menu_bar = main_window.menu_bar
+
+    PROFILER.clear()
+
+    try:
+        menu_bar.cprofile_action.setChecked(True)
+
+        assert not PROFILER.enabled
+
+        menu_bar.profiling_action.setChecked(True)
+
+        assert PROFILER.enabled
+        assert PROFILER.use_cprofile
+        assert not menu_bar.profiler_label.isHidden()
+
+        # Tabs are built when first shown, so showing the window builds the first triangle.
+        main_window.show()
+
+        qtbot.waitUntil(lambda: menu_bar.profiler_label.text().startswith("Open triangle: "))
+
+        paths = menu_bar.export_profile(path=str(tmp_path / 'trace.json'))
+
+        assert [os.path.basename(path) for path in paths] == ['trace.json', 'trace.prof']
+
+        menu_bar.profiling_action.setChecked(False)
+
+        assert not PROFILER.enabled
+        assert menu_bar.profiler_label.isHidden()
+    finally:
+        PROFILER.disable()
+        PROFILER.clear()
@@ -0,0 +1,93 @@
+import pytest
+
+from faslr.database import (
+    create_faslr_engine,
+    run_db_job
+)
+
+from faslr.query_log import (
+    QUERY_LOG,
+    DatabasePerformanceDialog,
+    QueryLog,
+    instrument_engine
+)
+
+from faslr.schema import CountryTable
+
+from pytestqt.qtbot import QtBot
+
+from sqlalchemy import text
+
+
+@pytest.fixture()
+def query_log() -> QueryLog:
+
+    query_log = QueryLog(size=5)
+
+    yield query_log
+
+
+def test_instrument_engine(
+        sample_db: str,
+        query_log: QueryLog
+) -> None:
+
+    engine = instrument_engine(
+        engine=create_faslr_engine(db_path=sample_db),
+        query_log=query_log
+    )
+
+    with engine.connect() as conn:
+        countries = len(conn.execute(text("SELECT country_id FROM country")).fetchall())
+
+        for i in range(3):
+            conn.execute(text("SELECT * FROM country")).fetchall()
+
+    df = query_log.summary()
+    select = df[df['statement'] == "SELECT * FROM country"].iloc[0]
+
+    assert select['calls'] == 3
+    assert select['total'] > 0
+    assert select['call_site'].startswith('tests')
+
+    # sqlite does not report the rows of a SELECT, they are counted as they are fetched.
+    assert select['rows'] == 3 * countries
+
+    # The ring buffer discards the oldest statements.
+    with engine.connect() as conn:
+        for i in range(10):
+            conn.execute(text("SELECT 1"))
+
+    assert len(query_log) == 5
+
+    query_log.clear()
+
+    assert query_log.slowest().empty
+
+    engine.dispose()
+
+
+def test_default_query_log(
+        qtbot: QtBot,
+        sample_db: str
+) -> None:
+
+    QUERY_LOG.clear()
+
+    run_db_job(
+        db_path=sample_db,
+        job=lambda session, report_progress: session.query(CountryTable).all()
+    )
+
+    assert len(QUERY_LOG) > 0
+    assert QUERY_LOG.to_frame()['rows'].sum() > 0
+    assert QUERY_LOG.most_frequent().iloc[0]['calls'] >= 1
+
+    dialog = DatabasePerformanceDialog(query_log=QUERY_LOG)
+    qtbot.addWidget(dialog)
+
+    assert dialog.slowest_model.rowCount() > 0
+
+    dialog.clear()
+
+    assert dialog.frequent_model.rowCount() == 0
@@ -38,6 +38,34 @@ def test_tail_constant(tail_pane: TailPane) -> None:
     tail_pane.tail_candidates[0].gb_tail_type.constant_btn.setChecked(True)
 
 
+def test_selected_tail(tail_pane: TailPane) -> None:
+    """
+    Test selecting a constant tail and reading it back.
+
+    :param tail_pane: The tail_pane fixture.
+    :return: None
+    """
+
+    # Nothing is selected until a candidate is marked as selected.
+    assert tail_pane.selected_tail() is None
+
+    params = {
+        'tail': 1.05,
+        'decay': 0.4,
+        'attachment_age': 108,
+        'projection_period': 24
+    }
+
+    tail_pane.select_tail(params=params)
+
+    assert tail_pane.selected_tail() == pytest.approx(params)
+
+    # Only constant tails are saved.
+    tail_pane.tail_candidates[0].gb_tail_type.curve_btn.setChecked(True)
+
+    assert tail_pane.selected_tail() is None
+
+
 def test_tail_curve(tail_pane: TailPane) -> None:
     """
     Test curve tail type.
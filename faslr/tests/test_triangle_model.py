@@ -165,6 +165,41 @@ def test_triangle_view(
     assert copy_test == copy_expectation
 
 
+def test_copy_selection_raw(
+        qtbot: QtBot,
+        triangle_model: TriangleModel
+) -> None:
+    """
+    Copy the full-precision values of a selection, and a selection that is not a rectangle.
+    :param qtbot: The QtBot fixture.
+    :param triangle_model: The TriangleModel fixture.
+    :return: None
+    """
+
+    triangle_view = TriangleView()
+    qtbot.addWidget(triangle_view)
+    triangle_view.setModel(triangle_model)
+
+    triangle_view.selectRow(1)
+    triangle_view.copy_selection(raw=True)
+
+    copy_test = QApplication.clipboard().text().rstrip('\r\n').split('\t')
+
+    assert copy_test[0] == ''
+    assert float(copy_test[1]) == triangle_model.values[1, 1]
+
+    # Select two cells on a diagonal, the cells in between should be blank.
+    selection_model = triangle_view.selectionModel()
+    selection_model.clearSelection()
+    selection_model.select(triangle_model.index(0, 5), selection_model.SelectionFlag.Select)
+    selection_model.select(triangle_model.index(1, 6), selection_model.SelectionFlag.Select)
+
+    triangle_view.copy_selection()
+
+    assert QApplication.clipboard().text() == value_expectation + '\t\r\n\t' + \
+        triangle_model.display_values[1, 6] + '\r\n'
+
+
 def test_triangle_model_ratio(
         ratio_model: TriangleModel
 ) -> None:
@@ -1,11 +1,19 @@
 import chainladder as cl
+import numpy as np
 import pandas as pd
+import pytest
 
 from faslr.tests import ASSET_PATH
 
 from faslr.utilities import (
+    ModelResults,
     load_sample,
     fetch_cdf,
+    fetch_ibnr,
+    fetch_latest_diagonal,
+    fetch_origin,
+    fetch_results,
+    fetch_ultimate,
     table_from_tri
 )
 
@@ -43,3 +51,35 @@ def test_fetch_cdf():
     cdf_test = fetch_cdf(xyz_cl)
 
     assert cdf_test == cdf_expectation
+
+def test_fetch_results_cached():
+
+    model = cl.Chainladder().fit(xyz_tri)
+
+    results = fetch_results(model)
+
+    assert fetch_results(model) is results
+
+    # Callers get copies, so modifying them does not affect the cache.
+    cdf = fetch_cdf(model)
+    cdf.pop()
+    assert fetch_cdf(model) == cdf_expectation
+
+    # Refitting the model invalidates its results.
+    model.fit(xyz_tri.iloc[..., :-1, :])
+
+    assert fetch_results(model) is not results
+    assert len(fetch_origin(model)) == len(xyz_tri.origin) - 1
+
+def test_fetch_ibnr():
+
+    ibnr = fetch_ibnr(xyz_cl)
+    ultimate = fetch_ultimate(xyz_cl)
+    diagonal = fetch_latest_diagonal(xyz_cl)
+
+    np.testing.assert_allclose(ibnr, np.array(ultimate) - np.array(diagonal))
+
+def test_model_results_invalid_column():
+
+    with pytest.raises(ValueError):
+        ModelResults(xyz_cl).get_column('Bad Column')
@@ -0,0 +1,30 @@
+import sys
+
+from faslr.utilities.lazy import (
+    is_loaded,
+    lazy_import
+)
+
+
+def test_lazy_import() -> None:
+
+    name = 'faslr.samples.db'
+    sys.modules.pop(name, None)
+
+    module = lazy_import(name)
+
+    assert sys.modules[name] is module
+    assert not is_loaded(name)
+
+    # The module is executed on first attribute access.
+    assert module.__name__ == name
+    assert is_loaded(name)
+
+    assert lazy_import(name) is module
+
+
+def test_lazy_import_loaded() -> None:
+
+    assert lazy_import('sys') is sys
+    assert is_loaded('sys')
+    assert not is_loaded('faslr.not_a_module')
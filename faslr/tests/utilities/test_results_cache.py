@@ -0,0 +1,219 @@
+import chainladder as cl
+import numpy as np
+import os
+import pandas as pd
+import pytest
+
+from faslr.diagnostics import MackDiagnostics
+from faslr.factor import FactorModel
+from faslr.utilities.sample import load_sample
+
+from faslr.utilities.results_cache import (
+    RESULTS_CACHE,
+    CachedResults,
+    ResultsCache,
+    cache_key,
+    deserialize_output,
+    serialize_output
+)
+
+from pathlib import Path
+
+
+@pytest.fixture()
+def results_cache(sample_db: str) -> ResultsCache:
+
+    results_cache = ResultsCache()
+    results_cache.set_db(db_path=sample_db)
+
+    yield results_cache
+
+    results_cache.set_db(db_path=None)
+
+
+@pytest.fixture()
+def app_results_cache(sample_db: str) -> ResultsCache:
+    """
+    Points the application's cache at the sample database for the duration of a test.
+    """
+
+    RESULTS_CACHE.set_db(db_path=sample_db)
+
+    yield RESULTS_CACHE
+
+    RESULTS_CACHE.set_db(db_path=None)
+
+
+def fit_development(calls: list, n_periods: int = -1):
+
+    calls.append(n_periods)
+
+    return cl.Development(n_periods=n_periods).fit(load_sample('xyz')['Paid Claims'])
+
+
+def test_serialize_output() -> None:
+
+    model = cl.TailCurve().fit(load_sample('xyz')['Paid Claims'])
+
+    ldf = deserialize_output(*serialize_output(model.ldf_))
+    pd.testing.assert_frame_equal(ldf.to_frame(), model.ldf_.to_frame())
+
+    tail = deserialize_output(*serialize_output(model.tail_))
+    pd.testing.assert_frame_equal(tail, model.tail_)
+
+    labels = np.array([1999, 2000])
+    np.testing.assert_array_equal(deserialize_output(*serialize_output(labels)), labels)
+
+    assert deserialize_output(*serialize_output(.5)) == .5
+
+    with pytest.raises(ValueError):
+        serialize_output([1, 2])
+
+
+def test_cache_key() -> None:
+
+    triangle = load_sample('xyz')['Paid Claims']
+
+    key = cache_key(triangle=triangle, method='Development', params={'n_periods': 3})
+
+    # The key depends on the contents of the triangle rather than the object.
+    assert key == cache_key(triangle=load_sample('xyz')['Paid Claims'], method='Development', params={'n_periods': 3})
+    assert key != cache_key(triangle=triangle, method='Development', params={'n_periods': 4})
+    assert key != cache_key(triangle=triangle * 2, method='Development', params={'n_periods': 3})
+
+
+def test_results_cache(results_cache: ResultsCache) -> None:
+
+    triangle = load_sample('xyz')['Paid Claims']
+    calls = []
+
+    def fetch(n_periods: int):
+
+        return results_cache.fetch(
+            triangle=triangle,
+            method='Development',
+            params={'n_periods': n_periods},
+            fit=lambda: fit_development(calls=calls, n_periods=n_periods),
+            outputs=['ldf_', 'cdf_']
+        )
+
+    fitted = fetch(n_periods=3)
+    cached = fetch(n_periods=3)
+
+    assert isinstance(cached, CachedResults)
+    assert calls == [3]
+    assert (results_cache.hits, results_cache.misses) == (1, 1)
+
+    np.testing.assert_array_equal(cached.ldf_.values, fitted.ldf_.values)
+    np.testing.assert_array_equal(cached.cdf_.values, fitted.cdf_.values)
+
+    # Different parameters miss the cache.
+    fetch(n_periods=4)
+
+    assert calls == [3, 4]
+    assert results_cache.size() > 0
+
+    # A cache asking for more outputs than were stored refits.
+    results_cache.fetch(
+        triangle=triangle,
+        method='Development',
+        params={'n_periods': 3},
+        fit=lambda: fit_development(calls=calls, n_periods=3),
+        outputs=['ldf_', 'cdf_', 'sigma_']
+    )
+
+    assert calls == [3, 4, 3]
+
+    assert results_cache.clear() == 2
+    assert results_cache.size() == 0
+
+    fetch(n_periods=3)
+
+    assert calls == [3, 4, 3, 3]
+
+
+def test_eviction(results_cache: ResultsCache) -> None:
+
+    triangle = load_sample('xyz')['Paid Claims']
+    calls = []
+
+    for n_periods in [2, 3, 4]:
+        results_cache.fetch(
+            triangle=triangle,
+            method='Development',
+            params={'n_periods': n_periods},
+            fit=lambda: fit_development(calls=calls, n_periods=n_periods), # noqa
+            outputs=['ldf_']
+        )
+
+        # Make sure the entries' last use differs.
+        if n_periods == 2:
+            entry_size = results_cache.size()
+            results_cache.max_size = 2 * entry_size
+
+    assert results_cache.size() == 2 * entry_size
+
+    # The least recently used entry was evicted.
+    for n_periods in [4, 3, 2]:
+        results_cache.fetch(
+            triangle=triangle,
+            method='Development',
+            params={'n_periods': n_periods},
+            fit=lambda: fit_development(calls=calls, n_periods=n_periods), # noqa
+            outputs=['ldf_']
+        )
+
+    assert calls == [2, 3, 4, 2]
+
+
+def test_disabled_results_cache(tmp_path: Path) -> None:
+
+    results_cache = ResultsCache()
+    calls = []
+
+    db_path = str(tmp_path / 'missing.db')
+
+    assert not results_cache.set_db(db_path=db_path)
+    assert not os.path.exists(db_path)
+
+    for i in range(2):
+        results_cache.fetch(
+            triangle=load_sample('xyz')['Paid Claims'],
+            method='Development',
+            params={},
+            fit=lambda: fit_development(calls=calls),
+            outputs=['ldf_']
+        )
+
+    assert len(calls) == 2
+    assert results_cache.clear() == 0
+
+
+def test_cached_factor_model(app_results_cache: ResultsCache) -> None:
+
+    triangle = load_sample('xyz')['Paid Claims']
+
+    fitted = FactorModel(triangle=triangle)
+
+    misses = app_results_cache.misses
+
+    cached = FactorModel(triangle=triangle)
+
+    assert app_results_cache.misses == misses
+    pd.testing.assert_frame_equal(cached._data, fitted._data)  # noqa
+
+
+def test_cached_diagnostics(app_results_cache: ResultsCache) -> None:
+
+    triangle = load_sample('xyz')['Paid Claims']
+    hits = app_results_cache.hits
+
+    fitted = MackDiagnostics(triangle=triangle)
+    fitted.compute_valuation()
+    fitted.compute_development()
+
+    cached = MackDiagnostics(triangle=triangle)
+
+    assert cached.valuation_individual(p_critical=.1).equals(fitted.valuation_individual(p_critical=.1))
+    assert cached.development(p_critical=.5) == fitted.development(p_critical=.5)
+    assert app_results_cache.hits == hits + 2
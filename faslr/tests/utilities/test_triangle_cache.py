@@ -0,0 +1,152 @@
+import chainladder as cl
+import numpy as np
+import os
+import pandas as pd
+import pytest
+import shutil
+
+from faslr.utilities.sample import (
+    load_sample,
+    samples
+)
+
+from faslr.utilities.triangle_cache import (
+    TriangleCache,
+    read_triangle,
+    read_triangle_csv,
+    triangle_from_bytes,
+    triangle_to_bytes,
+    write_triangle
+)
+
+from pathlib import Path
+
+SAMPLES_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'samples')
+
+ARGUMENTS = {
+    'origin': 'Accident Year',
+    'development': 'Calendar Year',
+    'columns': ['Paid Claims', 'Reported Claims'],
+    'cumulative': True
+}
+
+
+@pytest.fixture()
+def sample_csv(tmp_path: Path) -> str:
+    """
+    A copy of a sample CSV that the tests are free to modify.
+    """
+
+    path = str(tmp_path / 'xyz.csv')
+    shutil.copyfile(os.path.join(SAMPLES_PATH, samples['xyz']), path)
+
+    yield path
+
+
+def assert_same_triangle(
+        triangle: cl.Triangle,
+        expected: cl.Triangle
+) -> None:
+
+    np.testing.assert_array_equal(triangle.values, expected.values)
+    pd.testing.assert_frame_equal(triangle.to_frame(), expected.to_frame())
+
+    assert triangle.valuation_date == expected.valuation_date
+    assert triangle.key_labels == expected.key_labels
+    assert triangle.is_cumulative == expected.is_cumulative
+
+
+def test_write_read_triangle(tmp_path: Path) -> None:
+
+    triangle = load_sample('mack97')
+    path = str(tmp_path / 'mack97.tri')
+
+    write_triangle(path=path, triangle=triangle)
+    restored = read_triangle(path=path)
+
+    assert_same_triangle(restored, triangle)
+
+    # Restored triangles work with chainladder as usual.
+    np.testing.assert_allclose(
+        cl.Chainladder().fit(restored).ultimate_.values,
+        cl.Chainladder().fit(triangle).ultimate_.values
+    )
+
+    with open(path, 'r+b') as f:
+        f.write(b'NOTATRIA')
+
+    with pytest.raises(ValueError):
+        read_triangle(path=path)
+
+
+def test_triangle_bytes() -> None:
+
+    triangle = load_sample('mack97')
+
+    assert_same_triangle(
+        triangle=triangle_from_bytes(data=triangle_to_bytes(triangle=triangle)),
+        expected=triangle
+    )
+
+    with pytest.raises(ValueError):
+        triangle_from_bytes(data=b'not a triangle')
+
+
+def test_triangle_cache(
+        tmp_path: Path,
+        sample_csv: str
+) -> None:
+
+    cache = TriangleCache(directory=str(tmp_path / 'cache'))
+
+    triangle = read_triangle_csv(sample_csv, cache=cache, **ARGUMENTS)
+    cached = read_triangle_csv(sample_csv, cache=cache, **ARGUMENTS)
+
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert_same_triangle(cached, triangle)
+
+    # Other arguments are cached separately.
+    paid = read_triangle_csv(sample_csv, cache=cache, **dict(ARGUMENTS, columns=['Paid Claims']))
+
+    assert cache.misses == 2
+    assert paid.shape == (1, 1, 11, 11)
+
+    # Modifying the source replaces its entry.
+    df = pd.read_csv(sample_csv)
+    df['Paid Claims'] = df['Paid Claims'] * 2
+    df.to_csv(sample_csv, index=False)
+
+    doubled = read_triangle_csv(sample_csv, cache=cache, **ARGUMENTS)
+
+    assert cache.misses == 3
+    np.testing.assert_allclose(
+        doubled['Paid Claims'].values,
+        triangle['Paid Claims'].values * 2
+    )
+
+    assert len(os.listdir(cache.directory)) == 2
+
+    assert cache.clear() == 2
+    assert os.listdir(cache.directory) == []
+
+
+def test_triangle_cache_corrupt(
+        tmp_path: Path,
+        sample_csv: str
+) -> None:
+
+    cache = TriangleCache(directory=str(tmp_path / 'cache'))
+
+    triangle = read_triangle_csv(sample_csv, cache=cache, **ARGUMENTS)
+
+    path = cache.entry_path(source=sample_csv, arguments=ARGUMENTS)
+
+    with open(path, 'wb') as f:
+        f.write(b'garbage')
+
+    # Unreadable entries are rebuilt.
+    rebuilt = read_triangle_csv(sample_csv, cache=cache, **ARGUMENTS)
+
+    assert cache.misses == 2
+    assert_same_triangle(rebuilt, triangle)
+    assert_same_triangle(read_triangle(path=path), triangle)
@@ -1,14 +1,21 @@
+import numpy as np
+
 from faslr.base_table import (
     FAbstractTableModel,
     FTableView
 )
 
+from faslr.constants import (
+    TRIANGLE_PREFETCH_MARGIN,
+    TRIANGLE_WIDTH_SAMPLE_SIZE
+)
+
 from chainladder import Triangle
 
 from PyQt6.QtCore import (
+    QAbstractItemModel,
     QSize,
-    Qt,
-    QVariant
+    Qt
 )
 
 from PyQt6.QtGui import (
@@ -40,7 +47,9 @@ class TriangleModel(FAbstractTableModel):
             value_type: str
     ):
         """
-        Subclass of the FAbstractTableModel used to hold triangle data.
+        Subclass of the FAbstractTableModel used to hold triangle data. The values are held in a NumPy array and
+        their display text is only generated for the cells that are about to be shown, see format_block().
+
         :param triangle: A chainladder Triangle object.
         :param value_type: The type of values to be displayed, e.g., "value" to display scalars such as premium or
         loss, and "ratio" to display link ratios.
@@ -53,49 +62,92 @@ class TriangleModel(FAbstractTableModel):
         self.triangle = triangle
 
         self._data = triangle.to_frame(origin_as_datetime=False)
+        self.values = self._data.to_numpy(dtype=float)
         self.value_type = value_type
         self.n_rows = self.rowCount()
         self.n_columns = self.columnCount()
         self.excl_frame = self._data.copy()
         self.excl_frame.loc[:] = False
 
-    def data(
+        # "value" means stuff like losses and premiums, for "ratio", want to display 3 decimal places.
+        if self.value_type == "value":
+            self.style = VALUE_STYLE
+        else:
+            self.style = RATIO_STYLE
+
+        # Display text of each cell, filled in as cells come into view.
+        self.display_values = np.empty(self.values.shape, dtype=object)
+        self.formatted = np.zeros(self.values.shape, dtype=bool)
+
+    def format_block(
             self,
-            index,
-            role=None
-    ):
+            top: int,
+            bottom: int,
+            left: int,
+            right: int
+    ) -> None:
+        """
+        Generates the display text of the cells within the given rows and columns (inclusive) that have not yet been
+        formatted.
+        """
 
-        if role == Qt.ItemDataRole.DisplayRole:
+        rows = slice(max(top, 0), min(bottom, self.n_rows - 1) + 1)
+        columns = slice(max(left, 0), min(right, self.n_columns - 1) + 1)
 
-            value = self._data.iloc[index.row(), index.column()]
+        pending = ~self.formatted[rows, columns]
 
-            # Display blank when there are nans in the lower-right hand of the triangle.
-            if str(value) == "nan":
+        if not pending.any():
+            return
 
-                display_value = BLANK_TEXT
-            else:
-                # "value" means stuff like losses and premiums, should have 2 decimal places.
-                if self.value_type == "value":
+        values = self.values[rows, columns][pending]
 
-                    display_value = VALUE_STYLE.format(value)
+        # Display blank when there are nans in the lower-right hand of the triangle.
+        self.display_values[rows, columns][pending] = [
+            BLANK_TEXT if np.isnan(value) else self.style.format(value) for value in values
+        ]
 
-                # for "ratio", want to display 3 decimal places.
-                else:
+        self.formatted[rows, columns] = True
 
-                    display_value = RATIO_STYLE.format(value)
+    def display_block(
+            self,
+            top: int,
+            bottom: int,
+            left: int,
+            right: int
+    ) -> np.ndarray:
+        """
+        Returns the display text of the cells within the given rows and columns (inclusive).
+        """
 
-                display_value = str(display_value)
+        self.format_block(top, bottom, left, right)
 
-            self.setData(
-                self.index(
-                    index.row(),
-                    index.column()
-                ),
-                QVariant(Qt.AlignmentFlag.AlignRight),
-                Qt.ItemDataRole.TextAlignmentRole
-            )
+        return self.display_values[top:bottom + 1, left:right + 1]
+
+    def raw_block(
+            self,
+            top: int,
+            bottom: int,
+            left: int,
+            right: int
+    ) -> np.ndarray:
+
+        return self.values[top:bottom + 1, left:right + 1]
+
+    def data(
+            self,
+            index,
+            role=None
+    ):
+
+        if role == Qt.ItemDataRole.DisplayRole:
 
-            return display_value
+            row = index.row()
+            column = index.column()
+
+            if not self.formatted[row, column]:
+                self.format_block(row, row, column, column)
+
+            return self.display_values[row, column]
 
         if role == Qt.ItemDataRole.TextAlignmentRole:
             return Qt.AlignmentFlag.AlignRight
@@ -144,7 +196,13 @@ class TriangleView(FTableView):
         self.copy_action.setStatusTip("Copy selection to clipboard.")
         self.addAction(self.copy_action)
         # noinspection PyUnresolvedReferences
-        self.copy_action.triggered.connect(self.copy_selection)
+        self.copy_action.triggered.connect(lambda: self.copy_selection())
+
+        self.copy_values_action = QAction("Copy &Values", self)
+        self.copy_values_action.setShortcut(QKeySequence("Ctrl+Alt+c"))
+        self.copy_values_action.setStatusTip("Copy the full-precision values of the selection to clipboard.")
+        self.addAction(self.copy_values_action)
+        self.copy_values_action.triggered.connect(lambda: self.copy_selection(raw=True)) # noqa
 
         self.installEventFilter(self)
 
@@ -189,6 +247,112 @@ class TriangleView(FTableView):
         if s.isValid():
             self.verticalHeader().setMinimumWidth(s.width())
 
+        # Format the cells coming into view as the user scrolls.
+        self.horizontalScrollBar().valueChanged.connect(self.prefetch_viewport) # noqa
+        self.verticalScrollBar().valueChanged.connect(self.prefetch_viewport) # noqa
+
+    def setModel(
+            self,
+            model: QAbstractItemModel
+    ) -> None:
+
+        super().setModel(model)
+
+        if isinstance(model, TriangleModel):
+            self.set_column_widths()
+            self.prefetch_viewport()
+
+    def resizeEvent(self, event) -> None:
+
+        super().resizeEvent(event)
+
+        self.prefetch_viewport()
+
+    def visible_range(self) -> tuple:
+        """
+        Returns the (top, bottom, left, right) rows and columns currently visible in the viewport.
+        """
+
+        model = self.model()
+
+        rect = self.viewport().rect()
+
+        top = max(self.rowAt(rect.top()), 0)
+        bottom = self.rowAt(rect.bottom())
+        left = max(self.columnAt(rect.left()), 0)
+        right = self.columnAt(rect.right())
+
+        # rowAt() and columnAt() return -1 past the last row or column.
+        if bottom < 0:
+            bottom = model.rowCount() - 1
+        if right < 0:
+            right = model.columnCount() - 1
+
+        return top, bottom, left, right
+
+    def prefetch_viewport(self) -> None:
+        """
+        Formats the visible cells plus a margin around them, so that they are ready for painting.
+        """
+
+        model = self.model()
+
+        if not isinstance(model, TriangleModel):
+            return
+
+        top, bottom, left, right = self.visible_range()
+
+        model.format_block(
+            top=top - TRIANGLE_PREFETCH_MARGIN,
+            bottom=bottom + TRIANGLE_PREFETCH_MARGIN,
+            left=left - TRIANGLE_PREFETCH_MARGIN,
+            right=right + TRIANGLE_PREFETCH_MARGIN
+        )
+
+    def set_column_widths(
+            self,
+            sample_size: int = TRIANGLE_WIDTH_SAMPLE_SIZE
+    ) -> None:
+        """
+        Sizes each column to fit its contents, measured on a sample of rows rather than every cell. The sample
+        always includes the largest and smallest value in the column, which produce the widest text.
+        """
+
+        model = self.model()
+
+        n_rows = model.rowCount()
+
+        if n_rows == 0:
+            return
+
+        metrics = self.fontMetrics()
+        header_metrics = self.horizontalHeader().fontMetrics()
+        padding = 2 * self.style().pixelMetric(QStyle.PixelMetric.PM_HeaderMargin) + 6
+
+        sample_rows = np.unique(np.linspace(0, n_rows - 1, min(sample_size, n_rows)).astype(int))
+
+        values = model.values
+        has_values = ~np.isnan(values).all(axis=0)
+
+        max_rows = np.argmax(np.where(np.isnan(values), -np.inf, values), axis=0)
+        min_rows = np.argmin(np.where(np.isnan(values), np.inf, values), axis=0)
+
+        for column in range(model.columnCount()):
+
+            rows = sample_rows
+            if has_values[column]:
+                rows = np.append(rows, [max_rows[column], min_rows[column]])
+
+            texts = [model.display_block(row, row, column, column)[0, 0] for row in rows]
+
+            width = max(metrics.horizontalAdvance(text) for text in texts)
+
+            header_width = header_metrics.horizontalAdvance(
+                str(model.headerData(column, Qt.Orientation.Horizontal, Qt.ItemDataRole.DisplayRole))
+            )
+
+            self.setColumnWidth(column, max(width, header_width) + padding)
+
     def contextMenuEvent(
             self,
             event
@@ -202,4 +366,5 @@ class TriangleView(FTableView):
 
         self.context_menu = QMenu(self)
         self.context_menu.addAction(self.copy_action)
+        self.context_menu.addAction(self.copy_values_action)
         self.context_menu.exec(self.viewport().mapToGlobal(event))
@@ -4,9 +4,13 @@ from sqlalchemy import event
 from sqlalchemy.engine import Engine
 
 from faslr.utilities.chainladder import (
+    ModelResults,
+    clear_results_cache,
     fetch_cdf,
+    fetch_ibnr,
     fetch_latest_diagonal,
     fetch_origin,
+    fetch_results,
     fetch_ultimate,
     table_from_tri
 )
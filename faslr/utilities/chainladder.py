@@ -1,14 +1,128 @@
+"""
+Extraction of results from fitted chainladder models. Deriving a series such as the latest diagonal or the CDFs
+from a fitted model goes through chainladder's Triangle machinery and a pandas conversion, which is slow relative to
+how often the GUI asks for it. ModelResults pulls every series out of a fitted model once and keeps them as arrays,
+and fetch_results() caches one ModelResults per fitted model.
+"""
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
-
+import numpy as np
 import pandas as pd
+import weakref
+
+from typing import TYPE_CHECKING
 
 if TYPE_CHECKING: # pragma: no cover
     from chainladder import Chainladder
     from pandas import DataFrame
 
 
+class ModelResults:
+    """
+    Columnar cache of the series of a fitted chain ladder model that can be placed into an exhibit or a table.
+
+    :param triangle: A fitted chainladder model, e.g., Chainladder().fit(triangle).
+    """
+    def __init__(
+            self,
+            triangle: Chainladder
+    ):
+
+        x = triangle.X_
+        latest_diagonal = x.latest_diagonal
+
+        # Keep a reference to the ultimate of the fit the series were extracted from, so that refitting the model
+        # can be detected.
+        self.ultimate_ = triangle.ultimate_
+
+        self.column = x.columns[0]
+        self.origin_grain = x.origin_grain
+
+        self.origin = np.asarray(x.origin.to_frame().index.astype(str))
+        self.age = np.asarray(x.development.sort_values(ascending=False))
+        self.latest_diagonal = latest_diagonal.to_frame().iloc[:, 0].to_numpy()
+
+        # The CDFs are ordered by development period, with a trailing entry for the tail. Reverse them so that they
+        # line up with the origin periods, the latest of which is the least developed.
+        cdf = latest_diagonal.cdf_.to_frame().values.flatten()
+        self.cdf = cdf[:-1][::-1].copy()
+
+        self.ultimate = triangle.ultimate_.to_frame().iloc[:, 0].to_numpy()
+
+        # Derived here rather than from ibnr_, whose conversion to a frame reports fully developed origins as NaN.
+        self.ibnr = self.ultimate - self.latest_diagonal
+
+        # Series by the names under which they are offered in the exhibit builder.
+        self.columns = {
+            'Accident Year': self.origin,
+            'Age': self.age,
+            self.column: self.latest_diagonal,
+            self.column + ' CDF': self.cdf,
+            'Ultimate ' + self.column: self.ultimate,
+            self.column + ' IBNR': self.ibnr
+        }
+
+    def get_column(
+            self,
+            colname: str
+    ) -> list:
+        """
+        Returns a copy of a series as a list, so that callers are free to modify it.
+        """
+
+        try:
+            return self.columns[colname].tolist()
+        except KeyError:
+            raise ValueError("Invalid column name specified.")
+
+    def is_current(
+            self,
+            triangle: Chainladder
+    ) -> bool:
+        """
+        Whether the cached series still belong to the model, i.e., the model has not been refit since.
+        """
+
+        return getattr(triangle, 'ultimate_', None) is self.ultimate_
+
+
+# Cached results, keyed by the id of the fitted model. Entries are dropped when the model is garbage collected.
+_RESULTS_CACHE = {}
+
+
+def fetch_results(
+        triangle: Chainladder
+) -> ModelResults:
+    """
+    Returns the cached results of a fitted model, extracting them on first use or if the model has been refit.
+    """
+
+    key = id(triangle)
+
+    results = _RESULTS_CACHE.get(key)
+
+    if results is None or not results.is_current(triangle=triangle):
+        if results is None:
+            weakref.finalize(triangle, _RESULTS_CACHE.pop, key, None)
+        results = ModelResults(triangle=triangle)
+        _RESULTS_CACHE[key] = results
+
+    return results
+
+
+def clear_results_cache() -> int:
+    """
+    Drops the cached results of every fitted model. They are extracted again the next time they are asked for.
+
+    :return: The number of entries dropped.
+    """
+
+    count = len(_RESULTS_CACHE)
+    _RESULTS_CACHE.clear()
+
+    return count
+
+
 def table_from_tri(
         triangle: Chainladder
 ) -> DataFrame:
@@ -16,16 +130,13 @@ def table_from_tri(
     Summarize fitted chain ladder model in 2-D table format.
     """
 
-    origin = fetch_origin(triangle=triangle)
-    diagonal = fetch_latest_diagonal(triangle=triangle)
-    column = triangle.X_.columns[0]
-
-    ultimate = fetch_ultimate(triangle=triangle)
+    results = fetch_results(triangle=triangle)
+    column = results.column
 
     df = pd.DataFrame({
-        'Accident Year': origin,
-        column: diagonal,
-        'Ultimate ' + column: ultimate
+        'Accident Year': results.get_column('Accident Year'),
+        column: results.get_column(column),
+        'Ultimate ' + column: results.get_column('Ultimate ' + column)
     })
 
     return df
@@ -35,32 +146,36 @@ def fetch_origin(
         triangle: Chainladder
 ) -> list:
 
-    origin = triangle.X_.origin.to_frame().index.astype(str).tolist()
-
-    return origin
+    return fetch_results(triangle=triangle).get_column('Accident Year')
 
 def fetch_latest_diagonal(
         triangle: Chainladder
 ) -> list:
 
-    diagonal = list(triangle.X_.latest_diagonal.to_frame().iloc[:, 0])
+    results = fetch_results(triangle=triangle)
 
-    return diagonal
+    return results.get_column(results.column)
 
 def fetch_cdf(
         triangle: Chainladder
 ) -> list:
 
-    cdf = list(triangle.X_.latest_diagonal.cdf_.to_frame().iloc[:, ].values.flatten())
-    cdf.pop()
-    cdf.reverse()
+    results = fetch_results(triangle=triangle)
 
-    return cdf
+    return results.get_column(results.column + ' CDF')
 
 def fetch_ultimate(
         triangle: Chainladder
 ) -> list:
 
-    data = list(triangle.ultimate_.to_frame().iloc[:, 0])
+    results = fetch_results(triangle=triangle)
+
+    return results.get_column('Ultimate ' + results.column)
+
+def fetch_ibnr(
+        triangle: Chainladder
+) -> list:
+
+    results = fetch_results(triangle=triangle)
 
-    return data
\ No newline at end of file
+    return results.get_column(results.column + ' IBNR')
@@ -0,0 +1,48 @@
+"""
+Deferred imports of heavy modules. chainladder alone pulls in scikit-learn, scipy and their dependencies, which take
+longer to import than it takes to build and show the main window. Modules on the startup path bind such packages
+with lazy_import(), so that they are only loaded when first used.
+"""
+import importlib.util
+import sys
+
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns a module that is executed on first attribute access. If the module has already been imported, it is
+    returned as is.
+
+    :param name: The fully qualified name of the module, e.g., 'chainladder'.
+    """
+
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+
+    if spec is None:
+        raise ModuleNotFoundError("No module named %s." % name, name=name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+
+    return module
+
+
+def is_loaded(name: str) -> bool:
+    """
+    Whether a module has been executed, as opposed to not imported at all or only bound by lazy_import().
+    """
+
+    module = sys.modules.get(name)
+
+    if module is None:
+        return False
+
+    return not isinstance(module, importlib.util._LazyModule)  # noqa
@@ -0,0 +1,445 @@
+"""
+Cache of fitted results in the project database.
+
+Reopening a project refits every LDF average, tail and diagnostic test from scratch, although neither the triangles
+nor the selections have changed. ResultsCache keeps the fitted outputs of each fit, such as ldf_, cdf_, ultimate_
+and tail_, in the result_cache table of the project database, keyed by a hash of the triangle's contents, the name
+of the method and its full set of parameters. Since the key is derived from the contents, an edited triangle or a
+changed parameter simply misses the cache, and entries never need to be invalidated. The least recently used
+entries are evicted once the table grows past its maximum size.
+
+Triangles are stored in the layout of the triangle cache files, arrays in numpy's .npy format, and DataFrames as a
+JSON header with their labels followed by their values in .npy format, so that values are restored exactly and
+reading an entry never unpickles anything from the database.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import logging
+import numpy as np
+import os
+import pandas as pd
+
+from datetime import datetime
+
+from faslr.constants import RESULTS_CACHE_SIZE
+
+from faslr.database import create_faslr_engine
+
+from faslr.schema import (
+    Base,
+    ResultCacheTable
+)
+
+from faslr.utilities.triangle_cache import (
+    triangle_from_bytes,
+    triangle_header,
+    triangle_to_bytes
+)
+
+from sqlalchemy import (
+    delete,
+    func,
+    select,
+    update
+)
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm.session import Session
+
+from typing import (
+    Any,
+    Callable,
+    TYPE_CHECKING
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from chainladder import Triangle
+
+# Part of every key, increment when the way results are computed or serialized changes.
+RESULTS_CACHE_VERSION = 1
+
+# Errors reading or writing the cache, upon which the results are fitted as if there were no cache.
+_CACHE_ERRORS = (
+    SQLAlchemyError,
+    OSError,
+    TypeError,
+    ValueError,
+    KeyError
+)
+
+
+def triangle_digest(triangle: Triangle) -> str:
+    """
+    Hashes the contents of a triangle, i.e., its values and everything needed to restore it.
+    """
+
+    header, values = triangle_header(triangle=triangle)
+
+    digest = hashlib.sha256(json.dumps(header, sort_keys=True).encode())
+    digest.update(values.tobytes())
+
+    return digest.hexdigest()
+
+
+def cache_key(
+        triangle: Triangle,
+        method: str,
+        params: dict
+) -> str:
+
+    return hashlib.sha256(
+        json.dumps(
+            [RESULTS_CACHE_VERSION, triangle_digest(triangle=triangle), method, params],
+            sort_keys=True,
+            default=str
+        ).encode()
+    ).hexdigest()
+
+
+def array_to_bytes(values: np.ndarray) -> bytes:
+
+    f = io.BytesIO()
+    np.save(f, np.asarray(values), allow_pickle=False)
+
+    return f.getvalue()
+
+
+def array_from_bytes(data: bytes) -> np.ndarray:
+
+    return np.load(io.BytesIO(data), allow_pickle=False)
+
+
+def frame_to_bytes(df: pd.DataFrame) -> bytes:
+    """
+    Serializes a DataFrame with a numeric body and string or integer labels, such as chainladder's tail_.
+    """
+
+    header = json.dumps({
+        'index': df.index.tolist(),
+        'columns': df.columns.tolist(),
+        'index_name': df.index.name,
+        'columns_name': df.columns.name
+    }).encode()
+
+    return len(header).to_bytes(8, 'little') + header + array_to_bytes(values=df.to_numpy())
+
+
+def frame_from_bytes(data: bytes) -> pd.DataFrame:
+
+    header_size = int.from_bytes(data[:8], 'little')
+    header = json.loads(data[8:8 + header_size])
+
+    df = pd.DataFrame(
+        array_from_bytes(data=data[8 + header_size:]),
+        index=header['index'],
+        columns=header['columns']
+    )
+
+    df.index.name = header['index_name']
+    df.columns.name = header['columns_name']
+
+    return df
+
+
+def serialize_output(value: Any) -> (str, bytes):
+    """
+    Serializes a fitted output, returning how it was serialized along with the data.
+    """
+
+    if isinstance(value, pd.DataFrame):
+        return 'frame', frame_to_bytes(df=value)
+    elif isinstance(value, np.ndarray) or np.isscalar(value):
+        return 'array', array_to_bytes(values=value)
+    elif type(value).__name__ == 'Triangle':
+        return 'triangle', triangle_to_bytes(triangle=value)
+    else:
+        raise ValueError("Cannot cache outputs of type %s." % type(value).__name__)
+
+
+def deserialize_output(
+        kind: str,
+        data: bytes
+) -> Any:
+
+    if kind == 'frame':
+        return frame_from_bytes(data=data)
+    elif kind == 'array':
+        return array_from_bytes(data=data)
+    elif kind == 'triangle':
+        return triangle_from_bytes(data=data)
+    else:
+        raise ValueError("Unknown cached output kind %s." % kind)
+
+
+class CachedResults:
+    """
+    Stands in for a fitted model restored from the cache, holding its outputs as attributes, e.g., results.ldf_.
+    """
+    def __init__(
+            self,
+            outputs: dict
+    ):
+
+        self.__dict__.update(outputs)
+
+
+class ResultsCache:
+    """
+    Cache of fitted results in the result_cache table of a project database. The cache does nothing until it is
+    pointed at a database with set_db(), so fits made without a project open are unaffected.
+
+    :param max_size: Bytes of serialized outputs kept before the least recently used entries are evicted.
+    """
+    def __init__(
+            self,
+            max_size: float = RESULTS_CACHE_SIZE * 1024 ** 2
+    ):
+
+        self.max_size = max_size
+
+        self.db_path = None
+        self.engine = None
+        self.session_factory = None
+
+        # Number of lookups served from and missing the cache, for diagnostics.
+        self.hits = 0
+        self.misses = 0
+
+    def set_db(
+            self,
+            db_path: str = None
+    ) -> bool:
+        """
+        Points the cache at a project database, adding the result_cache table if the database predates it.
+
+        :param db_path: The path of the database, None turns the cache off.
+        :return: Whether the cache is on.
+        """
+
+        if self.engine is not None:
+            self.engine.dispose()
+
+        self.db_path = None
+        self.engine = None
+        self.session_factory = None
+
+        if db_path is None:
+            return False
+
+        try:
+            engine = create_faslr_engine(db_path=db_path)
+
+            Base.metadata.create_all(
+                bind=engine,
+                tables=[ResultCacheTable.__table__]
+            )
+        except (SQLAlchemyError, OSError) as e:
+            logging.warning("Could not open the results cache of %s: %s" % (db_path, e))
+            return False
+
+        self.db_path = db_path
+        self.engine = engine
+        self.session_factory = sessionmaker(bind=engine)
+
+        return True
+
+    @property
+    def enabled(self) -> bool:
+
+        # The database may have been moved or deleted since it was opened.
+        return self.engine is not None and os.path.isfile(self.db_path)
+
+    def fetch(
+            self,
+            triangle: Triangle,
+            method: str,
+            params: dict,
+            fit: Callable[[], Any],
+            outputs: list
+    ) -> Any:
+        """
+        Returns the outputs of a fit from the cache, or fits and caches them on a miss.
+
+        :param triangle: The triangle being fit, part of the key.
+        :param method: The name of the method, e.g., Development, part of the key.
+        :param params: Every parameter the fit depends on, part of the key. Must be serializable as JSON.
+        :param fit: Fits the model on a miss. The result must have the outputs as attributes.
+        :param outputs: The names of the attributes to cache, e.g., ['ldf_', 'cdf_'].
+        :return: The fitted model on a miss, otherwise CachedResults with the same attributes.
+        """
+
+        if not self.enabled:
+            return fit()
+
+        try:
+            key = cache_key(triangle=triangle, method=method, params=params)
+            cached = self.get(key=key, outputs=outputs)
+        except _CACHE_ERRORS as e:
+            logging.warning("Could not read cached %s results: %s" % (method, e))
+            return fit()
+
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+
+        fitted = fit()
+
+        try:
+            self.put(
+                key=key,
+                method=method,
+                outputs={output: getattr(fitted, output) for output in outputs}
+            )
+        except _CACHE_ERRORS as e:
+            logging.warning("Could not cache %s results: %s" % (method, e))
+
+        return fitted
+
+    def get(
+            self,
+            key: str,
+            outputs: list
+    ) -> CachedResults | None:
+        """
+        Reads an entry, marking it as used. Entries lacking any of the outputs are treated as missing.
+        """
+
+        with self.session_factory() as session, session.begin():
+
+            rows = session.execute(
+                select(
+                    ResultCacheTable.output,
+                    ResultCacheTable.kind,
+                    ResultCacheTable.data
+                ).where(ResultCacheTable.key == key)
+            ).all()
+
+            data = {row.output: (row.kind, row.data) for row in rows}
+
+            if not set(outputs).issubset(data):
+                return None
+
+            session.execute(
+                update(ResultCacheTable).where(
+                    ResultCacheTable.key == key
+                ).values(
+                    last_used=datetime.now()
+                )
+            )
+
+        return CachedResults(
+            outputs={output: deserialize_output(*data[output]) for output in outputs}
+        )
+
+    def put(
+            self,
+            key: str,
+            method: str,
+            outputs: dict
+    ) -> None:
+        """
+        Writes an entry, replacing any earlier entry with the same key, then evicts entries if the cache has grown
+        past its maximum size.
+        """
+
+        rows = []
+
+        for output, value in outputs.items():
+            kind, data = serialize_output(value=value)
+
+            rows.append({
+                'key': key,
+                'method': method,
+                'output': output,
+                'kind': kind,
+                'data': data,
+                'size': len(data),
+                'last_used': datetime.now()
+            })
+
+        with self.session_factory() as session, session.begin():
+
+            session.execute(delete(ResultCacheTable).where(ResultCacheTable.key == key))
+            session.execute(ResultCacheTable.__table__.insert(), rows)
+
+            self.evict(session=session, keep=key)
+
+    def evict(
+            self,
+            session: Session,
+            keep: str = None
+    ) -> int:
+        """
+        Deletes the least recently used entries until the cache fits within its maximum size.
+
+        :param session: The session of the write that may have grown the cache.
+        :param keep: An entry that is never evicted, i.e., the one just written.
+        :return: The number of entries evicted.
+        """
+
+        total = session.scalar(select(func.sum(ResultCacheTable.size))) or 0
+
+        if total <= self.max_size:
+            return 0
+
+        entries = session.execute(
+            select(
+                ResultCacheTable.key,
+                func.sum(ResultCacheTable.size)
+            ).group_by(
+                ResultCacheTable.key
+            ).order_by(
+                func.max(ResultCacheTable.last_used)
+            )
+        ).all()
+
+        evicted = []
+
+        for key, size in entries:
+            if total <= self.max_size:
+                break
+            if key == keep:
+                continue
+            evicted.append(key)
+            total -= size
+
+        session.execute(delete(ResultCacheTable).where(ResultCacheTable.key.in_(evicted)))
+
+        return len(evicted)
+
+    def size(self) -> int:
+        """
+        Returns the bytes of serialized outputs in the cache.
+        """
+
+        if not self.enabled:
+            return 0
+
+        with self.session_factory() as session:
+            return session.scalar(select(func.sum(ResultCacheTable.size))) or 0
+
+    def clear(self) -> int:
+        """
+        Deletes every entry.
+
+        :return: The number of entries deleted.
+        """
+
+        if not self.enabled:
+            return 0
+
+        with self.session_factory() as session, session.begin():
+            count = session.scalar(select(func.count(func.distinct(ResultCacheTable.key))))
+            session.execute(delete(ResultCacheTable))
+
+        return count
+
+
+# The cache of the project database the application is connected to.
+RESULTS_CACHE = ResultsCache()
@@ -1,7 +1,13 @@
-import chainladder as cl
-import pandas as pd
+from __future__ import annotations
+
 import os
-from chainladder import Triangle
+
+from faslr.utilities.triangle_cache import read_triangle_csv
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from chainladder import Triangle
 
 
 samples = {
@@ -106,27 +112,21 @@ def load_sample(
         return joined
 
     try:
-        df_csv = pd.read_csv(
-            join_path(samples[sample_name])
-        )
+        sample_path = join_path(samples[sample_name])
     except KeyError:
         raise Exception("Invalid sample name.")
 
     if sample_name != "mack97":
-        triangle = cl.Triangle(
-            data=df_csv,
-            origin='Accident Year',
-            development='Calendar Year',
-            columns=['Paid Claims', 'Reported Claims'],
-            cumulative=True
-        )
+        columns = ['Paid Claims', 'Reported Claims']
     else:
-        triangle = cl.Triangle(
-            data=df_csv,
-            origin='Accident Year',
-            development='Calendar Year',
-            columns=['Case Incurred'],
-            cumulative=True
-        )
+        columns = ['Case Incurred']
+
+    triangle = read_triangle_csv(
+        path=sample_path,
+        origin='Accident Year',
+        development='Calendar Year',
+        columns=columns,
+        cumulative=True
+    )
 
     return triangle
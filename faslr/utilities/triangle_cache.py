@@ -0,0 +1,398 @@
+"""
+Binary on-disk cache of triangles built from files.
+
+Building a chainladder Triangle from a CSV means parsing the file with pandas and then aggregating it into the
+triangle's value array, which is repeated every time a sample or a frequently used file is opened. TriangleCache
+stores the value array of each constructed triangle, along with its index, column, origin and development
+metadata, in a single file keyed by the source path, its modification time and the constructor arguments. Hits
+memory-map the values and restore the triangle's attributes directly, skipping both steps.
+
+Each cache file consists of a magic string, the length of a JSON header, the header, padding up to a 64-byte
+boundary, and the values in C order.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+
+from faslr.constants import TRIANGLE_CACHE_PATH
+
+from faslr.utilities.lazy import lazy_import
+
+from typing import (
+    Callable,
+    TYPE_CHECKING
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from chainladder import Triangle
+
+cl = lazy_import('chainladder')
+
+TRIANGLE_CACHE_MAGIC = b'FASLRTRI'
+TRIANGLE_CACHE_VERSION = 1
+TRIANGLE_CACHE_ALIGNMENT = 64
+TRIANGLE_CACHE_EXTENSION = '.tri'
+
+
+def hash_key(parts: list) -> str:
+
+    return hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()[:24]
+
+
+def triangle_header(triangle: Triangle) -> (dict, np.ndarray):
+    """
+    Returns the metadata of a triangle, as stored in the header of a cache file, along with its values as a
+    contiguous numpy array.
+    """
+
+    backend = triangle.array_backend
+
+    if backend != 'numpy':
+        triangle = triangle.set_backend('numpy')
+
+    values = np.ascontiguousarray(triangle.values)
+
+    # Projected triangles, e.g., ultimate_, are developed to a valuation date rather than to an age.
+    ddims = triangle.ddims
+
+    if np.issubdtype(ddims.dtype, np.datetime64):
+        ddims = ddims.astype('datetime64[ns]').astype(np.int64)
+
+    header = {
+        'version': TRIANGLE_CACHE_VERSION,
+        'dtype': values.dtype.str,
+        'shape': list(values.shape),
+        'array_backend': backend,
+        'kdims': triangle.kdims.tolist(),
+        'vdims': triangle.vdims.tolist(),
+        'odims': triangle.odims.astype('datetime64[ns]').astype(np.int64).tolist(),
+        'ddims': ddims.tolist(),
+        'ddims_dtype': triangle.ddims.dtype.str,
+        'key_labels': list(triangle.key_labels),
+        'valuation_date': triangle.valuation_date.value,
+        'origin_grain': triangle.origin_grain,
+        'development_grain': triangle.development_grain,
+        'origin_close': triangle.origin_close,
+        'is_cumulative': triangle.is_cumulative,
+        'is_pattern': triangle.is_pattern
+    }
+
+    return header, values
+
+
+def triangle_to_bytes(triangle: Triangle) -> bytes:
+    """
+    Serializes a triangle in the layout of a cache file.
+    """
+
+    header, values = triangle_header(triangle=triangle)
+
+    header_bytes = json.dumps(header).encode()
+
+    prefix_size = len(TRIANGLE_CACHE_MAGIC) + 8 + len(header_bytes)
+    padding = -prefix_size % TRIANGLE_CACHE_ALIGNMENT
+
+    return b''.join([
+        TRIANGLE_CACHE_MAGIC,
+        len(header_bytes).to_bytes(8, 'little'),
+        header_bytes,
+        b'\0' * padding,
+        values.tobytes()
+    ])
+
+
+def write_triangle(
+        path: str,
+        triangle: Triangle
+) -> None:
+    """
+    Serializes a triangle to a cache file. The file is written under a temporary name and then moved into place,
+    so that readers never see a partially written file.
+    """
+
+    data = triangle_to_bytes(triangle=triangle)
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+def read_header(
+        prefix: bytes,
+        source: str
+) -> (dict, int):
+    """
+    Parses the beginning of a serialized triangle.
+
+    :param prefix: The serialized triangle, or at least its magic string, header length and header.
+    :param source: Describes where the triangle comes from, for error messages.
+    :return: The header, and the offset of the values.
+    """
+
+    if prefix[:len(TRIANGLE_CACHE_MAGIC)] != TRIANGLE_CACHE_MAGIC:
+        raise ValueError("%s is not a triangle cache file." % source)
+
+    start = len(TRIANGLE_CACHE_MAGIC) + 8
+    header_size = int.from_bytes(prefix[len(TRIANGLE_CACHE_MAGIC):start], 'little')
+    header = json.loads(prefix[start:start + header_size])
+
+    if header['version'] != TRIANGLE_CACHE_VERSION:
+        raise ValueError("Unsupported triangle cache version %s." % header['version'])
+
+    offset = start + header_size
+    offset += -offset % TRIANGLE_CACHE_ALIGNMENT
+
+    return header, offset
+
+
+def build_triangle(
+        header: dict,
+        values: np.ndarray
+) -> Triangle:
+    """
+    Restores a triangle from its header and values.
+    """
+
+    # An empty Triangle skips all parsing and aggregation, its attributes are then set from the header.
+    triangle = cl.Triangle()
+
+    kdims = np.empty((len(header['kdims']), len(header['key_labels'])), dtype=object)
+    kdims[:] = header['kdims']
+
+    triangle.kdims = kdims
+    triangle.vdims = np.array(header['vdims'])
+    triangle.odims = np.array(header['odims'], dtype='datetime64[ns]')
+    triangle.ddims = np.array(header['ddims'])
+
+    if 'ddims_dtype' in header:
+        triangle.ddims = triangle.ddims.astype(np.dtype(header['ddims_dtype']))
+    triangle.key_labels = header['key_labels']
+    triangle.valuation_date = pd.Timestamp(header['valuation_date'])
+    triangle.origin_grain = header['origin_grain']
+    triangle.development_grain = header['development_grain']
+    triangle.origin_close = header['origin_close']
+    triangle.is_cumulative = header['is_cumulative']
+    triangle.is_pattern = header['is_pattern']
+    triangle.values = np.asarray(values)
+    triangle.array_backend = 'numpy'
+    triangle.virtual_columns = cl.core.triangle.VirtualColumns(triangle)
+    triangle._set_slicers()  # noqa
+
+    if header['array_backend'] != 'numpy':
+        triangle = triangle.set_backend(header['array_backend'])
+
+    return triangle
+
+
+def triangle_from_bytes(data: bytes) -> Triangle:
+    """
+    Restores a triangle serialized by triangle_to_bytes(). The values are copied out of data.
+    """
+
+    header, offset = read_header(prefix=data, source="Serialized triangle")
+
+    values = np.frombuffer(
+        data,
+        dtype=np.dtype(header['dtype']),
+        offset=offset,
+        count=int(np.prod(header['shape']))
+    ).reshape(header['shape']).copy()
+
+    return build_triangle(header=header, values=values)
+
+
+def read_triangle(path: str) -> Triangle:
+    """
+    Restores a triangle from a cache file. The values are memory-mapped copy-on-write, so that they are paged in
+    as needed and chainladder may still modify them in memory.
+    """
+
+    with open(path, 'rb') as f:
+        prefix = f.read(len(TRIANGLE_CACHE_MAGIC) + 8)
+        if prefix[:len(TRIANGLE_CACHE_MAGIC)] == TRIANGLE_CACHE_MAGIC:
+            prefix += f.read(int.from_bytes(prefix[len(TRIANGLE_CACHE_MAGIC):], 'little'))
+
+    header, offset = read_header(prefix=prefix, source=path)
+
+    values = np.memmap(
+        path,
+        dtype=np.dtype(header['dtype']),
+        mode='c',
+        offset=offset,
+        shape=tuple(header['shape'])
+    )
+
+    return build_triangle(header=header, values=values)
+
+
+class TriangleCache:
+    """
+    Directory of cached triangles. A source keeps a single entry per set of constructor arguments, which is replaced
+    once the source is modified.
+
+    :param directory: Where the cache files are kept.
+    """
+    def __init__(
+            self,
+            directory: str = TRIANGLE_CACHE_PATH
+    ):
+
+        self.directory = directory
+
+        # Number of lookups served from and missing the cache, for diagnostics.
+        self.hits = 0
+        self.misses = 0
+
+    def entry_prefix(
+            self,
+            source: str,
+            arguments: dict
+    ) -> str:
+        """
+        The part of the file name shared by every version of a source read with the same arguments.
+        """
+
+        return hash_key([os.path.abspath(source), arguments])
+
+    def entry_path(
+            self,
+            source: str,
+            arguments: dict
+    ) -> str:
+
+        stat = os.stat(source)
+
+        return os.path.join(
+            self.directory,
+            self.entry_prefix(source=source, arguments=arguments) + '-' +
+            hash_key([stat.st_mtime_ns, stat.st_size]) + TRIANGLE_CACHE_EXTENSION
+        )
+
+    def get(
+            self,
+            source: str,
+            arguments: dict,
+            build: Callable[[], Triangle]
+    ) -> Triangle:
+        """
+        Returns the cached triangle of a source, building and caching it if there is none or the source has changed
+        since. Errors reading or writing the cache are logged, and the triangle is then built as if there were no
+        cache.
+
+        :param source: The path of the file the triangle is built from.
+        :param arguments: The arguments the triangle is constructed with, part of the key.
+        :param build: Builds the triangle on a miss.
+        """
+
+        path = self.entry_path(source=source, arguments=arguments)
+
+        if os.path.isfile(path):
+            try:
+                triangle = read_triangle(path=path)
+                self.hits += 1
+                return triangle
+            except (OSError, ValueError, KeyError) as e:
+                logging.warning("Could not read cached triangle %s: %s" % (path, e))
+
+        self.misses += 1
+
+        triangle = build()
+
+        try:
+            self.remove_stale(path=path)
+            write_triangle(path=path, triangle=triangle)
+        except OSError as e:
+            logging.warning("Could not cache triangle %s: %s" % (path, e))
+
+        return triangle
+
+    def remove_stale(
+            self,
+            path: str
+    ) -> None:
+        """
+        Deletes the entries of earlier versions of the source whose entry is about to be written to path.
+        """
+
+        if not os.path.isdir(self.directory):
+            return
+
+        prefix = os.path.basename(path).split('-')[0]
+
+        for filename in os.listdir(self.directory):
+            stale_path = os.path.join(self.directory, filename)
+            if filename.startswith(prefix) and stale_path != path:
+                try:
+                    os.remove(stale_path)
+                except OSError as e:
+                    # E.g., on Windows, while a triangle read from it is still alive.
+                    logging.warning("Could not remove stale triangle %s: %s" % (stale_path, e))
+
+    def clear(self) -> int:
+        """
+        Deletes every cached triangle.
+
+        :return: The number of entries deleted.
+        """
+
+        if not os.path.isdir(self.directory):
+            return 0
+
+        count = 0
+
+        for filename in os.listdir(self.directory):
+            if filename.endswith(TRIANGLE_CACHE_EXTENSION):
+                os.remove(os.path.join(self.directory, filename))
+                count += 1
+
+        return count
+
+
+TRIANGLE_CACHE = TriangleCache()
+
+
+def read_triangle_csv(
+        path: str,
+        cache: TriangleCache = TRIANGLE_CACHE,
+        **arguments
+) -> Triangle:
+    """
+    Builds a triangle from a CSV file, going through the triangle cache unless cache is None.
+
+    :param path: The path of the CSV file.
+    :param cache: The cache to use.
+    :param arguments: Passed to the Triangle constructor, e.g., origin and development.
+    """
+
+    def build() -> Triangle:
+
+        return cl.Triangle(
+            data=pd.read_csv(path),
+            **arguments
+        )
+
+    if cache is None:
+        return build()
+
+    return cache.get(
+        source=path,
+        arguments=arguments,
+        build=build
+    )